@@ -29,8 +29,8 @@ config = context.config
 db_url = settings.DATABASE_URL.replace("+asyncpg", "+psycopg2") if "+asyncpg" in settings.DATABASE_URL else settings.DATABASE_URL
 config.set_main_option("sqlalchemy.url", db_url)
 
-# 解析日志配置
-if config.config_file_name is not None:
+# 解析日志配置（应用内调用迁移时不覆盖应用的日志配置）
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
     fileConfig(config.config_file_name)
 
 # 目标元数据
@@ -0,0 +1,51 @@
+"""create background_jobs table
+
+Revision ID: create_background_jobs
+Revises: add_expense_amount
+Create Date: 2026-02-15
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'create_background_jobs'
+down_revision: Union[str, None] = 'add_expense_amount'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """创建后台任务表（持久化发件箱）"""
+    op.create_table(
+        'background_jobs',
+        sa.Column('id', sa.Integer(), primary_key=True, index=True),
+        sa.Column('job_type', sa.String(50), nullable=False, index=True, comment='任务类型'),
+        sa.Column('payload', sa.JSON(), nullable=False, comment='任务参数'),
+        sa.Column('dedupe_key', sa.String(100), nullable=True, index=True, comment='去重键（存在相同键的待执行任务时不重复入队）'),
+        sa.Column('status', sa.String(20), nullable=False, server_default='pending', comment='状态: pending(待执行), running(执行中), succeeded(成功), failed(失败)'),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0', comment='已尝试次数'),
+        sa.Column('max_attempts', sa.Integer(), nullable=False, server_default='5', comment='最大尝试次数'),
+        sa.Column('run_after', sa.DateTime(), nullable=False, server_default=sa.func.now(), comment='最早执行时间（重试退避）'),
+        sa.Column('locked_at', sa.DateTime(), nullable=True, comment='被工作者领取的时间'),
+        sa.Column('last_error', sa.Text(), nullable=True, comment='最近一次错误信息'),
+        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.func.now(), comment='创建时间'),
+        sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.func.now(), comment='更新时间'),
+        sa.Column('finished_at', sa.DateTime(), nullable=True, comment='完成时间'),
+    )
+
+    # 工作者按状态 + 执行时间领取任务
+    op.create_index(
+        'ix_background_jobs_status_run_after',
+        'background_jobs',
+        ['status', 'run_after']
+    )
+
+
+def downgrade() -> None:
+    """删除后台任务表"""
+    op.drop_index('ix_background_jobs_status_run_after', table_name='background_jobs')
+    op.drop_table('background_jobs')
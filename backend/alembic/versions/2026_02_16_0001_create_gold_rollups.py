@@ -0,0 +1,59 @@
+"""create gold analytics rollup tables
+
+Revision ID: create_gold_rollups
+Revises: create_background_jobs
+Create Date: 2026-02-16
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'create_gold_rollups'
+down_revision: Union[str, None] = 'create_background_jobs'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """创建金团统计汇总表（数据由 scripts/rebuild_gold_analytics.py 回填）"""
+    op.create_table(
+        'gold_rollups',
+        sa.Column('id', sa.Integer(), primary_key=True, index=True),
+        sa.Column('guild_id', sa.Integer(), sa.ForeignKey('guilds.id', ondelete='CASCADE'), nullable=False, index=True, comment='群组ID'),
+        sa.Column('period_type', sa.String(10), nullable=False, comment='周期类型: week(周), month(月)'),
+        sa.Column('period_start', sa.Date(), nullable=False, comment='周期起始日期（周一 / 每月1日）'),
+        sa.Column('dungeon', sa.String(50), nullable=False, comment='副本名称'),
+        sa.Column('record_count', sa.Integer(), nullable=False, server_default='0', comment='金团记录数'),
+        sa.Column('total_gold', sa.BigInteger(), nullable=False, server_default='0', comment='总金团'),
+        sa.Column('subsidy_gold', sa.BigInteger(), nullable=False, server_default='0', comment='总补贴'),
+        sa.Column('worker_count', sa.Integer(), nullable=False, server_default='0', comment='打工人次'),
+        sa.Column('xuanjing_count', sa.Integer(), nullable=False, server_default='0', comment='出玄晶次数'),
+        sa.Column('heibenren_count', sa.Integer(), nullable=False, server_default='0', comment='有黑本人的记录数'),
+        sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.func.now(), comment='更新时间'),
+        sa.UniqueConstraint('guild_id', 'period_type', 'period_start', 'dungeon', name='uq_gold_rollups_period_dungeon'),
+    )
+
+    op.create_table(
+        'gold_user_rollups',
+        sa.Column('id', sa.Integer(), primary_key=True, index=True),
+        sa.Column('guild_id', sa.Integer(), sa.ForeignKey('guilds.id', ondelete='CASCADE'), nullable=False, index=True, comment='群组ID'),
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id', ondelete='CASCADE'), nullable=False, index=True, comment='用户ID'),
+        sa.Column('period_type', sa.String(10), nullable=False, comment='周期类型: week(周), month(月)'),
+        sa.Column('period_start', sa.Date(), nullable=False, comment='周期起始日期（周一 / 每月1日）'),
+        sa.Column('run_count', sa.Integer(), nullable=False, server_default='0', comment='打工次数'),
+        sa.Column('earned_gold', sa.BigInteger(), nullable=False, server_default='0', comment='打工收入（人均工资之和）'),
+        sa.Column('heibenren_count', sa.Integer(), nullable=False, server_default='0', comment='黑本次数'),
+        sa.Column('heibenren_gold', sa.BigInteger(), nullable=False, server_default='0', comment='黑本团总金团'),
+        sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.func.now(), comment='更新时间'),
+        sa.UniqueConstraint('guild_id', 'user_id', 'period_type', 'period_start', name='uq_gold_user_rollups_period_user'),
+    )
+
+
+def downgrade() -> None:
+    """删除金团统计汇总表"""
+    op.drop_table('gold_user_rollups')
+    op.drop_table('gold_rollups')
@@ -0,0 +1,66 @@
+"""add composite and partial indexes for hot queries
+
+Revision ID: add_hot_query_indexes
+Revises: create_gold_rollups
+Create Date: 2026-02-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_hot_query_indexes'
+down_revision: Union[str, None] = 'create_gold_rollups'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """按热点查询的过滤与排序列创建复合索引（软删除/取消/退群条件使用部分索引）"""
+    op.create_index(
+        'ix_gold_records_guild_run_date_active',
+        'gold_records',
+        ['guild_id', sa.text('run_date DESC'), sa.text('id DESC')],
+        postgresql_where=sa.text('deleted_at IS NULL'),
+    )
+    op.create_index(
+        'ix_gold_records_guild_heibenren_run_date',
+        'gold_records',
+        ['guild_id', 'heibenren_user_id', sa.text('run_date DESC')],
+        postgresql_where=sa.text('deleted_at IS NULL'),
+    )
+    op.create_index(
+        'ix_signups_team_active_created_at',
+        'signups',
+        ['team_id', 'created_at'],
+        postgresql_where=sa.text('cancelled_at IS NULL'),
+    )
+    op.create_index(
+        'ix_ranking_snapshots_guild_user_date',
+        'ranking_snapshots',
+        ['guild_id', 'user_id', sa.text('snapshot_date DESC')],
+    )
+    op.create_index(
+        'ix_guild_members_guild_user_active',
+        'guild_members',
+        ['guild_id', 'user_id'],
+        postgresql_where=sa.text('left_at IS NULL'),
+    )
+    op.create_index(
+        'ix_weekly_records_user_week',
+        'weekly_records',
+        ['user_id', 'week_start_date'],
+    )
+
+
+def downgrade() -> None:
+    """删除热点查询索引"""
+    op.drop_index('ix_weekly_records_user_week', table_name='weekly_records')
+    op.drop_index('ix_guild_members_guild_user_active', table_name='guild_members')
+    op.drop_index('ix_ranking_snapshots_guild_user_date', table_name='ranking_snapshots')
+    op.drop_index('ix_signups_team_active_created_at', table_name='signups')
+    op.drop_index('ix_gold_records_guild_heibenren_run_date', table_name='gold_records')
+    op.drop_index('ix_gold_records_guild_run_date_active', table_name='gold_records')
@@ -0,0 +1,33 @@
+"""add keyset index for team listing
+
+Revision ID: add_teams_keyset_index
+Revises: add_hot_query_indexes
+Create Date: 2026-02-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_teams_keyset_index'
+down_revision: Union[str, None] = 'add_hot_query_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """开团列表按 (team_time, id) 游标分页、按时间范围过滤（只索引未删除的团队）"""
+    op.create_index(
+        'ix_teams_guild_team_time_active',
+        'teams',
+        ['guild_id', 'team_time', 'id'],
+        postgresql_where=sa.text("status != 'deleted'"),
+    )
+
+
+def downgrade() -> None:
+    """删除开团列表索引"""
+    op.drop_index('ix_teams_guild_team_time_active', table_name='teams')
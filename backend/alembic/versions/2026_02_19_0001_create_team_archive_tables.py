@@ -0,0 +1,112 @@
+"""create team archive tables
+
+Revision ID: create_team_archive_tables
+Revises: add_teams_keyset_index
+Create Date: 2026-02-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'create_team_archive_tables'
+down_revision: Union[str, None] = 'add_teams_keyset_index'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    创建开团、报名、团队日志的归档表（列与热表一致，另加归档时间，不设外键）
+
+    金团记录的 team_id 改为不设外键：团队归档后记录仍指向原团队ID，
+    否则删除热表中的团队会把 team_id 置空
+    """
+    op.create_table(
+        'teams_archive',
+        sa.Column('id', sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column('guild_id', sa.Integer(), nullable=False, comment='群组ID'),
+        sa.Column('creator_id', sa.Integer(), nullable=False, comment='创建者ID'),
+        sa.Column('title', sa.String(100), nullable=False, comment='开团标题'),
+        sa.Column('team_time', sa.DateTime(), nullable=False, comment='开团时间'),
+        sa.Column('dungeon', sa.String(50), nullable=False, comment='副本名称'),
+        sa.Column('max_members', sa.Integer(), nullable=True, comment='最大人数'),
+        sa.Column('is_xuanjing_booked', sa.Boolean(), nullable=True, comment='是否预定玄晶'),
+        sa.Column('is_yuntie_booked', sa.Boolean(), nullable=True, comment='是否预定陨铁'),
+        sa.Column('is_hidden', sa.Boolean(), nullable=True, comment='是否对成员隐藏'),
+        sa.Column('is_locked', sa.Boolean(), nullable=True, comment='是否锁定'),
+        sa.Column('status', sa.String(20), nullable=True, comment='状态: open(开启), completed(完成), cancelled(取消), deleted(删除)'),
+        sa.Column('rule', sa.JSON(), nullable=False, comment='报名规则'),
+        sa.Column('slot_view', sa.JSON(), nullable=True, comment='坑位视觉映射（已废弃，使用slot_assignments）'),
+        sa.Column('slot_assignments', sa.JSON(), nullable=True, comment='坑位分配情况 [{signup_id, locked}, ...]'),
+        sa.Column('waitlist', sa.JSON(), nullable=True, comment='候补列表 [signup_id, ...]'),
+        sa.Column('notice', sa.Text(), nullable=True, comment='团队告示'),
+        sa.Column('created_at', sa.DateTime(), nullable=False, comment='创建时间'),
+        sa.Column('updated_at', sa.DateTime(), nullable=False, comment='更新时间'),
+        sa.Column('closed_at', sa.DateTime(), nullable=True, comment='关闭时间'),
+        sa.Column('closed_by', sa.Integer(), nullable=True, comment='关闭者ID'),
+        sa.Column('archived_at', sa.DateTime(), nullable=False, server_default=sa.func.now(), comment='归档时间'),
+    )
+    op.create_index('ix_teams_archive_guild_team_time', 'teams_archive', ['guild_id', 'team_time', 'id'])
+
+    op.create_table(
+        'signups_archive',
+        sa.Column('id', sa.Integer(), primary_key=True, autoincrement=False, comment='报名ID'),
+        sa.Column('team_id', sa.Integer(), nullable=False, comment='开团ID'),
+        sa.Column('submitter_id', sa.Integer(), nullable=False, comment='提交者用户ID（当前登录用户）'),
+        sa.Column('signup_user_id', sa.Integer(), nullable=True, comment='报名用户ID（可为null，表示系统外的人）'),
+        sa.Column('signup_character_id', sa.Integer(), nullable=True, comment='报名角色ID（可为null，表示未录入系统的角色）'),
+        sa.Column('signup_info', sa.JSON(), nullable=False, comment='报名信息（包含提交者名称、报名者名称、角色名称、心法）'),
+        sa.Column('priority', sa.Integer(), nullable=False, comment='优先级（用于排序）'),
+        sa.Column('is_rich', sa.Boolean(), nullable=False, comment='是否老板'),
+        sa.Column('is_proxy', sa.Boolean(), nullable=False, comment='是否代报（自动判断）'),
+        sa.Column('slot_position', sa.Integer(), nullable=True, comment='锁定位置（0-24或null）'),
+        sa.Column('presence_status', sa.String(20), nullable=True, comment='到场状态: ready(就绪), absent(缺席), null(未标记)'),
+        sa.Column('cancelled_at', sa.DateTime(), nullable=True, comment='取消时间（软删除）'),
+        sa.Column('cancelled_by', sa.Integer(), nullable=True, comment='取消者用户ID'),
+        sa.Column('edit_count', sa.Integer(), nullable=False, comment='编辑次数（用于限制普通用户修改次数）'),
+        sa.Column('created_at', sa.DateTime(), nullable=False, comment='创建时间'),
+        sa.Column('updated_at', sa.DateTime(), nullable=False, comment='更新时间'),
+        sa.Column('archived_at', sa.DateTime(), nullable=False, server_default=sa.func.now(), comment='归档时间'),
+    )
+    op.create_index('ix_signups_archive_team_id', 'signups_archive', ['team_id'])
+
+    op.create_table(
+        'team_logs_archive',
+        sa.Column('id', sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column('team_id', sa.Integer(), nullable=False, comment='关联的团队ID'),
+        sa.Column('guild_id', sa.Integer(), nullable=False, comment='关联的群组ID'),
+        sa.Column('action_type', sa.String(50), nullable=False, comment='操作类型'),
+        sa.Column('action_user_id', sa.Integer(), nullable=True, comment='执行操作的用户ID'),
+        sa.Column('action_detail', sa.JSON(), nullable=False, comment='操作详情'),
+        sa.Column('created_at', sa.DateTime(), nullable=False, comment='操作时间'),
+        sa.Column('archived_at', sa.DateTime(), nullable=False, server_default=sa.func.now(), comment='归档时间'),
+    )
+    op.create_index('ix_team_logs_archive_team_created_at', 'team_logs_archive', ['team_id', 'created_at'])
+
+    # 金团记录 -> 团队的外键（历史迁移中约束名不一致，按引用关系查找）
+    bind = op.get_bind()
+    for fk in sa.inspect(bind).get_foreign_keys('gold_records'):
+        if fk['referred_table'] == 'teams' and fk.get('name'):
+            op.drop_constraint(fk['name'], 'gold_records', type_='foreignkey')
+
+
+def downgrade() -> None:
+    """删除归档表（归档数据需先手动迁回热表），恢复金团记录外键"""
+    op.execute(
+        "UPDATE gold_records SET team_id = NULL "
+        "WHERE team_id IS NOT NULL AND team_id NOT IN (SELECT id FROM teams)"
+    )
+    op.create_foreign_key(
+        'gold_records_team_id_fkey', 'gold_records', 'teams',
+        ['team_id'], ['id'], ondelete='SET NULL',
+    )
+    op.drop_index('ix_team_logs_archive_team_created_at', table_name='team_logs_archive')
+    op.drop_table('team_logs_archive')
+    op.drop_index('ix_signups_archive_team_id', table_name='signups_archive')
+    op.drop_table('signups_archive')
+    op.drop_index('ix_teams_archive_guild_team_time', table_name='teams_archive')
+    op.drop_table('teams_archive')
@@ -10,13 +10,13 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
 from app.core.logging import get_logger
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.core.security import verify_token, verify_password
 from app.models.user import User
 from app.models.admin import SystemAdmin
 from app.models.bot import Bot, BotGuild
 from app.models.guild import Guild
-from app.models.guild_member import GuildMember
+from app.services.guild_context_service import GuildContext, GuildContextService
 
 logger = get_logger(__name__)
 
@@ -273,117 +273,104 @@ async def verify_bot_guild_access_by_qq(
     return guild
 
 
-async def get_current_guild(
-    x_guild_id: Optional[str] = Header(None, alias="X-Guild-Id"),
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-) -> Guild:
-    """
-    获取当前选中的群组
-    
-    通过 X-Guild-Id 请求头获取群组 ID
-    
-    Args:
-        x_guild_id: 群组ID（从X-Guild-Id请求头获取）
-        db: 数据库会话
-        current_user: 当前用户
-    
-    Returns:
-        Guild: 当前群组对象
-    
-    Raises:
-        HTTPException: 未选择群组或群组不存在
-    """
+def _parse_guild_id_header(x_guild_id: Optional[str]) -> int:
+    """解析 X-Guild-Id 请求头"""
     if not x_guild_id:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="请先选择一个群组"
         )
-    
+
     try:
-        guild_id = int(x_guild_id)
+        return int(x_guild_id)
     except ValueError:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="无效的群组ID"
         )
-    
-    # 查询群组
-    result = await db.execute(
-        select(Guild).where(Guild.id == guild_id, Guild.deleted_at.is_(None))
-    )
-    guild = result.scalar_one_or_none()
-    
-    if not guild:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="群组不存在"
-        )
-    
-    # 验证用户是否是群组成员
-    member_result = await db.execute(
-        select(GuildMember).where(
-            GuildMember.guild_id == guild_id,
-            GuildMember.user_id == current_user.id
-        )
-    )
-    member = member_result.scalar_one_or_none()
-    
-    if not member:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="您不是该群组的成员"
-        )
-    
-    return guild
 
 
-async def get_current_member_role(
+async def get_current_guild_context(
     x_guild_id: Optional[str] = Header(None, alias="X-Guild-Id"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
-) -> str:
+) -> GuildContext:
     """
-    获取当前用户在选中群组中的角色
-    
+    获取当前选中群组的上下文（群组 + 成员关系 + 角色）
+
+    同一请求内 FastAPI 会复用该依赖的结果，
+    get_current_guild / get_current_member_role 均基于它，不再重复查库
+
     Args:
         x_guild_id: 群组ID（从X-Guild-Id请求头获取）
         db: 数据库会话
         current_user: 当前用户
-    
+
     Returns:
-        str: 角色（owner/helper/member）
-    
+        GuildContext: 群组上下文
+
     Raises:
-        HTTPException: 未选择群组或不是群组成员
+        HTTPException: 未选择群组、群组不存在或不是群组成员
     """
-    if not x_guild_id:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="请先选择一个群组"
-        )
-    
-    try:
-        guild_id = int(x_guild_id)
-    except ValueError:
+    guild_id = _parse_guild_id_header(x_guild_id)
+
+    context = await GuildContextService.resolve(db, guild_id, current_user.id)
+    if context is None:
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="无效的群组ID"
-        )
-    
-    # 查询成员关系
-    result = await db.execute(
-        select(GuildMember).where(
-            GuildMember.guild_id == guild_id,
-            GuildMember.user_id == current_user.id
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="群组不存在"
         )
-    )
-    member = result.scalar_one_or_none()
-    
-    if not member:
+
+    if not context.is_member:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="您不是该群组的成员"
         )
-    
-    return member.role
+
+    return context
+
+
+async def get_current_guild(
+    context: GuildContext = Depends(get_current_guild_context),
+    db: AsyncSession = Depends(get_db)
+) -> Guild:
+    """
+    获取当前选中的群组
+
+    通过 X-Guild-Id 请求头获取群组 ID
+
+    Args:
+        context: 当前群组上下文
+        db: 数据库会话
+
+    Returns:
+        Guild: 当前群组对象
+
+    Raises:
+        HTTPException: 未选择群组或群组不存在
+    """
+    # 上下文加载时群组已进入会话的 identity map，命中时无需再次查询
+    guild = await db.get(Guild, context.guild_id)
+
+    if not guild or guild.deleted_at is not None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="群组不存在"
+        )
+
+    return guild
+
+
+async def get_current_member_role(
+    context: GuildContext = Depends(get_current_guild_context)
+) -> str:
+    """
+    获取当前用户在选中群组中的角色
+
+    Args:
+        context: 当前群组上下文
+
+    Returns:
+        str: 角色（owner/helper/member）
+    """
+    return context.role
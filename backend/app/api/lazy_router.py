@@ -0,0 +1,91 @@
+"""
+延迟加载路由
+
+管理后台、游戏控制台等低频且导入较重的路由模块不在启动时导入，
+第一次有请求命中其路径前缀时才导入并注册，降低工作进程冷启动耗时
+"""
+import importlib
+import threading
+from typing import Any, List, Optional, Sequence
+
+from fastapi import APIRouter
+from starlette.routing import BaseRoute, Match, NoMatchFound
+from starlette.types import Receive, Scope, Send
+
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class LazyRouter(BaseRoute):
+    """
+    延迟加载的路由组
+
+    Args:
+        path_prefix: 该路由组所有路径共同的前缀（完整路径，用于判断是否需要加载）
+        target: 路由对象位置，格式 "模块路径:属性名"
+        prefix: 注册时使用的前缀（同 include_router）
+        tags: 注册时使用的标签（同 include_router）
+    """
+
+    def __init__(self, path_prefix: str, target: str, prefix: str = "", tags: Optional[Sequence[str]] = None):
+        self.path_prefix = path_prefix.rstrip("/")
+        self.target = target
+        self.prefix = prefix
+        self.tags = list(tags or [])
+        self._routes: Optional[List[BaseRoute]] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._routes is not None
+
+    @property
+    def routes(self) -> List[BaseRoute]:
+        """加载并返回实际的路由"""
+        if self._routes is None:
+            with self._lock:
+                if self._routes is None:
+                    module_name, attr = self.target.split(":")
+                    router = APIRouter()
+                    router.include_router(
+                        getattr(importlib.import_module(module_name), attr),
+                        prefix=self.prefix,
+                        tags=self.tags,
+                    )
+                    self._routes = router.routes
+                    logger.info(f"已加载延迟路由: {self.target}（{len(self._routes)} 个接口）")
+        return self._routes
+
+    def _covers(self, path: str) -> bool:
+        return path == self.path_prefix or path.startswith(self.path_prefix + "/")
+
+    def matches(self, scope: Scope) -> tuple[Match, Scope]:
+        if scope["type"] not in ("http", "websocket") or not self._covers(scope["path"]):
+            return Match.NONE, {}
+
+        partial: Optional[Scope] = None
+        for route in self.routes:
+            match, child_scope = route.matches(scope)
+            if match == Match.FULL:
+                return Match.FULL, {**child_scope, "lazy_route": route}
+            if match == Match.PARTIAL and partial is None:
+                partial = {**child_scope, "lazy_route": route}
+        if partial is not None:
+            return Match.PARTIAL, partial
+        return Match.NONE, {}
+
+    async def handle(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await scope["lazy_route"].handle(scope, receive, send)
+
+    def url_path_for(self, name: str, /, **path_params: Any):
+        for route in self.routes:
+            try:
+                return route.url_path_for(name, **path_params)
+            except NoMatchFound:
+                pass
+        raise NoMatchFound(name, path_params)
+
+    def load(self) -> None:
+        """立即加载（文档需要完整接口列表时使用）"""
+        self.routes
@@ -2,18 +2,19 @@
 API v2 路由模块
 """
 from fastapi import APIRouter
+from app.api.lazy_router import LazyRouter
+from app.core.config import settings
 from app.api.v2.endpoints import auth
 from app.api.v2.endpoints import guilds as guilds_user
 from app.api.v2.endpoints import teams
 from app.api.v2.endpoints import templates
 from app.api.v2.endpoints import signups
 from app.api.v2.endpoints import gold_records
+from app.api.v2.endpoints import gold_analytics
 from app.api.v2.endpoints import configs
 from app.api.v2.endpoints import ranking
 from app.api.v2.endpoints import my_records
 from app.api.v2.endpoints import guild_configs
-from app.api.v2.endpoints import game_console
-from app.api.v2 import admin
 from app.api.v2 import users
 from app.api.v2 import characters
 from app.api.v2 import bot
@@ -33,13 +34,6 @@ api_router.include_router(
     tags=["用户管理"]
 )
 
-# 注册管理员路由（群组管理、订阅管理等）
-api_router.include_router(
-    admin.api_router,
-    prefix="/admin",
-    tags=["管理后台"]
-)
-
 # 群组成员相关用户接口
 api_router.include_router(
     guilds_user.router,
@@ -76,6 +70,12 @@ api_router.include_router(
     tags=["金团记录"]
 )
 
+# 金团统计接口
+api_router.include_router(
+    gold_analytics.router,
+    tags=["金团统计"]
+)
+
 # 红黑榜接口
 api_router.include_router(
     ranking.router,
@@ -109,8 +109,21 @@ api_router.include_router(
     tags=["群组配置"]
 )
 
-# 游戏控制台接口
-api_router.include_router(
-    game_console.router,
-    tags=["游戏控制台"]
-)
+
+def include_lazy_routers(router: APIRouter, prefix: str = "") -> None:
+    """
+    注册低频且导入较重的路由（首次请求命中时才导入，见 app.api.lazy_router）
+
+    调试模式需要完整的接口文档，直接加载
+    """
+    lazy_routers = [
+        # 管理员路由（群组管理、订阅管理等）
+        LazyRouter(f"{prefix}/admin", "app.api.v2.admin:api_router", prefix=f"{prefix}/admin", tags=["管理后台"]),
+        # 游戏控制台接口
+        LazyRouter(f"{prefix}/game", "app.api.v2.endpoints.game_console:router", prefix=prefix, tags=["游戏控制台"]),
+    ]
+    for lazy_router in lazy_routers:
+        if settings.LAZY_ROUTERS and not settings.DEBUG:
+            router.routes.append(lazy_router)
+        else:
+            router.routes.extend(lazy_router.routes)
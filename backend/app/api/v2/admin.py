@@ -2,7 +2,7 @@
 API v2 管理员路由模块
 """
 from fastapi import APIRouter
-from app.api.v2.endpoints import admin_auth, admin_guilds, admin_users, admin_characters, admin_configs, admin_season_correction, admin_bots
+from app.api.v2.endpoints import admin_auth, admin_guilds, admin_users, admin_characters, admin_configs, admin_season_correction, admin_bots, admin_jobs
 
 api_router = APIRouter()
 
@@ -54,3 +54,10 @@ api_router.include_router(
     prefix="/bots",
     tags=["管理员-Bot管理"]
 )
+
+# 注册后台任务队列管理路由
+api_router.include_router(
+    admin_jobs.router,
+    prefix="/jobs",
+    tags=["管理员-后台任务"]
+)
@@ -8,6 +8,7 @@ from sqlalchemy import select, text, bindparam, String
 from pydantic import BaseModel
 
 from app.api import deps
+from app.services.config_cache_service import ConfigCacheService, system_key
 from app.database import AsyncSessionLocal
 
 
@@ -41,17 +42,12 @@ async def get_dungeon_options(
 
     - **type**: 可选，过滤副本类型（primary 或 secondary）
     """
-    # 查询配置
-    result = await db.execute(
-        text("SELECT value FROM system_configs WHERE key = 'dungeon_options'")
-    )
-    row = result.fetchone()
+    # 查询配置（走配置缓存）
+    options = await ConfigCacheService.get_system_config(db, "dungeon_options")
 
-    if not row:
+    if options is None:
         raise HTTPException(status_code=404, detail="副本配置不存在")
 
-    options = row[0]  # JSONB 字段会自动解析为 Python 对象
-
     # 如果指定了类型，进行过滤
     if type:
         options = [opt for opt in options if opt.get("type") == type]
@@ -83,6 +79,7 @@ async def update_dungeon_options(
         text("UPDATE system_configs SET value = :value, updated_at = NOW() WHERE key = 'dungeon_options'"),
         {"value": options_json}
     )
+    await ConfigCacheService.invalidate_on_commit(db, system_key("dungeon_options"))
     await db.commit()
 
     return {"options": data.options}
@@ -11,6 +11,7 @@ from sqlalchemy.orm import selectinload
 from app.api import deps
 from app.models import Guild, Subscription, User, GuildMember
 from app.schemas.common import PaginatedResponse
+from app.services.guild_context_service import GuildContextService
 from app.schemas.guild import (
     GuildCreate,
     GuildUpdate,
@@ -298,6 +299,7 @@ async def update_guild(
     
     await db.commit()
     await db.refresh(guild)
+    GuildContextService.invalidate_guild(guild_id)
     
     # 获取当前有效订阅
     today = date.today()
@@ -393,6 +395,7 @@ async def transfer_guild_owner(
         ))
 
     await db.commit()
+    GuildContextService.invalidate_guild(guild_id)
 
     return {"message": "群主转让成功"}
 
@@ -421,6 +424,7 @@ async def delete_guild(
     guild.deleted_at = datetime.utcnow()
     
     await db.commit()
+    GuildContextService.invalidate_guild(guild_id)
     
     return {"message": "群组删除成功"}
 
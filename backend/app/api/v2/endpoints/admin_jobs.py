@@ -0,0 +1,29 @@
+"""
+管理员 - 后台任务队列接口
+"""
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_db
+from app.api.deps import get_current_admin
+from app.models.admin import SystemAdmin
+from app.schemas.background_job import JobQueueStats
+from app.schemas.common import ResponseModel
+from app.services.job_queue import JobQueue
+
+router = APIRouter()
+
+
+@router.get("/stats", response_model=ResponseModel[JobQueueStats])
+async def get_job_queue_stats(
+    current_admin: SystemAdmin = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    获取后台任务队列统计
+
+    - depth 为待执行任务数量（队列深度）
+    - 按任务类型、状态分组统计
+    """
+    stats = await JobQueue.get_stats(db)
+    return ResponseModel(data=JobQueueStats(**stats))
@@ -30,6 +30,7 @@ from app.schemas.bot import (
 )
 from app.schemas.common import ResponseModel
 from app.core.security import get_password_hash
+from app.services.guild_context_service import GuildContextService
 
 router = APIRouter()
 
@@ -169,6 +170,7 @@ async def batch_add_members(
             ))
 
     await db.commit()
+    GuildContextService.invalidate_guild(guild.id)
 
     return ResponseModel(data=BotAddMembersResponse(
         success_count=success_count,
@@ -292,6 +294,7 @@ async def batch_remove_members(
             ))
 
     await db.commit()
+    GuildContextService.invalidate_guild(guild.id)
 
     return ResponseModel(data=BotRemoveMembersResponse(
         success_count=success_count,
@@ -351,6 +354,7 @@ async def update_member_nickname(
     # 更新群昵称
     gm.group_nickname = payload.group_nickname
     await db.commit()
+    GuildContextService.invalidate_member(guild.id, user.id)
 
     return ResponseModel(message="群昵称更新成功")
 
@@ -644,6 +648,7 @@ async def sync_members(
             ))
     
     await db.commit()
+    GuildContextService.invalidate_guild(guild.id)
     
     return ResponseModel(data=BotSyncMembersResponse(
         added_count=added_count,
@@ -7,6 +7,7 @@ Bot API - 报名管理（重构版）
 3. 登记老板：submitter_id = 当前用户，signup_user_id = null，is_rich = true
 4. 取消报名：必须使用 signup_id 精确取消
 """
+import asyncio
 from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -16,7 +17,6 @@ from app.database import get_db
 from app.api.deps import get_current_bot, verify_bot_guild_access_by_qq
 from app.models.bot import Bot
 from app.models.user import User
-from app.models.guild_member import GuildMember
 from app.models.team import Team
 from app.models.signup import Signup
 from app.models.character import Character, CharacterPlayer
@@ -26,6 +26,7 @@ from app.schemas.common import ResponseModel
 from app.core.logging import get_logger
 from app.services.slot_allocation_service import SlotAllocationService
 from app.services.team_log_service import TeamLogService
+from app.services.data_loader import get_loaders, pick_nickname
 
 logger = get_logger(__name__)
 router = APIRouter()
@@ -39,35 +40,15 @@ async def _get_user_nickname(
     """
     获取用户昵称，优先级：群昵称 > 用户主昵称 > 用户其他昵称
     """
-    # 先尝试获取群昵称
-    member_result = await db.execute(
-        select(GuildMember).where(
-            GuildMember.guild_id == guild_id,
-            GuildMember.user_id == user_id,
-            GuildMember.left_at.is_(None)
-        )
+    loaders = get_loaders(db)
+    user, member = await asyncio.gather(
+        loaders.users.load(user_id),
+        loaders.guild_members.load((guild_id, user_id))
     )
-    member = member_result.scalar_one_or_none()
-    if member and member.group_nickname:
-        return member.group_nickname
-
-    # 获取用户信息
-    user_result = await db.execute(
-        select(User).where(User.id == user_id, User.deleted_at.is_(None))
-    )
-    user = user_result.scalar_one_or_none()
-    if not user:
-        return "未知用户"
-
-    # 优先返回主昵称
-    if user.nickname:
-        return user.nickname
-
-    # 最后尝试其他昵称
-    if user.other_nicknames and len(user.other_nicknames) > 0:
-        return user.other_nicknames[0]
-
-    return "未知用户"
+    # 已注销的用户按不存在处理
+    if user is not None and user.deleted_at is not None:
+        user = None
+    return pick_nickname(member, user)
 
 
 @router.post(
@@ -149,7 +130,8 @@ async def create_signup(
             detail=f"QQ号 {payload.qq_number} 未注册"
         )
 
-    # 获取提交者昵称
+    # 获取提交者昵称（用户已查询，预先写入加载器）
+    get_loaders(db).users.prime(submitter.id, submitter)
     submitter_nickname = await _get_user_nickname(db, guild.id, submitter.id)
     logger.debug(f"找到提交者 - 用户ID: {submitter.id}, 昵称: {submitter_nickname}")
 
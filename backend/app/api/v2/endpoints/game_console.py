@@ -1,20 +1,23 @@
 """
 Game Console API - 卡牌活动控制台
 """
-import httpx
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.database import get_db
 from app.schemas.game_console import PublishCardRequest
 from app.schemas.common import ResponseModel
+from app.services.job_queue import JobQueue
 
 router = APIRouter()
 
-BOT_API_URL = "http://bot:8080/api/send-card"
-
 
 @router.post("/game/publish-card", response_model=ResponseModel)
-async def publish_card(payload: PublishCardRequest):
-    """发布卡牌到QQ群"""
+async def publish_card(
+    payload: PublishCardRequest,
+    db: AsyncSession = Depends(get_db)
+):
+    """发布卡牌到QQ群（通过后台任务队列调用 Bot，仅连接失败时重试）"""
 
     # 构建文本消息
     text = f"{payload.target_team}队抽卡："
@@ -24,31 +27,20 @@ async def publish_card(payload: PublishCardRequest):
         text += f"\n[{payload.card_type}] {payload.card_name}\n{payload.desc}"
 
     # 调用 Bot API - 传递卡牌参数而非URL
-    try:
-        async with httpx.AsyncClient(timeout=15.0) as client:
-            response = await client.post(
-                BOT_API_URL,
-                json={
-                    "group_id": payload.qq_group_number,
-                    "text": text,
-                    "card_type": payload.card_type,
-                    "card_name": payload.card_name,
-                    "desc": payload.desc,
-                    "enhanced": payload.enhanced or "",
-                    "note": payload.note or "",
-                    "image_dir": payload.image_dir or "",
-                },
-            )
-            response.raise_for_status()
-    except httpx.HTTPStatusError as e:
-        raise HTTPException(
-            status_code=status.HTTP_502_BAD_GATEWAY,
-            detail=f"Bot API 错误: {e.response.text}",
-        ) from e
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_502_BAD_GATEWAY,
-            detail=f"Bot API 调用失败: {str(e)}",
-        ) from e
-
-    return ResponseModel(message="发布成功")
+    await JobQueue.enqueue(
+        db, "bot.publish_card",
+        {
+            "group_id": payload.qq_group_number,
+            "text": text,
+            "card_type": payload.card_type,
+            "card_name": payload.card_name,
+            "desc": payload.desc,
+            "enhanced": payload.enhanced or "",
+            "note": payload.note or "",
+            "image_dir": payload.image_dir or "",
+        },
+        max_attempts=3
+    )
+    await db.commit()
+
+    return ResponseModel(message="已提交发布")
@@ -0,0 +1,55 @@
+"""
+金团统计接口（读取汇总表）
+"""
+from datetime import date
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_current_user, get_db
+from app.models.user import User
+from app.schemas.common import ResponseModel, success
+from app.schemas.gold_analytics import GoldAnalyticsResponse
+from app.services.data_loader import get_loaders
+from app.services.gold_analytics_service import GoldAnalyticsService
+from app.services.guild_context_service import GuildContextService
+
+router = APIRouter(prefix="/guilds", tags=["金团统计"])
+
+
+@router.get("/{guild_id}/gold-analytics", response_model=ResponseModel[GoldAnalyticsResponse])
+async def get_gold_analytics(
+    guild_id: int,
+    period: Literal["week", "month"] = Query("week", description="周期类型: week(周), month(月)"),
+    start_date: Optional[date] = Query(None, description="开始日期"),
+    end_date: Optional[date] = Query(None, description="结束日期"),
+    dungeon: Optional[str] = Query(None, description="副本名称"),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    获取群组金团统计
+
+    - 按周/月的总金团、平均金团、补贴占比、出玄晶率
+    - 按副本汇总
+    - 按成员的打工收入与黑本统计
+    """
+    # 验证权限：所有群组成员都可以查看
+    await GuildContextService.require_member(db, guild_id, current_user.id)
+
+    analytics = await GoldAnalyticsService.get_analytics(
+        db, guild_id, period, start_date, end_date, dungeon
+    )
+
+    # 填充成员显示名称
+    names = await get_loaders(db).display_names(guild_id, [u["user_id"] for u in analytics["users"]])
+    for user_stat in analytics["users"]:
+        user_stat["user_name"] = names.get(user_stat["user_id"])
+
+    return success(GoldAnalyticsResponse(
+        period_type=period,
+        start_date=start_date,
+        end_date=end_date,
+        dungeon=dungeon,
+        **analytics
+    ))
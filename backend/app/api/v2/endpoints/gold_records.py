@@ -1,80 +1,83 @@
 """
 金团记录用户接口
 """
+import asyncio
+import io
 import logging
-from typing import Optional
+from typing import List, Optional, Tuple
 from datetime import date
 
 logger = logging.getLogger(__name__)
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_
+from sqlalchemy import select, and_, func, tuple_
 
-from app.api.deps import get_current_user, get_db
+from app.api.deps import get_current_user, get_db, get_read_db
 from app.models.user import User
-from app.models.guild import Guild
-from app.models.guild_member import GuildMember
 from app.models.gold_record import GoldRecord
-from app.models.character import Character
-from app.models.team import Team
 from app.models.signup import Signup
-from app.schemas.common import ResponseModel, success
-from app.schemas.gold_record import GoldRecordCreate, GoldRecordUpdate, GoldRecordOut
+from app.schemas.common import ResponseModel, CursorPage, success
+from app.schemas.gold_record import GoldRecordCreate, GoldRecordUpdate, GoldRecordOut, GoldImportResult
+from app.services.guild_context_service import GuildContextService
+from app.services.archive_service import ArchiveService
+from app.services.data_loader import get_loaders
+from app.services.gold_import_service import GoldImportService
+from app.services.job_queue import JobQueue
+from app.utils.export import ensure_export_format, streaming_export
 
 router = APIRouter(prefix="/guilds", tags=["金团记录"])
 
 
-def _ensure_member_with_role(member: GuildMember, roles: list[str]):
-    """验证成员角色权限"""
-    if member is None or member.left_at is not None:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="非该群组成员")
-    if member.role not in roles:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="权限不足")
-
-
-async def _get_heibenren_info(
-    db: AsyncSession,
-    guild_id: int,
-    user_id: Optional[int],
-    original_info: dict
-) -> dict:
+def _build_heibenren_info(original_info: Optional[dict], user, gm) -> dict:
     """
-    获取黑本人显示信息
+    构建黑本人显示信息
     读取时只动态覆盖用户名（不覆盖角色名，角色名在记录时已确定）
     """
     result_info = dict(original_info) if original_info else {}
-
-    # 如果有用户ID，从数据库获取用户昵称（动态覆盖）
-    if user_id:
-        user_result = await db.execute(select(User).where(User.id == user_id))
-        user = user_result.scalar_one_or_none()
-        if user:
-            # 尝试获取群昵称
-            gm_result = await db.execute(
-                select(GuildMember).where(
-                    GuildMember.guild_id == guild_id,
-                    GuildMember.user_id == user_id,
-                    GuildMember.left_at.is_(None)
-                )
-            )
-            gm = gm_result.scalar_one_or_none()
-            if gm and gm.group_nickname:
-                result_info['user_name'] = gm.group_nickname
-            else:
-                result_info['user_name'] = user.nickname
+    if user:
+        # 优先使用群昵称
+        if gm and gm.group_nickname:
+            result_info['user_name'] = gm.group_nickname
+        else:
+            result_info['user_name'] = user.nickname
 
     # 注意：character_name 在记录时已经覆盖并写入数据库，读取时直接使用数据库中的值
 
     return result_info
 
 
-async def _auto_update_weekly_records(db: AsyncSession, gold_record: GoldRecord):
+async def _get_heibenren_info(
+    db: AsyncSession,
+    guild_id: int,
+    user_id: Optional[int],
+    original_info: dict
+) -> dict:
+    """获取单条记录的黑本人显示信息（通过请求级加载器获取用户与群成员）"""
+    if not user_id:
+        return _build_heibenren_info(original_info, None, None)
+
+    loaders = get_loaders(db)
+    user, gm = await asyncio.gather(
+        loaders.users.load(user_id),
+        loaders.guild_members.load((guild_id, user_id))
+    )
+    return _build_heibenren_info(original_info, user, gm)
+
+
+async def _auto_update_weekly_records(
+    db: AsyncSession,
+    gold_record: GoldRecord,
+    week_start: Optional[date] = None
+):
     """
     自动更新每周记录（金团记录联动）
     根据 team_id 查找报名的角色，自动记录人均金团金额
     工资计算公式：(总金团 - 总补贴) / 打工人数
+
+    Args:
+        week_start: 记录所属周（入队时确定，任务延迟执行时不会落到下一周），默认当前周
     """
-    from app.api.v2.endpoints.my_records import auto_create_weekly_record
+    from app.api.v2.endpoints.my_records import auto_upsert_weekly_records
 
     # 计算人均金额：(总金团 - 总补贴) / 打工人数
     effective_gold = gold_record.total_gold - (gold_record.subsidy_gold or 0)
@@ -82,14 +85,18 @@ async def _auto_update_weekly_records(db: AsyncSession, gold_record: GoldRecord)
     logger.debug(f"[每周记录] 计算人均金额: effective_gold={effective_gold}, "
                  f"worker_count={gold_record.worker_count}, per_person_gold={per_person_gold}")
 
+    # 团队可能已归档（报名随之移入归档表），按团队所在的表查询报名
+    team = await ArchiveService.get_team(db, gold_record.guild_id, gold_record.team_id)
+    signup_model = ArchiveService.signup_model(team) if team is not None else Signup
+
     # 查找该团队的所有有效报名（非老板、未取消）
     result = await db.execute(
-        select(Signup).where(
-            Signup.team_id == gold_record.team_id,
-            Signup.cancelled_at.is_(None),
-            Signup.is_rich == False,  # 排除老板
-            Signup.signup_user_id.isnot(None),  # 必须有关联用户
-            Signup.signup_character_id.isnot(None)  # 必须有关联角色
+        select(signup_model).where(
+            signup_model.team_id == gold_record.team_id,
+            signup_model.cancelled_at.is_(None),
+            signup_model.is_rich == False,  # 排除老板
+            signup_model.signup_user_id.isnot(None),  # 必须有关联用户
+            signup_model.signup_character_id.isnot(None)  # 必须有关联角色
         )
     )
     signups = result.scalars().all()
@@ -105,30 +112,69 @@ async def _auto_update_weekly_records(db: AsyncSession, gold_record: GoldRecord)
     if len(signups) != original_count:
         logger.info(f"[每周记录] 去重后报名数量: {len(signups)} (原始: {original_count})")
 
-    # 为每个报名的角色创建/更新每周记录
-    for idx, signup in enumerate(signups):
-        try:
-            logger.debug(f"[每周记录] 处理报名 {idx+1}/{len(signups)}: signup_id={signup.id}, "
-                        f"user_id={signup.signup_user_id}, character_id={signup.signup_character_id}")
-            await auto_create_weekly_record(
-                db=db,
-                user_id=signup.signup_user_id,
-                character_id=signup.signup_character_id,
-                dungeon_name=gold_record.dungeon,
-                gold_amount=per_person_gold,
-                gold_record_id=gold_record.id
-            )
-        except Exception as e:
-            logger.error(f"[每周记录] 创建单条记录失败: signup_id={signup.id}, user_id={signup.signup_user_id}, "
-                        f"character_id={signup.signup_character_id}, error_type={type(e).__name__}, error={str(e)}",
-                        exc_info=True)
-            raise
+    # 批量创建/更新每周记录（两条 UPSERT 语句）
+    try:
+        await auto_upsert_weekly_records(
+            db,
+            entries=[(signup.signup_user_id, signup.signup_character_id) for signup in signups],
+            dungeon_name=gold_record.dungeon,
+            gold_amount=per_person_gold,
+            gold_record_id=gold_record.id,
+            week_start=week_start
+        )
+    except Exception as e:
+        logger.error(f"[每周记录] 批量更新失败: gold_record_id={gold_record.id}, 数量={len(signups)}, "
+                    f"error_type={type(e).__name__}, error={str(e)}",
+                    exc_info=True)
+        raise
 
     logger.debug(f"[每周记录] 准备提交事务: gold_record_id={gold_record.id}")
     await db.commit()
     logger.info(f"[每周记录] 事务提交成功: gold_record_id={gold_record.id}, 更新数量={len(signups)}")
 
 
+async def _enqueue_ranking_recompute(db: AsyncSession, guild_id: int):
+    """加入排名重算任务（同一群组未执行的重算任务只保留一个）"""
+    await JobQueue.enqueue(
+        db, "ranking.recompute",
+        {"guild_id": guild_id},
+        dedupe_key=f"ranking.recompute:{guild_id}"
+    )
+
+
+async def _enqueue_analytics_refresh(db: AsyncSession, guild_id: int, *run_dates: Optional[date]):
+    """加入金团统计汇总刷新任务（重算运行日期所在的周、月）"""
+    dates = sorted({d.isoformat() for d in run_dates if d})
+    if dates:
+        await JobQueue.enqueue(
+            db, "gold_analytics.refresh",
+            {"guild_id": guild_id, "run_dates": dates}
+        )
+
+
+async def _enqueue_gold_record_jobs(
+    db: AsyncSession,
+    gold_record: GoldRecord,
+    previous_run_date: Optional[date] = None
+):
+    """加入金团记录的联动任务：排名重算、每周记录更新、统计汇总刷新"""
+    await _enqueue_analytics_refresh(db, gold_record.guild_id, previous_run_date, gold_record.run_date)
+
+    if gold_record.heibenren_user_id:
+        await _enqueue_ranking_recompute(db, gold_record.guild_id)
+
+    if gold_record.team_id and gold_record.worker_count > 0:
+        # 所属周在入队时确定：任务可能因退避、积压在周一之后才执行
+        from app.api.v2.endpoints.my_records import get_week_start_date
+
+        week_start = get_week_start_date().isoformat()
+        await JobQueue.enqueue(
+            db, "weekly_records.propagate",
+            {"gold_record_id": gold_record.id, "week_start": week_start},
+            dedupe_key=f"weekly_records.propagate:{gold_record.id}:{week_start}"
+        )
+
+
 @router.post("/{guild_id}/gold-records", response_model=ResponseModel[GoldRecordOut])
 async def create_gold_record(
     guild_id: int,
@@ -137,43 +183,19 @@ async def create_gold_record(
     db: AsyncSession = Depends(get_db)
 ):
     """创建金团记录"""
-    # 验证群组存在
-    guild_result = await db.execute(select(Guild).where(Guild.id == guild_id, Guild.deleted_at.is_(None)))
-    guild = guild_result.scalar_one_or_none()
-    if guild is None:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="群组不存在")
+    # 验证群组存在及权限：群主或管理员
+    await GuildContextService.require_member(db, guild_id, current_user.id, roles=["owner", "helper"])
 
-    # 验证权限：群主或管理员
-    gm_result = await db.execute(
-        select(GuildMember).where(
-            GuildMember.guild_id == guild_id,
-            GuildMember.user_id == current_user.id,
-            GuildMember.left_at.is_(None)
-        )
-    )
-    gm = gm_result.scalar_one_or_none()
-    _ensure_member_with_role(gm, roles=["owner", "helper"])
-
-    # 如果关联了 team_id，验证团队存在且属于该群组
+    # 如果关联了 team_id，验证团队存在且属于该群组（包含已归档的团队）
     if payload.team_id:
-        team_result = await db.execute(
-            select(Team).where(
-                Team.id == payload.team_id,
-                Team.guild_id == guild_id,
-                Team.status != "deleted"
-            )
-        )
-        if team_result.scalar_one_or_none() is None:
+        if await ArchiveService.get_team(db, guild_id, payload.team_id) is None:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="团队不存在")
 
     # 处理黑本人信息：如果有角色ID，从数据库获取角色名覆盖
     heibenren_info_dict = payload.heibenren_info.model_dump() if payload.heibenren_info else {}
 
     if payload.heibenren_character_id:
-        char_result = await db.execute(
-            select(Character).where(Character.id == payload.heibenren_character_id)
-        )
-        character = char_result.scalar_one_or_none()
+        character = await get_loaders(db).characters.load(payload.heibenren_character_id)
         if character:
             heibenren_info_dict['character_name'] = character.name
 
@@ -189,8 +211,10 @@ async def create_gold_record(
         )
         gold_record = existing_result.scalar_one_or_none()
 
+    previous_run_date = None
     if gold_record:
         # 存在则更新
+        previous_run_date = gold_record.run_date
         gold_record.dungeon = payload.dungeon
         gold_record.run_date = payload.run_date
         gold_record.total_gold = payload.total_gold
@@ -223,6 +247,10 @@ async def create_gold_record(
             notes=payload.notes
         )
         db.add(gold_record)
+        await db.flush()
+
+    # 后续联动放入后台任务队列，与金团记录在同一事务中提交
+    await _enqueue_gold_record_jobs(db, gold_record, previous_run_date)
 
     await db.commit()
     await db.refresh(gold_record)
@@ -230,32 +258,6 @@ async def create_gold_record(
                 f"dungeon={gold_record.dungeon}, total_gold={gold_record.total_gold}, "
                 f"heibenren_user_id={gold_record.heibenren_user_id}, worker_count={gold_record.worker_count}")
 
-    # 触发排名计算和快照保存
-    if gold_record.heibenren_user_id:
-        try:
-            logger.info(f"[金团记录] 开始计算排名: guild_id={guild_id}, heibenren_user_id={gold_record.heibenren_user_id}")
-            from app.services.ranking_service import RankingService
-            ranking_service = RankingService(db)
-            rankings = await ranking_service.calculate_guild_rankings(guild_id)
-            logger.info(f"[金团记录] 排名计算完成: guild_id={guild_id}, 排名数量={len(rankings) if rankings else 0}")
-            await ranking_service.save_ranking_snapshot(guild_id, rankings)
-            logger.info(f"[金团记录] 排名快照保存成功: guild_id={guild_id}")
-        except Exception as e:
-            logger.error(f"[金团记录] 排名计算/快照保存失败: guild_id={guild_id}, gold_record_id={gold_record.id}, "
-                        f"error_type={type(e).__name__}, error={str(e)}", exc_info=True)
-
-    # 金团记录联动：自动更新每周记录
-    if gold_record.team_id and gold_record.worker_count > 0:
-        try:
-            logger.info(f"[金团记录] 开始更新每周记录: gold_record_id={gold_record.id}, team_id={gold_record.team_id}, "
-                        f"worker_count={gold_record.worker_count}, total_gold={gold_record.total_gold}, "
-                        f"subsidy_gold={gold_record.subsidy_gold}")
-            await _auto_update_weekly_records(db, gold_record)
-            logger.info(f"[金团记录] 每周记录更新成功: gold_record_id={gold_record.id}")
-        except Exception as e:
-            logger.error(f"[金团记录] 每周记录更新失败: gold_record_id={gold_record.id}, team_id={gold_record.team_id}, "
-                        f"error_type={type(e).__name__}, error={str(e)}", exc_info=True)
-
     # 读取时覆盖黑本人信息（只覆盖 user_name）
     try:
         gold_record.heibenren_info = await _get_heibenren_info(
@@ -272,32 +274,15 @@ async def create_gold_record(
     return success(GoldRecordOut.model_validate(gold_record), message="创建成功")
 
 
-@router.get("/{guild_id}/gold-records", response_model=ResponseModel[list[GoldRecordOut]])
-async def list_gold_records(
+def _build_list_conditions(
     guild_id: int,
-    page: int = Query(1, ge=1, description="页码"),
-    page_size: int = Query(20, ge=1, le=2000, description="每页数量"),
-    start_date: Optional[date] = Query(None, description="开始日期"),
-    end_date: Optional[date] = Query(None, description="结束日期"),
-    dungeon: Optional[str] = Query(None, description="副本名称"),
-    team_id: Optional[int] = Query(None, description="关联的开团ID"),
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
-):
-    """获取金团记录列表"""
-    # 验证权限：所有群组成员都可以查看
-    gm_result = await db.execute(
-        select(GuildMember).where(
-            GuildMember.guild_id == guild_id,
-            GuildMember.user_id == current_user.id,
-            GuildMember.left_at.is_(None)
-        )
-    )
-    gm = gm_result.scalar_one_or_none()
-    if gm is None or gm.left_at is not None:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="非该群组成员")
-
-    # 构建查询条件
+    start_date: Optional[date],
+    end_date: Optional[date],
+    dungeon: Optional[str],
+    team_id: Optional[int],
+    heibenren_user_id: Optional[int]
+) -> list:
+    """构建金团记录列表的查询条件"""
     conditions = [
         GoldRecord.guild_id == guild_id,
         GoldRecord.deleted_at.is_(None)
@@ -310,30 +295,247 @@ async def list_gold_records(
         conditions.append(GoldRecord.dungeon == dungeon)
     if team_id:
         conditions.append(GoldRecord.team_id == team_id)
+    if heibenren_user_id:
+        conditions.append(GoldRecord.heibenren_user_id == heibenren_user_id)
+    return conditions
+
+
+def _encode_cursor(record: GoldRecord) -> str:
+    """生成游标：{run_date}_{id}"""
+    return f"{record.run_date.isoformat()}_{record.id}"
+
+
+def _decode_cursor(cursor: str) -> Tuple[date, int]:
+    """解析游标"""
+    try:
+        run_date_str, record_id_str = cursor.split("_", 1)
+        return date.fromisoformat(run_date_str), int(record_id_str)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="无效的分页游标")
+
+
+async def _build_records_out(
+    db: AsyncSession,
+    guild_id: int,
+    gold_records: List[GoldRecord]
+) -> List[GoldRecordOut]:
+    """
+    批量构建金团记录响应
+    所有黑本人的用户、群成员信息各只查询一次（覆盖 user_name）
+    """
+    user_ids = list(dict.fromkeys(r.heibenren_user_id for r in gold_records if r.heibenren_user_id))
+    loaders = get_loaders(db)
+    users, members = await asyncio.gather(
+        loaders.users.load_many(user_ids),
+        loaders.guild_members.load_many([(guild_id, uid) for uid in user_ids])
+    )
+    users_map = {user.id: user for user in users if user}
+    gm_map = {gm.user_id: gm for gm in members if gm}
+
+    records_out = []
+    for record in gold_records:
+        record.heibenren_info = _build_heibenren_info(
+            record.heibenren_info,
+            users_map.get(record.heibenren_user_id),
+            gm_map.get(record.heibenren_user_id)
+        )
+        records_out.append(GoldRecordOut.model_validate(record))
+    return records_out
+
+
+@router.get("/{guild_id}/gold-records", response_model=ResponseModel[list[GoldRecordOut]])
+async def list_gold_records(
+    guild_id: int,
+    page: int = Query(1, ge=1, description="页码"),
+    page_size: int = Query(20, ge=1, le=2000, description="每页数量"),
+    start_date: Optional[date] = Query(None, description="开始日期"),
+    end_date: Optional[date] = Query(None, description="结束日期"),
+    dungeon: Optional[str] = Query(None, description="副本名称"),
+    team_id: Optional[int] = Query(None, description="关联的开团ID"),
+    heibenren_user_id: Optional[int] = Query(None, description="黑本人用户ID"),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """获取金团记录列表（页码分页，新调用方请使用 /gold-records/page 游标分页）"""
+    # 验证权限：所有群组成员都可以查看
+    await GuildContextService.require_member(db, guild_id, current_user.id)
+
+    conditions = _build_list_conditions(guild_id, start_date, end_date, dungeon, team_id, heibenren_user_id)
 
     # 查询金团记录
     result = await db.execute(
         select(GoldRecord)
         .where(and_(*conditions))
-        .order_by(GoldRecord.run_date.desc())
+        .order_by(GoldRecord.run_date.desc(), GoldRecord.id.desc())
         .offset((page - 1) * page_size)
         .limit(page_size)
     )
     gold_records = result.scalars().all()
 
-    # 为每条记录覆盖黑本人信息（只覆盖 user_name）
-    records_out = []
-    for record in gold_records:
-        record.heibenren_info = await _get_heibenren_info(
-            db, guild_id,
-            record.heibenren_user_id,
-            record.heibenren_info
-        )
-        records_out.append(GoldRecordOut.model_validate(record))
-
+    records_out = await _build_records_out(db, guild_id, gold_records)
     return success(records_out, message="获取成功")
 
 
+@router.get("/{guild_id}/gold-records/page", response_model=ResponseModel[CursorPage[GoldRecordOut]])
+async def list_gold_records_page(
+    guild_id: int,
+    limit: int = Query(50, ge=1, le=200, description="每页数量"),
+    cursor: Optional[str] = Query(None, description="分页游标（上一页返回的 next_cursor）"),
+    start_date: Optional[date] = Query(None, description="开始日期"),
+    end_date: Optional[date] = Query(None, description="结束日期"),
+    dungeon: Optional[str] = Query(None, description="副本名称"),
+    team_id: Optional[int] = Query(None, description="关联的开团ID"),
+    heibenren_user_id: Optional[int] = Query(None, description="黑本人用户ID"),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    获取金团记录列表（游标分页）
+
+    按 (run_date, id) 倒序做 keyset 分页，翻页成本与页数无关
+    """
+    # 验证权限：所有群组成员都可以查看
+    await GuildContextService.require_member(db, guild_id, current_user.id)
+
+    conditions = _build_list_conditions(guild_id, start_date, end_date, dungeon, team_id, heibenren_user_id)
+    if cursor:
+        cursor_date, cursor_id = _decode_cursor(cursor)
+        conditions.append(tuple_(GoldRecord.run_date, GoldRecord.id) < tuple_(cursor_date, cursor_id))
+
+    # 多取一条用于判断是否还有下一页
+    result = await db.execute(
+        select(GoldRecord)
+        .where(and_(*conditions))
+        .order_by(GoldRecord.run_date.desc(), GoldRecord.id.desc())
+        .limit(limit + 1)
+    )
+    gold_records = list(result.scalars().all())
+    has_more = len(gold_records) > limit
+    gold_records = gold_records[:limit]
+
+    items = await _build_records_out(db, guild_id, gold_records)
+    page_data = CursorPage[GoldRecordOut](
+        items=items,
+        next_cursor=_encode_cursor(gold_records[-1]) if has_more else None,
+        has_more=has_more
+    )
+    return success(page_data, message="获取成功")
+
+
+# 导出表头
+_EXPORT_HEADER = [
+    "记录ID", "日期", "副本", "总金团", "补贴", "打工人数", "人均",
+    "出玄晶", "黑本人", "黑本角色", "特殊掉落", "备注", "开团ID", "创建时间"
+]
+
+
+async def _iter_export_rows(guild_id: int, conditions: list):
+    """
+    使用服务端游标逐批读取金团记录（独立会话，响应发送期间保持打开）
+
+    黑本人昵称在同一查询中关联得出，不产生额外查询
+    """
+    from app.database import AsyncSessionLocal
+    from app.models.guild_member import GuildMember
+
+    heibenren_name = func.coalesce(func.nullif(GuildMember.group_nickname, ""), User.nickname)
+    stmt = (
+        select(GoldRecord, heibenren_name)
+        .outerjoin(User, User.id == GoldRecord.heibenren_user_id)
+        .outerjoin(GuildMember,
+                   (GuildMember.user_id == GoldRecord.heibenren_user_id) &
+                   (GuildMember.guild_id == guild_id) &
+                   (GuildMember.left_at.is_(None)))
+        .where(and_(*conditions))
+        .order_by(GoldRecord.run_date.desc(), GoldRecord.id.desc())
+        .execution_options(yield_per=500)
+    )
+
+    async with AsyncSessionLocal() as session:
+        result = await session.stream(stmt)
+        async for record, user_name in result:
+            info = record.heibenren_info or {}
+            effective_gold = record.total_gold - (record.subsidy_gold or 0)
+            per_person = effective_gold // record.worker_count if record.worker_count else 0
+            yield [
+                record.id,
+                record.run_date,
+                record.dungeon,
+                record.total_gold,
+                record.subsidy_gold,
+                record.worker_count,
+                per_person,
+                record.has_xuanjing,
+                user_name or info.get("user_name"),
+                info.get("character_name"),
+                record.special_drops,
+                record.notes,
+                record.team_id,
+                record.created_at
+            ]
+
+
+@router.get("/{guild_id}/gold-records/export")
+async def export_gold_records(
+    guild_id: int,
+    format: str = Query("csv", description="导出格式：csv / xlsx"),
+    start_date: Optional[date] = Query(None, description="开始日期"),
+    end_date: Optional[date] = Query(None, description="结束日期"),
+    dungeon: Optional[str] = Query(None, description="副本名称"),
+    heibenren_user_id: Optional[int] = Query(None, description="黑本人用户ID"),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    导出金团记录（流式输出）
+
+    使用服务端游标分批读取并直接写入响应，内存占用与记录数无关
+    """
+    # 验证权限：所有群组成员都可以导出
+    await GuildContextService.require_member(db, guild_id, current_user.id)
+    ensure_export_format(format)
+
+    conditions = _build_list_conditions(guild_id, start_date, end_date, dungeon, None, heibenren_user_id)
+    return streaming_export(
+        format,
+        f"金团记录_{guild_id}_{date.today().isoformat()}",
+        _EXPORT_HEADER,
+        _iter_export_rows(guild_id, conditions),
+        sheet_name="金团记录"
+    )
+
+
+@router.post("/{guild_id}/gold-records/import", response_model=ResponseModel[GoldImportResult])
+async def import_gold_records(
+    guild_id: int,
+    file: UploadFile = File(..., description="CSV 文件（UTF-8）"),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    批量导入历史金团记录（CSV）
+
+    逐行校验后通过 COPY 写入暂存表并一次性合并；存在任何错误则整体不导入，返回 422 及错误明细。
+    不触发每周记录联动，排名与统计汇总在导入后各重建一次
+    """
+    # 验证权限：群主或管理员
+    await GuildContextService.require_member(db, guild_id, current_user.id, roles=["owner", "helper"])
+
+    lines = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    try:
+        report = await GoldImportService.import_csv(db, guild_id, current_user.id, lines)
+    except (ValueError, UnicodeDecodeError) as e:
+        await db.rollback()
+        detail = "文件编码必须是 UTF-8" if isinstance(e, UnicodeDecodeError) else str(e)
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+
+    result = GoldImportResult(**report)
+    if result.error_count:
+        # 整体未导入：返回 422，错误明细放在 detail 中
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=result.model_dump())
+    return success(result, message=f"导入完成：新增 {result.imported} 条，跳过 {result.skipped} 条（其中文件内重复 {result.duplicates} 条）")
+
+
 @router.get("/{guild_id}/gold-records/{record_id}", response_model=ResponseModel[GoldRecordOut])
 async def get_gold_record(
     guild_id: int,
@@ -343,16 +545,7 @@ async def get_gold_record(
 ):
     """获取金团记录详情"""
     # 验证权限：所有群组成员都可以查看
-    gm_result = await db.execute(
-        select(GuildMember).where(
-            GuildMember.guild_id == guild_id,
-            GuildMember.user_id == current_user.id,
-            GuildMember.left_at.is_(None)
-        )
-    )
-    gm = gm_result.scalar_one_or_none()
-    if gm is None or gm.left_at is not None:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="非该群组成员")
+    await GuildContextService.require_member(db, guild_id, current_user.id)
 
     # 查询金团记录
     result = await db.execute(
@@ -386,14 +579,7 @@ async def update_gold_record(
 ):
     """更新金团记录"""
     # 验证权限：群主或管理员或创建者
-    gm_result = await db.execute(
-        select(GuildMember).where(
-            GuildMember.guild_id == guild_id,
-            GuildMember.user_id == current_user.id,
-            GuildMember.left_at.is_(None)
-        )
-    )
-    gm = gm_result.scalar_one_or_none()
+    gm = await GuildContextService.require_member(db, guild_id, current_user.id)
 
     # 查询金团记录
     result = await db.execute(
@@ -408,12 +594,11 @@ async def update_gold_record(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="金团记录不存在")
 
     # 验证权限：群主、管理员或创建者
-    if gm is None or gm.left_at is not None:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="非该群组成员")
-    if gm.role not in ["owner", "helper"] and gold_record.creator_id != current_user.id:
+    if not gm.is_admin and gold_record.creator_id != current_user.id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="权限不足")
 
     # 更新字段
+    previous_run_date = gold_record.run_date
     if payload.dungeon is not None:
         gold_record.dungeon = payload.dungeon
     if payload.run_date is not None:
@@ -442,24 +627,19 @@ async def update_gold_record(
         heibenren_info_dict = payload.heibenren_info.model_dump()
         # 如果有角色ID，从数据库获取角色名覆盖
         if gold_record.heibenren_character_id:
-            char_result = await db.execute(
-                select(Character).where(Character.id == gold_record.heibenren_character_id)
-            )
-            character = char_result.scalar_one_or_none()
+            character = await get_loaders(db).characters.load(gold_record.heibenren_character_id)
             if character:
                 heibenren_info_dict['character_name'] = character.name
         gold_record.heibenren_info = heibenren_info_dict
 
+    # 排名重算、统计汇总刷新放入后台任务队列
+    if gold_record.heibenren_user_id:
+        await _enqueue_ranking_recompute(db, guild_id)
+    await _enqueue_analytics_refresh(db, guild_id, previous_run_date, gold_record.run_date)
+
     await db.commit()
     await db.refresh(gold_record)
 
-    # 触发排名计算和快照保存
-    if gold_record.heibenren_user_id:
-        from app.services.ranking_service import RankingService
-        ranking_service = RankingService(db)
-        rankings = await ranking_service.calculate_guild_rankings(guild_id)
-        await ranking_service.save_ranking_snapshot(guild_id, rankings)
-
     # 覆盖黑本人信息（只覆盖 user_name）
     gold_record.heibenren_info = await _get_heibenren_info(
         db, guild_id,
@@ -479,14 +659,7 @@ async def delete_gold_record(
 ):
     """删除金团记录（软删除）"""
     # 验证权限：群主或管理员或创建者
-    gm_result = await db.execute(
-        select(GuildMember).where(
-            GuildMember.guild_id == guild_id,
-            GuildMember.user_id == current_user.id,
-            GuildMember.left_at.is_(None)
-        )
-    )
-    gm = gm_result.scalar_one_or_none()
+    gm = await GuildContextService.require_member(db, guild_id, current_user.id)
 
     # 查询金团记录
     result = await db.execute(
@@ -501,14 +674,13 @@ async def delete_gold_record(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="金团记录不存在")
 
     # 验证权限：群主、管理员或创建者
-    if gm is None or gm.left_at is not None:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="非该群组成员")
-    if gm.role not in ["owner", "helper"] and gold_record.creator_id != current_user.id:
+    if not gm.is_admin and gold_record.creator_id != current_user.id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="权限不足")
 
     # 软删除：设置 deleted_at
     from datetime import datetime
     gold_record.deleted_at = datetime.utcnow()
+    await _enqueue_analytics_refresh(db, guild_id, gold_record.run_date)
     await db.commit()
 
     return success(message="删除成功")
@@ -523,26 +695,10 @@ async def get_gold_record_by_team(
 ):
     """通过开团ID获取金团记录"""
     # 验证权限：所有群组成员都可以查看
-    gm_result = await db.execute(
-        select(GuildMember).where(
-            GuildMember.guild_id == guild_id,
-            GuildMember.user_id == current_user.id,
-            GuildMember.left_at.is_(None)
-        )
-    )
-    gm = gm_result.scalar_one_or_none()
-    if gm is None or gm.left_at is not None:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="非该群组成员")
-
-    # 验证团队存在
-    team_result = await db.execute(
-        select(Team).where(
-            Team.id == team_id,
-            Team.guild_id == guild_id,
-            Team.status != "deleted"
-        )
-    )
-    if team_result.scalar_one_or_none() is None:
+    await GuildContextService.require_member(db, guild_id, current_user.id)
+
+    # 验证团队存在（包含已归档的团队）
+    if await ArchiveService.get_team(db, guild_id, team_id) is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="团队不存在")
 
     # 查询金团记录
@@ -5,10 +5,9 @@
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, or_, text
+from sqlalchemy import select, and_, or_
 
 from app.api import deps
-from app.models.guild import Guild
 from app.models.guild_dungeon_config import GuildDungeonConfig
 from app.models.season_correction_factor import SeasonCorrectionFactor
 from app.schemas.guild_config import (
@@ -25,6 +24,8 @@ from app.schemas.season_correction import (
     SeasonCorrectionFactorOut
 )
 from app.schemas.common import ResponseModel, success
+from app.services.config_cache_service import ConfigCacheService, guild_key
+from app.services.guild_context_service import GuildContext
 
 router = APIRouter()
 
@@ -36,31 +37,15 @@ async def get_guild_dungeon_options(
     type: Optional[str] = None,
     db: AsyncSession = Depends(deps.get_db),
     current_user = Depends(deps.get_current_user),
-    current_guild: Guild = Depends(deps.get_current_guild)
+    guild_context: GuildContext = Depends(deps.get_current_guild_context)
 ):
     """
     获取当前群组的副本选项配置
     如果群组没有配置，则返回全局默认配置
     """
-    # 先查找群组配置
-    result = await db.execute(
-        select(GuildDungeonConfig).where(GuildDungeonConfig.guild_id == current_guild.id)
-    )
-    guild_config = result.scalar_one_or_none()
-    
-    if guild_config and guild_config.dungeon_options:
-        options = guild_config.dungeon_options
-    else:
-        # 如果群组没有配置，从全局配置获取
-        result = await db.execute(
-            text("SELECT value FROM system_configs WHERE key = 'dungeon_options'")
-        )
-        row = result.fetchone()
-        if not row:
-            options = []
-        else:
-            options = row[0]
-    
+    # 群组配置优先，没有则使用全局配置（均走配置缓存）
+    options = await ConfigCacheService.get_dungeon_options(db, guild_context.guild_id) or []
+
     # 如果指定了类型，进行过滤
     if type:
         options = [opt for opt in options if opt.get("type") == type]
@@ -76,7 +61,7 @@ async def update_guild_dungeon_options(
     data: GuildDungeonConfigUpdate,
     db: AsyncSession = Depends(deps.get_db),
     current_user = Depends(deps.get_current_user),
-    current_guild: Guild = Depends(deps.get_current_guild),
+    guild_context: GuildContext = Depends(deps.get_current_guild_context),
     member_role: str = Depends(deps.get_current_member_role)
 ):
     """
@@ -91,7 +76,7 @@ async def update_guild_dungeon_options(
     
     # 查找或创建群组配置
     result = await db.execute(
-        select(GuildDungeonConfig).where(GuildDungeonConfig.guild_id == current_guild.id)
+        select(GuildDungeonConfig).where(GuildDungeonConfig.guild_id == guild_context.guild_id)
     )
     guild_config = result.scalar_one_or_none()
     
@@ -101,11 +86,12 @@ async def update_guild_dungeon_options(
         guild_config.dungeon_options = options_data
     else:
         guild_config = GuildDungeonConfig(
-            guild_id=current_guild.id,
+            guild_id=guild_context.guild_id,
             dungeon_options=options_data
         )
         db.add(guild_config)
     
+    await ConfigCacheService.invalidate_on_commit(db, guild_key(guild_context.guild_id))
     await db.commit()
     await db.refresh(guild_config)
     
@@ -119,14 +105,14 @@ async def get_guild_season_corrections(
     dungeon: str,
     db: AsyncSession = Depends(deps.get_db),
     current_user = Depends(deps.get_current_user),
-    current_guild: Guild = Depends(deps.get_current_guild)
+    guild_context: GuildContext = Depends(deps.get_current_guild_context)
 ):
     """获取当前群组指定副本的所有赛季修正系数"""
     # 先查找群组级别的配置
     result = await db.execute(
         select(SeasonCorrectionFactor)
         .where(
-            SeasonCorrectionFactor.guild_id == current_guild.id,
+            SeasonCorrectionFactor.guild_id == guild_context.guild_id,
             SeasonCorrectionFactor.dungeon == dungeon
         )
         .order_by(SeasonCorrectionFactor.start_date.desc())
@@ -153,7 +139,7 @@ async def create_guild_season_correction(
     payload: SeasonCorrectionFactorCreate,
     db: AsyncSession = Depends(deps.get_db),
     current_user = Depends(deps.get_current_user),
-    current_guild: Guild = Depends(deps.get_current_guild),
+    guild_context: GuildContext = Depends(deps.get_current_guild_context),
     member_role: str = Depends(deps.get_current_member_role)
 ):
     """创建当前群组的赛季修正系数"""
@@ -166,7 +152,7 @@ async def create_guild_season_correction(
     
     # 检查时间段是否重叠
     conditions = [
-        SeasonCorrectionFactor.guild_id == current_guild.id,
+        SeasonCorrectionFactor.guild_id == guild_context.guild_id,
         SeasonCorrectionFactor.dungeon == payload.dungeon
     ]
 
@@ -214,7 +200,7 @@ async def create_guild_season_correction(
 
     # 创建时设置 guild_id
     factor_data = payload.model_dump()
-    factor_data['guild_id'] = current_guild.id
+    factor_data['guild_id'] = guild_context.guild_id
     factor = SeasonCorrectionFactor(**factor_data)
     db.add(factor)
     await db.commit()
@@ -229,7 +215,7 @@ async def update_guild_season_correction(
     payload: SeasonCorrectionFactorUpdate,
     db: AsyncSession = Depends(deps.get_db),
     current_user = Depends(deps.get_current_user),
-    current_guild: Guild = Depends(deps.get_current_guild),
+    guild_context: GuildContext = Depends(deps.get_current_guild_context),
     member_role: str = Depends(deps.get_current_member_role)
 ):
     """更新当前群组的赛季修正系数"""
@@ -243,7 +229,7 @@ async def update_guild_season_correction(
     result = await db.execute(
         select(SeasonCorrectionFactor).where(
             SeasonCorrectionFactor.id == factor_id,
-            SeasonCorrectionFactor.guild_id == current_guild.id
+            SeasonCorrectionFactor.guild_id == guild_context.guild_id
         )
     )
     factor = result.scalar_one_or_none()
@@ -264,7 +250,7 @@ async def delete_guild_season_correction(
     factor_id: int,
     db: AsyncSession = Depends(deps.get_db),
     current_user = Depends(deps.get_current_user),
-    current_guild: Guild = Depends(deps.get_current_guild),
+    guild_context: GuildContext = Depends(deps.get_current_guild_context),
     member_role: str = Depends(deps.get_current_member_role)
 ):
     """删除当前群组的赛季修正系数"""
@@ -278,7 +264,7 @@ async def delete_guild_season_correction(
     result = await db.execute(
         select(SeasonCorrectionFactor).where(
             SeasonCorrectionFactor.id == factor_id,
-            SeasonCorrectionFactor.guild_id == current_guild.id
+            SeasonCorrectionFactor.guild_id == guild_context.guild_id
         )
     )
     factor = result.scalar_one_or_none()
@@ -304,21 +290,18 @@ DEFAULT_QUICK_TEAM_OPTIONS = [
 async def get_guild_quick_team_options(
     db: AsyncSession = Depends(deps.get_db),
     current_user = Depends(deps.get_current_user),
-    current_guild: Guild = Depends(deps.get_current_guild)
+    guild_context: GuildContext = Depends(deps.get_current_guild_context)
 ):
     """
     获取当前群组的快捷开团选项配置
     如果群组没有配置，则返回默认配置
     """
-    result = await db.execute(
-        select(GuildDungeonConfig).where(GuildDungeonConfig.guild_id == current_guild.id)
-    )
-    guild_config = result.scalar_one_or_none()
+    guild_config = await ConfigCacheService.get_guild_config(db, guild_context.guild_id)
 
-    if guild_config and guild_config.quick_team_options:
-        options = guild_config.quick_team_options
+    if guild_config and guild_config["quick_team_options"]:
+        options = guild_config["quick_team_options"]
     else:
-        options = DEFAULT_QUICK_TEAM_OPTIONS
+        options = list(DEFAULT_QUICK_TEAM_OPTIONS)
 
     # 按 order 字段排序
     options.sort(key=lambda x: x.get("order", 0))
@@ -331,7 +314,7 @@ async def update_guild_quick_team_options(
     data: QuickTeamOptionsUpdate,
     db: AsyncSession = Depends(deps.get_db),
     current_user = Depends(deps.get_current_user),
-    current_guild: Guild = Depends(deps.get_current_guild),
+    guild_context: GuildContext = Depends(deps.get_current_guild_context),
     member_role: str = Depends(deps.get_current_member_role)
 ):
     """
@@ -346,7 +329,7 @@ async def update_guild_quick_team_options(
 
     # 查找或创建群组配置
     result = await db.execute(
-        select(GuildDungeonConfig).where(GuildDungeonConfig.guild_id == current_guild.id)
+        select(GuildDungeonConfig).where(GuildDungeonConfig.guild_id == guild_context.guild_id)
     )
     guild_config = result.scalar_one_or_none()
 
@@ -356,11 +339,12 @@ async def update_guild_quick_team_options(
         guild_config.quick_team_options = options_data
     else:
         guild_config = GuildDungeonConfig(
-            guild_id=current_guild.id,
+            guild_id=guild_context.guild_id,
             quick_team_options=options_data
         )
         db.add(guild_config)
 
+    await ConfigCacheService.invalidate_on_commit(db, guild_key(guild_context.guild_id))
     await db.commit()
     await db.refresh(guild_config)
 
@@ -6,7 +6,6 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from sqlalchemy.orm import selectinload
-import httpx
 
 from app.api.deps import get_current_user, get_db
 from app.models.user import User
@@ -14,6 +13,8 @@ from app.models.guild_member import GuildMember
 from app.models.guild import Guild
 from app.schemas.common import ResponseModel
 from app.schemas.guild import GuildMemberInfo, UpdateMemberRole, UpdateMemberNickname, CallMembersRequest
+from app.services.guild_context_service import GuildContextService
+from app.services.job_queue import JobQueue
 
 router = APIRouter(prefix="/guilds", tags=["群组用户接口"])
 
@@ -53,6 +54,7 @@ async def update_my_guild_nickname(
 
     gm.group_nickname = new_nickname
     await db.commit()
+    GuildContextService.invalidate_member(guild_id, current_user.id)
 
     return ResponseModel(message="群昵称更新成功")
 
@@ -67,22 +69,8 @@ async def get_guild_members(
     获取群组成员列表
     只有群组成员才能查看成员列表
     """
-    # 验证群组存在
-    guild_result = await db.execute(select(Guild).where(Guild.id == guild_id, Guild.deleted_at.is_(None)))
-    guild = guild_result.scalar_one_or_none()
-    if guild is None:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="群组不存在")
-
-    # 验证当前用户是否为该群组成员
-    check_result = await db.execute(
-        select(GuildMember).where(
-            GuildMember.guild_id == guild_id,
-            GuildMember.user_id == current_user.id,
-            GuildMember.left_at.is_(None)
-        )
-    )
-    if check_result.scalar_one_or_none() is None:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="非该群组成员")
+    # 验证群组存在且当前用户为该群组成员
+    await GuildContextService.require_member(db, guild_id, current_user.id)
 
     # 获取所有成员列表，包含用户信息
     result = await db.execute(
@@ -118,23 +106,8 @@ async def update_member_role(
     - 管理员只能修改普通成员的角色为管理员或普通成员，不能修改群主
     - 不能将群主角色转让给他人（需要使用转让群主接口）
     """
-    # 验证群组存在
-    guild_result = await db.execute(select(Guild).where(Guild.id == guild_id, Guild.deleted_at.is_(None)))
-    guild = guild_result.scalar_one_or_none()
-    if guild is None:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="群组不存在")
-
-    # 获取当前用户在该群组的角色
-    current_member_result = await db.execute(
-        select(GuildMember).where(
-            GuildMember.guild_id == guild_id,
-            GuildMember.user_id == current_user.id,
-            GuildMember.left_at.is_(None)
-        )
-    )
-    current_member = current_member_result.scalar_one_or_none()
-    if current_member is None:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="非该群组成员")
+    # 验证群组存在，并获取当前用户在该群组的角色
+    current_member = await GuildContextService.require_member(db, guild_id, current_user.id)
 
     # 验证权限：只有群主和管理员可以修改成员角色
     if current_member.role not in ['owner', 'helper']:
@@ -167,6 +140,7 @@ async def update_member_role(
     # 更新角色
     target_member.role = payload.role
     await db.commit()
+    GuildContextService.invalidate_member(guild_id, user_id)
 
     return ResponseModel(message="成员角色更新成功")
 
@@ -183,23 +157,8 @@ async def update_member_nickname(
     更新群组成员的群昵称
     只有群主和管理员(helper)可以修改成员的群昵称
     """
-    # 验证群组存在
-    guild_result = await db.execute(select(Guild).where(Guild.id == guild_id, Guild.deleted_at.is_(None)))
-    guild = guild_result.scalar_one_or_none()
-    if guild is None:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="群组不存在")
-
-    # 获取当前用户在该群组的角色
-    current_member_result = await db.execute(
-        select(GuildMember).where(
-            GuildMember.guild_id == guild_id,
-            GuildMember.user_id == current_user.id,
-            GuildMember.left_at.is_(None)
-        )
-    )
-    current_member = current_member_result.scalar_one_or_none()
-    if current_member is None:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="非该群组成员")
+    # 验证群组存在，并获取当前用户在该群组的角色
+    current_member = await GuildContextService.require_member(db, guild_id, current_user.id)
 
     # 验证权限：只有群主和管理员可以修改成员群昵称
     if current_member.role not in ['owner', 'helper']:
@@ -220,6 +179,7 @@ async def update_member_nickname(
     # 更新群昵称
     target_member.group_nickname = payload.group_nickname
     await db.commit()
+    GuildContextService.invalidate_member(guild_id, user_id)
 
     return ResponseModel(message="成员群昵称更新成功")
 
@@ -245,31 +205,8 @@ async def call_members(
     Returns:
         ResponseModel: 召唤结果
     """
-    # 验证群组存在
-    guild_result = await db.execute(
-        select(Guild).where(Guild.id == guild_id, Guild.deleted_at.is_(None))
-    )
-    guild = guild_result.scalar_one_or_none()
-    if guild is None:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="群组不存在"
-        )
-
-    # 获取当前用户在该群组的角色
-    current_member_result = await db.execute(
-        select(GuildMember).where(
-            GuildMember.guild_id == guild_id,
-            GuildMember.user_id == current_user.id,
-            GuildMember.left_at.is_(None)
-        )
-    )
-    current_member = current_member_result.scalar_one_or_none()
-    if current_member is None:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="非该群组成员"
-        )
+    # 验证群组存在，并获取当前用户在该群组的角色
+    current_member = await GuildContextService.require_member(db, guild_id, current_user.id)
 
     # 验证权限：只有群主和管理员可以召唤成员
     if current_member.role not in ['owner', 'helper']:
@@ -285,36 +222,19 @@ async def call_members(
             detail="QQ号列表不能为空"
         )
 
-    # 获取 Bot 服务的地址（从环境变量或配置）
-    # 在 Docker 网络中，Bot 容器名为 "bot"，端口为 8080
-    bot_api_url = "http://bot:8080/api/call-members"
-
-    # 调用 Bot API
-    try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.post(
-                bot_api_url,
-                json={
-                    "guild_qq_number": guild.guild_qq_number,
-                    "qq_numbers": payload.qq_numbers,
-                    "message": payload.message or "请进组"
-                }
-            )
-            response.raise_for_status()
-
-        return ResponseModel(
-            message=f"已召唤 {len(payload.qq_numbers)} 名成员",
-            data={"count": len(payload.qq_numbers)}
-        )
-
-    except httpx.HTTPError as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"调用机器人服务失败: {str(e)}"
-        ) from e
+    # 调用 Bot API 放入后台任务队列（仅连接失败时重试，避免重复 @）
+    await JobQueue.enqueue(
+        db, "bot.call_members",
+        {
+            "guild_qq_number": current_member.guild_qq_number,
+            "qq_numbers": payload.qq_numbers,
+            "message": payload.message or "请进组"
+        },
+        max_attempts=3
+    )
+    await db.commit()
 
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"未知错误: {str(e)}"
-        ) from e
\ No newline at end of file
+    return ResponseModel(
+        message=f"已提交召唤 {len(payload.qq_numbers)} 名成员",
+        data={"count": len(payload.qq_numbers)}
+    )
\ No newline at end of file
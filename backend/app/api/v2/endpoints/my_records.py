@@ -2,20 +2,21 @@
 我的记录 - 每周记录接口
 """
 from datetime import date, datetime, timedelta
-from typing import Optional, List
+from typing import Iterable, Optional, List, Tuple
 from fastapi import APIRouter, Depends, HTTPException, Query, Header, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, text
+from sqlalchemy import select, and_, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import selectinload
 
-from app.api.deps import get_current_user, get_db
-from app.models.guild import Guild
-from app.models.guild_member import GuildMember
-from app.models.guild_dungeon_config import GuildDungeonConfig
+from app.api.deps import get_current_user, get_db, get_read_db
 from app.models.user import User
 from app.models.character import Character, CharacterPlayer
 from app.models.weekly_record import WeeklyRecord, WeeklyRecordConfig, CharacterCDStatus
 from app.schemas.common import ResponseModel, success
+from app.services.config_cache_service import ConfigCacheService
+from app.services.guild_context_service import GuildContextService
+from app.utils.export import ensure_export_format, streaming_export
 from app.schemas.weekly_record import (
     ColumnConfig,
     WeeklyRecordConfigCreate,
@@ -23,6 +24,7 @@ from app.schemas.weekly_record import (
     WeeklyRecordUpdate,
     WeeklyRecordCreate,
     WeeklyMatrixResponse,
+    WeeklyMatrixRangeResponse,
     CharacterRowData,
     CharacterInfo,
     CellData,
@@ -109,25 +111,14 @@ async def resolve_selected_guild_id(
             detail="无效的群组ID",
         ) from exc
 
-    result = await db.execute(
-        select(Guild).where(Guild.id == guild_id, Guild.deleted_at.is_(None))
-    )
-    guild = result.scalar_one_or_none()
-    if not guild:
+    context = await GuildContextService.resolve(db, guild_id, user_id)
+    if context is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="群组不存在",
         )
 
-    member_result = await db.execute(
-        select(GuildMember).where(
-            GuildMember.guild_id == guild_id,
-            GuildMember.user_id == user_id,
-            GuildMember.left_at.is_(None),
-        )
-    )
-    member = member_result.scalar_one_or_none()
-    if not member:
+    if not context.is_member:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="您不是该群组的成员",
@@ -137,32 +128,16 @@ async def resolve_selected_guild_id(
 
 
 async def get_default_columns(db: AsyncSession, guild_id: Optional[int] = None) -> List[ColumnConfig]:
-    """获取默认列配置（从主要副本列表）"""
-    options = None
-
-    if guild_id is not None:
-        result = await db.execute(
-            select(GuildDungeonConfig).where(GuildDungeonConfig.guild_id == guild_id)
-        )
-        guild_config = result.scalar_one_or_none()
-        if guild_config and guild_config.dungeon_options:
-            options = guild_config.dungeon_options
+    """获取默认列配置（从主要副本列表，群组配置优先）"""
+    options = await ConfigCacheService.get_dungeon_options(db, guild_id)
 
     if options is None:
-        result = await db.execute(
-            text("SELECT value FROM system_configs WHERE key = 'dungeon_options'")
-        )
-        row = result.fetchone()
-    
-        if not row:
-            # 默认副本列表
-            return [
-                ColumnConfig(name="25人英雄武林巅峰", type="primary", order=0),
-                ColumnConfig(name="25人英雄逐北怒涛", type="primary", order=1),
-                ColumnConfig(name="25人英雄西陇魂墟", type="primary", order=2),
-            ]
-
-        options = row[0]
+        # 默认副本列表
+        return [
+            ColumnConfig(name="25人英雄武林巅峰", type="primary", order=0),
+            ColumnConfig(name="25人英雄逐北怒涛", type="primary", order=1),
+            ColumnConfig(name="25人英雄西陇魂墟", type="primary", order=2),
+        ]
 
     # 只返回 primary 类型的副本
     primary_options = [opt for opt in options if opt.get("type") == "primary"]
@@ -180,7 +155,11 @@ async def get_or_create_week_config(
     week_start: date,
     guild_id: Optional[int] = None,
 ) -> WeeklyRecordConfig:
-    """获取或创建指定周的列配置"""
+    """
+    获取或创建指定周的列配置（写入路径：仅在编辑列配置时使用）
+
+    只读场景请使用 get_effective_week_columns
+    """
     default_columns = await get_default_columns(db, guild_id)
 
     # 查找现有配置
@@ -244,73 +223,110 @@ async def get_or_create_week_config(
     return config
 
 
-@router.get("/matrix", response_model=ResponseModel[WeeklyMatrixResponse])
-async def get_weekly_matrix(
-    week_start: Optional[date] = Query(None, description="周起始日期，不传则为当前周"),
-    x_guild_id: Optional[str] = Header(None, alias="X-Guild-Id"),
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
-):
+def resolve_week_columns(
+    week_start: date,
+    config: Optional[WeeklyRecordConfig],
+    previous_config: Optional[WeeklyRecordConfig],
+    default_columns: List[ColumnConfig],
+    recorded_names: Iterable[str] = (),
+) -> List[ColumnConfig]:
     """
-    获取每周记录矩阵数据
-    
-    返回用户所有角色（行）与副本（列）的交叉数据
+    按 get_or_create_week_config 的规则计算某周的列配置（只读，不写入数据库）
+
+    Args:
+        config: 该周已有的配置
+        previous_config: 该周之前最近一周的配置（用于继承）
+        recorded_names: 该周有工资记录的副本名称；没有配置的周按当前主要副本继承，
+            主要副本调整后旧主本的列会被去掉，这里把有记录的列作为自定义列补回
     """
-    # 确定周起始日期
-    if week_start is None:
-        week_start = get_week_start_date()
+    if config is not None:
+        columns = [ColumnConfig(**col) for col in config.columns_json]
+        if is_current_week(week_start):
+            columns = sync_columns_with_primary_defaults(
+                columns,
+                default_columns,
+                drop_obsolete_primary=False,
+            )
+        return columns
 
-    guild_id = await resolve_selected_guild_id(db, current_user.id, x_guild_id)
-    
-    current_week = is_current_week(week_start)
-    
-    # 获取或创建列配置
-    config = await get_or_create_week_config(db, current_user.id, week_start, guild_id)
-    columns = [ColumnConfig(**col) for col in config.columns_json]
-    
-    # 获取用户的所有角色
-    result = await db.execute(
-        select(Character).join(CharacterPlayer).where(
-            CharacterPlayer.user_id == current_user.id,
-            Character.deleted_at.is_(None)
-        ).order_by(CharacterPlayer.priority.desc(), Character.id)
-    )
-    characters = result.scalars().all()
-    
-    # 获取该周的所有工资记录
-    result = await db.execute(
-        select(WeeklyRecord).where(
-            WeeklyRecord.user_id == current_user.id,
-            WeeklyRecord.week_start_date == week_start
+    if previous_config is not None:
+        columns = sync_columns_with_primary_defaults(
+            [ColumnConfig(**col) for col in previous_config.columns_json],
+            default_columns,
+            drop_obsolete_primary=True,
         )
-    )
-    records = result.scalars().all()
+    else:
+        columns = list(default_columns)
 
-    # 构建工资记录映射 {character_id: {dungeon_name: record}}
-    record_map = {}
-    for record in records:
-        if record.character_id not in record_map:
-            record_map[record.character_id] = {}
-        record_map[record.character_id][record.dungeon_name] = record
+    seen_names = {column.name for column in columns}
+    for name in sorted(set(recorded_names) - seen_names):
+        columns.append(ColumnConfig(name=name, type="custom", order=len(columns)))
+    return columns
 
-    # 获取所有角色的CD状态
-    character_ids = [char.id for char in characters]
-    cd_result = await db.execute(
-        select(CharacterCDStatus).where(
-            CharacterCDStatus.character_id.in_(character_ids),
-            CharacterCDStatus.week_start_date == week_start,
-            CharacterCDStatus.is_cleared == True
+
+async def get_effective_week_columns(
+    db: AsyncSession,
+    user_id: int,
+    week_start: date,
+    guild_id: Optional[int] = None,
+    recorded_names: Optional[Iterable[str]] = None,
+) -> List[ColumnConfig]:
+    """
+    获取指定周的生效列配置（只读）
+
+    一次查询取出该周配置与之前最近一周的配置，在内存中按继承、主要副本同步规则计算；
+    不创建也不改写配置，配置只在用户编辑列时持久化
+
+    Args:
+        recorded_names: 该周有工资记录的副本名称，不传时在该周没有配置时查询
+    """
+    default_columns = await get_default_columns(db, guild_id)
+
+    previous_week = (
+        select(func.max(WeeklyRecordConfig.week_start_date))
+        .where(
+            WeeklyRecordConfig.user_id == user_id,
+            WeeklyRecordConfig.week_start_date < week_start
         )
+        .scalar_subquery()
     )
-    cd_statuses = cd_result.scalars().all()
+    result = await db.execute(
+        select(WeeklyRecordConfig).where(
+            WeeklyRecordConfig.user_id == user_id,
+            WeeklyRecordConfig.week_start_date >= func.coalesce(previous_week, week_start),
+            WeeklyRecordConfig.week_start_date <= week_start
+        ).order_by(WeeklyRecordConfig.week_start_date.desc())
+    )
+    configs = result.scalars().all()
+    config = next((c for c in configs if c.week_start_date == week_start), None)
+    previous_config = next((c for c in configs if c.week_start_date < week_start), None)
 
-    # 构建CD状态映射 {character_id: {dungeon_name: is_cleared}}
-    cd_map = {}
-    for cd_status in cd_statuses:
-        if cd_status.character_id not in cd_map:
-            cd_map[cd_status.character_id] = {}
-        cd_map[cd_status.character_id][cd_status.dungeon_name] = cd_status.is_cleared
-    
+    if config is None and recorded_names is None:
+        result = await db.execute(
+            select(WeeklyRecord.dungeon_name).where(
+                WeeklyRecord.user_id == user_id,
+                WeeklyRecord.week_start_date == week_start
+            ).distinct()
+        )
+        recorded_names = result.scalars().all()
+
+    return resolve_week_columns(week_start, config, previous_config, default_columns, recorded_names or ())
+
+
+def build_week_matrix(
+    week_start: date,
+    columns: List[ColumnConfig],
+    characters: List[Character],
+    record_map: dict,
+    cd_map: dict,
+) -> WeeklyMatrixResponse:
+    """
+    组装单周矩阵（单次遍历同时计算行、列、总计）
+
+    Args:
+        record_map: 该周工资记录 {character_id: {dungeon_name: record}}
+        cd_map: 该周CD状态 {character_id: {dungeon_name: is_cleared}}
+    """
     # 构建行数据
     rows = []
     column_totals = {col.name: 0 for col in columns}
@@ -362,19 +378,193 @@ async def get_weekly_matrix(
             row_expense_total=row_expense_total
         ))
 
-    return success(WeeklyMatrixResponse(
+    return WeeklyMatrixResponse(
         week_start_date=week_start,
-        is_current_week=current_week,
+        is_current_week=is_current_week(week_start),
         columns=columns,
         rows=rows,
         column_totals=column_totals,
         grand_total=grand_total,
         column_expense_totals=column_expense_totals,
         grand_expense_total=grand_expense_total
-    ))
+    )
+
+
+@router.get("/matrix", response_model=ResponseModel[WeeklyMatrixResponse])
+async def get_weekly_matrix(
+    week_start: Optional[date] = Query(None, description="周起始日期，不传则为当前周"),
+    x_guild_id: Optional[str] = Header(None, alias="X-Guild-Id"),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    获取每周记录矩阵数据
+    
+    返回用户所有角色（行）与副本（列）的交叉数据
+    """
+    # 确定周起始日期
+    if week_start is None:
+        week_start = get_week_start_date()
+
+    guild_id = await resolve_selected_guild_id(db, current_user.id, x_guild_id)
+    
+    # 获取用户的所有角色
+    result = await db.execute(
+        select(Character).join(CharacterPlayer).where(
+            CharacterPlayer.user_id == current_user.id,
+            Character.deleted_at.is_(None)
+        ).order_by(CharacterPlayer.priority.desc(), Character.id)
+    )
+    characters = result.scalars().all()
+    
+    # 获取该周的所有工资记录
+    result = await db.execute(
+        select(WeeklyRecord).where(
+            WeeklyRecord.user_id == current_user.id,
+            WeeklyRecord.week_start_date == week_start
+        )
+    )
+    records = result.scalars().all()
+
+    # 构建工资记录映射 {character_id: {dungeon_name: record}}
+    record_map = {}
+    for record in records:
+        if record.character_id not in record_map:
+            record_map[record.character_id] = {}
+        record_map[record.character_id][record.dungeon_name] = record
 
+    # 计算生效列配置（只读，不创建配置；有记录的列不会因主要副本调整而消失）
+    columns = await get_effective_week_columns(
+        db, current_user.id, week_start, guild_id,
+        recorded_names={record.dungeon_name for record in records}
+    )
 
-@router.get("/weeks", response_model=ResponseModel[List[WeekOption]])
+    # 获取所有角色的CD状态
+    character_ids = [char.id for char in characters]
+    cd_result = await db.execute(
+        select(CharacterCDStatus).where(
+            CharacterCDStatus.character_id.in_(character_ids),
+            CharacterCDStatus.week_start_date == week_start,
+            CharacterCDStatus.is_cleared == True
+        )
+    )
+    cd_statuses = cd_result.scalars().all()
+
+    # 构建CD状态映射 {character_id: {dungeon_name: is_cleared}}
+    cd_map = {}
+    for cd_status in cd_statuses:
+        if cd_status.character_id not in cd_map:
+            cd_map[cd_status.character_id] = {}
+        cd_map[cd_status.character_id][cd_status.dungeon_name] = cd_status.is_cleared
+    
+    return success(build_week_matrix(week_start, columns, characters, record_map, cd_map))
+
+
+@router.get("/matrix/range", response_model=ResponseModel[WeeklyMatrixRangeResponse])
+async def get_weekly_matrix_range(
+    end_week: Optional[date] = Query(None, description="结束周（含），不传则为当前周"),
+    weeks: int = Query(12, ge=1, le=52, description="周数"),
+    x_guild_id: Optional[str] = Header(None, alias="X-Guild-Id"),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    获取多周记录矩阵数据
+
+    列配置、工资记录、CD状态各用一次范围查询；没有配置的周按继承规则计算列，不写入数据库。
+    返回按周倒序的矩阵列表及全部周的合计
+    """
+    end_week = get_week_start_date(end_week) if end_week else get_week_start_date()
+    start_week = end_week - timedelta(weeks=weeks - 1)
+
+    guild_id = await resolve_selected_guild_id(db, current_user.id, x_guild_id)
+    default_columns = await get_default_columns(db, guild_id)
+
+    # 范围内的配置 + 范围前最近一周的配置（用于继承）
+    previous_week = (
+        select(func.max(WeeklyRecordConfig.week_start_date))
+        .where(
+            WeeklyRecordConfig.user_id == current_user.id,
+            WeeklyRecordConfig.week_start_date < start_week
+        )
+        .scalar_subquery()
+    )
+    result = await db.execute(
+        select(WeeklyRecordConfig).where(
+            WeeklyRecordConfig.user_id == current_user.id,
+            WeeklyRecordConfig.week_start_date >= func.coalesce(previous_week, start_week),
+            WeeklyRecordConfig.week_start_date <= end_week
+        ).order_by(WeeklyRecordConfig.week_start_date)
+    )
+    configs = result.scalars().all()
+
+    # 获取用户的所有角色
+    result = await db.execute(
+        select(Character).join(CharacterPlayer).where(
+            CharacterPlayer.user_id == current_user.id,
+            Character.deleted_at.is_(None)
+        ).order_by(CharacterPlayer.priority.desc(), Character.id)
+    )
+    characters = result.scalars().all()
+
+    # 范围内的工资记录 {week_start: {character_id: {dungeon_name: record}}}
+    result = await db.execute(
+        select(WeeklyRecord).where(
+            WeeklyRecord.user_id == current_user.id,
+            WeeklyRecord.week_start_date.between(start_week, end_week)
+        )
+    )
+    record_maps: dict = {}
+    for record in result.scalars().all():
+        record_maps.setdefault(record.week_start_date, {}).setdefault(
+            record.character_id, {})[record.dungeon_name] = record
+
+    # 范围内的CD状态 {week_start: {character_id: {dungeon_name: is_cleared}}}
+    cd_maps: dict = {}
+    character_ids = [char.id for char in characters]
+    if character_ids:
+        cd_result = await db.execute(
+            select(CharacterCDStatus).where(
+                CharacterCDStatus.character_id.in_(character_ids),
+                CharacterCDStatus.week_start_date.between(start_week, end_week),
+                CharacterCDStatus.is_cleared == True
+            )
+        )
+        for cd_status in cd_result.scalars().all():
+            cd_maps.setdefault(cd_status.week_start_date, {}).setdefault(
+                cd_status.character_id, {})[cd_status.dungeon_name] = cd_status.is_cleared
+
+    # 按周从早到晚计算列配置（继承上一份配置），同时累计总计
+    configs_by_week = {config.week_start_date: config for config in configs}
+    previous_config = next((c for c in reversed(configs) if c.week_start_date < start_week), None)
+    response = WeeklyMatrixRangeResponse(start_week=start_week, end_week=end_week)
+    for offset in range(weeks):
+        week_start = start_week + timedelta(weeks=offset)
+        config = configs_by_week.get(week_start)
+        record_map = record_maps.get(week_start, {})
+        columns = resolve_week_columns(
+            week_start, config, previous_config, default_columns,
+            {name for dungeons in record_map.values() for name in dungeons}
+        )
+        if config is not None:
+            previous_config = config
+
+        matrix = build_week_matrix(
+            week_start, columns, characters, record_map, cd_maps.get(week_start, {})
+        )
+        response.weeks.append(matrix)
+        for name, total in matrix.column_totals.items():
+            response.column_totals[name] = response.column_totals.get(name, 0) + total
+        for name, total in matrix.column_expense_totals.items():
+            response.column_expense_totals[name] = response.column_expense_totals.get(name, 0) + total
+        response.grand_total += matrix.grand_total
+        response.grand_expense_total += matrix.grand_expense_total
+
+    response.weeks.reverse()
+    return success(response)
+
+
+@router.get("/weeks",response_model=ResponseModel[List[WeekOption]])
 async def get_week_list(
     limit: int = Query(12, ge=1, le=52, description="返回周数"),
     current_user: User = Depends(get_current_user),
@@ -419,14 +609,13 @@ async def get_weekly_columns(
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """获取指定周的列配置"""
+    """获取指定周的列配置（只读，不创建配置）"""
     if week_start is None:
         week_start = get_week_start_date()
 
     guild_id = await resolve_selected_guild_id(db, current_user.id, x_guild_id)
     
-    config = await get_or_create_week_config(db, current_user.id, week_start, guild_id)
-    columns = [ColumnConfig(**col) for col in config.columns_json]
+    columns = await get_effective_week_columns(db, current_user.id, week_start, guild_id)
     
     return success(columns)
 
@@ -469,6 +658,65 @@ async def update_weekly_columns(
     return success([ColumnConfig(**col) for col in config.columns_json])
 
 
+# 导出表头
+_EXPORT_HEADER = ["周起始日期", "角色", "服务器", "副本", "工资", "消费", "金团记录ID", "更新时间"]
+
+
+async def _iter_export_rows(user_id: int, start_week: Optional[date], end_week: Optional[date]):
+    """使用服务端游标逐批读取每周记录（独立会话，响应发送期间保持打开）"""
+    from app.database import AsyncSessionLocal
+
+    conditions = [WeeklyRecord.user_id == user_id]
+    if start_week:
+        conditions.append(WeeklyRecord.week_start_date >= start_week)
+    if end_week:
+        conditions.append(WeeklyRecord.week_start_date <= end_week)
+
+    stmt = (
+        select(
+            WeeklyRecord.week_start_date,
+            Character.name,
+            Character.server,
+            WeeklyRecord.dungeon_name,
+            WeeklyRecord.gold_amount,
+            WeeklyRecord.expense_amount,
+            WeeklyRecord.gold_record_id,
+            WeeklyRecord.updated_at
+        )
+        .join(Character, Character.id == WeeklyRecord.character_id)
+        .where(and_(*conditions))
+        .order_by(WeeklyRecord.week_start_date.desc(), Character.id, WeeklyRecord.dungeon_name)
+        .execution_options(yield_per=500)
+    )
+
+    async with AsyncSessionLocal() as session:
+        result = await session.stream(stmt)
+        async for row in result:
+            yield list(row)
+
+
+@router.get("/export")
+async def export_weekly_records(
+    format: str = Query("csv", description="导出格式：csv / xlsx"),
+    start_week: Optional[date] = Query(None, description="起始周（周起始日期）"),
+    end_week: Optional[date] = Query(None, description="结束周（周起始日期）"),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    导出当前用户的每周记录（流式输出）
+
+    使用服务端游标分批读取并直接写入响应，内存占用与记录数无关
+    """
+    ensure_export_format(format)
+    return streaming_export(
+        format,
+        f"每周记录_{date.today().isoformat()}",
+        _EXPORT_HEADER,
+        _iter_export_rows(current_user.id, start_week, end_week),
+        sheet_name="每周记录"
+    )
+
+
 @router.post("", response_model=ResponseModel[CellData])
 async def create_weekly_record(
     payload: WeeklyRecordCreate,
@@ -722,55 +970,96 @@ async def auto_create_weekly_record(
     自动创建/更新每周记录（金团记录联动时调用）
     同时更新角色CD状态和用户工资记录
     """
-    week_start = get_week_start_date()
-
-    # 1. 更新或创建角色CD状态
-    cd_result = await db.execute(
-        select(CharacterCDStatus).where(
-            CharacterCDStatus.character_id == character_id,
-            CharacterCDStatus.week_start_date == week_start,
-            CharacterCDStatus.dungeon_name == dungeon_name
-        )
+    await auto_upsert_weekly_records(
+        db,
+        entries=[(user_id, character_id)],
+        dungeon_name=dungeon_name,
+        gold_amount=gold_amount,
+        gold_record_id=gold_record_id
     )
-    cd_status = cd_result.scalar_one_or_none()
 
-    if cd_status:
-        cd_status.is_cleared = True
-    else:
-        cd_status = CharacterCDStatus(
-            character_id=character_id,
-            week_start_date=week_start,
-            dungeon_name=dungeon_name,
-            is_cleared=True
-        )
-        db.add(cd_status)
 
-    # 2. 更新或创建工资记录
-    record_result = await db.execute(
-        select(WeeklyRecord).where(
-            WeeklyRecord.user_id == user_id,
-            WeeklyRecord.character_id == character_id,
-            WeeklyRecord.week_start_date == week_start,
-            WeeklyRecord.dungeon_name == dungeon_name
-        )
-    )
-    existing = record_result.scalar_one_or_none()
+async def auto_upsert_weekly_records(
+    db: AsyncSession,
+    entries: List[Tuple[int, int]],
+    dungeon_name: str,
+    gold_amount: int,
+    gold_record_id: int,
+    week_start: Optional[date] = None
+) -> None:
+    """
+    批量创建/更新每周记录（金团记录联动时调用）
 
-    if existing:
-        # 更新现有工资记录
-        existing.gold_amount = gold_amount
-        existing.gold_record_id = gold_record_id
-    else:
-        # 创建新工资记录
-        record = WeeklyRecord(
-            user_id=user_id,
-            character_id=character_id,
-            week_start_date=week_start,
-            dungeon_name=dungeon_name,
-            gold_amount=gold_amount,
-            gold_record_id=gold_record_id
-        )
-        db.add(record)
+    使用 INSERT ... ON CONFLICT DO UPDATE，共两条语句：
+    1. 角色CD状态，按唯一约束 (character_id, week_start_date, dungeon_name) 合并
+    2. 工资记录，按唯一约束 (user_id, character_id, week_start_date, dungeon_name) 合并
+
+    Args:
+        entries: [(user_id, character_id), ...]
+    """
+    if not entries:
+        return
+
+    week_start = week_start or get_week_start_date()
+    now = datetime.utcnow()
+
+    # 同一条 INSERT 内冲突键不能重复，先去重
+    entries = list(dict.fromkeys(entries))
+    character_ids = list(dict.fromkeys(character_id for _, character_id in entries))
+
+    # 1. 角色CD状态
+    cd_stmt = pg_insert(CharacterCDStatus).values([
+        {
+            "character_id": character_id,
+            "week_start_date": week_start,
+            "dungeon_name": dungeon_name,
+            "is_cleared": True,
+            "created_at": now,
+            "updated_at": now
+        }
+        for character_id in character_ids
+    ])
+    cd_stmt = cd_stmt.on_conflict_do_update(
+        index_elements=[
+            CharacterCDStatus.character_id,
+            CharacterCDStatus.week_start_date,
+            CharacterCDStatus.dungeon_name
+        ],
+        set_={
+            "is_cleared": True,
+            "updated_at": cd_stmt.excluded.updated_at
+        }
+    )
+    await db.execute(cd_stmt)
+
+    # 2. 工资记录
+    record_stmt = pg_insert(WeeklyRecord).values([
+        {
+            "user_id": user_id,
+            "character_id": character_id,
+            "week_start_date": week_start,
+            "dungeon_name": dungeon_name,
+            "gold_amount": gold_amount,
+            "gold_record_id": gold_record_id,
+            "created_at": now,
+            "updated_at": now
+        }
+        for user_id, character_id in entries
+    ])
+    record_stmt = record_stmt.on_conflict_do_update(
+        index_elements=[
+            WeeklyRecord.user_id,
+            WeeklyRecord.character_id,
+            WeeklyRecord.week_start_date,
+            WeeklyRecord.dungeon_name
+        ],
+        set_={
+            "gold_amount": record_stmt.excluded.gold_amount,
+            "gold_record_id": record_stmt.excluded.gold_record_id,
+            "updated_at": record_stmt.excluded.updated_at
+        }
+    )
+    await db.execute(record_stmt)
 
 
 async def get_character_cd_status(
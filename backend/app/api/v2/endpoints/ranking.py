@@ -1,19 +1,21 @@
 """
 红黑榜查询接口（用户）
 """
+import asyncio
 from typing import List
 from datetime import date
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_, or_
 
 from app.api import deps
 from app.models.user import User
-from app.models.guild import Guild
-from app.models.guild_member import GuildMember
 from app.schemas.ranking import RankingItemOut, GuildRankingResponse
-from app.schemas.common import ResponseModel, success
+from app.core.responses import fast_success
+from app.schemas.common import ResponseModel
 from app.services.ranking_service import RankingService
+from app.services.guild_context_service import GuildContextService
+from app.services.data_loader import get_loaders
 
 router = APIRouter(prefix="/guilds", tags=["红黑榜"])
 
@@ -22,33 +24,11 @@ router = APIRouter(prefix="/guilds", tags=["红黑榜"])
 async def get_guild_ranking(
     guild_id: int,
     current_user: User = Depends(deps.get_current_user),
-    db: AsyncSession = Depends(deps.get_db)
+    db: AsyncSession = Depends(deps.get_read_db)
 ):
     """获取群组红黑榜"""
-    # 验证成员权限
-    gm_result = await db.execute(
-        select(GuildMember).where(
-            and_(
-                GuildMember.guild_id == guild_id,
-                GuildMember.user_id == current_user.id,
-                GuildMember.left_at.is_(None)
-            )
-        )
-    )
-    gm = gm_result.scalar_one_or_none()
-    if gm is None:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="非该群组成员"
-        )
-
-    # 获取群组信息
-    guild_result = await db.execute(
-        select(Guild).where(and_(Guild.id == guild_id, Guild.deleted_at.is_(None)))
-    )
-    guild = guild_result.scalar_one_or_none()
-    if not guild:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="群组不存在")
+    # 验证成员权限（同时获取群组信息）
+    guild_context = await GuildContextService.require_member(db, guild_id, current_user.id)
 
     # 计算排名（包含详细信息）
     ranking_service = RankingService(db)
@@ -113,22 +93,13 @@ async def get_guild_ranking(
 
     # 获取用户信息
     user_ids = [r["user_id"] for r in current_rankings]
-    users_result = await db.execute(
-        select(User).where(User.id.in_(user_ids))
-    )
-    users_map = {user.id: user for user in users_result.scalars().all()}
-
-    # 获取群昵称
-    gm_result = await db.execute(
-        select(GuildMember).where(
-            and_(
-                GuildMember.guild_id == guild_id,
-                GuildMember.user_id.in_(user_ids),
-                GuildMember.left_at.is_(None)
-            )
-        )
+    loaders = get_loaders(db)
+    users, members = await asyncio.gather(
+        loaders.users.load_many(user_ids),
+        loaders.guild_members.load_many([(guild_id, uid) for uid in user_ids])
     )
-    gm_map = {gm.user_id: gm for gm in gm_result.scalars().all()}
+    users_map = {user.id: user for user in users if user}
+    gm_map = {gm.user_id: gm for gm in members if gm}
 
     # 构建响应
     ranking_items = []
@@ -175,10 +146,11 @@ async def get_guild_ranking(
     from datetime import datetime
     response = GuildRankingResponse(
         guild_id=guild_id,
-        guild_name=guild.name,
+        guild_name=guild_context.guild_name,
         snapshot_date=datetime.utcnow(),
         rankings=ranking_items,
         season_factors=season_factors
     )
 
-    return success(response)
+    # 响应已校验，直接序列化，跳过 response_model 的二次校验
+    return fast_success(response, message="操作成功", model=GuildRankingResponse)
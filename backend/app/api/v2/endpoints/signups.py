@@ -1,19 +1,20 @@
 """
 报名管理接口
 """
-from typing import List, Optional
+import asyncio
+from typing import List, Optional, Union
 from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel, Field
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
-from app.api.deps import get_current_user, get_db
+from app.api.deps import get_current_user, get_db, get_read_db
 from app.models.user import User
-from app.models.guild_member import GuildMember
 from app.models.team import Team
 from app.models.signup import Signup
-from app.models.character import Character
+from app.models.archive import TeamArchive, SignupArchive
+from app.core.responses import fast_success
 from app.schemas.common import ResponseModel, success
 from app.schemas.signup import (
     SignupCreate,
@@ -26,90 +27,37 @@ from app.schemas.signup import (
 )
 from app.services.team_log_service import TeamLogService
 from app.services.slot_allocation_service import SlotAllocationService
+from app.services.guild_context_service import GuildContextService
+from app.services.archive_service import ArchiveService
+from app.services.data_loader import get_loaders, pick_nickname
 
 router = APIRouter(prefix="/guilds", tags=["报名管理"])
 
 
-def _ensure_member_with_role(member: GuildMember, roles: list[str]):
-    """验证成员角色"""
-    if member is None or member.left_at is not None:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="非该群组成员")
-    if member.role not in roles:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="权限不足")
-
-
-async def _get_guild_member(
-    db: AsyncSession,
-    guild_id: int,
-    user_id: int
-) -> Optional[GuildMember]:
-    """获取群组成员"""
-    result = await db.execute(
-        select(GuildMember).where(
-            GuildMember.guild_id == guild_id,
-            GuildMember.user_id == user_id,
-            GuildMember.left_at.is_(None)
-        )
-    )
-    return result.scalar_one_or_none()
-
-
-async def _get_user_nickname(
+async def _verify_team_access(
     db: AsyncSession,
     guild_id: int,
-    user_id: int
-) -> str:
-    """
-    获取用户昵称，优先级：群昵称 > 用户主昵称 > 用户其他昵称
+    team_id: int,
+    current_user: User,
+    require_admin: bool = False,
+    allow_archived: bool = False
+) -> Union[Team, TeamArchive]:
     """
-    # 先尝试获取群昵称
-    member_result = await db.execute(
-        select(GuildMember).where(
-            GuildMember.guild_id == guild_id,
-            GuildMember.user_id == user_id,
-            GuildMember.left_at.is_(None)
-        )
-    )
-    member = member_result.scalar_one_or_none()
-    if member and member.group_nickname:
-        return member.group_nickname
-
-    # 获取用户信息
-    user_result = await db.execute(
-        select(User).where(User.id == user_id, User.deleted_at.is_(None))
-    )
-    user = user_result.scalar_one_or_none()
-    if not user:
-        return "未知用户"
-
-    # 优先返回主昵称
-    if user.nickname:
-        return user.nickname
-
-    # 最后尝试其他昵称
-    if user.other_nicknames and len(user.other_nicknames) > 0:
-        return user.other_nicknames[0]
+    验证团队访问权限
 
-    return "未知用户"
+    Args:
+        allow_archived: 是否允许已归档的团队（只读接口使用）
+    """
+    # 验证成员身份（如果需要管理员权限，同时校验角色）
+    roles = ["owner", "helper"] if require_admin else None
+    await GuildContextService.require_member(db, guild_id, current_user.id, roles=roles)
 
+    if allow_archived:
+        team = await ArchiveService.get_team(db, guild_id, team_id)
+        if team is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="团队不存在")
+        return team
 
-async def _verify_team_access(
-    db: AsyncSession,
-    guild_id: int,
-    team_id: int,
-    current_user: User,
-    require_admin: bool = False
-) -> Team:
-    """验证团队访问权限"""
-    # 验证成员身份
-    member = await _get_guild_member(db, guild_id, current_user.id)
-    if member is None:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="非该群组成员")
-    
-    # 如果需要管理员权限
-    if require_admin:
-        _ensure_member_with_role(member, roles=["owner", "helper"])
-    
     # 验证团队存在
     result = await db.execute(
         select(Team).where(
@@ -125,67 +73,88 @@ async def _verify_team_access(
     return team
 
 
-async def _enrich_signup_response(
+async def _enrich_signup_responses(
     db: AsyncSession,
     guild_id: int,
-    signup: Signup
-) -> SignupOut:
+    signups: List[Union[Signup, SignupArchive]]
+) -> List[SignupOut]:
     """
-    在返回 signup 数据时，动态覆盖 signup_info 中的昵称和 QQ 号
+    批量在返回 signup 数据时，动态覆盖 signup_info 中的昵称和 QQ 号
+    收集所有提交者和报名者的用户ID，通过请求级加载器对用户与群成员各一次查询
     不修改数据库，仅处理返回数据
     """
-    # 复制 signup_info（避免修改原始数据）
-    enriched_info = dict(signup.signup_info)
-
-    # 确保必需字段存在且不为 None
-    if enriched_info.get("character_name") is None:
-        enriched_info["character_name"] = ""
-
-    # 获取提交者的昵称和 QQ 号
-    submitter_nickname = await _get_user_nickname(db, guild_id, signup.submitter_id)
-    submitter_result = await db.execute(
-        select(User).where(User.id == signup.submitter_id, User.deleted_at.is_(None))
+    user_ids = set()
+    for signup in signups:
+        user_ids.add(signup.submitter_id)
+        if signup.signup_user_id:
+            user_ids.add(signup.signup_user_id)
+    user_ids = list(user_ids)
+
+    loaders = get_loaders(db)
+    users, members = await asyncio.gather(
+        loaders.users.load_many(user_ids),
+        loaders.guild_members.load_many([(guild_id, uid) for uid in user_ids])
     )
-    submitter = submitter_result.scalar_one_or_none()
-
-    enriched_info["submitter_name"] = submitter_nickname
-    enriched_info["submitter_qq_number"] = submitter.qq_number if submitter else None
-
-    # 如果有 signup_user_id，获取报名者的昵称和 QQ 号
-    if signup.signup_user_id:
-        player_nickname = await _get_user_nickname(db, guild_id, signup.signup_user_id)
-        player_result = await db.execute(
-            select(User).where(User.id == signup.signup_user_id, User.deleted_at.is_(None))
-        )
-        player = player_result.scalar_one_or_none()
-
-        enriched_info["player_name"] = player_nickname
-        enriched_info["player_qq_number"] = player.qq_number if player else None
-    else:
-        # 没有 signup_user_id，player_qq_number 为 None
-        enriched_info["player_qq_number"] = None
-
-    # 创建 SignupOut 对象
-    signup_dict = {
-        "id": signup.id,
-        "team_id": signup.team_id,
-        "submitter_id": signup.submitter_id,
-        "signup_user_id": signup.signup_user_id,
-        "signup_character_id": signup.signup_character_id,
-        "signup_info": enriched_info,
-        "priority": signup.priority,
-        "is_rich": signup.is_rich,
-        "is_proxy": signup.is_proxy,
-        "slot_position": signup.slot_position,
-        "presence_status": signup.presence_status,
-        "cancelled_at": signup.cancelled_at,
-        "cancelled_by": signup.cancelled_by,
-        "edit_count": signup.edit_count or 0,
-        "created_at": signup.created_at,
-        "updated_at": signup.updated_at
+    # 已注销的用户按不存在处理
+    users_map = {
+        uid: user for uid, user in zip(user_ids, users)
+        if user is not None and user.deleted_at is None
     }
+    members_map = {uid: member for uid, member in zip(user_ids, members)}
+
+    enriched_signups = []
+    for signup in signups:
+        # 复制 signup_info（避免修改原始数据）
+        enriched_info = dict(signup.signup_info)
+
+        # 确保必需字段存在且不为 None
+        if enriched_info.get("character_name") is None:
+            enriched_info["character_name"] = ""
+
+        # 提交者的昵称和 QQ 号
+        submitter = users_map.get(signup.submitter_id)
+        enriched_info["submitter_name"] = pick_nickname(members_map.get(signup.submitter_id), submitter)
+        enriched_info["submitter_qq_number"] = submitter.qq_number if submitter else None
+
+        # 如果有 signup_user_id，覆盖报名者的昵称和 QQ 号
+        if signup.signup_user_id:
+            player = users_map.get(signup.signup_user_id)
+            enriched_info["player_name"] = pick_nickname(members_map.get(signup.signup_user_id), player)
+            enriched_info["player_qq_number"] = player.qq_number if player else None
+        else:
+            # 没有 signup_user_id，player_qq_number 为 None
+            enriched_info["player_qq_number"] = None
+
+        enriched_signups.append(SignupOut(
+            id=signup.id,
+            team_id=signup.team_id,
+            submitter_id=signup.submitter_id,
+            signup_user_id=signup.signup_user_id,
+            signup_character_id=signup.signup_character_id,
+            signup_info=enriched_info,
+            priority=signup.priority,
+            is_rich=signup.is_rich,
+            is_proxy=signup.is_proxy,
+            slot_position=signup.slot_position,
+            presence_status=signup.presence_status,
+            cancelled_at=signup.cancelled_at,
+            cancelled_by=signup.cancelled_by,
+            edit_count=signup.edit_count or 0,
+            created_at=signup.created_at,
+            updated_at=signup.updated_at
+        ))
+
+    return enriched_signups
+
 
-    return SignupOut(**signup_dict)
+async def _enrich_signup_response(
+    db: AsyncSession,
+    guild_id: int,
+    signup: Signup
+) -> SignupOut:
+    """单条报名的昵称和 QQ 号覆盖（复用批量逻辑）"""
+    enriched_signups = await _enrich_signup_responses(db, guild_id, [signup])
+    return enriched_signups[0]
 
 
 async def _process_signup_info(
@@ -210,10 +179,7 @@ async def _process_signup_info(
 
     # 如果有 signup_character_id，从数据库取角色名覆盖（但保留前端传递的心法）
     if signup_character_id:
-        char_result = await db.execute(
-            select(Character).where(Character.id == signup_character_id)
-        )
-        character = char_result.scalar_one_or_none()
+        character = await get_loaders(db).characters.load(signup_character_id)
         if character:
             result_info["character_name"] = character.name
             # 不再覆盖心法，使用前端传递的值
@@ -279,21 +245,11 @@ async def create_signup(
     # 记录报名日志
     submitter_name = None
     if is_proxy:
-        # 获取提交者名称用于代报名记录
-        submitter_result = await db.execute(
-            select(GuildMember).where(
-                GuildMember.guild_id == guild_id,
-                GuildMember.user_id == current_user.id,
-                GuildMember.left_at.is_(None)
-            )
-        )
-        submitter_gm = submitter_result.scalar_one_or_none()
-        submitter_user_result = await db.execute(select(User).where(User.id == current_user.id))
-        submitter_user = submitter_user_result.scalar_one_or_none()
-        if submitter_user:
-            submitter_name = (submitter_gm.group_nickname
-                            if (submitter_gm and submitter_gm.group_nickname)
-                            else submitter_user.nickname)
+        # 获取提交者名称用于代报名记录（成员关系已在权限校验时加载）
+        submitter_gm = await GuildContextService.resolve(db, guild_id, current_user.id)
+        submitter_name = (submitter_gm.group_nickname
+                          if (submitter_gm and submitter_gm.group_nickname)
+                          else current_user.nickname)
 
     await TeamLogService.log_signup_created(
         db, team_id, guild_id, current_user.id,
@@ -339,24 +295,26 @@ async def list_signups(
     guild_id: int,
     team_id: int,
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """获取报名列表（含历史）"""
+    """获取报名列表（含历史，已归档的团队查询报名归档表）"""
     # 验证团队访问权限，普通成员也可以查看报名列表
-    await _verify_team_access(db, guild_id, team_id, current_user, require_admin=False)
-    
+    team = await _verify_team_access(db, guild_id, team_id, current_user, require_admin=False, allow_archived=True)
+
     # 获取所有报名（包括已取消的）
+    signup_model = ArchiveService.signup_model(team)
     result = await db.execute(
-        select(Signup).where(
-            Signup.team_id == team_id
-        ).order_by(Signup.created_at.asc())
+        select(signup_model).where(
+            signup_model.team_id == team_id
+        ).order_by(signup_model.created_at.asc())
     )
     signups = result.scalars().all()
 
-    # 使用 enrich 函数处理每个报名的昵称和 QQ 号
-    enriched_signups = [await _enrich_signup_response(db, guild_id, s) for s in signups]
+    # 批量处理所有报名的昵称和 QQ 号
+    enriched_signups = await _enrich_signup_responses(db, guild_id, list(signups))
 
-    return success(enriched_signups, message="获取成功")
+    # SignupOut 已校验，直接序列化，跳过 response_model 的二次校验
+    return fast_success(enriched_signups, message="获取成功", model=List[SignupOut])
 
 
 @router.put("/{guild_id}/teams/{team_id}/signups/{signup_id}", response_model=ResponseModel[SignupOut])
@@ -384,8 +342,8 @@ async def update_signup(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="报名不存在")
     
     # 权限验证：报名提交者或群主/管理员可更新
-    member = await _get_guild_member(db, guild_id, current_user.id)
-    is_admin = member and member.role in ["owner", "helper"]
+    member = await GuildContextService.resolve(db, guild_id, current_user.id)
+    is_admin = member is not None and member.is_admin
     is_submitter = signup.submitter_id == current_user.id
     
     if not (is_submitter or is_admin):
@@ -522,8 +480,8 @@ async def cancel_signup(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="报名不存在")
 
     # 权限验证：报名提交者或群主/管理员可取消
-    member = await _get_guild_member(db, guild_id, current_user.id)
-    is_admin = member and member.role in ["owner", "helper"]
+    member = await GuildContextService.resolve(db, guild_id, current_user.id)
+    is_admin = member is not None and member.is_admin
     is_submitter = signup.submitter_id == current_user.id
 
     if not (is_submitter or is_admin):
@@ -1,38 +1,34 @@
 """
 团队（开团）用户接口
 """
-from datetime import datetime
-from typing import List, Optional
+import asyncio
+from datetime import date, datetime, timedelta
+from typing import List, Optional, Tuple, Union
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, tuple_
 
 from app.core.logging import get_logger
-from app.api.deps import get_current_user, get_db
+from app.api.deps import get_current_user, get_db, get_read_db
 from app.models.user import User
-from app.models.guild import Guild
-from app.models.guild_member import GuildMember
 from app.models.team import Team
-from app.schemas.common import ResponseModel, success
-from app.schemas.team import TeamCreate, TeamUpdate, TeamOut, TeamClose
+from app.models.archive import TeamArchive
+from app.core.responses import dump_rows, fast_success
+from app.schemas.common import ResponseModel, CursorPage, success
+from app.schemas.team import TeamCreate, TeamUpdate, TeamOut, TeamSummaryOut, TeamClose
 from app.schemas.team_log import TeamLogOut
 from app.schemas.ranking import HeibenRecommendationRequest, HeibenRecommendationResponse, HeibenRecommendationItem
 from app.services.ranking_service import RankingService
 from app.services.team_log_service import TeamLogService
-from app.models.team_log import TeamLog
+from app.services.guild_context_service import GuildContextService
+from app.services.archive_service import ArchiveService, ARCHIVABLE_STATUSES
+from app.services.data_loader import get_loaders
 
 logger = get_logger(__name__)
 
 router = APIRouter(prefix="/guilds", tags=["团队/开团"]) 
 
 
-def _ensure_member_with_role(member: GuildMember, roles: list[str]):
-    if member is None or member.left_at is not None:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="非该群组成员")
-    if member.role not in roles:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="权限不足")
-
-
 @router.post("/{guild_id}/teams", response_model=ResponseModel[TeamOut])
 async def create_team(
     guild_id: int,
@@ -41,22 +37,8 @@ async def create_team(
     db: AsyncSession = Depends(get_db)
 ):
     """创建开团"""
-    # 验证群组存在
-    guild_result = await db.execute(select(Guild).where(Guild.id == guild_id, Guild.deleted_at.is_(None)))
-    guild = guild_result.scalar_one_or_none()
-    if guild is None:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="群组不存在")
-
-    # 验证权限：群主或管理员可开团
-    gm_result = await db.execute(
-        select(GuildMember).where(
-            GuildMember.guild_id == guild_id,
-            GuildMember.user_id == current_user.id,
-            GuildMember.left_at.is_(None)
-        )
-    )
-    gm = gm_result.scalar_one_or_none()
-    _ensure_member_with_role(gm, roles=["owner", "helper"]) 
+    # 验证群组存在及权限：群主或管理员可开团
+    await GuildContextService.require_member(db, guild_id, current_user.id, roles=["owner", "helper"])
 
     # 创建团队，将 rules 转换为 JSON
     team = Team(
@@ -91,41 +73,130 @@ async def create_team(
     return success(TeamOut.model_validate(team), message="创建成功")
 
 
+def _summary_columns(model: type) -> list:
+    """摘要视图查询的列（不加载 rule、slot_assignments、notice 等 JSON/长文本列）"""
+    return [getattr(model, name) for name in TeamSummaryOut.model_fields]
+
+
+def _list_models(status_filter: Optional[str]) -> list:
+    """开团列表需要查询的表：归档表只有已完成/已取消的团队"""
+    if status_filter and status_filter not in ARCHIVABLE_STATUSES:
+        return [Team]
+    return [Team, TeamArchive]
+
+
+def _build_list_conditions(
+    model: type,
+    guild_id: int,
+    status_filter: Optional[str],
+    from_date: Optional[date],
+    to_date: Optional[date]
+) -> list:
+    """构建开团列表的查询条件（日期范围为闭区间，model 为 Team 或 TeamArchive）"""
+    conditions = [
+        model.guild_id == guild_id,
+        model.status != "deleted"
+    ]
+    # 如果提供了 status 参数，添加状态过滤
+    if status_filter:
+        conditions.append(model.status == status_filter)
+    if from_date:
+        conditions.append(model.team_time >= datetime.combine(from_date, datetime.min.time()))
+    if to_date:
+        conditions.append(model.team_time < datetime.combine(to_date + timedelta(days=1), datetime.min.time()))
+    return conditions
+
+
+def _encode_cursor(team_time: datetime, team_id: int) -> str:
+    """生成游标：{team_time}_{id}"""
+    return f"{team_time.isoformat()}_{team_id}"
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """解析游标"""
+    try:
+        team_time_str, team_id_str = cursor.split("_", 1)
+        return datetime.fromisoformat(team_time_str), int(team_id_str)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="无效的分页游标")
+
+
 @router.get("/{guild_id}/teams", response_model=ResponseModel[List[TeamOut]])
 async def list_teams(
     guild_id: int,
     status_filter: Optional[str] = Query(None, alias="status", description="按状态过滤: open, completed, cancelled"),
+    from_date: Optional[date] = Query(None, alias="from", description="开团日期起（含）"),
+    to_date: Optional[date] = Query(None, alias="to", description="开团日期止（含）"),
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """获取开团列表"""
+    """获取开团列表（全部返回，包含已归档的团队；新调用方请使用 /teams/page 游标分页）"""
     # 需为该群成员
-    gm_result = await db.execute(
-        select(GuildMember).where(
-            GuildMember.guild_id == guild_id,
-            GuildMember.user_id == current_user.id,
-            GuildMember.left_at.is_(None)
+    await GuildContextService.require_member(db, guild_id, current_user.id)
+
+    # 获取团队列表（热表与归档表分别查询后合并）
+    groups = []
+    for model in _list_models(status_filter):
+        conditions = _build_list_conditions(model, guild_id, status_filter, from_date, to_date)
+        result = await db.execute(
+            select(model).where(*conditions).order_by(model.team_time.desc(), model.id.desc())
         )
-    )
-    if gm_result.scalar_one_or_none() is None:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="非该群组成员")
+        groups.append(result.scalars().all())
+    teams = ArchiveService.merge_by_team_time(*groups)
+    # 一次 TypeAdapter 调用完成整批校验与序列化
+    return fast_success(dump_rows(TeamOut, teams, from_attributes=True), message="获取成功")
 
-    # 构建查询条件
-    conditions = [
-        Team.guild_id == guild_id,
-        Team.status != "deleted"
-    ]
 
-    # 如果提供了 status 参数，添加状态过滤
-    if status_filter:
-        conditions.append(Team.status == status_filter)
+@router.get(
+    "/{guild_id}/teams/page",
+    response_model=ResponseModel[CursorPage[Union[TeamOut, TeamSummaryOut]]]
+)
+async def list_teams_page(
+    guild_id: int,
+    limit: int = Query(50, ge=1, le=200, description="每页数量"),
+    cursor: Optional[str] = Query(None, description="分页游标（上一页返回的 next_cursor）"),
+    status_filter: Optional[str] = Query(None, alias="status", description="按状态过滤: open, completed, cancelled"),
+    from_date: Optional[date] = Query(None, alias="from", description="开团日期起（含）"),
+    to_date: Optional[date] = Query(None, alias="to", description="开团日期止（含）"),
+    detail: bool = Query(False, description="是否返回完整信息（规则、坑位分配、告示等），默认只返回摘要"),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    获取开团列表（游标分页）
 
-    # 获取团队列表
-    result = await db.execute(
-        select(Team).where(*conditions).order_by(Team.team_time.desc())
-    )
-    teams = result.scalars().all()
-    return success([TeamOut.model_validate(t) for t in teams], message="获取成功")
+    按 (team_time, id) 倒序做 keyset 分页，翻页成本与页数无关；
+    默认返回摘要，不读取规则、坑位分配等较大的 JSON 列；
+    已归档的团队一并返回（热表与归档表各取一页后合并）
+    """
+    # 需为该群成员
+    await GuildContextService.require_member(db, guild_id, current_user.id)
+
+    cursor_key = _decode_cursor(cursor) if cursor else None
+    groups = []
+    for model in _list_models(status_filter):
+        conditions = _build_list_conditions(model, guild_id, status_filter, from_date, to_date)
+        if cursor_key:
+            conditions.append(tuple_(model.team_time, model.id) < tuple_(*cursor_key))
+
+        # 多取一条用于判断是否还有下一页
+        query = (
+            select(model) if detail else select(*_summary_columns(model))
+        ).where(*conditions).order_by(model.team_time.desc(), model.id.desc()).limit(limit + 1)
+        result = await db.execute(query)
+        # 摘要查询返回 Row，与 ORM 对象一样可按属性读取
+        groups.append(result.scalars().all() if detail else result.all())
+
+    rows = ArchiveService.merge_by_team_time(*groups, limit=limit + 1)
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    page_data = {
+        "items": dump_rows(TeamOut if detail else TeamSummaryOut, rows, from_attributes=True),
+        "next_cursor": _encode_cursor(rows[-1].team_time, rows[-1].id) if has_more else None,
+        "has_more": has_more,
+    }
+    return fast_success(page_data, message="获取成功")
 
 
 @router.get("/{guild_id}/teams/{team_id}", response_model=ResponseModel[TeamOut])
@@ -135,26 +206,11 @@ async def get_team(
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """获取开团详情"""
+    """获取开团详情（包含已归档的团队）"""
     # 需为该群成员
-    gm_result = await db.execute(
-        select(GuildMember).where(
-            GuildMember.guild_id == guild_id,
-            GuildMember.user_id == current_user.id,
-            GuildMember.left_at.is_(None)
-        )
-    )
-    if gm_result.scalar_one_or_none() is None:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="非该群组成员")
+    await GuildContextService.require_member(db, guild_id, current_user.id)
 
-    result = await db.execute(
-        select(Team).where(
-            Team.id == team_id,
-            Team.guild_id == guild_id,
-            Team.status != "deleted"
-        )
-    )
-    team = result.scalar_one_or_none()
+    team = await ArchiveService.get_team(db, guild_id, team_id)
     if team is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="团队不存在")
     return success(TeamOut.model_validate(team), message="获取成功")
@@ -170,15 +226,7 @@ async def update_team(
 ):
     """更新开团信息"""
     # 权限：群主或管理员
-    gm_result = await db.execute(
-        select(GuildMember).where(
-            GuildMember.guild_id == guild_id,
-            GuildMember.user_id == current_user.id,
-            GuildMember.left_at.is_(None)
-        )
-    )
-    gm = gm_result.scalar_one_or_none()
-    _ensure_member_with_role(gm, roles=["owner", "helper"]) 
+    await GuildContextService.require_member(db, guild_id, current_user.id, roles=["owner", "helper"])
 
     result = await db.execute(
         select(Team).where(
@@ -256,14 +304,7 @@ async def close_team(
 ):
     """关闭开团（完成或取消）"""
     # 权限：群主或管理员或创建者
-    gm_result = await db.execute(
-        select(GuildMember).where(
-            GuildMember.guild_id == guild_id,
-            GuildMember.user_id == current_user.id,
-            GuildMember.left_at.is_(None)
-        )
-    )
-    gm = gm_result.scalar_one_or_none()
+    gm = await GuildContextService.require_member(db, guild_id, current_user.id)
 
     # 获取团队
     result = await db.execute(
@@ -278,10 +319,7 @@ async def close_team(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="团队不存在")
 
     # 验证权限：必须是群主、管理员或创建者
-    if gm is None or gm.left_at is not None:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="非该群组成员")
-
-    is_owner_or_helper = gm.role in ["owner", "helper"]
+    is_owner_or_helper = gm.is_admin
     is_creator = team.creator_id == current_user.id
 
     if not (is_owner_or_helper or is_creator):
@@ -314,15 +352,7 @@ async def reopen_team(
 ):
     """重新开启已关闭的开团"""
     # 权限：群主或管理员
-    gm_result = await db.execute(
-        select(GuildMember).where(
-            GuildMember.guild_id == guild_id,
-            GuildMember.user_id == current_user.id,
-            GuildMember.left_at.is_(None)
-        )
-    )
-    gm = gm_result.scalar_one_or_none()
-    _ensure_member_with_role(gm, roles=["owner", "helper"])
+    await GuildContextService.require_member(db, guild_id, current_user.id, roles=["owner", "helper"])
 
     # 获取团队
     result = await db.execute(
@@ -364,15 +394,7 @@ async def delete_team(
 ):
     """删除开团（软删除）"""
     # 权限：群主或管理员
-    gm_result = await db.execute(
-        select(GuildMember).where(
-            GuildMember.guild_id == guild_id,
-            GuildMember.user_id == current_user.id,
-            GuildMember.left_at.is_(None)
-        )
-    )
-    gm = gm_result.scalar_one_or_none()
-    _ensure_member_with_role(gm, roles=["owner", "helper"])
+    await GuildContextService.require_member(db, guild_id, current_user.id, roles=["owner", "helper"])
 
     result = await db.execute(
         select(Team).where(
@@ -404,15 +426,7 @@ async def get_heibenren_recommendations(
 ):
     """获取团队黑本推荐列表"""
     # 验证用户是该群组成员
-    gm_result = await db.execute(
-        select(GuildMember).where(
-            GuildMember.guild_id == guild_id,
-            GuildMember.user_id == current_user.id,
-            GuildMember.left_at.is_(None)
-        )
-    )
-    if gm_result.scalar_one_or_none() is None:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="非该群组成员")
+    await GuildContextService.require_member(db, guild_id, current_user.id)
 
     # 验证团队存在
     result = await db.execute(
@@ -434,20 +448,13 @@ async def get_heibenren_recommendations(
 
     # 获取用户信息
     user_ids = [r["user_id"] for r in recommendations]
-    users_result = await db.execute(
-        select(User).where(User.id.in_(user_ids))
-    )
-    users_map = {user.id: user for user in users_result.scalars().all()}
-
-    # 获取群昵称
-    gm_result = await db.execute(
-        select(GuildMember).where(
-            GuildMember.guild_id == guild_id,
-            GuildMember.user_id.in_(user_ids),
-            GuildMember.left_at.is_(None)
-        )
+    loaders = get_loaders(db)
+    users, members = await asyncio.gather(
+        loaders.users.load_many(user_ids),
+        loaders.guild_members.load_many([(guild_id, uid) for uid in user_ids])
     )
-    gm_map = {gm.user_id: gm for gm in gm_result.scalars().all()}
+    users_map = {user.id: user for user in users if user}
+    gm_map = {gm.user_id: gm for gm in members if gm}
 
     # 构建响应
     recommendation_items = []
@@ -493,60 +500,35 @@ async def get_team_logs(
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """获取团队日志"""
+    """获取团队日志（包含已归档的团队）"""
     # 验证权限：需为该群成员
-    gm_result = await db.execute(
-        select(GuildMember).where(
-            GuildMember.guild_id == guild_id,
-            GuildMember.user_id == current_user.id,
-            GuildMember.left_at.is_(None)
-        )
-    )
-    if gm_result.scalar_one_or_none() is None:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="非该群组成员")
+    await GuildContextService.require_member(db, guild_id, current_user.id)
 
     # 验证团队存在
-    result = await db.execute(
-        select(Team).where(
-            Team.id == team_id,
-            Team.guild_id == guild_id,
-            Team.status != "deleted"
-        )
-    )
-    team = result.scalar_one_or_none()
+    team = await ArchiveService.get_team(db, guild_id, team_id)
     if team is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="团队不存在")
 
-    # 查询日志
+    # 查询日志（已归档的团队查询日志归档表）
+    log_model = ArchiveService.log_model(team)
     logs_result = await db.execute(
-        select(TeamLog)
-        .where(TeamLog.team_id == team_id)
-        .order_by(TeamLog.created_at.desc())
+        select(log_model)
+        .where(log_model.team_id == team_id)
+        .order_by(log_model.created_at.desc())
         .limit(limit)
         .offset(offset)
     )
     logs = logs_result.scalars().all()
 
     # 获取所有操作用户的信息
-    user_ids = [log.action_user_id for log in logs if log.action_user_id]
-    users_map = {}
-    gm_map = {}
-
-    if user_ids:
-        users_result = await db.execute(
-            select(User).where(User.id.in_(user_ids))
-        )
-        users_map = {user.id: user for user in users_result.scalars().all()}
-
-        # 获取群昵称
-        gm_result = await db.execute(
-            select(GuildMember).where(
-                GuildMember.guild_id == guild_id,
-                GuildMember.user_id.in_(user_ids),
-                GuildMember.left_at.is_(None)
-            )
-        )
-        gm_map = {gm.user_id: gm for gm in gm_result.scalars().all()}
+    user_ids = list(dict.fromkeys(log.action_user_id for log in logs if log.action_user_id))
+    loaders = get_loaders(db)
+    users, members = await asyncio.gather(
+        loaders.users.load_many(user_ids),
+        loaders.guild_members.load_many([(guild_id, uid) for uid in user_ids])
+    )
+    users_map = {user.id: user for user in users if user}
+    gm_map = {gm.user_id: gm for gm in members if gm}
 
     # 构建响应
     log_items = []
@@ -2,7 +2,7 @@
 应用配置模块
 使用 pydantic-settings 管理环境变量
 """
-from typing import List
+from typing import List, Optional
 from pydantic import Field, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -15,6 +15,7 @@ class Settings(BaseSettings):
     APP_VERSION: str = "1.0.0"
     DEBUG: bool = False
     ENVIRONMENT: str = "production"
+    LAZY_ROUTERS: bool = True  # 管理后台等低频路由首次请求时才加载（调试模式下始终直接加载）
 
     # 服务器配置
     HOST: str = "0.0.0.0"
@@ -27,6 +28,46 @@ class Settings(BaseSettings):
     )
     DATABASE_POOL_SIZE: int = 5
     DATABASE_MAX_OVERFLOW: int = 10
+    DATABASE_REPLICA_URL: Optional[str] = None  # 只读副本连接URL（可选，GET 只读接口使用）
+    DATABASE_REPLICA_STICKY_SECONDS: float = 5.0  # 写请求后同一请求方读主库的时间（秒）
+    MIGRATION_MODE: str = "auto"  # 启动时的迁移方式：auto（落后时加锁迁移）/ check（只检查）/ skip
+
+    # 缓存配置
+    GUILD_CONTEXT_CACHE_TTL: int = 60  # 群组成员关系缓存秒数，0 表示关闭跨请求缓存
+    TEAM_BOARD_CACHE_TTL: int = 300  # 团队面板文档缓存秒数（兜底昵称变更），0 表示关闭
+    CONFIG_CACHE_TTL: int = 300  # 系统/群组副本配置缓存秒数，0 表示关闭
+    CONFIG_CACHE_NOTIFY: bool = False  # 是否通过 PostgreSQL LISTEN/NOTIFY 跨进程失效配置缓存
+
+    # 日志配置
+    LOG_ASYNC: bool = True  # 经有界队列由后台线程输出日志，不阻塞事件循环
+    LOG_QUEUE_SIZE: int = 10000  # 日志队列容量
+    LOG_OVERFLOW_POLICY: str = "drop_newest"  # 队列满时的策略：drop_newest / drop_oldest / block
+    LOG_JSON: bool = False  # 文件日志使用 JSON 格式（每行一条）
+
+    # SQL 执行统计配置
+    SQL_INSTRUMENTATION_ENABLED: bool = True  # 是否统计每个请求的 SQL 执行情况（响应头 + 日志）
+    SQL_REPEAT_THRESHOLD: int = 10  # 同一语句单请求执行超过该次数时告警（疑似 N+1）
+
+    # 指标配置
+    METRICS_ENABLED: bool = True  # 是否开启 /metrics（Prometheus 文本格式）
+    METRICS_MULTIPROCESS_DIR: Optional[str] = None  # 多进程部署时的快照目录（各工作进程共享）
+    METRICS_FLUSH_INTERVAL: float = 5.0  # 多进程模式下写快照的间隔（秒）
+    METRICS_STALE_SECONDS: float = 60.0  # 快照超过该时间未更新视为进程已退出，不再合并其仪表
+
+    # 后台任务队列配置
+    JOB_QUEUE_ENABLED: bool = True  # 是否在本进程启动任务工作者
+    JOB_WORKER_CONCURRENCY: int = 2  # 工作者协程数量
+    JOB_POLL_INTERVAL: float = 5.0  # 空闲时轮询间隔（秒）
+    JOB_MAX_ATTEMPTS: int = 5  # 默认最大尝试次数
+    JOB_RETRY_BASE_DELAY: int = 10  # 重试退避基数（秒），按 2^n 递增
+    JOB_STALE_TIMEOUT: int = 600  # 执行中任务超时回收（秒），用于进程崩溃后恢复
+    JOB_HEARTBEAT_INTERVAL: float = 60.0  # 执行中任务刷新 locked_at 的间隔（秒），须明显小于 JOB_STALE_TIMEOUT
+    JOB_RECOVER_INTERVAL: float = 60.0  # 工作者检查超时任务的间隔（秒）
+    JOB_RETENTION_DAYS: int = 7  # 成功任务保留天数
+
+    # 开团归档配置
+    TEAM_ARCHIVE_AFTER_DAYS: int = 180  # 已完成/已取消的团队关闭超过该天数后移入归档表
+    TEAM_ARCHIVE_BATCH_SIZE: int = 200  # 每批归档的团队数量（每批一个事务）
 
     # JWT配置
     SECRET_KEY: str = Field(
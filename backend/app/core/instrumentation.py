@@ -0,0 +1,131 @@
+"""
+SQL 执行统计模块
+
+通过引擎事件统计每个请求的 SQL 执行情况（存放在 contextvar 中）：
+1. 语句数、数据库总耗时、最慢语句
+2. 按归一化语句计数，用于发现 N+1 查询（同一语句执行次数超过阈值）
+3. query_budget() 供测试断言关键路径的查询预算
+"""
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from dataclasses import dataclass, field
+from typing import Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# 当前请求的统计（未开启统计时为 None）
+_current_stats: ContextVar[Optional["QueryStats"]] = ContextVar("sql_query_stats", default=None)
+
+# 引擎连接 info 中记录语句开始时间的键
+_START_TIME_KEY = "sql_instrumentation_start"
+
+# 归一化用的正则
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PARAMETER = re.compile(r"\$\d+|%\(\w+\)s|:\w+|\?")
+_IN_LIST = re.compile(r"IN \((?:\?\s*,\s*)*\?\)", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_statement(statement: str) -> str:
+    """
+    归一化 SQL 语句（参数、字面量替换为 ?，IN 列表折叠），用于判断「同一语句」
+    """
+    statement = _STRING_LITERAL.sub("?", statement)
+    statement = _PARAMETER.sub("?", statement)
+    statement = _NUMBER_LITERAL.sub("?", statement)
+    statement = _WHITESPACE.sub(" ", statement).strip()
+    return _IN_LIST.sub("IN (...)", statement)
+
+
+@dataclass
+class QueryStats:
+    """一次请求（或一段代码）内的 SQL 执行统计"""
+    count: int = 0
+    total_ms: float = 0.0
+    slowest_ms: float = 0.0
+    slowest_statement: Optional[str] = None
+    statements: Counter = field(default_factory=Counter)
+
+    def record(self, statement: str, elapsed_ms: float) -> None:
+        """记录一条语句"""
+        self.count += 1
+        self.total_ms += elapsed_ms
+        normalized = normalize_statement(statement)
+        self.statements[normalized] += 1
+        if elapsed_ms >= self.slowest_ms:
+            self.slowest_ms = elapsed_ms
+            self.slowest_statement = normalized
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """执行次数超过阈值的语句（疑似 N+1），按次数倒序"""
+        return [(sql, n) for sql, n in self.statements.most_common() if n > threshold]
+
+
+def begin() -> Token:
+    """开始统计（请求开始时调用），返回用于 end() 的令牌"""
+    return _current_stats.set(QueryStats())
+
+
+def end(token: Token) -> Optional[QueryStats]:
+    """结束统计并返回结果"""
+    stats = _current_stats.get()
+    _current_stats.reset(token)
+    return stats
+
+
+def current_stats() -> Optional[QueryStats]:
+    """获取当前上下文的统计"""
+    return _current_stats.get()
+
+
+def install(engine: Engine) -> None:
+    """在引擎上注册统计事件（异步引擎传入 engine.sync_engine）"""
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _before_cursor_execute(conn, _cursor, _statement, _parameters, _context, _executemany) -> None:
+    if _current_stats.get() is not None:
+        conn.info.setdefault(_START_TIME_KEY, []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, _cursor, statement, _parameters, _context, _executemany) -> None:
+    stats = _current_stats.get()
+    if stats is None:
+        return
+    starts = conn.info.get(_START_TIME_KEY)
+    if not starts:
+        return
+    stats.record(statement, (time.perf_counter() - starts.pop()) * 1000)
+
+
+@contextmanager
+def query_budget(max_queries: int, max_repeats: Optional[int] = None) -> Iterator[QueryStats]:
+    """
+    断言代码块内的查询预算（测试辅助）
+
+    Args:
+        max_queries: 允许的最大语句数
+        max_repeats: 同一归一化语句允许的最大执行次数
+
+    Raises:
+        AssertionError: 超出预算，消息中列出执行过的语句
+    """
+    token = begin()
+    try:
+        yield _current_stats.get()
+    finally:
+        stats = end(token)
+
+    details = "\n".join(f"  {n} x {sql}" for sql, n in stats.statements.most_common())
+    if stats.count > max_queries:
+        raise AssertionError(f"执行了 {stats.count} 条 SQL，超出预算 {max_queries}:\n{details}")
+    if max_repeats is not None and stats.repeated(max_repeats):
+        raise AssertionError(f"存在重复执行超过 {max_repeats} 次的 SQL（疑似 N+1）:\n{details}")
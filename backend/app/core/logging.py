@@ -1,13 +1,20 @@
 """
 日志配置模块
 提供统一的日志管理，支持控制台和文件输出
+
+开启 LOG_ASYNC 时，根日志器只挂一个有界队列处理器，控制台输出、文件写入与轮转
+都在 QueueListener 的后台线程中完成，不阻塞事件循环；队列满时按 LOG_OVERFLOW_POLICY 处理
 """
+import atexit
+import json
 import logging
+import queue
 import sys
+import threading
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
-from logging.handlers import RotatingFileHandler
+from typing import Any, Dict, List, Optional
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 
 from app.core.config import settings
 
@@ -22,12 +29,83 @@ CONSOLE_FORMAT = "%(asctime)s | %(levelname)-8s | %(name)s | %(message)s"
 # 日志目录
 LOG_DIR = Path(__file__).parent.parent.parent / "logs"
 
+# 队列满时的处理策略
+OVERFLOW_POLICIES = ("drop_newest", "drop_oldest", "block")
+
+# LogRecord 自带的属性，JSON 输出时其余属性视为 extra 字段
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """JSON 格式化器（每条日志一行，extra 字段原样输出）"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data: Dict[str, Any] = {
+            "time": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "line": record.lineno,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                data[key] = value
+        if record.exc_info:
+            data["exception"] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class BoundedQueueHandler(QueueHandler):
+    """
+    有界队列处理器
+
+    队列满时的策略：
+    - drop_newest: 丢弃当前日志
+    - drop_oldest: 丢弃队列中最早的日志，放入当前日志
+    - block: 阻塞等待队列有空位（会阻塞事件循环，仅用于不能丢日志的场景）
+    """
+
+    def __init__(self, log_queue: queue.Queue, policy: str = "drop_newest"):
+        if policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"不支持的日志溢出策略: {policy}，可选 {OVERFLOW_POLICIES}")
+        super().__init__(log_queue)
+        self.policy = policy
+        self.dropped = 0
+        self._dropped_lock = threading.Lock()
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if self.policy == "block":
+            self.queue.put(record)
+            return
+        try:
+            self.queue.put_nowait(record)
+            return
+        except queue.Full:
+            pass
+
+        if self.policy == "drop_oldest":
+            try:
+                self.queue.get_nowait()
+            except queue.Empty:
+                pass
+            try:
+                self.queue.put_nowait(record)
+            except queue.Full:
+                pass
+        self._count_dropped()
+
+    def _count_dropped(self) -> None:
+        with self._dropped_lock:
+            self.dropped += 1
+
 
 class LoggerManager:
     """日志管理器"""
 
     _initialized = False
     _log_level = logging.DEBUG if settings.DEBUG else logging.INFO
+    _queue_handler: Optional[BoundedQueueHandler] = None
+    _listener: Optional[QueueListener] = None
 
     @classmethod
     def setup(cls) -> None:
@@ -48,17 +126,17 @@ class LoggerManager:
         # 清除现有处理器（避免重复）
         root_logger.handlers.clear()
 
-        # 添加控制台处理器
-        console_handler = cls._create_console_handler()
-        root_logger.addHandler(console_handler)
-
-        # 添加文件处理器
-        file_handler = cls._create_file_handler()
-        root_logger.addHandler(file_handler)
-
-        # 添加错误日志文件处理器
-        error_handler = cls._create_error_file_handler()
-        root_logger.addHandler(error_handler)
+        # 控制台、文件、错误日志文件处理器
+        handlers = [
+            cls._create_console_handler(),
+            cls._create_file_handler(),
+            cls._create_error_file_handler(),
+        ]
+        if settings.LOG_ASYNC:
+            cls._start_queue(root_logger, handlers)
+        else:
+            for handler in handlers:
+                root_logger.addHandler(handler)
 
         # 配置第三方库的日志级别，避免过多噪音
         cls._configure_third_party_loggers()
@@ -73,6 +151,36 @@ class LoggerManager:
         logger.info(f"环境: {settings.ENVIRONMENT} | 调试模式: {settings.DEBUG}")
         logger.info("=" * 60)
 
+    @classmethod
+    def _start_queue(cls, root_logger: logging.Logger, handlers: List[logging.Handler]) -> None:
+        """根日志器只挂队列处理器，实际输出在后台线程中进行"""
+        log_queue: queue.Queue = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+        cls._queue_handler = BoundedQueueHandler(log_queue, settings.LOG_OVERFLOW_POLICY)
+        cls._listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+        cls._listener.start()
+        root_logger.addHandler(cls._queue_handler)
+        atexit.register(cls.shutdown)
+
+    @classmethod
+    def dropped_records(cls) -> int:
+        """队列满被丢弃的日志条数"""
+        return cls._queue_handler.dropped if cls._queue_handler else 0
+
+    @classmethod
+    def shutdown(cls) -> None:
+        """停止后台线程并写出队列中剩余的日志（应用关闭时调用，可重复调用）"""
+        listener, cls._listener = cls._listener, None
+        if listener is None:
+            return
+        listener.stop()
+        # 之后的日志直接输出，避免关闭后丢失
+        root_logger = logging.getLogger()
+        root_logger.removeHandler(cls._queue_handler)
+        for handler in listener.handlers:
+            root_logger.addHandler(handler)
+        if cls.dropped_records():
+            root_logger.warning(f"日志队列已满，共丢弃 {cls.dropped_records()} 条日志")
+
     @classmethod
     def _create_console_handler(cls) -> logging.Handler:
         """创建控制台处理器"""
@@ -96,7 +204,7 @@ class LoggerManager:
             encoding="utf-8"
         )
         handler.setLevel(cls._log_level)
-        handler.setFormatter(logging.Formatter(LOG_FORMAT, LOG_DATE_FORMAT))
+        handler.setFormatter(cls._create_file_formatter())
         return handler
 
     @classmethod
@@ -110,9 +218,16 @@ class LoggerManager:
             encoding="utf-8"
         )
         handler.setLevel(logging.ERROR)
-        handler.setFormatter(logging.Formatter(LOG_FORMAT, LOG_DATE_FORMAT))
+        handler.setFormatter(cls._create_file_formatter())
         return handler
 
+    @classmethod
+    def _create_file_formatter(cls) -> logging.Formatter:
+        """文件日志格式（LOG_JSON 开启时每行一条 JSON）"""
+        if settings.LOG_JSON:
+            return JsonFormatter()
+        return logging.Formatter(LOG_FORMAT, LOG_DATE_FORMAT)
+
     @classmethod
     def _configure_third_party_loggers(cls) -> None:
         """配置第三方库的日志级别"""
@@ -193,5 +308,10 @@ def setup_logging() -> None:
     LoggerManager.setup()
 
 
+def shutdown_logging() -> None:
+    """关闭日志系统（写出队列中剩余的日志）"""
+    LoggerManager.shutdown()
+
+
 # 提供一个默认的 logger 实例，方便快速使用
 logger = get_logger("app")
@@ -0,0 +1,341 @@
+"""
+进程内指标模块
+
+提供简单的 Counter / Gauge / Histogram 注册表，并以 Prometheus 文本格式输出：
+1. 单进程模式：直接输出本进程的指标
+2. 多进程模式（配置 METRICS_MULTIPROCESS_DIR）：每个工作进程定期把快照写入目录下
+   metrics-<pid>.json，抓取时合并全部快照（计数器、直方图求和；仪表只合并未过期的快照）
+"""
+import asyncio
+import json
+import os
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from app.core.config import settings
+from app.core.logging import LoggerManager, get_logger
+
+logger = get_logger(__name__)
+
+# 默认直方图桶（秒）
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelValues = Tuple[str, ...]
+
+
+class _Metric:
+    """指标基类"""
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[LabelValues, Any] = {}
+        self._function: Optional[Callable[[], float]] = None
+
+    def _key(self, labels: Dict[str, Any]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"指标 {self.name} 的标签应为 {self.labelnames}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        """输出时调用 function 取值（仅用于无标签的计数器、仪表）"""
+        self._function = function
+
+    def samples(self) -> List[List[Any]]:
+        """快照中的样本 [[标签值...], 值]"""
+        if self._function is not None:
+            try:
+                return [[[], float(self._function())]]
+            except Exception as e:
+                logger.warning(f"指标 {self.name} 取值失败: {e}")
+                return []
+        return [[list(key), value] for key, value in self._values.items()]
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "type": self.type_name,
+            "help": self.documentation,
+            "labelnames": list(self.labelnames),
+            "samples": self.samples(),
+        }
+
+
+class Counter(_Metric):
+    """只增计数器（可设置回调，读取由其他组件累计的进程内计数）"""
+    type_name = "counter"
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    """仪表（可设置回调，在输出时取值）"""
+    type_name = "gauge"
+
+    def set(self, value: float, **labels: Any) -> None:
+        self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels: Any) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    """直方图（累计桶 + 总和 + 次数）"""
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        entry = self._values.get(key)
+        if entry is None:
+            entry = self._values[key] = {"buckets": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                entry["buckets"][index] += 1
+        entry["sum"] += value
+        entry["count"] += 1
+
+    @contextmanager
+    def time(self, **labels: Any) -> Iterator[None]:
+        """统计代码块耗时（秒）"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def snapshot(self) -> Dict[str, Any]:
+        data = super().snapshot()
+        data["buckets"] = list(self.buckets)
+        return data
+
+
+class MetricsRegistry:
+    """指标注册表"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._flusher: Optional[asyncio.Task] = None
+
+    def _register(self, metric: _Metric) -> Any:
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """本进程全部指标的快照（可 JSON 序列化）"""
+        return {name: metric.snapshot() for name, metric in self._metrics.items()}
+
+    def reset(self) -> None:
+        """清空所有样本（测试用）"""
+        for metric in self._metrics.values():
+            metric._values.clear()
+
+    # ==================== 多进程模式 ====================
+
+    def write_snapshot(self, directory: str) -> None:
+        """把本进程快照原子写入 directory/metrics-<pid>.json"""
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"metrics-{os.getpid()}.json")
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f)
+        os.replace(tmp_path, path)
+
+    def collect(self) -> List[Dict[str, Dict[str, Any]]]:
+        """
+        收集需要合并的快照
+
+        单进程模式只返回本进程快照；多进程模式先写入本进程快照再读取目录下全部快照，
+        过期快照（进程已退出）中的仪表会被丢弃，计数器和直方图保留
+        """
+        directory = settings.METRICS_MULTIPROCESS_DIR
+        if not directory:
+            return [self.snapshot()]
+
+        self.write_snapshot(directory)
+        stale_before = time.time() - settings.METRICS_STALE_SECONDS
+        snapshots = []
+        for filename in sorted(os.listdir(directory)):
+            if not (filename.startswith("metrics-") and filename.endswith(".json")):
+                continue
+            path = os.path.join(directory, filename)
+            try:
+                with open(path, encoding="utf-8") as f:
+                    snapshot = json.load(f)
+                stale = os.path.getmtime(path) < stale_before
+            except (OSError, ValueError) as e:
+                logger.warning(f"读取指标快照失败 {filename}: {e}")
+                continue
+            if stale:
+                snapshot = {name: data for name, data in snapshot.items() if data["type"] != "gauge"}
+            snapshots.append(snapshot)
+        return snapshots
+
+    def render(self) -> str:
+        """输出 Prometheus 文本格式"""
+        return render_snapshots(self.collect())
+
+    async def start_flusher(self) -> None:
+        """多进程模式下启动定期写快照的任务（应用启动时调用）"""
+        if not settings.METRICS_MULTIPROCESS_DIR or self._flusher is not None:
+            return
+        self._flusher = asyncio.create_task(self._flush_loop(), name="metrics-flusher")
+
+    async def stop_flusher(self) -> None:
+        """停止定期写快照，并删除本进程快照中的仪表（应用关闭时调用）"""
+        if self._flusher is None:
+            return
+        self._flusher.cancel()
+        await asyncio.gather(self._flusher, return_exceptions=True)
+        self._flusher = None
+        try:
+            self.write_snapshot(settings.METRICS_MULTIPROCESS_DIR)
+            path = os.path.join(settings.METRICS_MULTIPROCESS_DIR, f"metrics-{os.getpid()}.json")
+            # 把修改时间设为过期，进程退出后仪表不再参与合并
+            os.utime(path, (0, 0))
+        except OSError as e:
+            logger.warning(f"写入最终指标快照失败: {e}")
+
+    async def _flush_loop(self) -> None:
+        while True:
+            try:
+                self.write_snapshot(settings.METRICS_MULTIPROCESS_DIR)
+            except OSError as e:
+                logger.warning(f"写入指标快照失败: {e}")
+            await asyncio.sleep(settings.METRICS_FLUSH_INTERVAL)
+
+
+def _merge(snapshots: List[Dict[str, Dict[str, Any]]]) -> Dict[str, Dict[str, Any]]:
+    """合并多个快照：同名指标按标签求和"""
+    merged: Dict[str, Dict[str, Any]] = {}
+    for snapshot in snapshots:
+        for name, data in snapshot.items():
+            target = merged.setdefault(name, {**data, "values": {}})
+            for labels, value in data["samples"]:
+                key = tuple(labels)
+                current = target["values"].get(key)
+                if data["type"] == "histogram":
+                    if current is None:
+                        current = target["values"][key] = {
+                            "buckets": [0] * len(value["buckets"]), "sum": 0.0, "count": 0
+                        }
+                    current["buckets"] = [a + b for a, b in zip(current["buckets"], value["buckets"])]
+                    current["sum"] += value["sum"]
+                    current["count"] += value["count"]
+                else:
+                    target["values"][key] = (current or 0) + value
+    return merged
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(zip(names, values))
+    if extra is not None:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _escape(value: str) -> str:
+    """转义标签值中的反斜杠、换行和双引号"""
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render_snapshots(snapshots: List[Dict[str, Dict[str, Any]]]) -> str:
+    """把快照合并后输出为 Prometheus 文本格式"""
+    lines: List[str] = []
+    for name, data in sorted(_merge(snapshots).items()):
+        lines.append(f"# HELP {name} {data['help']}")
+        lines.append(f"# TYPE {name} {data['type']}")
+        labelnames = data["labelnames"]
+        for labels, value in sorted(data["values"].items()):
+            if data["type"] == "histogram":
+                for bound, count in zip(data["buckets"], value["buckets"]):
+                    lines.append(
+                        f"{name}_bucket{_format_labels(labelnames, labels, ('le', _format_value(float(bound))))} {count}"
+                    )
+                lines.append(f"{name}_bucket{_format_labels(labelnames, labels, ('le', '+Inf'))} {value['count']}")
+                lines.append(f"{name}_sum{_format_labels(labelnames, labels)} {_format_value(value['sum'])}")
+                lines.append(f"{name}_count{_format_labels(labelnames, labels)} {value['count']}")
+            else:
+                lines.append(f"{name}{_format_labels(labelnames, labels)} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+# ==================== 全局注册表与应用指标 ====================
+
+registry = MetricsRegistry()
+
+HTTP_REQUEST_DURATION = registry.histogram(
+    "http_request_duration_seconds", "HTTP 请求耗时（秒）", ("method", "route", "status")
+)
+HTTP_REQUESTS_IN_FLIGHT = registry.gauge(
+    "http_requests_in_flight", "正在处理的 HTTP 请求数", ("method",)
+)
+
+DB_POOL_SIZE = registry.gauge("db_pool_size", "数据库连接池大小")
+DB_POOL_CHECKED_OUT = registry.gauge("db_pool_checked_out", "已借出的数据库连接数")
+DB_POOL_OVERFLOW = registry.gauge("db_pool_overflow", "连接池溢出连接数")
+DB_POOL_CHECKOUTS = registry.counter("db_pool_checkouts_total", "数据库连接借出次数")
+
+SLOT_LOCK_WAIT = registry.histogram(
+    "slot_allocation_lock_wait_seconds", "排坑团队锁等待时间（秒）",
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0),
+)
+RANKING_COMPUTE_DURATION = registry.histogram(
+    "ranking_compute_duration_seconds", "群组排名计算耗时（秒）"
+)
+
+# 计数由日志队列处理器累计；作为计数器，进程退出后多进程模式仍保留其快照中的值
+LOG_RECORDS_DROPPED = registry.counter("log_records_dropped_total", "日志队列已满被丢弃的日志条数")
+LOG_RECORDS_DROPPED.set_function(LoggerManager.dropped_records)
+
+CACHE_REQUESTS = registry.counter(
+    "cache_requests_total", "进程内缓存读取次数（result=hit/miss，命中率 = hit / 全部）", ("cache", "result")
+)
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    """记录一次缓存读取"""
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
@@ -0,0 +1,69 @@
+"""
+JSON 响应
+
+1. FastJSONResponse：使用 orjson 序列化，作为应用的默认响应类
+2. dump_rows / fast_success：大列表接口用 TypeAdapter 一次性完成校验与序列化，
+   直接返回响应对象，跳过 FastAPI 按 response_model 的二次校验与序列化
+   （输出与 response_model 序列化结果一致，如 Decimal 仍输出为字符串）
+"""
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, Iterable, List, Optional
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, TypeAdapter
+
+
+def _default(obj: Any) -> Any:
+    """orjson 不支持的类型（与 FastAPI jsonable_encoder 的处理一致）"""
+    if isinstance(obj, Decimal):
+        # 整数值输出为 int，否则输出为 float
+        return int(obj) if obj.as_tuple().exponent >= 0 else float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json", by_alias=True)
+    raise TypeError(f"无法序列化类型: {type(obj).__name__}")
+
+
+class FastJSONResponse(JSONResponse):
+    """基于 orjson 的 JSON 响应（datetime/date/UUID 原生支持，Decimal 见 _default）"""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+@lru_cache(maxsize=None)
+def get_adapter(tp: Any) -> TypeAdapter:
+    """按类型缓存 TypeAdapter（构建 TypeAdapter 需要编译校验器，开销较大）"""
+    return TypeAdapter(tp)
+
+
+def dump_rows(model: type, rows: Iterable[Any], from_attributes: bool = False) -> List[Any]:
+    """
+    批量校验并转为 JSON 兼容数据（一次 TypeAdapter 调用代替逐行 model_validate）
+
+    Args:
+        model: 行模型（如 TeamOut）
+        rows: ORM 对象（from_attributes=True）或字典
+    """
+    adapter = get_adapter(List[model])
+    return adapter.dump_python(
+        adapter.validate_python(list(rows), from_attributes=from_attributes),
+        mode="json",
+        by_alias=True,
+    )
+
+
+def fast_success(data: Any = None, message: str = "操作成功", model: Optional[Any] = None) -> FastJSONResponse:
+    """
+    成功响应（直接返回响应对象，格式同 success()）
+
+    Args:
+        data: 已是 JSON 兼容数据（如 dump_rows 的结果），或 model 类型的实例
+        model: data 的类型（如 GuildRankingResponse、List[SignupOut]），给出时按该类型序列化
+    """
+    if model is not None:
+        data = get_adapter(model).dump_python(data, mode="json", by_alias=True)
+    return FastJSONResponse({"code": 200, "message": message, "data": data})
@@ -1,8 +1,23 @@
 """
 数据库连接配置
 使用 SQLAlchemy 2.0 异步引擎
+
+可选只读副本（DATABASE_REPLICA_URL）：使用 get_read_db 的只读接口走副本，
+写请求之后的粘滞窗口内同一请求方的读请求仍走主库，保证读到自己的写入；
+粘滞窗口通过签名 Cookie 下发（任一工作进程都能校验，多进程部署同样有效），
+本进程内另有一份记录，兜底不保存 Cookie 的客户端（如每次新建连接的 Bot）；
+副本会话在 info 中带有标记，进程内共享缓存不会用副本读到的（可能滞后的）数据填充
 """
+import math
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, Dict, Optional
+
+from fastapi import Request, Response
+from jose import JWTError, jwt
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+from app.core import instrumentation, metrics
 from app.core.config import settings
 from app.core.logging import get_logger
 from app.models.base import Base
@@ -18,6 +33,15 @@ engine = create_async_engine(
     pool_pre_ping=True,  # 连接前测试可用性
 )
 
+if settings.SQL_INSTRUMENTATION_ENABLED:
+    instrumentation.install(engine.sync_engine)
+
+# 连接池指标
+metrics.DB_POOL_SIZE.set_function(lambda: engine.sync_engine.pool.size())
+metrics.DB_POOL_CHECKED_OUT.set_function(lambda: engine.sync_engine.pool.checkedout())
+metrics.DB_POOL_OVERFLOW.set_function(lambda: engine.sync_engine.pool.overflow())
+event.listen(engine.sync_engine, "checkout", lambda *_args: metrics.DB_POOL_CHECKOUTS.inc())
+
 # 创建异步会话工厂
 AsyncSessionLocal = async_sessionmaker(
     engine,
@@ -27,12 +51,142 @@ AsyncSessionLocal = async_sessionmaker(
     autoflush=False,
 )
 
+# 只读副本（可选），连接级别设置为只读事务，误写会直接报错
+replica_engine = None
+ReplicaSessionLocal: Optional[async_sessionmaker] = None
+if settings.DATABASE_REPLICA_URL:
+    replica_engine = create_async_engine(
+        settings.DATABASE_REPLICA_URL,
+        echo=settings.DEBUG,
+        pool_size=settings.DATABASE_POOL_SIZE,
+        max_overflow=settings.DATABASE_MAX_OVERFLOW,
+        pool_pre_ping=True,
+        connect_args={"server_settings": {"default_transaction_read_only": "on"}},
+    )
+    if settings.SQL_INSTRUMENTATION_ENABLED:
+        instrumentation.install(replica_engine.sync_engine)
+    ReplicaSessionLocal = async_sessionmaker(
+        replica_engine,
+        class_=AsyncSession,
+        expire_on_commit=False,
+        autocommit=False,
+        autoflush=False,
+    )
+
+# 只读请求方法
+READ_METHODS = frozenset({"GET", "HEAD"})
 
-async def get_db() -> AsyncSession:
+# 副本会话在 session.info 中使用的标记键
+REPLICA_SESSION_KEY = "replica"
+
+# 粘滞窗口 Cookie（HS256 签名，内容为请求方标识与过期时间）
+STICKY_COOKIE = "db_primary_sticky"
+_STICKY_TOKEN_TYPE = "db_sticky"
+
+# 粘滞窗口 {请求方标识: 截止时间（monotonic）}，仅本进程有效，兜底不带 Cookie 的客户端
+_sticky_until: Dict[str, float] = {}
+_STICKY_MAX_ENTRIES = 10000
+
+
+def is_replica_session(session: AsyncSession) -> bool:
+    """会话是否连接只读副本（副本数据可能滞后，不应写入跨请求缓存）"""
+    return bool(session.info.get(REPLICA_SESSION_KEY))
+
+
+def request_identity(request: Request) -> str:
     """
-    获取数据库会话的依赖注入函数
-    用于 FastAPI 的 Depends
+    请求方标识（用于粘滞窗口）
+
+    优先使用 Bearer token 中的用户，其次 Bot API Key，最后客户端地址；
+    这里只用于选择数据库，不校验签名，认证仍由 deps 完成
+    """
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() == "bearer" and token:
+        try:
+            claims = jwt.get_unverified_claims(token)
+            return f"{claims.get('type')}:{claims.get('sub')}"
+        except JWTError:
+            pass
+    api_key = request.headers.get("x-api-key")
+    if api_key:
+        return f"bot:{api_key.split('_')[0]}"
+    return f"ip:{request.client.host if request.client else ''}"
+
+
+def mark_primary_sticky(identity: str) -> None:
+    """写入后一段时间内该请求方的读请求走主库"""
+    now = time.monotonic()
+    if len(_sticky_until) >= _STICKY_MAX_ENTRIES:
+        for key in [k for k, until in _sticky_until.items() if until < now]:
+            _sticky_until.pop(key, None)
+    _sticky_until[identity] = now + settings.DATABASE_REPLICA_STICKY_SECONDS
+
+
+def _sticky_cookie_value(identity: str, seconds: float) -> str:
+    """签发粘滞窗口 Cookie（与请求方绑定，客户端无法伪造或延长）"""
+    claims = {
+        "sub": identity,
+        "token_type": _STICKY_TOKEN_TYPE,
+        "exp": math.ceil(time.time() + seconds),
+    }
+    return jwt.encode(claims, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
+
+def _has_sticky_cookie(request: Request, identity: str) -> bool:
+    """请求是否带有该请求方未过期的粘滞窗口 Cookie"""
+    token = request.cookies.get(STICKY_COOKIE)
+    if not token:
+        return False
+    try:
+        claims = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except JWTError:
+        return False
+    return claims.get("token_type") == _STICKY_TOKEN_TYPE and claims.get("sub") == identity
+
+
+def is_primary_sticky(identity: str, request: Optional[Request] = None) -> bool:
+    """请求方是否处于写入后的粘滞窗口内（先看请求携带的 Cookie，再看本进程记录）"""
+    if request is not None and _has_sticky_cookie(request, identity):
+        return True
+    until = _sticky_until.get(identity)
+    if until is None:
+        return False
+    if until < time.monotonic():
+        _sticky_until.pop(identity, None)
+        return False
+    return True
+
+
+async def primary_sticky_middleware(
+    request: Request,
+    call_next: Callable[[Request], Awaitable[Response]]
+) -> Response:
     """
+    粘滞窗口中间件：配置了副本时，写请求结束后为请求方开启粘滞窗口
+
+    在响应上设置签名 Cookie，后续读请求无论落到哪个工作进程都会走主库
+    """
+    response = await call_next(request)
+    if ReplicaSessionLocal is None or request.method in READ_METHODS:
+        return response
+
+    identity = request_identity(request)
+    mark_primary_sticky(identity)
+    seconds = settings.DATABASE_REPLICA_STICKY_SECONDS
+    if seconds > 0:
+        response.set_cookie(
+            STICKY_COOKIE,
+            _sticky_cookie_value(identity, seconds),
+            max_age=math.ceil(seconds),
+            httponly=True,
+            samesite="lax",
+        )
+    return response
+
+
+@asynccontextmanager
+async def _primary_session() -> AsyncIterator[AsyncSession]:
+    """主库会话"""
     async with AsyncSessionLocal() as session:
         try:
             yield session
@@ -40,70 +194,47 @@ async def get_db() -> AsyncSession:
             await session.close()
 
 
-async def init_db():
+async def get_db() -> AsyncSession:
     """
-    初始化数据库
-    使用 Alembic 自动迁移到最新版本
+    获取数据库会话的依赖注入函数
+    用于 FastAPI 的 Depends
     """
-    from alembic.config import Config
-    from alembic import command
-    from alembic.script import ScriptDirectory
-    from alembic.runtime.migration import MigrationContext
-    from sqlalchemy import create_engine
-    import os
-    import asyncio
-
-    # 导入所有模型以确保它们被注册到元数据中
-    import app.models  # noqa: F401 - 导入用于注册模型，不直接使用
-
-    logger.info("开始数据库初始化流程...")
-
-    # 获取 alembic.ini 配置文件路径
-    alembic_cfg_path = os.path.join(
-        os.path.dirname(os.path.dirname(__file__)),
-        "alembic.ini"
-    )
-    logger.info(f"Alembic 配置文件: {alembic_cfg_path}")
+    async with _primary_session() as session:
+        yield session
 
-    # 创建 Alembic 配置
-    alembic_cfg = Config(alembic_cfg_path)
 
-    # 将 asyncpg 转换为 psycopg2 用于迁移
-    db_url = settings.DATABASE_URL.replace("+asyncpg", "+psycopg2") if "+asyncpg" in settings.DATABASE_URL else settings.DATABASE_URL
-    alembic_cfg.set_main_option("sqlalchemy.url", db_url)
-    logger.info("已设置数据库 URL")
+async def get_read_db(request: Request) -> AsyncSession:
+    """
+    获取按请求路由的数据库会话（只读接口使用）
 
-    # 在单独的线程中运行迁移检查和执行
-    def run_migration():
-        logger.info("创建同步引擎用于迁移...")
-        sync_engine = create_engine(db_url, poolclass=None)
+    只读请求走副本；写请求、粘滞窗口内的请求或未配置副本时走主库
+    """
+    if (
+        ReplicaSessionLocal is None
+        or request.method not in READ_METHODS
+        or is_primary_sticky(request_identity(request), request)
+    ):
+        async with _primary_session() as session:
+            yield session
+        return
 
+    async with ReplicaSessionLocal() as session:
+        session.info[REPLICA_SESSION_KEY] = True
         try:
-            with sync_engine.connect() as connection:
-                logger.info("检查当前数据库版本...")
-                context = MigrationContext.configure(connection)
-                current_rev = context.get_current_revision()
-                logger.info(f"当前数据库版本: {current_rev}")
-
-                # 检查是否需要迁移
-                script = ScriptDirectory.from_config(alembic_cfg)
-                head_rev = script.get_current_head()
-                logger.info(f"目标数据库版本: {head_rev}")
-
-                if current_rev == head_rev:
-                    logger.info("数据库已是最新版本，无需迁移")
-                else:
-                    logger.info(f"需要迁移: {current_rev} -> {head_rev}")
-                    logger.info("开始执行迁移...")
-                    command.upgrade(alembic_cfg, "head")
-                    logger.info("迁移完成")
+            yield session
         finally:
-            sync_engine.dispose()
-            logger.info("已释放同步引擎资源")
+            await session.close()
+
+
+async def init_db():
+    """
+    初始化数据库
+    按 MIGRATION_MODE 检查版本或迁移（详见 app.migrate）
+    """
+    from app.migrate import ensure_schema
 
-    # 使用 to_thread 在单独的线程中运行迁移
-    logger.info("在独立线程中运行数据库迁移...")
-    await asyncio.to_thread(run_migration)
+    logger.info(f"开始数据库初始化流程（迁移模式: {settings.MIGRATION_MODE}）...")
+    await ensure_schema()
     logger.info("数据库初始化完成")
 
 
@@ -4,12 +4,17 @@ FastAPI主应用入口
 import sys
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.core import instrumentation, metrics
 from app.core.config import settings
-from app.core.logging import setup_logging, get_logger
-from app.database import init_db, close_db
-from app.api.v2 import api_router
+from app.core.logging import setup_logging, shutdown_logging, get_logger
+from app.core.responses import FastJSONResponse
+from app.database import init_db, close_db, primary_sticky_middleware
+from app.api.v2 import api_router, include_lazy_routers
+from app.services.config_cache_service import ConfigCacheService
+from app.services.job_queue import JobQueue
 
 # 确保 stdout 不被缓冲（解决 print 不显示的问题）
 sys.stdout.reconfigure(line_buffering=True)
@@ -30,12 +35,23 @@ async def lifespan(app: FastAPI):
     await init_db()
     logger.info("数据库初始化完成")
 
+    if settings.JOB_QUEUE_ENABLED:
+        await JobQueue.start()
+    await ConfigCacheService.start_listener()
+    await metrics.registry.start_flusher()
+
     yield
 
     # 关闭时执行
+    await metrics.registry.stop_flusher()
+    await ConfigCacheService.stop_listener()
+    if settings.JOB_QUEUE_ENABLED:
+        await JobQueue.stop()
+
     logger.info("正在关闭数据库连接...")
     await close_db()
     logger.info("数据库连接已关闭")
+    shutdown_logging()
 
 
 # 创建FastAPI应用
@@ -45,7 +61,8 @@ app = FastAPI(
     description="剑网3副本团队管理系统后端API",
     docs_url="/api/docs" if settings.DEBUG else None,
     redoc_url="/api/redoc" if settings.DEBUG else None,
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse
 )
 
 # 配置CORS
@@ -60,40 +77,88 @@ app.add_middleware(
 
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
-    """请求日志中间件"""
+    """请求日志中间件（附带 SQL 执行统计）"""
     import time
     start_time = time.time()
 
     # 记录请求
     logger.debug(f">>> {request.method} {request.url.path}")
 
-    response = await call_next(request)
+    token = instrumentation.begin() if settings.SQL_INSTRUMENTATION_ENABLED else None
+    try:
+        response = await call_next(request)
+    finally:
+        stats = instrumentation.end(token) if token is not None else None
 
     # 计算处理时间
     process_time = (time.time() - start_time) * 1000
 
+    summary = (
+        f"<<< {request.method} {request.url.path} | "
+        f"状态: {response.status_code} | 耗时: {process_time:.2f}ms"
+    )
+    extra = {"status_code": response.status_code, "duration_ms": round(process_time, 2)}
+    if stats is not None:
+        response.headers["X-DB-Query-Count"] = str(stats.count)
+        response.headers["X-DB-Time-Ms"] = f"{stats.total_ms:.2f}"
+        response.headers["X-DB-Slowest-Ms"] = f"{stats.slowest_ms:.2f}"
+        summary += f" | SQL: {stats.count}条/{stats.total_ms:.2f}ms"
+        extra.update(
+            db_query_count=stats.count,
+            db_time_ms=round(stats.total_ms, 2),
+            db_slowest_ms=round(stats.slowest_ms, 2),
+            db_slowest_statement=stats.slowest_statement,
+        )
+        for statement, times in stats.repeated(settings.SQL_REPEAT_THRESHOLD):
+            logger.warning(
+                f"疑似 N+1 查询: {request.method} {request.url.path} | "
+                f"同一语句执行 {times} 次: {statement[:200]}"
+            )
+
     # 根据状态码选择日志级别
     if response.status_code >= 500:
-        logger.error(
-            f"<<< {request.method} {request.url.path} | "
-            f"状态: {response.status_code} | 耗时: {process_time:.2f}ms"
-        )
+        logger.error(summary, extra=extra)
     elif response.status_code >= 400:
-        logger.warning(
-            f"<<< {request.method} {request.url.path} | "
-            f"状态: {response.status_code} | 耗时: {process_time:.2f}ms"
-        )
+        logger.warning(summary, extra=extra)
     else:
-        logger.info(
-            f"<<< {request.method} {request.url.path} | "
-            f"状态: {response.status_code} | 耗时: {process_time:.2f}ms"
-        )
+        logger.info(summary, extra=extra)
 
     return response
 
 
+@app.middleware("http")
+async def collect_metrics(request: Request, call_next):
+    """请求指标中间件（按路由模板统计耗时，避免路径参数导致标签膨胀）"""
+    if not settings.METRICS_ENABLED:
+        return await call_next(request)
+
+    import time
+    method = request.method
+    metrics.HTTP_REQUESTS_IN_FLIGHT.inc(method=method)
+    start_time = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        metrics.HTTP_REQUEST_DURATION.observe(
+            time.perf_counter() - start_time,
+            method=method,
+            route=getattr(route, "path", "unmatched"),
+            status=status,
+        )
+        metrics.HTTP_REQUESTS_IN_FLIGHT.dec(method=method)
+
+
+# 只读副本的粘滞窗口（写请求后同一请求方读主库）
+app.middleware("http")(primary_sticky_middleware)
+
+
 # 注册API路由
 app.include_router(api_router, prefix="/api/v2")
+include_lazy_routers(app.router, prefix="/api/v2")
 
 
 @app.get("/")
@@ -113,6 +178,14 @@ async def health_check():
     return {"status": "ok"}
 
 
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """Prometheus 指标"""
+    if not settings.METRICS_ENABLED:
+        return PlainTextResponse("metrics disabled\n", status_code=404)
+    return PlainTextResponse(metrics.registry.render(), media_type="text/plain; version=0.0.4")
+
+
 @app.get("/test-log")
 async def test_logging():
     """测试日志系统"""
@@ -0,0 +1,182 @@
+"""
+数据库迁移
+
+部署时执行一次迁移（多个进程同时执行时由 advisory lock 保证只有一个真正迁移）:
+    python -m app.migrate
+
+应用启动时由 ensure_schema() 按 MIGRATION_MODE 处理：
+- auto: 已是最新版本时直接跳过，否则加锁迁移（默认，兼容开发环境直接启动）
+- check: 只检查版本，落后时拒绝启动（部署脚本已执行迁移时使用）
+- skip: 不做任何检查，启动耗时只剩应用导入
+"""
+import asyncio
+import hashlib
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+MIGRATION_MODES = ("auto", "check", "skip")
+
+# 迁移的 advisory lock 键
+_MIGRATION_LOCK_KEY = 834002
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+ALEMBIC_INI = BACKEND_DIR / "alembic.ini"
+VERSIONS_DIR = BACKEND_DIR / "alembic" / "versions"
+
+# 进程内缓存的目标版本 (指纹, 版本)
+_head_cache: Optional[tuple] = None
+
+
+def sync_database_url() -> str:
+    """迁移使用的同步数据库 URL（asyncpg 转换为 psycopg2）"""
+    return settings.DATABASE_URL.replace("+asyncpg", "+psycopg2")
+
+
+def _alembic_config():
+    from alembic.config import Config
+
+    config = Config(str(ALEMBIC_INI))
+    config.set_main_option("sqlalchemy.url", sync_database_url())
+    # 不让 env.py 按 alembic.ini 重新配置日志，避免覆盖应用的日志处理器
+    config.attributes["configure_logger"] = False
+    return config
+
+
+def _versions_fingerprint() -> str:
+    """迁移脚本目录的指纹（文件名、大小、修改时间），脚本变化后缓存自动失效"""
+    digest = hashlib.sha1()
+    for path in sorted(VERSIONS_DIR.glob("*.py")):
+        stat = path.stat()
+        digest.update(f"{path.name}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+    return digest.hexdigest()
+
+
+def get_head_revision() -> str:
+    """
+    获取迁移脚本的目标版本（head）
+
+    解析全部迁移脚本较慢，结果按脚本目录指纹缓存在进程内与临时目录中，
+    同一版本代码的多个工作进程只需解析一次
+    """
+    global _head_cache
+
+    fingerprint = _versions_fingerprint()
+    if _head_cache is not None and _head_cache[0] == fingerprint:
+        return _head_cache[1]
+
+    cache_file = Path(tempfile.gettempdir()) / f"alembic-head-{fingerprint}"
+    try:
+        head = cache_file.read_text(encoding="utf-8").strip() or None
+    except OSError:
+        head = None
+
+    if head is None:
+        from alembic.script import ScriptDirectory
+
+        head = ScriptDirectory.from_config(_alembic_config()).get_current_head()
+        try:
+            cache_file.write_text(head, encoding="utf-8")
+        except OSError as e:
+            logger.warning(f"写入迁移版本缓存失败: {e}")
+
+    _head_cache = (fingerprint, head)
+    return head
+
+
+def run_migrations() -> None:
+    """
+    迁移到最新版本（同步，部署时或 auto 模式下调用）
+
+    已是最新版本时不加锁直接返回；否则持有 advisory lock 后重新检查再迁移，
+    并发执行的其他进程会等待锁释放，随后发现已是最新版本
+    """
+    from alembic import command
+    from alembic.runtime.migration import MigrationContext
+    from sqlalchemy import create_engine, func, select
+    from sqlalchemy.pool import NullPool
+
+    head = get_head_revision()
+    sync_engine = create_engine(sync_database_url(), poolclass=NullPool, isolation_level="AUTOCOMMIT")
+    try:
+        with sync_engine.connect() as connection:
+            current = MigrationContext.configure(connection).get_current_revision()
+            if current == head:
+                logger.info(f"数据库已是最新版本 {head}，无需迁移")
+                return
+
+            logger.info(f"等待迁移锁: {current} -> {head}")
+            connection.execute(select(func.pg_advisory_lock(_MIGRATION_LOCK_KEY)))
+            try:
+                current = MigrationContext.configure(connection).get_current_revision()
+                if current == head:
+                    logger.info("其他进程已完成迁移")
+                    return
+                logger.info(f"开始执行迁移: {current} -> {head}")
+                command.upgrade(_alembic_config(), "head")
+                logger.info("迁移完成")
+            finally:
+                connection.execute(select(func.pg_advisory_unlock(_MIGRATION_LOCK_KEY)))
+    finally:
+        sync_engine.dispose()
+
+
+async def get_current_revision() -> Optional[str]:
+    """使用应用连接池读取数据库当前版本（未初始化时返回 None）"""
+    from sqlalchemy import text
+    from sqlalchemy.exc import DBAPIError
+
+    from app.database import engine
+
+    async with engine.connect() as connection:
+        try:
+            result = await connection.execute(text("SELECT version_num FROM alembic_version"))
+        except DBAPIError:
+            return None
+        return result.scalar()
+
+
+async def ensure_schema() -> None:
+    """
+    应用启动时按 MIGRATION_MODE 确保数据库版本
+
+    Raises:
+        RuntimeError: check 模式下数据库版本落后
+    """
+    mode = settings.MIGRATION_MODE
+    if mode not in MIGRATION_MODES:
+        raise ValueError(f"不支持的迁移模式: {mode}，可选 {MIGRATION_MODES}")
+    if mode == "skip":
+        logger.info("MIGRATION_MODE=skip，跳过数据库版本检查")
+        return
+
+    head = await asyncio.to_thread(get_head_revision)
+    current = await get_current_revision()
+    if current == head:
+        logger.info(f"数据库已是最新版本 {head}")
+        return
+
+    if mode == "check":
+        raise RuntimeError(f"数据库版本 {current} 落后于 {head}，请先执行 python -m app.migrate")
+
+    logger.info(f"需要迁移: {current} -> {head}")
+    await asyncio.to_thread(run_migrations)
+
+
+def main() -> None:
+    """部署入口：迁移到最新版本"""
+    from app.core.logging import shutdown_logging
+
+    try:
+        run_migrations()
+    finally:
+        shutdown_logging()
+
+
+if __name__ == "__main__":
+    main()
@@ -19,6 +19,9 @@ from app.models.bot import Bot, BotGuild
 from app.models.weekly_record import WeeklyRecordConfig, WeeklyRecord
 from app.models.guild_dungeon_config import GuildDungeonConfig
 from app.models.member_change_history import MemberChangeHistory
+from app.models.background_job import BackgroundJob
+from app.models.gold_rollup import GoldRollup, GoldUserRollup
+from app.models.archive import TeamArchive, SignupArchive, TeamLogArchive
 
 __all__ = [
 	"SystemAdmin",
@@ -41,4 +44,10 @@ __all__ = [
 	"WeeklyRecord",
 	"GuildDungeonConfig",
 	"MemberChangeHistory",
+	"BackgroundJob",
+	"GoldRollup",
+	"GoldUserRollup",
+	"TeamArchive",
+	"SignupArchive",
+	"TeamLogArchive",
 ]
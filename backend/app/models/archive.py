@@ -0,0 +1,65 @@
+"""
+开团归档模型
+已完成/已取消且超过保留期的团队连同报名、日志从热表移入归档表（scripts/archive_teams.py 或 teams.archive 任务）
+
+归档表的列与热表一致（由热表列复制，保证两者同步），另加归档时间；
+不设外键：归档后的团队不再被修改，主键沿用热表的ID
+"""
+from typing import List
+
+from sqlalchemy import Column, DateTime, Index, Table, func
+
+from app.models.base import Base
+from app.models.signup import Signup
+from app.models.team import Team
+from app.models.team_log import TeamLog
+
+
+def _archive_columns(source: Table) -> List[Column]:
+    """复制热表的列（不含外键、默认值与索引）"""
+    columns = [
+        Column(c.name, c.type, primary_key=c.primary_key, autoincrement=False, nullable=c.nullable, comment=c.comment)
+        for c in source.columns
+    ]
+    columns.append(Column("archived_at", DateTime, server_default=func.now(), nullable=False, comment="归档时间"))
+    return columns
+
+
+class TeamArchive(Base):
+    """开团归档表"""
+    __table__ = Table(
+        "teams_archive",
+        Base.metadata,
+        *_archive_columns(Team.__table__),
+        # 历史开团列表：群组内按 (team_time, id) 分页与时间范围过滤
+        Index("ix_teams_archive_guild_team_time", "guild_id", "team_time", "id"),
+    )
+
+    def __repr__(self):
+        return f"<TeamArchive(id={self.id}, guild_id={self.guild_id}, title='{self.title}')>"
+
+
+class SignupArchive(Base):
+    """报名归档表"""
+    __table__ = Table(
+        "signups_archive",
+        Base.metadata,
+        *_archive_columns(Signup.__table__),
+        Index("ix_signups_archive_team_id", "team_id"),
+    )
+
+    def __repr__(self):
+        return f"<SignupArchive(id={self.id}, team_id={self.team_id})>"
+
+
+class TeamLogArchive(Base):
+    """团队日志归档表"""
+    __table__ = Table(
+        "team_logs_archive",
+        Base.metadata,
+        *_archive_columns(TeamLog.__table__),
+        Index("ix_team_logs_archive_team_created_at", "team_id", "created_at"),
+    )
+
+    def __repr__(self):
+        return f"<TeamLogArchive(id={self.id}, team_id={self.team_id}, action_type={self.action_type})>"
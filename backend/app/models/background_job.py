@@ -0,0 +1,90 @@
+"""
+后台任务模型（持久化发件箱）
+与业务数据在同一事务中写入，提交后由任务队列工作者消费
+"""
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime, Text, JSON, Index
+from app.models.base import Base
+
+
+class BackgroundJob(Base):
+    """后台任务表"""
+    __tablename__ = "background_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    job_type = Column(
+        String(50),
+        nullable=False,
+        index=True,
+        comment="任务类型"
+    )
+    payload = Column(
+        JSON,
+        nullable=False,
+        comment="任务参数"
+    )
+    dedupe_key = Column(
+        String(100),
+        nullable=True,
+        index=True,
+        comment="去重键（存在相同键的待执行任务时不重复入队）"
+    )
+    status = Column(
+        String(20),
+        nullable=False,
+        default="pending",
+        comment="状态: pending(待执行), running(执行中), succeeded(成功), failed(失败)"
+    )
+    attempts = Column(
+        Integer,
+        nullable=False,
+        default=0,
+        comment="已尝试次数"
+    )
+    max_attempts = Column(
+        Integer,
+        nullable=False,
+        default=5,
+        comment="最大尝试次数"
+    )
+    run_after = Column(
+        DateTime,
+        nullable=False,
+        default=datetime.utcnow,
+        comment="最早执行时间（重试退避）"
+    )
+    locked_at = Column(
+        DateTime,
+        nullable=True,
+        comment="被工作者领取的时间"
+    )
+    last_error = Column(
+        Text,
+        nullable=True,
+        comment="最近一次错误信息"
+    )
+    created_at = Column(
+        DateTime,
+        default=datetime.utcnow,
+        nullable=False,
+        comment="创建时间"
+    )
+    updated_at = Column(
+        DateTime,
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow,
+        nullable=False,
+        comment="更新时间"
+    )
+    finished_at = Column(
+        DateTime,
+        nullable=True,
+        comment="完成时间"
+    )
+
+    __table_args__ = (
+        Index('ix_background_jobs_status_run_after', 'status', 'run_after'),
+    )
+
+    def __repr__(self):
+        return f"<BackgroundJob(id={self.id}, job_type={self.job_type}, status={self.status})>"
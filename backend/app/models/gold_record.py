@@ -1,5 +1,5 @@
 from datetime import datetime, date
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Date, Text, JSON, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Date, Text, JSON, Boolean, Index, text
 from sqlalchemy.orm import relationship
 from app.models.base import Base
 
@@ -12,7 +12,8 @@ class GoldRecord(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     guild_id = Column(Integer, ForeignKey("guilds.id", ondelete="CASCADE"), nullable=False, index=True, comment="群组ID")
-    team_id = Column(Integer, ForeignKey("teams.id", ondelete="SET NULL"), nullable=True, index=True, comment="关联的开团ID")
+    # 不设外键：关联的团队可能已归档（见 app/models/archive.py）
+    team_id = Column(Integer, nullable=True, index=True, comment="关联的开团ID")
     creator_id = Column(Integer, ForeignKey("users.id"), nullable=False, comment="创建者ID")
     dungeon = Column(String(50), nullable=False, index=True, comment="副本名称")
     run_date = Column(Date, nullable=False, index=True, comment="运行日期")
@@ -29,3 +30,18 @@ class GoldRecord(Base):
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False, comment="创建时间")
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False, comment="更新时间")
     deleted_at = Column(DateTime, nullable=True, comment="软删除时间")
+
+    __table_args__ = (
+        # 列表分页：群组内未删除记录按日期倒序
+        Index(
+            "ix_gold_records_guild_run_date_active",
+            guild_id, run_date.desc(), id.desc(),
+            postgresql_where=text("deleted_at IS NULL"),
+        ),
+        # 排名计算：群组内某人的黑本记录按日期排序
+        Index(
+            "ix_gold_records_guild_heibenren_run_date",
+            guild_id, heibenren_user_id, run_date.desc(),
+            postgresql_where=text("deleted_at IS NULL"),
+        ),
+    )
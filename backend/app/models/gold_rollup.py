@@ -0,0 +1,55 @@
+"""
+金团统计汇总模型
+由金团记录写入时增量维护（按受影响的周期重算），也可通过脚本整体重建
+"""
+from datetime import datetime
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, Date, ForeignKey, UniqueConstraint
+from app.models.base import Base
+
+
+class GoldRollup(Base):
+    """金团汇总表（群组 × 周期 × 副本）"""
+    __tablename__ = "gold_rollups"
+
+    id = Column(Integer, primary_key=True, index=True)
+    guild_id = Column(Integer, ForeignKey("guilds.id", ondelete="CASCADE"), nullable=False, index=True, comment="群组ID")
+    period_type = Column(String(10), nullable=False, comment="周期类型: week(周), month(月)")
+    period_start = Column(Date, nullable=False, comment="周期起始日期（周一 / 每月1日）")
+    dungeon = Column(String(50), nullable=False, comment="副本名称")
+    record_count = Column(Integer, nullable=False, default=0, comment="金团记录数")
+    total_gold = Column(BigInteger, nullable=False, default=0, comment="总金团")
+    subsidy_gold = Column(BigInteger, nullable=False, default=0, comment="总补贴")
+    worker_count = Column(Integer, nullable=False, default=0, comment="打工人次")
+    xuanjing_count = Column(Integer, nullable=False, default=0, comment="出玄晶次数")
+    heibenren_count = Column(Integer, nullable=False, default=0, comment="有黑本人的记录数")
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False, comment="更新时间")
+
+    __table_args__ = (
+        UniqueConstraint('guild_id', 'period_type', 'period_start', 'dungeon', name='uq_gold_rollups_period_dungeon'),
+    )
+
+    def __repr__(self):
+        return f"<GoldRollup(guild_id={self.guild_id}, {self.period_type}={self.period_start}, dungeon='{self.dungeon}')>"
+
+
+class GoldUserRollup(Base):
+    """成员金团汇总表（群组 × 周期 × 用户）"""
+    __tablename__ = "gold_user_rollups"
+
+    id = Column(Integer, primary_key=True, index=True)
+    guild_id = Column(Integer, ForeignKey("guilds.id", ondelete="CASCADE"), nullable=False, index=True, comment="群组ID")
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True, comment="用户ID")
+    period_type = Column(String(10), nullable=False, comment="周期类型: week(周), month(月)")
+    period_start = Column(Date, nullable=False, comment="周期起始日期（周一 / 每月1日）")
+    run_count = Column(Integer, nullable=False, default=0, comment="打工次数")
+    earned_gold = Column(BigInteger, nullable=False, default=0, comment="打工收入（人均工资之和）")
+    heibenren_count = Column(Integer, nullable=False, default=0, comment="黑本次数")
+    heibenren_gold = Column(BigInteger, nullable=False, default=0, comment="黑本团总金团")
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False, comment="更新时间")
+
+    __table_args__ = (
+        UniqueConstraint('guild_id', 'user_id', 'period_type', 'period_start', name='uq_gold_user_rollups_period_user'),
+    )
+
+    def __repr__(self):
+        return f"<GoldUserRollup(guild_id={self.guild_id}, user_id={self.user_id}, {self.period_type}={self.period_start})>"
@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index, text
 from sqlalchemy.orm import relationship
 from app.models.base import Base
 
@@ -20,6 +20,15 @@ class GuildMember(Base):
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False, comment="创建时间")
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False, comment="更新时间")
 
+    __table_args__ = (
+        # 成员身份校验（只看未退群的成员）
+        Index(
+            "ix_guild_members_guild_user_active",
+            guild_id, user_id,
+            postgresql_where=text("left_at IS NULL"),
+        ),
+    )
+
     # 关系
     guild = relationship("Guild", back_populates="members")
     user = relationship("User", back_populates="guild_memberships")
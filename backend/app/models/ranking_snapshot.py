@@ -2,7 +2,7 @@
 排名快照模型
 """
 from datetime import datetime
-from sqlalchemy import Column, Integer, DateTime, ForeignKey, Date, DECIMAL
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Date, DECIMAL, Index
 from app.models.base import Base
 
 
@@ -35,5 +35,10 @@ class RankingSnapshot(Base):
     # 软删除字段（成员退群时隐藏红黑榜记录）
     deleted_at = Column(DateTime, nullable=True, comment="软删除时间")
 
+    __table_args__ = (
+        # 每个成员的最新快照
+        Index("ix_ranking_snapshots_guild_user_date", guild_id, user_id, snapshot_date.desc()),
+    )
+
     def __repr__(self):
         return f"<RankingSnapshot(id={self.id}, guild_id={self.guild_id}, user_id={self.user_id}, rank={self.rank_position})>"
@@ -2,7 +2,7 @@
 报名数据模型
 """
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, JSON
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, JSON, Index, text
 from sqlalchemy.orm import relationship
 from app.models.base import Base
 
@@ -102,6 +102,15 @@ class Signup(Base):
         comment="更新时间"
     )
 
+    __table_args__ = (
+        # 排坑：团队内有效报名按报名顺序
+        Index(
+            "ix_signups_team_active_created_at",
+            "team_id", "created_at",
+            postgresql_where=text("cancelled_at IS NULL"),
+        ),
+    )
+
     # 关系
     team = relationship("Team", foreign_keys=[team_id])
     submitter = relationship("User", foreign_keys=[submitter_id])
@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, Text, JSON
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, Text, JSON, Index, text
 from sqlalchemy.orm import relationship
 from app.models.base import Base
 
@@ -30,3 +30,12 @@ class Team(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False, comment="更新时间")
     closed_at = Column(DateTime, nullable=True, comment="关闭时间")
     closed_by = Column(Integer, ForeignKey("users.id"), nullable=True, comment="关闭者ID")
+
+    __table_args__ = (
+        # 开团列表：群组内未删除的团队按 (team_time, id) 做 keyset 分页与时间范围过滤
+        Index(
+            "ix_teams_guild_team_time_active",
+            guild_id, team_time, id,
+            postgresql_where=text("status != 'deleted'"),
+        ),
+    )
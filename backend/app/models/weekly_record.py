@@ -2,7 +2,7 @@
 每周记录数据模型
 """
 from datetime import datetime, date
-from sqlalchemy import Column, Integer, String, DateTime, Date, Boolean, JSON, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Date, Boolean, JSON, ForeignKey, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from app.models.base import Base
 
@@ -55,6 +55,10 @@ class CharacterCDStatus(Base):
     # 关系
     character = relationship("Character")
 
+    __table_args__ = (
+        UniqueConstraint('character_id', 'week_start_date', 'dungeon_name', name='uq_character_cd_status'),
+    )
+
     def __repr__(self):
         return f"<CharacterCDStatus(id={self.id}, character_id={self.character_id}, dungeon='{self.dungeon_name}', cleared={self.is_cleared})>"
 
@@ -171,5 +175,14 @@ class WeeklyRecord(Base):
     character = relationship("Character")
     gold_record = relationship("GoldRecord")
 
+    __table_args__ = (
+        UniqueConstraint(
+            'user_id', 'character_id', 'week_start_date', 'dungeon_name',
+            name='uq_weekly_records_user_char_week_dungeon'
+        ),
+        # 按周（或周范围）读取用户的记录
+        Index('ix_weekly_records_user_week', 'user_id', 'week_start_date'),
+    )
+
     def __repr__(self):
         return f"<WeeklyRecord(id={self.id}, character_id={self.character_id}, dungeon='{self.dungeon_name}', gold={self.gold_amount})>"
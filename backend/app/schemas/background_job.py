@@ -0,0 +1,15 @@
+"""
+后台任务队列相关的 Pydantic 模型
+"""
+from datetime import datetime
+from typing import Dict, Optional
+from pydantic import BaseModel, Field
+
+
+class JobQueueStats(BaseModel):
+    """任务队列统计"""
+    depth: int = Field(..., description="待执行任务数量")
+    by_status: Dict[str, int] = Field(default_factory=dict, description="按状态统计")
+    by_type: Dict[str, Dict[str, int]] = Field(default_factory=dict, description="按任务类型、状态统计")
+    oldest_pending_at: Optional[datetime] = Field(None, description="最早待执行任务的创建时间")
+    workers: int = Field(0, description="本进程工作者数量")
@@ -182,6 +182,8 @@ class BotTeamDetail(BaseModel):
     total_signup_count: int = Field(0, description="总报名数（包含已取消）")
     # 缓存用时间戳（团队更新时间和最新报名时间的最大值）
     latest_change_at: datetime = Field(..., description="最新变更时间")
+    # 面板文档版本（内容哈希）
+    version: Optional[str] = Field(None, description="面板文档版本")
 
 
 # ============ 报名管理 ============
@@ -82,6 +82,24 @@ class PaginatedResponse(BaseModel, Generic[DataT]):
         }
 
 
+class CursorPage(BaseModel, Generic[DataT]):
+    """
+    游标分页数据模型（keyset 分页，适合按时间倒序翻页）
+    """
+    items: list[DataT] = Field(description="数据列表")
+    next_cursor: Optional[str] = Field(default=None, description="下一页游标，为空表示没有更多数据")
+    has_more: bool = Field(default=False, description="是否还有更多数据")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "items": [],
+                "next_cursor": "2026-01-05_123",
+                "has_more": True
+            }
+        }
+
+
 class PageParams(BaseModel):
     """
     分页参数模型
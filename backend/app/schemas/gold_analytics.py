@@ -0,0 +1,50 @@
+"""
+金团统计相关的 Pydantic 模型
+"""
+from datetime import date
+from typing import List, Optional
+from pydantic import BaseModel, Field
+
+
+class GoldStatBase(BaseModel):
+    """金团统计指标"""
+    record_count: int = Field(0, description="金团记录数")
+    total_gold: int = Field(0, description="总金团")
+    average_gold: float = Field(0, description="平均金团")
+    subsidy_gold: int = Field(0, description="总补贴")
+    subsidy_ratio: float = Field(0, description="补贴占比（补贴 / 总金团）")
+    worker_count: int = Field(0, description="打工人次")
+    xuanjing_count: int = Field(0, description="出玄晶次数")
+    xuanjing_rate: float = Field(0, description="出玄晶率")
+    heibenren_count: int = Field(0, description="有黑本人的记录数")
+
+
+class GoldPeriodStat(GoldStatBase):
+    """按周期统计"""
+    period_start: date = Field(..., description="周期起始日期")
+
+
+class GoldDungeonStat(GoldStatBase):
+    """按副本统计"""
+    dungeon: str = Field(..., description="副本名称")
+
+
+class GoldUserStat(BaseModel):
+    """按成员统计"""
+    user_id: int = Field(..., description="用户ID")
+    user_name: Optional[str] = Field(None, description="用户显示名称")
+    run_count: int = Field(0, description="打工次数")
+    earned_gold: int = Field(0, description="打工收入")
+    heibenren_count: int = Field(0, description="黑本次数")
+    heibenren_gold: int = Field(0, description="黑本团总金团")
+
+
+class GoldAnalyticsResponse(BaseModel):
+    """金团统计响应"""
+    period_type: str = Field(..., description="周期类型: week, month")
+    start_date: Optional[date] = Field(None, description="开始日期")
+    end_date: Optional[date] = Field(None, description="结束日期")
+    dungeon: Optional[str] = Field(None, description="副本筛选")
+    periods: List[GoldPeriodStat] = Field(default=[], description="按周期统计（倒序）")
+    dungeons: List[GoldDungeonStat] = Field(default=[], description="按副本统计")
+    users: List[GoldUserStat] = Field(default=[], description="按成员统计（指定副本时为空）")
@@ -73,3 +73,19 @@ class GoldRecordOut(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class GoldImportError(BaseModel):
+    """导入错误明细"""
+    line: int = Field(..., description="CSV 行号（含表头，从1开始）")
+    message: str = Field(..., description="错误信息")
+
+
+class GoldImportResult(BaseModel):
+    """金团记录批量导入结果"""
+    total_rows: int = Field(0, description="数据行数")
+    imported: int = Field(0, description="新增记录数")
+    skipped: int = Field(0, description="已存在或文件内重复而跳过的记录数")
+    duplicates: int = Field(0, description="文件内重复而跳过的行数")
+    error_count: int = Field(0, description="错误总数")
+    errors: List[GoldImportError] = Field(default_factory=list, description="错误明细（最多50条）")
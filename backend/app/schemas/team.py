@@ -63,6 +63,29 @@ class SlotAssignmentItem(BaseModel):
     locked: bool = Field(default=False, description="是否锁定")
 
 
+class TeamSummaryOut(BaseModel):
+    """开团的摘要响应模型（不含规则、坑位分配、告示等较大的字段，用于列表/日历视图）"""
+    id: int
+    guild_id: int
+    creator_id: int
+    title: str
+    team_time: datetime
+    dungeon: str
+    max_members: int
+    is_xuanjing_booked: bool
+    is_yuntie_booked: bool
+    is_hidden: bool
+    is_locked: bool
+    status: str
+    created_at: datetime
+    updated_at: datetime
+    closed_at: Optional[datetime] = None
+    closed_by: Optional[int] = None
+
+    class Config:
+        from_attributes = True
+
+
 class TeamOut(BaseModel):
     """开团的响应模型"""
     id: int
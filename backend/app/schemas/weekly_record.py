@@ -102,6 +102,17 @@ class WeeklyMatrixResponse(BaseModel):
     grand_expense_total: int = 0  # 消费总计
 
 
+class WeeklyMatrixRangeResponse(BaseModel):
+    """多周记录矩阵响应"""
+    start_week: date
+    end_week: date
+    weeks: List[WeeklyMatrixResponse] = []  # 按周倒序
+    column_totals: dict[str, int] = {}  # 全部周按副本合计
+    grand_total: int = 0  # 全部周总计
+    column_expense_totals: dict[str, int] = {}  # 全部周按副本消费合计
+    grand_expense_total: int = 0  # 全部周消费总计
+
+
 class WeekOption(BaseModel):
     """周选项"""
     week_start_date: date
@@ -0,0 +1,176 @@
+"""
+开团归档服务
+
+1. 把已完成/已取消且超过保留期的团队连同报名、日志批量移入归档表，热表只保留近期数据
+2. 读接口查询历史数据时回退到归档表（归档后的团队只读，写接口仍只查热表）
+"""
+from datetime import datetime, timedelta
+from typing import Iterable, Optional, Union
+
+from sqlalchemy import delete, func, insert, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Subquery
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.models.archive import SignupArchive, TeamArchive, TeamLogArchive
+from app.models.signup import Signup
+from app.models.team import Team
+from app.models.team_log import TeamLog
+
+logger = get_logger(__name__)
+
+# 可归档的团队状态（开启中、已删除的团队不归档）
+ARCHIVABLE_STATUSES = ("completed", "cancelled")
+
+# 热表 -> 归档表，以及关联到团队的列（按此顺序复制）
+_ARCHIVE_TABLES = (
+    (Team, TeamArchive, "id"),
+    (Signup, SignupArchive, "team_id"),
+    (TeamLog, TeamLogArchive, "team_id"),
+)
+
+
+class ArchiveService:
+    """
+    开团归档服务
+
+    负责：
+    1. 批量归档过期团队（每批一个事务，行锁跳过正在被修改的团队）
+    2. 按团队ID回退查询归档表
+    3. 提供热表与归档表合并查询的子查询
+    """
+
+    @staticmethod
+    def is_archived(team: Union[Team, TeamArchive]) -> bool:
+        """团队是否已归档"""
+        return isinstance(team, TeamArchive)
+
+    @classmethod
+    def signup_model(cls, team: Union[Team, TeamArchive]) -> type:
+        """团队对应的报名表模型"""
+        return SignupArchive if cls.is_archived(team) else Signup
+
+    @classmethod
+    def log_model(cls, team: Union[Team, TeamArchive]) -> type:
+        """团队对应的日志表模型"""
+        return TeamLogArchive if cls.is_archived(team) else TeamLog
+
+    @staticmethod
+    def with_archive(model: type, archive_model: type, *names: str) -> Subquery:
+        """热表与归档表指定列的 UNION ALL 子查询（用于统计等需要完整历史的查询）"""
+        return union_all(
+            select(*[getattr(model, name) for name in names]),
+            select(*[getattr(archive_model, name) for name in names]),
+        ).subquery()
+
+    @classmethod
+    async def get_team(
+        cls,
+        db: AsyncSession,
+        guild_id: int,
+        team_id: int
+    ) -> Optional[Union[Team, TeamArchive]]:
+        """获取团队（热表不存在时查询归档表）"""
+        for model in (Team, TeamArchive):
+            result = await db.execute(
+                select(model).where(
+                    model.id == team_id,
+                    model.guild_id == guild_id,
+                    model.status != "deleted"
+                )
+            )
+            team = result.scalar_one_or_none()
+            if team is not None:
+                return team
+        return None
+
+    @classmethod
+    async def archive_batch(cls, db: AsyncSession, cutoff: datetime, batch_size: int) -> int:
+        """
+        归档一批团队（不提交）
+
+        Args:
+            cutoff: 关闭时间（未记录时按开团时间）早于该时间的团队才会归档
+
+        Returns:
+            本批归档的团队数量
+        """
+        result = await db.execute(
+            select(Team.id)
+            .where(
+                Team.status.in_(ARCHIVABLE_STATUSES),
+                func.coalesce(Team.closed_at, Team.team_time) < cutoff
+            )
+            .order_by(Team.id)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        team_ids = list(result.scalars().all())
+        if not team_ids:
+            return 0
+
+        for model, archive_model, team_column in _ARCHIVE_TABLES:
+            names = [column.name for column in model.__table__.columns]
+            await db.execute(
+                insert(archive_model).from_select(
+                    names,
+                    select(*[model.__table__.c[name] for name in names])
+                    .where(model.__table__.c[team_column].in_(team_ids))
+                )
+            )
+        # 先删除报名、日志，再删除团队
+        for model, _, team_column in reversed(_ARCHIVE_TABLES):
+            await db.execute(
+                delete(model)
+                .where(model.__table__.c[team_column].in_(team_ids))
+                .execution_options(synchronize_session=False)
+            )
+        return len(team_ids)
+
+    @classmethod
+    async def archive(
+        cls,
+        db: AsyncSession,
+        older_than_days: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        max_batches: Optional[int] = None
+    ) -> int:
+        """
+        归档所有过期团队（每批提交一次，避免长事务）
+
+        Args:
+            older_than_days: 保留天数，默认使用配置
+            batch_size: 每批团队数量，默认使用配置
+            max_batches: 最多执行的批数，为空表示直到没有可归档的团队
+
+        Returns:
+            归档的团队总数
+        """
+        days = settings.TEAM_ARCHIVE_AFTER_DAYS if older_than_days is None else older_than_days
+        size = batch_size or settings.TEAM_ARCHIVE_BATCH_SIZE
+        cutoff = datetime.utcnow() - timedelta(days=days)
+
+        total = 0
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            archived = await cls.archive_batch(db, cutoff, size)
+            await db.commit()
+            if not archived:
+                break
+            total += archived
+            batches += 1
+            logger.info(f"[归档] 已归档 {archived} 个团队（累计 {total}）")
+
+        logger.info(f"[归档] 完成: 早于 {cutoff:%Y-%m-%d} 关闭的团队共归档 {total} 个")
+        return total
+
+    @staticmethod
+    def merge_by_team_time(*groups: Iterable, limit: Optional[int] = None) -> list:
+        """合并各自按 (team_time, id) 倒序排列的结果（热表与归档表）"""
+        rows = sorted(
+            (row for group in groups for row in group),
+            key=lambda row: (row.team_time, row.id),
+            reverse=True
+        )
+        return rows if limit is None else rows[:limit]
@@ -0,0 +1,222 @@
+"""
+配置缓存服务
+
+缓存系统配置（system_configs）与群组副本配置（guild_dungeon_configs）：
+1. 每个键维护版本号，失效时递增；加载期间发生失效的结果不会写回缓存
+2. 写入方调用 invalidate_on_commit()，事务提交后本进程立即失效
+3. 可选 PostgreSQL LISTEN/NOTIFY：通知随事务一起提交，其他进程收到后立即失效；
+   未开启时其他进程依赖 TTL 兜底
+4. 副本会话加载的结果不写回缓存（副本可能滞后，旧配置会在整个 TTL 内生效）
+"""
+import asyncio
+import copy
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from sqlalchemy import event, func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core import metrics
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.database import is_replica_session
+from app.models.guild_dungeon_config import GuildDungeonConfig
+
+logger = get_logger(__name__)
+
+# 待失效键在 session.info 中使用的键
+_PENDING_KEYS = "config_cache_pending_keys"
+
+# NOTIFY 频道
+NOTIFY_CHANNEL = "config_cache_invalidate"
+
+# 监听连接断开后的重连间隔（秒）
+_LISTENER_RETRY_DELAY = 5.0
+
+
+def system_key(name: str) -> str:
+    """系统配置缓存键"""
+    return f"system:{name}"
+
+
+def guild_key(guild_id: int) -> str:
+    """群组副本配置缓存键"""
+    return f"guild:{guild_id}"
+
+
+class ConfigCacheService:
+    """
+    配置缓存服务
+
+    负责：
+    1. 读取系统配置、群组副本配置（带版本号的进程内缓存）
+    2. 事务提交后失效（可选跨进程通知）
+    3. LISTEN 连接生命周期
+    """
+
+    # 缓存 {key: (过期时间, 版本号, 值)}
+    _cache: Dict[str, Tuple[float, int, Any]] = {}
+    # 版本号 {key: version}
+    _versions: Dict[str, int] = {}
+    _listener: Optional[asyncio.Task] = None
+
+    @classmethod
+    async def get_system_config(cls, db: AsyncSession, name: str) -> Optional[Any]:
+        """
+        获取系统配置值（system_configs.value）
+
+        Returns:
+            配置值的副本，配置不存在时返回 None
+        """
+        async def load() -> Optional[Any]:
+            result = await db.execute(
+                text("SELECT value FROM system_configs WHERE key = :key").bindparams(key=name)
+            )
+            row = result.fetchone()
+            return row[0] if row else None
+
+        return await cls._get(db, system_key(name), load)
+
+    @classmethod
+    async def get_guild_config(cls, db: AsyncSession, guild_id: int) -> Optional[Dict[str, Any]]:
+        """
+        获取群组副本配置
+
+        Returns:
+            {"dungeon_options": [...], "quick_team_options": [...]} 的副本，未配置时返回 None
+        """
+        async def load() -> Optional[Dict[str, Any]]:
+            result = await db.execute(
+                select(GuildDungeonConfig).where(GuildDungeonConfig.guild_id == guild_id)
+            )
+            guild_config = result.scalar_one_or_none()
+            if guild_config is None:
+                return None
+            return {
+                "dungeon_options": guild_config.dungeon_options or [],
+                "quick_team_options": guild_config.quick_team_options or []
+            }
+
+        return await cls._get(db, guild_key(guild_id), load)
+
+    @classmethod
+    async def get_dungeon_options(cls, db: AsyncSession, guild_id: Optional[int] = None) -> Optional[list]:
+        """
+        获取副本选项：群组有配置时使用群组配置，否则使用全局配置
+
+        Returns:
+            副本选项列表的副本，全局配置也不存在时返回 None
+        """
+        if guild_id is not None:
+            guild_config = await cls.get_guild_config(db, guild_id)
+            if guild_config and guild_config["dungeon_options"]:
+                return guild_config["dungeon_options"]
+        return await cls.get_system_config(db, "dungeon_options")
+
+    @classmethod
+    def get_version(cls, key: str) -> int:
+        """获取键的当前版本号"""
+        return cls._versions.get(key, 0)
+
+    @classmethod
+    async def invalidate_on_commit(cls, db: AsyncSession, *keys: str) -> None:
+        """
+        登记待失效的键（在写入配置的事务中、提交前调用）
+
+        事务提交后本进程失效；开启 LISTEN/NOTIFY 时通知随事务一起提交
+        """
+        db.info.setdefault(_PENDING_KEYS, set()).update(keys)
+        if settings.CONFIG_CACHE_NOTIFY:
+            for key in keys:
+                await db.execute(select(func.pg_notify(NOTIFY_CHANNEL, key)))
+
+    @classmethod
+    def invalidate(cls, key: str) -> None:
+        """立即失效（递增版本号，进行中的加载结果不再写回）"""
+        cls._versions[key] = cls._versions.get(key, 0) + 1
+        cls._cache.pop(key, None)
+
+    @classmethod
+    def clear(cls) -> None:
+        """清空全部缓存"""
+        for key in list(cls._cache):
+            cls.invalidate(key)
+
+    @classmethod
+    async def start_listener(cls) -> None:
+        """启动 LISTEN 连接（应用启动时调用，未开启通知时不做任何事）"""
+        if not settings.CONFIG_CACHE_NOTIFY or cls._listener is not None:
+            return
+        cls._listener = asyncio.create_task(cls._listen_loop(), name="config-cache-listener")
+
+    @classmethod
+    async def stop_listener(cls) -> None:
+        """停止 LISTEN 连接（应用关闭时调用）"""
+        if cls._listener is None:
+            return
+        cls._listener.cancel()
+        await asyncio.gather(cls._listener, return_exceptions=True)
+        cls._listener = None
+
+    @classmethod
+    async def _get(cls, db: AsyncSession, key: str, load: Callable[[], Awaitable[Any]]) -> Any:
+        """读取缓存，未命中时加载并写回（加载期间版本变化或副本会话加载则不写回）"""
+        entry = cls._cache.get(key)
+        version = cls.get_version(key)
+        if entry is not None:
+            expires_at, cached_version, value = entry
+            if expires_at >= time.monotonic() and cached_version == version:
+                metrics.record_cache("config", hit=True)
+                return copy.deepcopy(value)
+            cls._cache.pop(key, None)
+        metrics.record_cache("config", hit=False)
+
+        value = await load()
+        ttl = settings.CONFIG_CACHE_TTL
+        if ttl > 0 and cls.get_version(key) == version and not is_replica_session(db):
+            cls._cache[key] = (time.monotonic() + ttl, version, value)
+        return copy.deepcopy(value)
+
+    @classmethod
+    async def _listen_loop(cls) -> None:
+        """保持独立的 LISTEN 连接，断线后清空缓存并重连"""
+        import asyncpg
+
+        dsn = settings.DATABASE_URL.replace("postgresql+asyncpg://", "postgresql://")
+
+        def on_notify(_connection, _pid, _channel, payload: str) -> None:
+            cls.invalidate(payload)
+
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(dsn)
+                await connection.add_listener(NOTIFY_CHANNEL, on_notify)
+                # 断线期间可能错过通知，连接建立后清空一次
+                cls.clear()
+                logger.info("配置缓存通知监听已启动")
+                while not connection.is_closed():
+                    await asyncio.sleep(_LISTENER_RETRY_DELAY)
+                logger.warning("配置缓存通知连接已断开，准备重连")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"配置缓存通知监听失败: {e}")
+            finally:
+                if connection is not None and not connection.is_closed():
+                    await connection.close()
+            await asyncio.sleep(_LISTENER_RETRY_DELAY)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_pending_keys(session: Session) -> None:
+    """事务提交后失效登记的配置键"""
+    for key in session.info.pop(_PENDING_KEYS, ()):
+        ConfigCacheService.invalidate(key)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_keys(session: Session) -> None:
+    """事务回滚后配置未变更，丢弃登记的键"""
+    session.info.pop(_PENDING_KEYS, None)
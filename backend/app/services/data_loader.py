@@ -0,0 +1,181 @@
+"""
+请求级批量加载器（DataLoader）
+
+同一事件循环 tick 内收集的键合并为一次 IN 查询：
+1. 每种实体（User / GuildMember / Character）一个加载器
+2. 同一请求内相同键只查询一次（identity map 语义，返回同一对象）
+3. 同一会话上的批量查询通过锁串行执行，避免 AsyncSession 并发操作
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.user import User
+from app.models.guild_member import GuildMember
+from app.models.character import Character
+
+# 加载器在 session.info 中使用的键
+_LOADERS_KEY = "request_loaders"
+
+BatchFn = Callable[[List[Hashable]], Awaitable[Dict[Hashable, Any]]]
+
+
+class BatchLoader:
+    """
+    通用批量加载器
+
+    batch_fn 接收键列表，返回 {键: 值} 字典；缺失的键解析为 None
+    """
+
+    def __init__(self, batch_fn: BatchFn, lock: asyncio.Lock):
+        self._batch_fn = batch_fn
+        self._lock = lock
+        self._futures: Dict[Hashable, asyncio.Future] = {}
+        self._queue: List[Hashable] = []
+        self._tasks: set = set()
+
+    async def load(self, key: Hashable) -> Any:
+        """加载单个键（同一 tick 内的调用会被合并）"""
+        future = self._futures.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._futures[key] = future
+            self._queue.append(key)
+            if len(self._queue) == 1:
+                # 当前 tick 结束后统一派发
+                loop.call_soon(self._schedule_dispatch)
+        return await future
+
+    async def load_many(self, keys: Iterable[Hashable]) -> List[Any]:
+        """加载多个键，按输入顺序返回"""
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    def prime(self, key: Hashable, value: Any) -> None:
+        """预先写入已知结果（例如刚查询过的对象）"""
+        if key not in self._futures:
+            future = asyncio.get_running_loop().create_future()
+            future.set_result(value)
+            self._futures[key] = future
+
+    def clear(self, key: Optional[Hashable] = None) -> None:
+        """清除缓存（写操作后使用）"""
+        if key is None:
+            self._futures = {
+                k: f for k, f in self._futures.items() if not f.done()
+            }
+        else:
+            future = self._futures.get(key)
+            if future is not None and future.done():
+                self._futures.pop(key, None)
+
+    def _schedule_dispatch(self) -> None:
+        keys, self._queue = self._queue, []
+        task = asyncio.ensure_future(self._dispatch(keys))
+        # 保留任务引用，避免被垃圾回收
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _dispatch(self, keys: List[Hashable]) -> None:
+        try:
+            async with self._lock:
+                results = await self._batch_fn(keys)
+        except Exception as exc:
+            for key in keys:
+                future = self._futures.pop(key, None)
+                if future is not None and not future.done():
+                    future.set_exception(exc)
+            return
+
+        for key in keys:
+            future = self._futures.get(key)
+            if future is not None and not future.done():
+                future.set_result(results.get(key))
+
+
+class RequestLoaders:
+    """单个请求（会话）内的加载器集合"""
+
+    def __init__(self, db: AsyncSession):
+        self._db = db
+        lock = asyncio.Lock()
+        self.users = BatchLoader(self._load_users, lock)
+        self.guild_members = BatchLoader(self._load_guild_members, lock)
+        self.characters = BatchLoader(self._load_characters, lock)
+
+    async def _load_users(self, user_ids: List[int]) -> Dict[int, User]:
+        result = await self._db.execute(select(User).where(User.id.in_(user_ids)))
+        return {user.id: user for user in result.scalars().all()}
+
+    async def _load_guild_members(
+        self,
+        keys: List[Tuple[int, int]]
+    ) -> Dict[Tuple[int, int], GuildMember]:
+        """键为 (guild_id, user_id)，只返回活跃成员"""
+        result = await self._db.execute(
+            select(GuildMember).where(
+                tuple_(GuildMember.guild_id, GuildMember.user_id).in_(keys),
+                GuildMember.left_at.is_(None)
+            )
+        )
+        return {(gm.guild_id, gm.user_id): gm for gm in result.scalars().all()}
+
+    async def _load_characters(self, character_ids: List[int]) -> Dict[int, Character]:
+        result = await self._db.execute(
+            select(Character).where(Character.id.in_(character_ids))
+        )
+        return {character.id: character for character in result.scalars().all()}
+
+    async def display_names(
+        self,
+        guild_id: int,
+        user_ids: Iterable[int]
+    ) -> Dict[int, str]:
+        """
+        批量获取用户在群组中的显示名称
+
+        Returns:
+            {user_id: 昵称}，用户不存在或已注销时不包含该键
+        """
+        user_ids = list(dict.fromkeys(uid for uid in user_ids if uid))
+        users, members = await asyncio.gather(
+            self.users.load_many(user_ids),
+            self.guild_members.load_many([(guild_id, uid) for uid in user_ids])
+        )
+        return {
+            user.id: pick_nickname(member, user)
+            for user, member in zip(users, members)
+            if user is not None and user.deleted_at is None
+        }
+
+
+def get_loaders(db: AsyncSession) -> RequestLoaders:
+    """获取当前请求（会话）的加载器，不存在则创建"""
+    loaders = db.info.get(_LOADERS_KEY)
+    if loaders is None:
+        loaders = RequestLoaders(db)
+        db.info[_LOADERS_KEY] = loaders
+    return loaders
+
+
+def pick_nickname(member: Optional[GuildMember], user: Optional[User]) -> str:
+    """
+    选择用户昵称，优先级：群昵称 > 用户主昵称 > 用户其他昵称
+    """
+    if member and member.group_nickname:
+        return member.group_nickname
+
+    if not user:
+        return "未知用户"
+
+    # 优先返回主昵称
+    if user.nickname:
+        return user.nickname
+
+    # 最后尝试其他昵称
+    if user.other_nicknames and len(user.other_nicknames) > 0:
+        return user.other_nicknames[0]
+
+    return "未知用户"
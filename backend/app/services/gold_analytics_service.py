@@ -0,0 +1,349 @@
+"""
+金团统计汇总服务
+
+维护按周、按月的金团汇总表：
+1. 金团记录写入后，只重算受影响的周期（后台任务执行）
+2. 支持整体重建（scripts/rebuild_gold_analytics.py）
+3. 统计接口直接读取汇总行，不再扫描全部金团记录
+"""
+import calendar
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import Date, cast, delete, func, literal, literal_column, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.logging import get_logger
+from app.models.gold_record import GoldRecord
+from app.models.gold_rollup import GoldRollup, GoldUserRollup
+from app.models.signup import Signup
+from app.models.archive import SignupArchive
+from app.services.archive_service import ArchiveService
+
+logger = get_logger(__name__)
+
+# 支持的周期类型
+PERIOD_TYPES = ("week", "month")
+
+# 汇总重算的 advisory lock 命名空间（与群组ID组合）
+_ROLLUP_LOCK_NAMESPACE = 834001
+
+
+class GoldAnalyticsService:
+    """
+    金团统计汇总服务
+
+    负责：
+    1. 增量刷新受影响周期的汇总
+    2. 整体重建
+    3. 读取汇总并计算平均值、比率
+    """
+
+    @staticmethod
+    def period_start(period_type: str, day: date) -> date:
+        """获取日期所在周期的起始日期（周一 / 每月1日）"""
+        if period_type == "week":
+            return day - timedelta(days=day.weekday())
+        return day.replace(day=1)
+
+    @staticmethod
+    def period_end(period_type: str, start: date) -> date:
+        """获取周期的结束日期（不含）"""
+        if period_type == "week":
+            return start + timedelta(days=7)
+        days = calendar.monthrange(start.year, start.month)[1]
+        return start + timedelta(days=days)
+
+    @classmethod
+    async def refresh(
+        cls,
+        db: AsyncSession,
+        guild_id: int,
+        run_dates: Iterable[date]
+    ) -> None:
+        """
+        重算指定日期所在周期的汇总（金团记录新增、修改、删除后调用）
+
+        修改运行日期时应同时传入旧日期和新日期
+        """
+        run_dates = {d for d in run_dates if d}
+        if not run_dates:
+            return
+
+        await cls._lock_guild(db, guild_id)
+        for period_type in PERIOD_TYPES:
+            for start in sorted({cls.period_start(period_type, d) for d in run_dates}):
+                await cls._rebuild_range(
+                    db, guild_id, period_type,
+                    start, cls.period_end(period_type, start)
+                )
+        await db.commit()
+
+    @classmethod
+    async def rebuild(cls, db: AsyncSession, guild_id: Optional[int] = None) -> List[int]:
+        """
+        整体重建汇总
+
+        Args:
+            guild_id: 指定群组，为空时重建所有有金团记录或汇总的群组
+
+        Returns:
+            重建的群组ID列表
+        """
+        if guild_id is not None:
+            guild_ids = [guild_id]
+        else:
+            result = await db.execute(
+                select(GoldRecord.guild_id).distinct()
+                .union(select(GoldRollup.guild_id).distinct())
+            )
+            guild_ids = sorted(row[0] for row in result.all())
+
+        for gid in guild_ids:
+            await cls._lock_guild(db, gid)
+            for period_type in PERIOD_TYPES:
+                await cls._rebuild_range(db, gid, period_type)
+            await db.commit()
+            logger.info(f"[金团统计] 汇总重建完成: guild_id={gid}")
+
+        return guild_ids
+
+    @classmethod
+    async def get_analytics(
+        cls,
+        db: AsyncSession,
+        guild_id: int,
+        period_type: str,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        dungeon: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        读取汇总统计
+
+        Returns:
+            {"periods": [...], "dungeons": [...], "users": [...]}
+            periods 按周期倒序，dungeons 按总金团倒序，users 按打工收入倒序
+        """
+        conditions = [GoldRollup.guild_id == guild_id, GoldRollup.period_type == period_type]
+        user_conditions = [GoldUserRollup.guild_id == guild_id, GoldUserRollup.period_type == period_type]
+        if start_date:
+            conditions.append(GoldRollup.period_start >= cls.period_start(period_type, start_date))
+            user_conditions.append(GoldUserRollup.period_start >= cls.period_start(period_type, start_date))
+        if end_date:
+            conditions.append(GoldRollup.period_start <= end_date)
+            user_conditions.append(GoldUserRollup.period_start <= end_date)
+        if dungeon:
+            conditions.append(GoldRollup.dungeon == dungeon)
+
+        rollups = (await db.execute(
+            select(GoldRollup).where(*conditions).order_by(GoldRollup.period_start.desc())
+        )).scalars().all()
+
+        periods: Dict[date, Dict[str, int]] = {}
+        dungeons: Dict[str, Dict[str, int]] = {}
+        for row in rollups:
+            cls._accumulate(periods.setdefault(row.period_start, {}), row)
+            cls._accumulate(dungeons.setdefault(row.dungeon, {}), row)
+
+        # 成员汇总不区分副本，指定副本时不返回
+        users: List[Dict[str, Any]] = []
+        if not dungeon:
+            user_rows = (await db.execute(
+                select(
+                    GoldUserRollup.user_id,
+                    func.sum(GoldUserRollup.run_count),
+                    func.sum(GoldUserRollup.earned_gold),
+                    func.sum(GoldUserRollup.heibenren_count),
+                    func.sum(GoldUserRollup.heibenren_gold)
+                )
+                .where(*user_conditions)
+                .group_by(GoldUserRollup.user_id)
+            )).all()
+            users = [
+                {
+                    "user_id": user_id,
+                    "run_count": int(run_count or 0),
+                    "earned_gold": int(earned_gold or 0),
+                    "heibenren_count": int(heibenren_count or 0),
+                    "heibenren_gold": int(heibenren_gold or 0)
+                }
+                for user_id, run_count, earned_gold, heibenren_count, heibenren_gold in user_rows
+            ]
+            users.sort(key=lambda u: u["earned_gold"], reverse=True)
+
+        return {
+            "periods": [
+                {"period_start": start, **cls.build_stat(totals)}
+                for start, totals in periods.items()
+            ],
+            "dungeons": sorted(
+                ({"dungeon": name, **cls.build_stat(totals)} for name, totals in dungeons.items()),
+                key=lambda d: d["total_gold"],
+                reverse=True
+            ),
+            "users": users
+        }
+
+    @staticmethod
+    def build_stat(totals: Dict[str, int]) -> Dict[str, Any]:
+        """根据累计值计算平均金团、补贴比例、出玄晶率"""
+        record_count = totals.get("record_count", 0)
+        total_gold = totals.get("total_gold", 0)
+        return {
+            "record_count": record_count,
+            "total_gold": total_gold,
+            "average_gold": round(total_gold / record_count, 2) if record_count else 0,
+            "subsidy_gold": totals.get("subsidy_gold", 0),
+            "subsidy_ratio": round(totals.get("subsidy_gold", 0) / total_gold, 4) if total_gold else 0,
+            "worker_count": totals.get("worker_count", 0),
+            "xuanjing_count": totals.get("xuanjing_count", 0),
+            "xuanjing_rate": round(totals.get("xuanjing_count", 0) / record_count, 4) if record_count else 0,
+            "heibenren_count": totals.get("heibenren_count", 0)
+        }
+
+    @staticmethod
+    def _accumulate(totals: Dict[str, int], row: GoldRollup) -> None:
+        """累加汇总行"""
+        for field in ("record_count", "total_gold", "subsidy_gold", "worker_count", "xuanjing_count", "heibenren_count"):
+            totals[field] = totals.get(field, 0) + (getattr(row, field) or 0)
+
+    @staticmethod
+    async def _lock_guild(db: AsyncSession, guild_id: int) -> None:
+        """事务级 advisory lock，避免同一群组并发重算产生重复行"""
+        await db.execute(select(func.pg_advisory_xact_lock(_ROLLUP_LOCK_NAMESPACE, guild_id)))
+
+    @classmethod
+    async def _rebuild_range(
+        cls,
+        db: AsyncSession,
+        guild_id: int,
+        period_type: str,
+        start: Optional[date] = None,
+        end: Optional[date] = None
+    ) -> None:
+        """
+        重算 [start, end) 范围内（为空表示全部历史）的汇总
+
+        范围必须与周期对齐，先删除旧汇总再由金团记录聚合写入
+        """
+        if period_type not in PERIOD_TYPES:
+            raise ValueError(f"不支持的周期类型: {period_type}")
+
+        now = datetime.utcnow()
+        # date_trunc 的字段参数需内联，否则 SELECT 与 GROUP BY 中的参数占位符不同会导致分组报错
+        bucket = cast(func.date_trunc(literal_column(f"'{period_type}'"), GoldRecord.run_date), Date)
+
+        record_conditions = [GoldRecord.guild_id == guild_id, GoldRecord.deleted_at.is_(None)]
+        rollup_conditions = [GoldRollup.guild_id == guild_id, GoldRollup.period_type == period_type]
+        user_conditions = [GoldUserRollup.guild_id == guild_id, GoldUserRollup.period_type == period_type]
+        if start is not None:
+            record_conditions.append(GoldRecord.run_date >= start)
+            rollup_conditions.append(GoldRollup.period_start >= start)
+            user_conditions.append(GoldUserRollup.period_start >= start)
+        if end is not None:
+            record_conditions.append(GoldRecord.run_date < end)
+            rollup_conditions.append(GoldRollup.period_start < end)
+            user_conditions.append(GoldUserRollup.period_start < end)
+
+        await db.execute(delete(GoldRollup).where(*rollup_conditions))
+        await db.execute(delete(GoldUserRollup).where(*user_conditions))
+
+        # 1. 群组 × 周期 × 副本
+        await db.execute(
+            pg_insert(GoldRollup).from_select(
+                ["guild_id", "period_type", "period_start", "dungeon", "record_count", "total_gold",
+                 "subsidy_gold", "worker_count", "xuanjing_count", "heibenren_count", "updated_at"],
+                select(
+                    GoldRecord.guild_id,
+                    literal(period_type),
+                    bucket,
+                    GoldRecord.dungeon,
+                    func.count(GoldRecord.id),
+                    func.coalesce(func.sum(GoldRecord.total_gold), 0),
+                    func.coalesce(func.sum(GoldRecord.subsidy_gold), 0),
+                    func.coalesce(func.sum(GoldRecord.worker_count), 0),
+                    func.count(GoldRecord.id).filter(GoldRecord.has_xuanjing.is_(True)),
+                    func.count(GoldRecord.heibenren_user_id),
+                    literal(now)
+                )
+                .where(*record_conditions)
+                .group_by(GoldRecord.guild_id, bucket, GoldRecord.dungeon)
+            )
+        )
+
+        # 2. 成员打工收入（同一用户在同一金团只计一次，人均工资 = (总金团 - 补贴) / 打工人数）
+        #    按金团记录主键分组，周期与人均工资函数依赖于主键
+        #    报名包含已归档团队的报名
+        per_person_gold = (GoldRecord.total_gold - func.coalesce(GoldRecord.subsidy_gold, 0)) // GoldRecord.worker_count
+        signups = ArchiveService.with_archive(Signup, SignupArchive, "team_id", "signup_user_id", "cancelled_at", "is_rich")
+        workers = (
+            select(
+                GoldRecord.id.label("gold_record_id"),
+                signups.c.signup_user_id.label("user_id"),
+                bucket.label("period_start"),
+                per_person_gold.label("earned_gold")
+            )
+            .join(signups, signups.c.team_id == GoldRecord.team_id)
+            .where(
+                *record_conditions,
+                GoldRecord.worker_count > 0,
+                signups.c.cancelled_at.is_(None),
+                signups.c.is_rich.is_(False),
+                signups.c.signup_user_id.isnot(None)
+            )
+            .group_by(GoldRecord.id, signups.c.signup_user_id)
+            .subquery()
+        )
+        await db.execute(
+            pg_insert(GoldUserRollup).from_select(
+                ["guild_id", "user_id", "period_type", "period_start", "run_count", "earned_gold",
+                 "heibenren_count", "heibenren_gold", "updated_at"],
+                select(
+                    literal(guild_id),
+                    workers.c.user_id,
+                    literal(period_type),
+                    workers.c.period_start,
+                    func.count(),
+                    func.sum(workers.c.earned_gold),
+                    literal(0),
+                    literal(0),
+                    literal(now)
+                )
+                .group_by(workers.c.user_id, workers.c.period_start)
+            )
+        )
+
+        # 3. 成员黑本统计（与打工收入合并到同一行）
+        heibenren_stmt = pg_insert(GoldUserRollup).from_select(
+            ["guild_id", "user_id", "period_type", "period_start", "run_count", "earned_gold",
+             "heibenren_count", "heibenren_gold", "updated_at"],
+            select(
+                GoldRecord.guild_id,
+                GoldRecord.heibenren_user_id,
+                literal(period_type),
+                bucket,
+                literal(0),
+                literal(0),
+                func.count(GoldRecord.id),
+                func.coalesce(func.sum(GoldRecord.total_gold), 0),
+                literal(now)
+            )
+            .where(*record_conditions, GoldRecord.heibenren_user_id.isnot(None))
+            .group_by(GoldRecord.guild_id, GoldRecord.heibenren_user_id, bucket)
+        )
+        heibenren_stmt = heibenren_stmt.on_conflict_do_update(
+            index_elements=[
+                GoldUserRollup.guild_id,
+                GoldUserRollup.user_id,
+                GoldUserRollup.period_type,
+                GoldUserRollup.period_start
+            ],
+            set_={
+                "heibenren_count": heibenren_stmt.excluded.heibenren_count,
+                "heibenren_gold": heibenren_stmt.excluded.heibenren_gold,
+                "updated_at": heibenren_stmt.excluded.updated_at
+            }
+        )
+        await db.execute(heibenren_stmt)
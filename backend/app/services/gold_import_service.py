@@ -0,0 +1,306 @@
+"""
+金团记录批量导入服务
+
+用于从表格迁移历史金团记录：
+1. 单次流式遍历 CSV，逐行校验后直接通过 COPY 写入临时暂存表（内存占用与行数无关）
+2. 一条 INSERT ... SELECT 合并到 gold_records，文件内重复的行只保留第一行，已存在的相同记录跳过（重复导入幂等）
+3. 不触发逐条的每周记录联动；排名（含车次）与统计汇总在导入结束后各重建一次
+"""
+import csv
+import json
+import re
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import JSON, and_, cast, column, exists, func, literal, select, table, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.logging import get_logger
+from app.models.gold_record import GoldRecord
+from app.models.user import User
+from app.services.job_queue import JobQueue
+
+logger = get_logger(__name__)
+
+# 暂存表（事务结束后自动删除）
+_STAGING_TABLE = "gold_records_import"
+
+# 暂存表列（与 COPY 写入的元组顺序一致）
+_STAGING_COLUMNS = (
+    "line_no", "run_date", "dungeon", "total_gold", "subsidy_gold", "worker_count",
+    "has_xuanjing", "heibenren_user_id", "heibenren_info", "special_drops", "notes"
+)
+
+_staging = table(_STAGING_TABLE, *(column(name) for name in _STAGING_COLUMNS))
+
+# 判断是否为同一条记录的列（文件内去重与跳过已存在记录都按此判断）
+_NATURAL_KEY = ("run_date", "dungeon", "total_gold", "worker_count", "heibenren_user_id")
+
+# 表头别名 {字段: (可接受的表头...)}，兼容导出文件的中文表头
+_HEADER_ALIASES = {
+    "run_date": ("run_date", "日期"),
+    "dungeon": ("dungeon", "副本"),
+    "total_gold": ("total_gold", "总金团"),
+    "subsidy_gold": ("subsidy_gold", "补贴"),
+    "worker_count": ("worker_count", "打工人数"),
+    "has_xuanjing": ("has_xuanjing", "出玄晶"),
+    "heibenren_user_id": ("heibenren_user_id", "黑本人ID"),
+    "heibenren_character_name": ("heibenren_character_name", "黑本角色"),
+    "special_drops": ("special_drops", "特殊掉落"),
+    "notes": ("notes", "备注"),
+}
+
+_REQUIRED_FIELDS = ("run_date", "dungeon", "total_gold", "worker_count")
+
+_TRUE_VALUES = {"是", "true", "1", "y", "yes"}
+_FALSE_VALUES = {"", "否", "false", "0", "n", "no"}
+
+# 特殊掉落分隔符
+_DROPS_SEPARATOR = re.compile(r"[、,，|;；]")
+
+
+class GoldImportService:
+    """
+    金团记录批量导入服务
+
+    负责：
+    1. 表头解析与逐行校验
+    2. COPY 写入暂存表并合并
+    3. 导入后加入排名、统计汇总重建任务
+    """
+
+    # 报告中最多保留的错误数
+    MAX_ERRORS = 50
+
+    @staticmethod
+    def resolve_columns(header: List[str]) -> Dict[str, int]:
+        """
+        解析表头，返回 {字段: 列序号}
+
+        Raises:
+            ValueError: 缺少必填列
+        """
+        normalized = [name.strip().lstrip("﻿") for name in header]
+        columns: Dict[str, int] = {}
+        for field, aliases in _HEADER_ALIASES.items():
+            for index, name in enumerate(normalized):
+                if name in aliases:
+                    columns[field] = index
+                    break
+
+        missing = [field for field in _REQUIRED_FIELDS if field not in columns]
+        if missing:
+            names = "、".join(_HEADER_ALIASES[field][1] for field in missing)
+            raise ValueError(f"缺少必填列: {names}")
+        return columns
+
+    @staticmethod
+    def parse_row(row: List[str], columns: Dict[str, int]) -> Tuple[Any, ...]:
+        """
+        校验并转换一行数据（顺序同暂存表，不含行号）
+
+        Raises:
+            ValueError: 数据不合法（消息用于错误报告）
+        """
+        def cell(field: str) -> str:
+            index = columns.get(field)
+            if index is None or index >= len(row):
+                return ""
+            return row[index].strip()
+
+        def non_negative_int(field: str, label: str, default: Optional[int] = None) -> Optional[int]:
+            value = cell(field)
+            if not value:
+                if default is None:
+                    raise ValueError(f"{label}不能为空")
+                return default
+            try:
+                number = int(value)
+            except ValueError:
+                raise ValueError(f"{label}必须是整数: {value}")
+            if number < 0:
+                raise ValueError(f"{label}不能为负数: {value}")
+            return number
+
+        raw_date = cell("run_date")
+        try:
+            run_date = date.fromisoformat(raw_date.replace("/", "-"))
+        except ValueError:
+            raise ValueError(f"日期格式错误（应为 YYYY-MM-DD）: {raw_date}")
+
+        dungeon = cell("dungeon")
+        if not dungeon or len(dungeon) > 50:
+            raise ValueError("副本名称不能为空且不能超过50个字符")
+
+        total_gold = non_negative_int("total_gold", "总金团")
+        subsidy_gold = non_negative_int("subsidy_gold", "补贴", default=0)
+        worker_count = non_negative_int("worker_count", "打工人数")
+
+        raw_xuanjing = cell("has_xuanjing").lower()
+        if raw_xuanjing in _TRUE_VALUES:
+            has_xuanjing = True
+        elif raw_xuanjing in _FALSE_VALUES:
+            has_xuanjing = False
+        else:
+            raise ValueError(f"出玄晶只能填写 是/否: {raw_xuanjing}")
+
+        raw_user_id = cell("heibenren_user_id")
+        heibenren_user_id = None
+        if raw_user_id:
+            try:
+                heibenren_user_id = int(raw_user_id)
+            except ValueError:
+                raise ValueError(f"黑本人ID必须是整数: {raw_user_id}")
+
+        character_name = cell("heibenren_character_name")
+        heibenren_info = (json.dumps({"character_name": character_name}, ensure_ascii=False)
+                          if character_name else None)
+
+        drops = [d.strip() for d in _DROPS_SEPARATOR.split(cell("special_drops")) if d.strip()]
+        special_drops = json.dumps(drops, ensure_ascii=False) if drops else None
+
+        return (
+            run_date, dungeon, total_gold, subsidy_gold, worker_count,
+            has_xuanjing, heibenren_user_id, heibenren_info, special_drops,
+            cell("notes") or None
+        )
+
+    @classmethod
+    async def import_csv(
+        cls,
+        db: AsyncSession,
+        guild_id: int,
+        creator_id: int,
+        lines: Iterable[str]
+    ) -> Dict[str, Any]:
+        """
+        导入 CSV（全部成功才提交，存在任何错误则整体回滚）
+
+        Args:
+            lines: CSV 文本行（文件对象即可，逐行读取）
+
+        Returns:
+            {"total_rows": 数据行数, "imported": 新增数, "skipped": 已存在或文件内重复而跳过的数,
+             "duplicates": 文件内重复而跳过的数,
+             "error_count": 错误总数, "errors": [{"line": 行号, "message": 错误信息}]（最多 MAX_ERRORS 条）}
+
+        Raises:
+            ValueError: 文件为空或表头不合法
+        """
+        report: Dict[str, Any] = {
+            "total_rows": 0, "imported": 0, "skipped": 0, "duplicates": 0, "error_count": 0, "errors": []
+        }
+
+        reader = csv.reader(lines)
+        header = next(reader, None)
+        if not header:
+            raise ValueError("文件为空")
+        columns = cls.resolve_columns(header)
+
+        async def records():
+            """逐行校验，合法行直接交给 COPY"""
+            for line_no, row in enumerate(reader, start=2):
+                if not any(value.strip() for value in row):
+                    continue
+                report["total_rows"] += 1
+                try:
+                    yield (line_no, *cls.parse_row(row, columns))
+                except ValueError as e:
+                    cls._add_error(report, line_no, str(e))
+
+        await db.execute(text(
+            f"CREATE TEMP TABLE {_STAGING_TABLE} ("
+            "line_no integer, run_date date, dungeon varchar(50), total_gold integer, "
+            "subsidy_gold integer, worker_count integer, has_xuanjing boolean, "
+            "heibenren_user_id integer, heibenren_info text, special_drops text, notes text"
+            ") ON COMMIT DROP"
+        ))
+        connection = await db.connection()
+        raw_connection = await connection.get_raw_connection()
+        await raw_connection.driver_connection.copy_records_to_table(
+            _STAGING_TABLE, records=records(), columns=list(_STAGING_COLUMNS)
+        )
+
+        # 黑本人必须是已存在的用户（一次查询校验全部行）
+        missing_users = await db.execute(
+            select(_staging.c.line_no, _staging.c.heibenren_user_id)
+            .where(
+                _staging.c.heibenren_user_id.isnot(None),
+                ~exists().where(User.id == _staging.c.heibenren_user_id)
+            )
+            .order_by(_staging.c.line_no)
+            .limit(cls.MAX_ERRORS)
+        )
+        for line_no, user_id in missing_users.all():
+            cls._add_error(report, line_no, f"黑本人用户不存在: {user_id}")
+
+        if report["errors"]:
+            await db.rollback()
+            report["errors"].sort(key=lambda e: e["line"])
+            return report
+
+        # 文件内重复的行（同一自然键）只保留行号最小的一行
+        natural_key = [_staging.c[name] for name in _NATURAL_KEY]
+        rows = (
+            select(_staging)
+            .distinct(*natural_key)
+            .order_by(*natural_key, _staging.c.line_no)
+            .subquery()
+        )
+        unique_rows = (await db.execute(select(func.count()).select_from(rows))).scalar()
+        report["duplicates"] = report["total_rows"] - unique_rows
+
+        now = datetime.utcnow()
+        result = await db.execute(
+            GoldRecord.__table__.insert().from_select(
+                [
+                    "guild_id", "creator_id", "dungeon", "run_date", "total_gold", "subsidy_gold",
+                    "worker_count", "has_xuanjing", "heibenren_user_id", "heibenren_info",
+                    "special_drops", "notes", "created_at", "updated_at"
+                ],
+                select(
+                    literal(guild_id), literal(creator_id),
+                    rows.c.dungeon, rows.c.run_date, rows.c.total_gold,
+                    rows.c.subsidy_gold, rows.c.worker_count, rows.c.has_xuanjing,
+                    rows.c.heibenren_user_id,
+                    cast(rows.c.heibenren_info, JSON),
+                    cast(rows.c.special_drops, JSON),
+                    rows.c.notes, literal(now), literal(now)
+                )
+                .where(~exists().where(and_(
+                    GoldRecord.guild_id == guild_id,
+                    GoldRecord.deleted_at.is_(None),
+                    GoldRecord.run_date == rows.c.run_date,
+                    GoldRecord.dungeon == rows.c.dungeon,
+                    GoldRecord.total_gold == rows.c.total_gold,
+                    GoldRecord.worker_count == rows.c.worker_count,
+                    GoldRecord.heibenren_user_id.is_not_distinct_from(rows.c.heibenren_user_id)
+                )))
+                .order_by(rows.c.line_no)
+            )
+        )
+        report["imported"] = result.rowcount
+        report["skipped"] = report["total_rows"] - report["imported"]
+
+        if report["imported"]:
+            # 排名（车次随之重算）与统计汇总整体重建一次
+            await JobQueue.enqueue(
+                db, "ranking.recompute", {"guild_id": guild_id},
+                dedupe_key=f"ranking.recompute:{guild_id}"
+            )
+            await JobQueue.enqueue(
+                db, "gold_analytics.rebuild", {"guild_id": guild_id},
+                dedupe_key=f"gold_analytics.rebuild:{guild_id}"
+            )
+        await db.commit()
+
+        logger.info(f"[金团导入] 导入完成: guild_id={guild_id}, 数据行={report['total_rows']}, "
+                    f"新增={report['imported']}, 跳过={report['skipped']}, 文件内重复={report['duplicates']}")
+        return report
+
+    @classmethod
+    def _add_error(cls, report: Dict[str, Any], line_no: int, message: str) -> None:
+        """记录错误（超过上限只计数不保存明细）"""
+        report["error_count"] += 1
+        if len(report["errors"]) < cls.MAX_ERRORS:
+            report["errors"].append({"line": line_no, "message": message})
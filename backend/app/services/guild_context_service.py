@@ -0,0 +1,197 @@
+"""
+群组上下文服务
+
+统一解析「群组 + 当前用户成员关系 + 角色」：
+1. 单次查询同时加载群组和成员关系（LEFT JOIN）
+2. 同一请求内通过会话的 info 字典记忆结果，依赖链重复调用不再查库
+3. 跨请求使用带 TTL 的进程内缓存，角色/群昵称变更、进退群、群组删除时主动失效；
+   副本会话读到的结果只做请求级记忆，不写入跨请求缓存
+"""
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import select, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import metrics
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.database import is_replica_session
+from app.models.guild import Guild
+from app.models.guild_member import GuildMember
+
+logger = get_logger(__name__)
+
+# 请求级记忆在 session.info 中使用的键
+_REQUEST_MEMO_KEY = "guild_context_memo"
+
+
+@dataclass(frozen=True)
+class GuildContext:
+    """群组上下文快照（与会话无关，可跨请求缓存）"""
+    guild_id: int
+    guild_name: str
+    guild_qq_number: str
+    user_id: int
+    member_id: Optional[int] = None
+    role: Optional[str] = None
+    group_nickname: Optional[str] = None
+
+    @property
+    def is_member(self) -> bool:
+        """是否为该群组的活跃成员"""
+        return self.member_id is not None
+
+    @property
+    def is_admin(self) -> bool:
+        """是否为群主或管理员"""
+        return self.role in ("owner", "helper")
+
+
+class GuildContextService:
+    """
+    群组上下文服务
+
+    负责：
+    1. 加载群组与成员关系（请求内记忆 + 跨请求 TTL 缓存）
+    2. 统一的成员/角色校验
+    3. 缓存失效
+    """
+
+    # 跨请求缓存 {(guild_id, user_id): (过期时间, GuildContext)}
+    _cache: Dict[Tuple[int, int], Tuple[float, GuildContext]] = {}
+    _max_entries = 10000
+
+    @classmethod
+    async def resolve(
+        cls,
+        db: AsyncSession,
+        guild_id: int,
+        user_id: int
+    ) -> Optional[GuildContext]:
+        """
+        获取群组上下文
+
+        Returns:
+            GuildContext: 群组存在时返回（非成员时 member_id 为 None）
+            None: 群组不存在或已删除
+        """
+        key = (guild_id, user_id)
+        memo = db.info.setdefault(_REQUEST_MEMO_KEY, {})
+        if key in memo:
+            return memo[key]
+
+        context = cls._get_cached(key)
+        if context is None:
+            context = await cls._load(db, guild_id, user_id)
+            if context is not None and not is_replica_session(db):
+                cls._set_cached(key, context)
+
+        memo[key] = context
+        return context
+
+    @classmethod
+    async def require_member(
+        cls,
+        db: AsyncSession,
+        guild_id: int,
+        user_id: int,
+        roles: Optional[list[str]] = None
+    ) -> GuildContext:
+        """
+        要求当前用户是群组成员（可选：具备指定角色）
+
+        Raises:
+            HTTPException: 群组不存在、非成员或权限不足
+        """
+        context = await cls.resolve(db, guild_id, user_id)
+        if context is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="群组不存在")
+        if not context.is_member:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="非该群组成员")
+        if roles is not None and context.role not in roles:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="权限不足")
+        return context
+
+    @classmethod
+    def invalidate_member(cls, guild_id: int, user_id: int) -> None:
+        """成员关系变更（角色、群昵称、进退群）后失效缓存"""
+        cls._cache.pop((guild_id, user_id), None)
+
+    @classmethod
+    def invalidate_guild(cls, guild_id: int) -> None:
+        """群组信息变更、删除或批量成员变更后失效该群组的全部缓存"""
+        for key in [k for k in cls._cache if k[0] == guild_id]:
+            cls._cache.pop(key, None)
+
+    @classmethod
+    def clear(cls) -> None:
+        """清空全部缓存"""
+        cls._cache.clear()
+
+    @classmethod
+    async def _load(
+        cls,
+        db: AsyncSession,
+        guild_id: int,
+        user_id: int
+    ) -> Optional[GuildContext]:
+        """单次查询加载群组及成员关系"""
+        result = await db.execute(
+            select(Guild, GuildMember)
+            .outerjoin(
+                GuildMember,
+                and_(
+                    GuildMember.guild_id == Guild.id,
+                    GuildMember.user_id == user_id,
+                    GuildMember.left_at.is_(None)
+                )
+            )
+            .where(Guild.id == guild_id, Guild.deleted_at.is_(None))
+        )
+        row = result.first()
+        if row is None:
+            return None
+
+        guild, member = row
+        return GuildContext(
+            guild_id=guild.id,
+            guild_name=guild.name,
+            guild_qq_number=guild.guild_qq_number,
+            user_id=user_id,
+            member_id=member.id if member else None,
+            role=member.role if member else None,
+            group_nickname=member.group_nickname if member else None
+        )
+
+    @classmethod
+    def _get_cached(cls, key: Tuple[int, int]) -> Optional[GuildContext]:
+        """读取未过期的缓存"""
+        entry = cls._cache.get(key)
+        if entry is None:
+            metrics.record_cache("guild_context", hit=False)
+            return None
+        expires_at, context = entry
+        if expires_at < time.monotonic():
+            cls._cache.pop(key, None)
+            metrics.record_cache("guild_context", hit=False)
+            return None
+        metrics.record_cache("guild_context", hit=True)
+        return context
+
+    @classmethod
+    def _set_cached(cls, key: Tuple[int, int], context: GuildContext) -> None:
+        """写入缓存（TTL 为 0 时不缓存）"""
+        ttl = settings.GUILD_CONTEXT_CACHE_TTL
+        if ttl <= 0:
+            return
+        if len(cls._cache) >= cls._max_entries:
+            now = time.monotonic()
+            for stale_key in [k for k, (exp, _) in cls._cache.items() if exp < now]:
+                cls._cache.pop(stale_key, None)
+            if len(cls._cache) >= cls._max_entries:
+                logger.debug("群组上下文缓存已满，清空后重建")
+                cls._cache.clear()
+        cls._cache[key] = (time.monotonic() + ttl, context)
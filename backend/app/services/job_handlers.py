@@ -0,0 +1,124 @@
+"""
+后台任务处理器
+
+每个处理器接收独立的数据库会话和任务参数，自行负责提交；
+抛出异常即视为失败，由任务队列按退避策略重试；重试可能重复产生副作用时抛出 PermanentJobError
+"""
+from datetime import date
+from typing import Any, Dict
+
+import httpx
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.logging import get_logger
+from app.models.gold_record import GoldRecord
+from app.services.job_queue import JobQueue, PermanentJobError
+
+logger = get_logger(__name__)
+
+# Bot 服务地址（Docker 网络中 Bot 容器名为 "bot"，端口为 8080）
+BOT_CALL_MEMBERS_URL = "http://bot:8080/api/call-members"
+BOT_SEND_CARD_URL = "http://bot:8080/api/send-card"
+
+# 请求尚未发出的错误（连接失败、连接池等待超时），重试不会重复发送
+_NOT_SENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+@JobQueue.handler("ranking.recompute")
+async def recompute_ranking(db: AsyncSession, payload: Dict[str, Any]) -> None:
+    """重新计算群组红黑榜并保存快照"""
+    from app.services.ranking_service import RankingService
+
+    guild_id = payload["guild_id"]
+    ranking_service = RankingService(db)
+    rankings = await ranking_service.calculate_guild_rankings(guild_id)
+    logger.info(f"[排名任务] 排名计算完成: guild_id={guild_id}, 排名数量={len(rankings) if rankings else 0}")
+    await ranking_service.save_ranking_snapshot(guild_id, rankings)
+    logger.info(f"[排名任务] 排名快照保存成功: guild_id={guild_id}")
+
+
+@JobQueue.handler("weekly_records.propagate")
+async def propagate_weekly_records(db: AsyncSession, payload: Dict[str, Any]) -> None:
+    """金团记录联动：更新打工人的每周记录"""
+    from app.api.v2.endpoints.gold_records import _auto_update_weekly_records
+
+    result = await db.execute(
+        select(GoldRecord).where(
+            GoldRecord.id == payload["gold_record_id"],
+            GoldRecord.deleted_at.is_(None)
+        )
+    )
+    gold_record = result.scalar_one_or_none()
+    if gold_record is None:
+        logger.info(f"[每周记录任务] 金团记录不存在或已删除，跳过: gold_record_id={payload['gold_record_id']}")
+        return
+    if not gold_record.team_id or gold_record.worker_count <= 0:
+        return
+
+    # 兼容升级前入队、不带所属周的任务（按执行时的当前周）
+    week_start = payload.get("week_start")
+    await _auto_update_weekly_records(
+        db, gold_record, date.fromisoformat(week_start) if week_start else None
+    )
+
+
+@JobQueue.handler("gold_analytics.refresh")
+async def refresh_gold_analytics(db: AsyncSession, payload: Dict[str, Any]) -> None:
+    """重算受影响周期的金团统计汇总"""
+    from app.services.gold_analytics_service import GoldAnalyticsService
+
+    await GoldAnalyticsService.refresh(
+        db,
+        payload["guild_id"],
+        [date.fromisoformat(d) for d in payload["run_dates"]]
+    )
+
+
+@JobQueue.handler("gold_analytics.rebuild")
+async def rebuild_gold_analytics(db: AsyncSession, payload: Dict[str, Any]) -> None:
+    """整体重建群组的金团统计汇总（批量导入后执行）"""
+    from app.services.gold_analytics_service import GoldAnalyticsService
+
+    await GoldAnalyticsService.rebuild(db, payload["guild_id"])
+
+
+@JobQueue.handler("teams.archive")
+async def archive_teams(db: AsyncSession, payload: Dict[str, Any]) -> None:
+    """归档过期的已完成/已取消团队（连同报名、日志）"""
+    from app.services.archive_service import ArchiveService
+
+    await ArchiveService.archive(
+        db,
+        older_than_days=payload.get("older_than_days"),
+        max_batches=payload.get("max_batches")
+    )
+
+
+async def _post_to_bot(url: str, payload: Dict[str, Any], timeout: float) -> None:
+    """
+    调用 Bot 接口（非幂等，消息可能已发到群里）
+
+    只有请求未发出时才抛出可重试的异常；请求发出后的超时、断开或错误响应不再重试，
+    避免群里出现重复的 @ 或卡牌
+    """
+    try:
+        async with httpx.AsyncClient(timeout=timeout) as client:
+            response = await client.post(url, json=payload)
+            response.raise_for_status()
+    except _NOT_SENT_ERRORS:
+        raise
+    except httpx.HTTPError as e:
+        raise PermanentJobError(f"Bot 请求已发出，结果未知或失败，不再重试: {type(e).__name__}: {e}") from e
+
+
+@JobQueue.handler("bot.call_members")
+async def call_members(db: AsyncSession, payload: Dict[str, Any]) -> None:
+    """调用 Bot 召唤成员"""
+    await _post_to_bot(BOT_CALL_MEMBERS_URL, payload, timeout=10.0)
+
+
+@JobQueue.handler("bot.publish_card")
+async def publish_card(db: AsyncSession, payload: Dict[str, Any]) -> None:
+    """调用 Bot 发布卡牌"""
+    await _post_to_bot(BOT_SEND_CARD_URL, payload, timeout=15.0)
@@ -0,0 +1,413 @@
+"""
+后台任务队列服务
+
+进程内任务队列 + PostgreSQL 持久化发件箱：
+1. 请求处理中调用 enqueue()，任务与业务数据在同一事务中写入 background_jobs 表
+2. 事务提交后唤醒本进程的工作者；其他进程的工作者通过轮询发现任务
+3. 工作者使用 FOR UPDATE SKIP LOCKED 领取任务，多进程部署下同一任务只会被执行一次
+4. 失败按指数退避重试，超过最大次数标记为失败；处理器抛出 PermanentJobError 时直接失败
+5. 执行期间定期刷新 locked_at（心跳）；结果只写回仍由本次领取持有的任务（按 locked_at 校验）
+6. 正常停止时被取消的任务立即重新入队；进程崩溃遗留的执行中任务（心跳超时）由工作者定期回收，
+   已用完尝试次数的标记为失败
+"""
+import asyncio
+import time
+import traceback
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from sqlalchemy import and_, event, or_, select, update, delete, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.models.background_job import BackgroundJob
+
+logger = get_logger(__name__)
+
+# 本事务有新任务入队时在 session.info 中使用的键
+_PENDING_WAKEUP_KEY = "job_queue_wakeup"
+
+JobHandler = Callable[[AsyncSession, Dict[str, Any]], Awaitable[None]]
+
+
+class PermanentJobError(Exception):
+    """处理器抛出此异常时不再重试，任务直接标记为失败（用于重试可能造成重复副作用的情况）"""
+
+
+class JobQueue:
+    """
+    后台任务队列
+
+    负责：
+    1. 任务处理器注册
+    2. 事务内入队（支持去重）
+    3. 工作者生命周期、领取、重试
+    4. 队列统计
+    """
+
+    # 任务处理器 {job_type: handler}
+    _handlers: Dict[str, JobHandler] = {}
+    _workers: List[asyncio.Task] = []
+    _wakeup: Optional[asyncio.Event] = None
+    _stopping: bool = False
+    # 本进程正在执行的任务 {任务ID: 领取标记 locked_at}（停止时重新入队）
+    _running: Dict[int, datetime] = {}
+    # 上次回收超时任务的时间（monotonic）
+    _last_recover: float = 0.0
+
+    @classmethod
+    def handler(cls, job_type: str) -> Callable[[JobHandler], JobHandler]:
+        """注册任务处理器（装饰器）"""
+        def decorator(func: JobHandler) -> JobHandler:
+            cls._handlers[job_type] = func
+            return func
+        return decorator
+
+    @classmethod
+    async def enqueue(
+        cls,
+        db: AsyncSession,
+        job_type: str,
+        payload: Dict[str, Any],
+        dedupe_key: Optional[str] = None,
+        max_attempts: Optional[int] = None
+    ) -> BackgroundJob:
+        """
+        在当前事务中加入任务（随业务数据一起提交）
+
+        Args:
+            dedupe_key: 去重键，已有相同键的待执行任务时直接返回该任务
+            max_attempts: 最大尝试次数，默认使用配置
+        """
+        if dedupe_key:
+            result = await db.execute(
+                select(BackgroundJob).where(
+                    BackgroundJob.dedupe_key == dedupe_key,
+                    BackgroundJob.status == "pending"
+                ).limit(1)
+            )
+            existing = result.scalar_one_or_none()
+            if existing is not None:
+                return existing
+
+        job = BackgroundJob(
+            job_type=job_type,
+            payload=payload,
+            dedupe_key=dedupe_key,
+            status="pending",
+            attempts=0,
+            max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+            run_after=datetime.utcnow()
+        )
+        db.add(job)
+        db.info[_PENDING_WAKEUP_KEY] = True
+        return job
+
+    @classmethod
+    def notify(cls) -> None:
+        """唤醒本进程的工作者"""
+        if cls._wakeup is not None:
+            cls._wakeup.set()
+
+    @classmethod
+    async def start(cls, concurrency: Optional[int] = None) -> None:
+        """启动工作者（应用启动时调用）"""
+        # 导入以注册任务处理器
+        import app.services.job_handlers  # noqa: F401
+
+        if cls._workers:
+            return
+
+        cls._stopping = False
+        cls._wakeup = asyncio.Event()
+        cls._last_recover = time.monotonic()
+        await cls._recover()
+
+        concurrency = concurrency or settings.JOB_WORKER_CONCURRENCY
+        cls._workers = [
+            asyncio.create_task(cls._worker_loop(index), name=f"job-worker-{index}")
+            for index in range(concurrency)
+        ]
+        logger.info(f"后台任务工作者已启动: 数量={concurrency}")
+
+    @classmethod
+    async def stop(cls) -> None:
+        """停止工作者（应用关闭时调用），正在执行的任务会被取消并立即重新入队"""
+        cls._stopping = True
+        cls.notify()
+        for task in cls._workers:
+            task.cancel()
+        await asyncio.gather(*cls._workers, return_exceptions=True)
+        cls._workers = []
+        cls._wakeup = None
+        await cls._release(dict(cls._running))
+        cls._running.clear()
+        logger.info("后台任务工作者已停止")
+
+    @classmethod
+    async def _release(cls, claims: Dict[int, datetime]) -> None:
+        """把被取消的任务重新入队（本次执行不计入尝试次数；已被回收领走的任务不受影响）"""
+        if not claims:
+            return
+        from app.database import AsyncSessionLocal
+
+        job_ids = list(claims)
+        now = datetime.utcnow()
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.execute(
+                    update(BackgroundJob)
+                    .where(
+                        BackgroundJob.status == "running",
+                        or_(*[
+                            and_(BackgroundJob.id == job_id, BackgroundJob.locked_at == locked_at)
+                            for job_id, locked_at in claims.items()
+                        ])
+                    )
+                    .values(
+                        status="pending",
+                        attempts=func.greatest(BackgroundJob.attempts - 1, 0),
+                        run_after=now,
+                        locked_at=None,
+                        updated_at=now
+                    )
+                )
+                await db.commit()
+            logger.info(f"[任务队列] 停止时重新入队执行中的任务 {len(job_ids)} 个: {job_ids}")
+        except Exception as e:
+            logger.error(f"[任务队列] 重新入队执行中的任务失败（将在超时后回收）: {e}", exc_info=True)
+
+    @classmethod
+    async def get_stats(cls, db: AsyncSession) -> Dict[str, Any]:
+        """
+        获取队列统计
+
+        Returns:
+            {"depth": 待执行数量, "by_status": {...}, "by_type": {job_type: {status: 数量}},
+             "oldest_pending_at": 最早待执行任务的创建时间}
+        """
+        result = await db.execute(
+            select(BackgroundJob.job_type, BackgroundJob.status, func.count(BackgroundJob.id))
+            .group_by(BackgroundJob.job_type, BackgroundJob.status)
+        )
+        by_status: Dict[str, int] = {}
+        by_type: Dict[str, Dict[str, int]] = {}
+        for job_type, job_status, count in result.all():
+            by_status[job_status] = by_status.get(job_status, 0) + count
+            by_type.setdefault(job_type, {})[job_status] = count
+
+        oldest_result = await db.execute(
+            select(func.min(BackgroundJob.created_at)).where(BackgroundJob.status == "pending")
+        )
+
+        return {
+            "depth": by_status.get("pending", 0),
+            "by_status": by_status,
+            "by_type": by_type,
+            "oldest_pending_at": oldest_result.scalar(),
+            "workers": len(cls._workers)
+        }
+
+    @staticmethod
+    def retry_delay(attempts: int) -> timedelta:
+        """第 attempts 次失败后的退避时间"""
+        return timedelta(seconds=settings.JOB_RETRY_BASE_DELAY * (2 ** max(attempts - 1, 0)))
+
+    @classmethod
+    async def _worker_loop(cls, index: int) -> None:
+        """工作者主循环：有任务就执行，没有则等待唤醒或轮询超时"""
+        while not cls._stopping:
+            # 定期回收其他进程崩溃遗留的执行中任务（各工作者共享间隔）
+            if time.monotonic() - cls._last_recover >= settings.JOB_RECOVER_INTERVAL:
+                cls._last_recover = time.monotonic()
+                await cls._recover()
+
+            try:
+                job = await cls._claim()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"[任务队列] 工作者{index} 领取任务失败: {e}", exc_info=True)
+                job = None
+
+            if job is None:
+                cls._wakeup.clear()
+                try:
+                    await asyncio.wait_for(cls._wakeup.wait(), timeout=settings.JOB_POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            await cls._execute(job)
+
+    @classmethod
+    async def _claim(cls) -> Optional[BackgroundJob]:
+        """领取一个到期的待执行任务（SKIP LOCKED，多进程安全）"""
+        from app.database import AsyncSessionLocal
+
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(BackgroundJob)
+                .where(
+                    BackgroundJob.status == "pending",
+                    BackgroundJob.run_after <= datetime.utcnow()
+                )
+                .order_by(BackgroundJob.id)
+                .limit(1)
+                .with_for_update(skip_locked=True)
+            )
+            job = result.scalar_one_or_none()
+            if job is None:
+                return None
+
+            job.status = "running"
+            job.attempts += 1
+            job.locked_at = datetime.utcnow()
+            await db.commit()
+            return job
+
+    @classmethod
+    async def _heartbeat(cls, job_id: int) -> None:
+        """执行期间定期刷新 locked_at，避免长任务被当作超时任务回收"""
+        from app.database import AsyncSessionLocal
+
+        while True:
+            await asyncio.sleep(settings.JOB_HEARTBEAT_INTERVAL)
+            locked_at = cls._running.get(job_id)
+            if locked_at is None:
+                return
+            now = datetime.utcnow()
+            try:
+                async with AsyncSessionLocal() as db:
+                    result = await db.execute(
+                        update(BackgroundJob)
+                        .where(
+                            BackgroundJob.id == job_id,
+                            BackgroundJob.status == "running",
+                            BackgroundJob.locked_at == locked_at
+                        )
+                        .values(locked_at=now, updated_at=now)
+                    )
+                    await db.commit()
+            except Exception as e:
+                logger.warning(f"[任务队列] 刷新任务心跳失败: id={job_id}, error={e}")
+                continue
+            if not result.rowcount:
+                logger.warning(f"[任务队列] 任务已不再由本次执行持有，停止心跳: id={job_id}")
+                return
+            if job_id in cls._running:
+                cls._running[job_id] = now
+
+    @classmethod
+    async def _execute(cls, job: BackgroundJob) -> None:
+        """执行任务并记录结果（只写回仍由本次领取持有的任务）"""
+        from app.database import AsyncSessionLocal
+
+        handler = cls._handlers.get(job.job_type)
+        error: Optional[str] = None
+        retryable = handler is not None
+        locked_at = job.locked_at
+        if handler is None:
+            error = f"未注册的任务类型: {job.job_type}"
+        else:
+            cls._running[job.id] = locked_at
+            heartbeat = asyncio.create_task(cls._heartbeat(job.id), name=f"job-heartbeat-{job.id}")
+            try:
+                async with AsyncSessionLocal() as db:
+                    await handler(db, job.payload)
+            except asyncio.CancelledError:
+                # 保留在 _running 中，由 stop() 重新入队
+                raise
+            except PermanentJobError as e:
+                error = f"{type(e).__name__}: {e}"
+                retryable = False
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}\n{traceback.format_exc(limit=5)}"
+            finally:
+                heartbeat.cancel()
+                await asyncio.gather(heartbeat, return_exceptions=True)
+            locked_at = cls._running.pop(job.id, locked_at)
+
+        now = datetime.utcnow()
+        if error is None:
+            values = {"status": "succeeded", "finished_at": now, "last_error": None}
+            logger.info(f"[任务队列] 任务完成: id={job.id}, type={job.job_type}, attempts={job.attempts}")
+        elif retryable and job.attempts < job.max_attempts:
+            values = {"status": "pending", "run_after": now + cls.retry_delay(job.attempts), "last_error": error}
+            logger.warning(f"[任务队列] 任务失败，稍后重试: id={job.id}, type={job.job_type}, "
+                           f"attempts={job.attempts}/{job.max_attempts}, error={error.splitlines()[0]}")
+        else:
+            values = {"status": "failed", "finished_at": now, "last_error": error}
+            logger.error(f"[任务队列] 任务最终失败: id={job.id}, type={job.job_type}, "
+                         f"attempts={job.attempts}, error={error.splitlines()[0]}")
+
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                update(BackgroundJob)
+                .where(
+                    BackgroundJob.id == job.id,
+                    BackgroundJob.status == "running",
+                    BackgroundJob.locked_at == locked_at
+                )
+                .values(locked_at=None, updated_at=now, **values)
+            )
+            await db.commit()
+        if not result.rowcount:
+            logger.warning(f"[任务队列] 任务已被回收或由其他工作者执行，忽略本次结果: id={job.id}, type={job.job_type}")
+
+    @classmethod
+    async def _recover(cls) -> None:
+        """
+        回收心跳超时的执行中任务，并清理过期的成功任务
+
+        尝试次数已用完的任务标记为失败，其余重新入队
+        """
+        from app.database import AsyncSessionLocal
+
+        now = datetime.utcnow()
+        stale = and_(
+            BackgroundJob.status == "running",
+            BackgroundJob.locked_at < now - timedelta(seconds=settings.JOB_STALE_TIMEOUT)
+        )
+        try:
+            async with AsyncSessionLocal() as db:
+                exhausted = await db.execute(
+                    update(BackgroundJob)
+                    .where(stale, BackgroundJob.attempts >= BackgroundJob.max_attempts)
+                    .values(
+                        status="failed", locked_at=None, finished_at=now, updated_at=now,
+                        last_error="执行超时（工作者已退出或失去心跳），尝试次数已用完"
+                    )
+                )
+                recovered = await db.execute(
+                    update(BackgroundJob)
+                    .where(stale)
+                    .values(status="pending", locked_at=None, updated_at=now)
+                )
+                purged = await db.execute(
+                    delete(BackgroundJob).where(
+                        BackgroundJob.status == "succeeded",
+                        BackgroundJob.finished_at < now - timedelta(days=settings.JOB_RETENTION_DAYS)
+                    )
+                )
+                await db.commit()
+            if recovered.rowcount or exhausted.rowcount or purged.rowcount:
+                logger.info(f"[任务队列] 回收超时任务 {recovered.rowcount} 个，超时失败 {exhausted.rowcount} 个，"
+                            f"清理成功任务 {purged.rowcount} 个")
+        except Exception as e:
+            logger.error(f"[任务队列] 回收任务失败: {e}", exc_info=True)
+
+
+@event.listens_for(Session, "after_commit")
+def _wakeup_workers(session: Session) -> None:
+    """事务提交后唤醒工作者（任务已持久化）"""
+    if session.info.pop(_PENDING_WAKEUP_KEY, False):
+        JobQueue.notify()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_wakeup(session: Session) -> None:
+    """事务回滚后任务未写入，无需唤醒"""
+    session.info.pop(_PENDING_WAKEUP_KEY, None)
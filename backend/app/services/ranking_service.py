@@ -8,12 +8,15 @@ from typing import List, Dict, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_, or_, func
 
+from app.core import metrics
 from app.models.gold_record import GoldRecord
 from app.models.ranking_snapshot import RankingSnapshot
 from app.models.season_correction_factor import SeasonCorrectionFactor
 from app.models.signup import Signup
 from app.models.team import Team
+from app.models.archive import TeamArchive, SignupArchive
 from app.models.guild_member import GuildMember
+from app.services.archive_service import ArchiveService
 
 
 class RankingService:
@@ -99,12 +102,46 @@ class RankingService:
         factor = result.scalar_one_or_none()
         return factor.correction_factor if factor else Decimal("1.00")
 
+    async def _load_correction_factors(self, guild_id: int) -> List[SeasonCorrectionFactor]:
+        """一次查询加载群组级别与全局的全部修正系数（配合 _pick_correction_factor 在内存中匹配）"""
+        result = await self.db.execute(
+            select(SeasonCorrectionFactor).where(
+                or_(
+                    SeasonCorrectionFactor.guild_id == guild_id,
+                    SeasonCorrectionFactor.guild_id.is_(None)
+                )
+            )
+        )
+        return list(result.scalars().all())
+
+    @staticmethod
+    def _pick_correction_factor(
+        factors: List[SeasonCorrectionFactor],
+        dungeon: str,
+        run_date: date,
+        guild_id: Optional[int] = None
+    ) -> Decimal:
+        """按 get_correction_factor 的规则从已加载的修正系数中选取（群组配置优先，其次全局配置）"""
+        for scope in ((guild_id,) if guild_id else ()) + (None,):
+            candidates = [
+                f for f in factors
+                if f.guild_id == scope
+                and f.dungeon == dungeon
+                and f.start_date <= run_date
+                and (f.end_date is None or f.end_date >= run_date)
+            ]
+            if candidates:
+                return max(candidates, key=lambda f: f.start_date).correction_factor
+        return Decimal("1.00")
+
     async def calculate_user_ranking_data(
         self,
         guild_id: int,
         user_id: int,
         car_number_map: Optional[Dict[int, int]] = None,
-        include_detail: bool = False
+        include_detail: bool = False,
+        records: Optional[List[GoldRecord]] = None,
+        correction_factors: Optional[List[SeasonCorrectionFactor]] = None
     ) -> Optional[Dict]:
         """
         计算单个用户的排名数据
@@ -114,23 +151,26 @@ class RankingService:
             user_id: 用户ID
             car_number_map: 车次映射（可选，如果未提供则内部计算）
             include_detail: 是否包含详细计算过程
+            records: 该用户的黑本记录（按日期、ID 升序；可选，如果未提供则查询）
+            correction_factors: 已加载的修正系数（可选，如果未提供则逐条查询）
 
         Returns:
             包含排名数据的字典，如果用户没有黑本记录则返回None
         """
         # 获取该用户在该群组的所有黑本记录
-        result = await self.db.execute(
-            select(GoldRecord)
-            .where(
-                and_(
-                    GoldRecord.guild_id == guild_id,
-                    GoldRecord.heibenren_user_id == user_id,
-                    GoldRecord.deleted_at.is_(None)
+        if records is None:
+            result = await self.db.execute(
+                select(GoldRecord)
+                .where(
+                    and_(
+                        GoldRecord.guild_id == guild_id,
+                        GoldRecord.heibenren_user_id == user_id,
+                        GoldRecord.deleted_at.is_(None)
+                    )
                 )
+                .order_by(GoldRecord.run_date.asc(), GoldRecord.id.asc())
             )
-            .order_by(GoldRecord.run_date.asc(), GoldRecord.id.asc())
-        )
-        records = result.scalars().all()
+            records = result.scalars().all()
 
         if not records:
             return None
@@ -150,7 +190,10 @@ class RankingService:
         total_record_count = len(records)
 
         for idx, record in enumerate(records):
-            factor = await self.get_correction_factor(record.dungeon, record.run_date, guild_id)
+            if correction_factors is None:
+                factor = await self.get_correction_factor(record.dungeon, record.run_date, guild_id)
+            else:
+                factor = self._pick_correction_factor(correction_factors, record.dungeon, record.run_date, guild_id)
             corrected_gold = Decimal(str(record.total_gold)) * factor
             corrected_total += corrected_gold
             total_gold += record.total_gold
@@ -252,7 +295,7 @@ class RankingService:
 
     async def calculate_guild_rankings(self, guild_id: int, include_detail: bool = False) -> List[Dict]:
         """
-        计算群组的完整排名
+        计算群组的完整排名（记录计算耗时）
 
         Args:
             guild_id: 群组ID
@@ -261,9 +304,14 @@ class RankingService:
         Returns:
             排名列表（按rank_score降序）
         """
-        # 获取该群组所有有黑本记录的用户
+        with metrics.RANKING_COMPUTE_DURATION.time():
+            return await self._calculate_guild_rankings(guild_id, include_detail)
+
+    async def _calculate_guild_rankings(self, guild_id: int, include_detail: bool) -> List[Dict]:
+        """计算群组的完整排名（黑本记录、修正系数各一次查询，不随人数增长）"""
+        # 一次查询获取该群组全部黑本记录，按黑本人分组
         result = await self.db.execute(
-            select(GoldRecord.heibenren_user_id)
+            select(GoldRecord)
             .where(
                 and_(
                     GoldRecord.guild_id == guild_id,
@@ -271,9 +319,12 @@ class RankingService:
                     GoldRecord.deleted_at.is_(None)
                 )
             )
-            .distinct()
+            .order_by(GoldRecord.run_date.asc(), GoldRecord.id.asc())
         )
-        all_user_ids = [row[0] for row in result.all()]
+        records_by_user: Dict[int, List[GoldRecord]] = {}
+        for record in result.scalars().all():
+            records_by_user.setdefault(record.heibenren_user_id, []).append(record)
+        all_user_ids = list(records_by_user)
         
         # 过滤掉已退群的成员（left_at 不为空表示已退群）
         active_members_result = await self.db.execute(
@@ -291,13 +342,17 @@ class RankingService:
         # 只保留仍在群组中的用户
         user_ids = [uid for uid in all_user_ids if uid in active_user_ids]
 
-        # 预先计算车次映射（避免重复计算）
+        # 预先计算车次映射、加载修正系数（避免重复查询）
         car_number_map = await self._get_car_number_map(guild_id)
+        correction_factors = await self._load_correction_factors(guild_id)
 
         # 计算每个用户的排名数据
         rankings = []
         for user_id in user_ids:
-            user_data = await self.calculate_user_ranking_data(guild_id, user_id, car_number_map, include_detail)
+            user_data = await self.calculate_user_ranking_data(
+                guild_id, user_id, car_number_map, include_detail,
+                records=records_by_user[user_id], correction_factors=correction_factors
+            )
             if user_data:
                 rankings.append(user_data)
 
@@ -586,16 +641,17 @@ class RankingService:
         Returns:
             (参与度惩罚系数, 倒数第三次跟车距今的车次差, 最近3次跟车详情)
         """
-        # 获取该群组所有开团列表（按时间倒序）
+        # 获取该群组所有开团列表（按时间倒序，包含已归档的团队）
+        teams = ArchiveService.with_archive(Team, TeamArchive, "id", "guild_id", "status", "team_time")
         recent_teams_result = await self.db.execute(
-            select(Team.id)
+            select(teams.c.id)
             .where(
                 and_(
-                    Team.guild_id == guild_id,
-                    Team.status.in_(["open", "completed"])  # 只看有效的开团
+                    teams.c.guild_id == guild_id,
+                    teams.c.status.in_(["open", "completed"])  # 只看有效的开团
                 )
             )
-            .order_by(Team.team_time.desc())
+            .order_by(teams.c.team_time.desc())
             .limit(100)  # 取足够多的开团用于计算
         )
         recent_team_ids = [row[0] for row in recent_teams_result.all()]
@@ -605,13 +661,14 @@ class RankingService:
             return Decimal("1.0"), 0, []
 
         # 查询该用户在这些开团中的报名记录（未取消的）
+        signups = ArchiveService.with_archive(Signup, SignupArchive, "team_id", "signup_user_id", "cancelled_at")
         signups_result = await self.db.execute(
-            select(Signup.team_id)
+            select(signups.c.team_id)
             .where(
                 and_(
-                    Signup.team_id.in_(recent_team_ids),
-                    Signup.signup_user_id == user_id,
-                    Signup.cancelled_at.is_(None)  # 未取消
+                    signups.c.team_id.in_(recent_team_ids),
+                    signups.c.signup_user_id == user_id,
+                    signups.c.cancelled_at.is_(None)  # 未取消
                 )
             )
         )
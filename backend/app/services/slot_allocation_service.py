@@ -9,7 +9,9 @@
 3. 使用队列保证单线程处理，避免并发问题
 """
 import asyncio
-from typing import List, Dict, Any, Optional, Tuple
+import time
+from contextlib import asynccontextmanager
+from typing import List, Dict, Any, AsyncIterator, Optional, Tuple
 from dataclasses import dataclass
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
@@ -17,6 +19,7 @@ from sqlalchemy.orm.attributes import flag_modified
 
 from app.models.team import Team
 from app.models.signup import Signup
+from app.core import metrics
 from app.core.logging import get_logger
 
 logger = get_logger(__name__)
@@ -56,6 +59,16 @@ class SlotAllocationService:
         if team_id not in cls._team_locks:
             cls._team_locks[team_id] = asyncio.Lock()
         return cls._team_locks[team_id]
+
+    @classmethod
+    @asynccontextmanager
+    async def _team_lock(cls, team_id: int) -> AsyncIterator[None]:
+        """持有团队锁，并记录等待时间"""
+        lock = cls._get_team_lock(team_id)
+        start = time.perf_counter()
+        async with lock:
+            metrics.SLOT_LOCK_WAIT.observe(time.perf_counter() - start)
+            yield
     
     @classmethod
     async def reallocate(
@@ -75,8 +88,7 @@ class SlotAllocationService:
         Returns:
             AllocationResult: 分配结果
         """
-        lock = cls._get_team_lock(team_id)
-        async with lock:
+        async with cls._team_lock(team_id):
             return await cls._do_reallocate(db, team_id, new_signup_id)
     
     @classmethod
@@ -427,8 +439,7 @@ class SlotAllocationService:
             signup_id: 报名ID
             slot_index: 坑位索引 (0-24)
         """
-        lock = cls._get_team_lock(team_id)
-        async with lock:
+        async with cls._team_lock(team_id):
             # 获取团队
             team_result = await db.execute(
                 select(Team).where(Team.id == team_id)
@@ -499,8 +510,7 @@ class SlotAllocationService:
         """
         解锁坑位（移除锁定标记，但保留分配）
         """
-        lock = cls._get_team_lock(team_id)
-        async with lock:
+        async with cls._team_lock(team_id):
             team_result = await db.execute(
                 select(Team).where(Team.id == team_id)
             )
@@ -529,8 +539,7 @@ class SlotAllocationService:
         """
         从坑位移除报名（不取消报名，只是移除分配）
         """
-        lock = cls._get_team_lock(team_id)
-        async with lock:
+        async with cls._team_lock(team_id):
             team_result = await db.execute(
                 select(Team).where(Team.id == team_id)
             )
@@ -564,8 +573,7 @@ class SlotAllocationService:
         交换两个坑位的分配（连连看模式）
         同时交换对应的 rule（规则），确保下次重新计算时交换效果不会失效
         """
-        lock = cls._get_team_lock(team_id)
-        async with lock:
+        async with cls._team_lock(team_id):
             team_result = await db.execute(
                 select(Team).where(Team.id == team_id)
             )
@@ -0,0 +1,307 @@
+"""
+团队面板文档服务（用于截图）
+
+将截图所需的全部数据（坑位、候补、报名详情、规则、报名统计）预先组装为一份「面板文档」：
+1. 文档按内容哈希生成版本号，便于机器人/前端做缓存比对
+2. 进程内缓存文档，命中时只需一次团队查询 + 一次报名聚合查询做版本校验
+3. 报名、排坑、团队变更提交后通过会话事件自动失效缓存
+4. 副本会话组装的文档不写入缓存，缓存只由主库数据填充
+"""
+import hashlib
+import time
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import event, select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core import metrics
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.database import is_replica_session
+from app.models.team import Team
+from app.models.signup import Signup
+from app.models.user import User
+from app.models.guild_member import GuildMember
+from app.schemas.bot import BotTeamDetail, BotSignupDetail
+from app.services.data_loader import get_loaders
+
+logger = get_logger(__name__)
+
+# 待失效团队在 session.info 中使用的键
+_DIRTY_TEAMS_KEY = "team_board_dirty_teams"
+
+# 新鲜度戳：(团队更新时间, 总报名数, 取消数, 报名最新更新时间)
+Stamp = Tuple[datetime, int, int, Optional[datetime]]
+
+
+class TeamBoardService:
+    """
+    团队面板文档服务
+
+    负责：
+    1. 报名统计聚合查询
+    2. 组装并缓存面板文档
+    3. 缓存失效
+    """
+
+    # 文档缓存 {team_id: (过期时间, 新鲜度戳, 文档)}
+    _cache: Dict[int, Tuple[float, Stamp, BotTeamDetail]] = {}
+    _max_entries = 1000
+
+    @staticmethod
+    async def get_signup_stats(
+        db: AsyncSession,
+        team_ids: Iterable[int]
+    ) -> Dict[int, dict]:
+        """
+        批量统计团队报名情况（单次 GROUP BY 聚合查询）
+
+        Returns:
+            {team_id: {"total": 总报名数, "cancelled": 取消数,
+                       "latest_created_at": 最新报名时间, "latest_cancelled_at": 最新取消时间,
+                       "latest_updated_at": 报名最新更新时间}}
+            没有报名记录的团队不包含在结果中
+        """
+        team_ids = list(team_ids)
+        if not team_ids:
+            return {}
+
+        result = await db.execute(
+            select(
+                Signup.team_id,
+                func.count(Signup.id),
+                func.count(Signup.cancelled_at),
+                func.max(Signup.created_at),
+                func.max(Signup.cancelled_at),
+                func.max(Signup.updated_at)
+            )
+            .where(Signup.team_id.in_(team_ids))
+            .group_by(Signup.team_id)
+        )
+        return {
+            row[0]: {
+                "total": row[1],
+                "cancelled": row[2],
+                "latest_created_at": row[3],
+                "latest_cancelled_at": row[4],
+                "latest_updated_at": row[5]
+            }
+            for row in result.all()
+        }
+
+    @staticmethod
+    def build_signup_counters(team: Team, stats: Optional[dict]) -> dict:
+        """
+        根据聚合结果计算报名统计字段
+
+        最新变更时间取团队更新时间、最新报名创建时间、最新取消时间中的最大值
+        """
+        total_count = stats["total"] if stats else 0
+        cancelled_count = stats["cancelled"] if stats else 0
+
+        latest_change: datetime = team.updated_at
+        if stats:
+            for candidate in (stats["latest_created_at"], stats["latest_cancelled_at"]):
+                if candidate is not None and candidate > latest_change:
+                    latest_change = candidate
+
+        return {
+            "signup_count": total_count - cancelled_count,
+            "cancelled_count": cancelled_count,
+            "total_signup_count": total_count,
+            "latest_change_at": latest_change
+        }
+
+    @classmethod
+    async def get_document(
+        cls,
+        db: AsyncSession,
+        guild_id: int,
+        team: Team
+    ) -> BotTeamDetail:
+        """
+        获取团队面板文档（优先使用缓存）
+
+        缓存命中条件：未过期且新鲜度戳与数据库一致（多进程部署时其他进程的写入也能被发现）
+        """
+        stats = (await cls.get_signup_stats(db, [team.id])).get(team.id)
+        stamp: Stamp = (
+            team.updated_at,
+            stats["total"] if stats else 0,
+            stats["cancelled"] if stats else 0,
+            stats["latest_updated_at"] if stats else None
+        )
+
+        entry = cls._cache.get(team.id)
+        if entry is not None:
+            expires_at, cached_stamp, document = entry
+            if expires_at >= time.monotonic() and cached_stamp == stamp and document.guild_id == guild_id:
+                metrics.record_cache("team_board", hit=True)
+                return document
+        metrics.record_cache("team_board", hit=False)
+
+        document = await cls._build_document(db, guild_id, team, stats)
+        if not is_replica_session(db):
+            cls._set_cached(team.id, stamp, document)
+        return document
+
+    @classmethod
+    def invalidate(cls, team_id: int) -> None:
+        """团队面板数据变更后失效缓存"""
+        cls._cache.pop(team_id, None)
+
+    @classmethod
+    def clear(cls) -> None:
+        """清空全部缓存"""
+        cls._cache.clear()
+
+    @classmethod
+    async def _build_document(
+        cls,
+        db: AsyncSession,
+        guild_id: int,
+        team: Team,
+        stats: Optional[dict]
+    ) -> BotTeamDetail:
+        """组装面板文档"""
+        # 查询创建者信息
+        creator_result = await db.execute(
+            select(User, GuildMember)
+            .outerjoin(GuildMember,
+                      (GuildMember.user_id == User.id) &
+                      (GuildMember.guild_id == guild_id) &
+                      (GuildMember.left_at.is_(None)))
+            .where(User.id == team.creator_id)
+        )
+        creator_row = creator_result.first()
+        creator_name = "未知"
+        if creator_row:
+            creator_user, creator_member = creator_row
+            creator_name = (creator_member.group_nickname
+                           if creator_member and creator_member.group_nickname
+                           else creator_user.nickname)
+
+        # 查询报名列表
+        signups_result = await db.execute(
+            select(Signup, User, GuildMember)
+            .outerjoin(User, User.id == Signup.submitter_id)
+            .outerjoin(GuildMember,
+                      (GuildMember.user_id == Signup.submitter_id) &
+                      (GuildMember.guild_id == guild_id) &
+                      (GuildMember.left_at.is_(None)))
+            .where(
+                Signup.team_id == team.id,
+                Signup.cancelled_at.is_(None)
+            )
+            .order_by(Signup.priority)
+        )
+        signup_rows = signups_result.all()
+
+        # 批量获取玩家的实时昵称（请求级加载器合并为一次查询）
+        player_names = await get_loaders(db).display_names(
+            guild_id,
+            [signup.signup_user_id for signup, _, _ in signup_rows
+             if signup.signup_user_id]
+        )
+
+        # 构建报名详情列表
+        signup_list = []
+        for signup, submitter_user, submitter_member in signup_rows:
+            submitter_name = "未知"
+            if submitter_user:
+                submitter_name = (submitter_member.group_nickname
+                                if submitter_member and submitter_member.group_nickname
+                                else submitter_user.nickname)
+
+            # 处理 signup_info 中的玩家昵称替换（优先级：群昵称 > 昵称）
+            enriched_info = dict(signup.signup_info)
+            if signup.signup_user_id in player_names:
+                enriched_info["player_name"] = player_names[signup.signup_user_id]
+
+            signup_list.append(BotSignupDetail(
+                id=signup.id,
+                submitter_id=signup.submitter_id,
+                submitter_name=submitter_name,
+                signup_user_id=signup.signup_user_id,
+                signup_info=enriched_info,  # 使用替换后的 info
+                priority=signup.priority,
+                is_rich=signup.is_rich,
+                is_proxy=signup.is_proxy,
+                slot_position=signup.slot_position,
+                presence_status=signup.presence_status,
+                created_at=signup.created_at
+            ))
+
+        document = BotTeamDetail(
+            id=team.id,
+            guild_id=guild_id,
+            creator_id=team.creator_id,
+            creator_name=creator_name,
+            title=team.title,
+            team_time=team.team_time,
+            dungeon=team.dungeon,
+            max_members=team.max_members,
+            is_xuanjing_booked=team.is_xuanjing_booked,
+            is_yuntie_booked=team.is_yuntie_booked,
+            is_hidden=team.is_hidden,
+            is_locked=team.is_locked,
+            status=team.status,
+            notice=team.notice,
+            rules=team.rule,  # 数据库字段是 rule
+            slot_view=team.slot_view,
+            slot_assignments=team.slot_assignments,  # 后端计算的坑位分配
+            waitlist=team.waitlist,  # 后端计算的候补列表
+            signups=signup_list,
+            created_at=team.created_at,
+            updated_at=team.updated_at,
+            **cls.build_signup_counters(team, stats)
+        )
+        document.version = cls.compute_version(document)
+        return document
+
+    @staticmethod
+    def compute_version(document: BotTeamDetail) -> str:
+        """根据文档内容计算版本号（内容哈希）"""
+        payload = document.model_dump_json(exclude={"version"})
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+    @classmethod
+    def _set_cached(cls, team_id: int, stamp: Stamp, document: BotTeamDetail) -> None:
+        """写入缓存（TTL 为 0 时不缓存）"""
+        ttl = settings.TEAM_BOARD_CACHE_TTL
+        if ttl <= 0:
+            return
+        if len(cls._cache) >= cls._max_entries and team_id not in cls._cache:
+            now = time.monotonic()
+            for stale_id in [k for k, (exp, _, _) in cls._cache.items() if exp < now]:
+                cls._cache.pop(stale_id, None)
+            if len(cls._cache) >= cls._max_entries:
+                logger.debug("团队面板缓存已满，清空后重建")
+                cls._cache.clear()
+        cls._cache[team_id] = (time.monotonic() + ttl, stamp, document)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_dirty_teams(session: Session, _flush_context) -> None:
+    """收集本次刷新中涉及的团队（报名写入、排坑结果、团队信息变更）"""
+    dirty = session.info.setdefault(_DIRTY_TEAMS_KEY, set())
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, Team) and obj.id is not None:
+            dirty.add(obj.id)
+        elif isinstance(obj, Signup) and obj.team_id is not None:
+            dirty.add(obj.team_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_dirty_teams(session: Session) -> None:
+    """事务提交后失效相关团队的面板缓存"""
+    for team_id in session.info.pop(_DIRTY_TEAMS_KEY, ()):
+        TeamBoardService.invalidate(team_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_dirty_teams(session: Session) -> None:
+    """事务回滚后丢弃收集的团队"""
+    session.info.pop(_DIRTY_TEAMS_KEY, None)
@@ -1,10 +1,21 @@
 """
 团队日志服务
+
+日志先写入会话级缓冲区，事务提交前用一条多行 INSERT 批量写入（保持调用顺序）：
+一次请求记录多条日志也只增加一次数据库往返；事务回滚时缓冲区一并丢弃
 """
+from datetime import datetime
 from typing import Optional, Dict, Any
+
+from sqlalchemy import event, insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
 from app.models.team_log import TeamLog
 
+# 待写入日志在 session.info 中使用的键
+_LOG_BUFFER_KEY = "team_log_buffer"
+
 
 class TeamLogService:
     """团队日志服务类"""
@@ -17,18 +28,16 @@ class TeamLogService:
         action_type: str,
         action_user_id: Optional[int],
         action_detail: Dict[str, Any]
-    ) -> TeamLog:
-        """创建日志记录"""
-        log = TeamLog(
-            team_id=team_id,
-            guild_id=guild_id,
-            action_type=action_type,
-            action_user_id=action_user_id,
-            action_detail=action_detail
-        )
-        db.add(log)
-        await db.flush()  # 不立即提交，等待外层事务提交
-        return log
+    ) -> None:
+        """创建日志记录（加入缓冲区，随外层事务提交写入）"""
+        db.info.setdefault(_LOG_BUFFER_KEY, []).append({
+            "team_id": team_id,
+            "guild_id": guild_id,
+            "action_type": action_type,
+            "action_user_id": action_user_id,
+            "action_detail": action_detail,
+            "created_at": datetime.utcnow()
+        })
 
     @staticmethod
     async def log_team_created(
@@ -222,3 +231,19 @@ class TeamLogService:
                 "previous_status": previous_status
             }
         )
+
+
+@event.listens_for(Session, "before_commit")
+def _write_buffered_logs(session: Session) -> None:
+    """提交前批量写入缓冲的日志（先刷新会话，保证关联的团队已写入）"""
+    rows = session.info.pop(_LOG_BUFFER_KEY, None)
+    if not rows:
+        return
+    session.flush()
+    session.execute(insert(TeamLog).values(rows))
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_buffered_logs(session: Session) -> None:
+    """事务回滚后丢弃未写入的日志"""
+    session.info.pop(_LOG_BUFFER_KEY, None)
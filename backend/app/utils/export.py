@@ -0,0 +1,148 @@
+"""
+数据导出工具
+
+将异步行迭代器直接写入 StreamingResponse，内存占用与行数无关：
+1. CSV：按批写出，带 UTF-8 BOM 以便 Excel 正确识别中文
+2. XLSX：使用 XlsxWriter 常量内存模式写入临时文件，完成后分块输出（需安装 XlsxWriter）
+"""
+import asyncio
+import csv
+import io
+import os
+import tempfile
+from datetime import date, datetime
+from typing import Any, AsyncIterator, List, Sequence
+from urllib.parse import quote
+
+from fastapi import HTTPException, status
+from fastapi.responses import StreamingResponse
+
+# 支持的导出格式
+EXPORT_FORMATS = ("csv", "xlsx")
+
+# CSV 每批写出的行数
+_CSV_BATCH_ROWS = 500
+# 文件分块输出大小
+_FILE_CHUNK_SIZE = 64 * 1024
+
+_MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+
+def _format_cell(value: Any) -> Any:
+    """转换单元格值（列表拼接、日期转字符串、None 转空）"""
+    if value is None:
+        return ""
+    if isinstance(value, (list, tuple)):
+        return "、".join(str(v) for v in value)
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, bool):
+        return "是" if value else "否"
+    return value
+
+
+async def _iter_csv(header: Sequence[str], rows: AsyncIterator[Sequence[Any]]) -> AsyncIterator[bytes]:
+    """逐批生成 CSV 内容"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    buffer.write("﻿")
+    writer.writerow(header)
+
+    count = 0
+    async for row in rows:
+        writer.writerow([_format_cell(v) for v in row])
+        count += 1
+        if count % _CSV_BATCH_ROWS == 0:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate(0)
+
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+async def _iter_xlsx(
+    header: Sequence[str],
+    rows: AsyncIterator[Sequence[Any]],
+    sheet_name: str
+) -> AsyncIterator[bytes]:
+    """写入临时 XLSX 文件（常量内存模式）后分块输出"""
+    import xlsxwriter
+
+    fd, path = tempfile.mkstemp(suffix=".xlsx")
+    os.close(fd)
+    try:
+        workbook = xlsxwriter.Workbook(path, {"constant_memory": True})
+        worksheet = workbook.add_worksheet(sheet_name[:31])
+        worksheet.write_row(0, 0, list(header))
+
+        row_index = 1
+        async for row in rows:
+            worksheet.write_row(row_index, 0, [_format_cell(v) for v in row])
+            row_index += 1
+
+        # 压缩打包较耗时，放到线程中执行
+        await asyncio.to_thread(workbook.close)
+
+        with open(path, "rb") as f:
+            while True:
+                chunk = f.read(_FILE_CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def ensure_export_format(export_format: str) -> None:
+    """
+    校验导出格式
+
+    Raises:
+        HTTPException: 格式不支持或缺少 XLSX 依赖
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="不支持的导出格式")
+    if export_format == "xlsx":
+        try:
+            import xlsxwriter  # noqa: F401
+        except ImportError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="服务器未安装 XlsxWriter，暂不支持导出 XLSX，请使用 CSV"
+            )
+
+
+def streaming_export(
+    export_format: str,
+    filename: str,
+    header: List[str],
+    rows: AsyncIterator[Sequence[Any]],
+    sheet_name: str = "Sheet1"
+) -> StreamingResponse:
+    """
+    构建流式导出响应
+
+    Args:
+        export_format: csv 或 xlsx（调用前应先 ensure_export_format）
+        filename: 文件名（不含扩展名）
+        header: 表头
+        rows: 异步行迭代器（通常来自服务端游标）
+    """
+    if export_format == "xlsx":
+        body = _iter_xlsx(header, rows, sheet_name)
+    else:
+        body = _iter_csv(header, rows)
+
+    full_name = f"{filename}.{export_format}"
+    return StreamingResponse(
+        body,
+        media_type=_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f"attachment; filename*=UTF-8''{quote(full_name)}"}
+    )
@@ -0,0 +1,34 @@
+"""
+开团归档脚本
+把已完成/已取消且关闭超过保留期的团队连同报名、日志移入归档表，建议每天定时运行
+
+用法:
+    python scripts/archive_teams.py               # 按配置 TEAM_ARCHIVE_AFTER_DAYS 归档
+    python scripts/archive_teams.py --days 365    # 只归档关闭超过 365 天的团队
+    python scripts/archive_teams.py --max-batches 10
+"""
+import argparse
+import asyncio
+import sys
+import os
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import AsyncSessionLocal, engine
+from app.services.archive_service import ArchiveService
+
+
+async def main(days: int = None, max_batches: int = None):
+    async with AsyncSessionLocal() as session:
+        total = await ArchiveService.archive(session, older_than_days=days, max_batches=max_batches)
+    await engine.dispose()
+    print(f"✅ 开团归档完成，共归档 {total} 个团队")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="归档过期的开团数据")
+    parser.add_argument("--days", type=int, default=None, help="保留天数（不指定则使用配置）")
+    parser.add_argument("--max-batches", type=int, default=None, help="最多执行的批数（不指定则全部归档）")
+    args = parser.parse_args()
+    asyncio.run(main(args.days, args.max_batches))
@@ -0,0 +1,119 @@
+"""
+响应序列化性能对比脚本
+对比大列表接口的两种序列化路径（不含数据库查询）：
+
+- 默认路径：逐行 model_validate -> success() -> FastAPI 按 response_model 再校验并序列化 -> json 响应
+- 快速路径：TypeAdapter 整批校验/序列化 -> fast_success() 直接返回 orjson 响应
+
+用法:
+    python scripts/benchmark_serialization.py               # 默认 500 行，重复 50 次
+    python scripts/benchmark_serialization.py --rows 2000 --repeat 20
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Callable, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+from fastapi.utils import create_response_field  # noqa: E402
+
+from app.core.responses import dump_rows, fast_success  # noqa: E402
+from app.models.team import Team  # noqa: E402
+from app.schemas.common import ResponseModel, success  # noqa: E402
+from app.schemas.ranking import GuildRankingResponse, RankingItemOut  # noqa: E402
+from app.schemas.team import TeamOut  # noqa: E402
+
+
+def build_teams(rows: int) -> List[Team]:
+    """构造未入库的 Team ORM 对象（字段形态与数据库读取的一致）"""
+    now = datetime(2026, 1, 10, 20, 0)
+    rule = [{"allowRich": i % 2 == 0, "allowXinfaList": ["冰心诀", "花间游"]} for i in range(25)]
+    return [
+        Team(
+            id=i, guild_id=1, creator_id=i % 30 + 1, title=f"周常金团 {i}", team_time=now + timedelta(hours=i),
+            dungeon="主本", max_members=25, is_xuanjing_booked=False, is_yuntie_booked=True, is_hidden=False,
+            is_locked=False, status="open", notice="准时进本", rule=rule, slot_view=None,
+            slot_assignments=[{"signup_id": j, "locked": False} for j in range(25)], waitlist=[1, 2, 3],
+            created_at=now, updated_at=now, closed_at=None, closed_by=None,
+        )
+        for i in range(rows)
+    ]
+
+
+def build_ranking(rows: int) -> GuildRankingResponse:
+    """构造红黑榜响应（含 Decimal 与日期字段）"""
+    items = [
+        RankingItemOut(
+            rank_position=i + 1, user_id=i, user_name=f"成员{i}", user_avatar=None, heibenren_count=i % 9,
+            average_gold=Decimal("12345.67"), corrected_average_gold=Decimal("13000.50"), rank_score=Decimal("8.75"),
+            last_heibenren_date=date(2026, 1, 1), last_heibenren_car_number=i % 5, last_heibenren_days_ago=9,
+            rank_change="up", rank_change_value=1, score_change_value=Decimal("0.25"), prev_rank=i + 2,
+            prev_score=Decimal("8.50"),
+        )
+        for i in range(rows)
+    ]
+    return GuildRankingResponse(guild_id=1, guild_name="测试群", snapshot_date=datetime(2026, 1, 10), rankings=items)
+
+
+def default_path(response_type) -> Callable[[object], bytes]:
+    """FastAPI 默认流程：按 response_model 校验、序列化后交给 JSONResponse"""
+    field = create_response_field(name="response", type_=ResponseModel[response_type], mode="serialization")
+
+    def render(content) -> bytes:
+        data = asyncio.run(serialize_response(field=field, response_content=content))
+        return JSONResponse(data).body
+
+    return render
+
+
+def timed(fn: Callable[[], bytes], repeat: int) -> tuple[float, int]:
+    """返回单次平均耗时（毫秒）与响应体大小"""
+    body = fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) * 1000 / repeat, len(body)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="对比响应序列化耗时")
+    parser.add_argument("--rows", type=int, default=500, help="每个响应的行数")
+    parser.add_argument("--repeat", type=int, default=50, help="重复次数")
+    args = parser.parse_args()
+
+    teams = build_teams(args.rows)
+    ranking = build_ranking(args.rows)
+    render_teams = default_path(List[TeamOut])
+    render_ranking = default_path(GuildRankingResponse)
+
+    cases = [
+        (
+            "开团列表",
+            lambda: render_teams(success([TeamOut.model_validate(t) for t in teams], message="获取成功")),
+            lambda: fast_success(dump_rows(TeamOut, teams, from_attributes=True), message="获取成功").body,
+        ),
+        (
+            "红黑榜",
+            lambda: render_ranking(success(ranking)),
+            lambda: fast_success(ranking, message="操作成功", model=GuildRankingResponse).body,
+        ),
+    ]
+
+    print(f"{args.rows} 行，重复 {args.repeat} 次")
+    print(f"{'接口':<8} {'默认(ms)':>10} {'快速(ms)':>10} {'加速比':>8} {'大小(KB)':>10}")
+    for name, slow, fast in cases:
+        slow_ms, size = timed(slow, args.repeat)
+        fast_ms, _ = timed(fast, args.repeat)
+        print(f"{name:<8} {slow_ms:>10.2f} {fast_ms:>10.2f} {slow_ms / fast_ms:>7.1f}x {size / 1024:>10.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
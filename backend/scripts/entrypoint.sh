@@ -10,10 +10,18 @@ if [ -n "$WAIT_FOR_DB" ]; then
     sleep 5
 fi
 
+# 迁移到最新版本（advisory lock 保证多实例同时启动时只迁移一次）
+# 必须先于初始化管理员执行，新库上管理员表由迁移创建
+echo "执行数据库迁移..."
+cd /app && python -m app.migrate
+
 # 初始化管理员账号（幂等操作）
 echo "检查并初始化管理员账号..."
 python /app/scripts/init_admin.py
 
+# 已在此处迁移，工作进程启动时只检查版本
+export MIGRATION_MODE="${MIGRATION_MODE:-check}"
+
 echo "=== 初始化完成，启动应用 ==="
 
 # 启动应用（使用 exec 确保信号正确传递）
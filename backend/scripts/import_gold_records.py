@@ -0,0 +1,50 @@
+"""
+批量导入历史金团记录脚本
+从表格迁移时使用，CSV 格式与 POST /guilds/{guild_id}/gold-records/import 相同
+
+必填列: 日期(run_date)、副本(dungeon)、总金团(total_gold)、打工人数(worker_count)
+可选列: 补贴、出玄晶、黑本人ID、黑本角色、特殊掉落、备注
+
+用法:
+    python scripts/import_gold_records.py --guild 3 --creator 1 records.csv
+"""
+import argparse
+import asyncio
+import sys
+import os
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import AsyncSessionLocal, engine
+from app.services.gold_import_service import GoldImportService
+
+
+async def main(guild_id: int, creator_id: int, path: str) -> int:
+    try:
+        with open(path, encoding="utf-8-sig", newline="") as f:
+            async with AsyncSessionLocal() as session:
+                report = await GoldImportService.import_csv(session, guild_id, creator_id, f)
+    except ValueError as e:
+        print(f"❌ 导入失败: {e}")
+        return 1
+    finally:
+        await engine.dispose()
+
+    if report["error_count"]:
+        print(f"❌ 导入失败：共 {report['error_count']} 处错误，未写入任何记录")
+        for item in report["errors"]:
+            print(f"   第 {item['line']} 行: {item['message']}")
+        return 1
+
+    print(f"✅ 导入完成：数据行 {report['total_rows']}，新增 {report['imported']}，跳过 {report['skipped']}")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="批量导入历史金团记录")
+    parser.add_argument("--guild", type=int, required=True, help="群组ID")
+    parser.add_argument("--creator", type=int, required=True, help="记录创建者用户ID")
+    parser.add_argument("file", help="CSV 文件路径（UTF-8）")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.guild, args.creator, args.file)))
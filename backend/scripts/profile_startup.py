@@ -0,0 +1,96 @@
+"""
+启动导入耗时分析脚本
+在新的解释器中以 -X importtime 导入应用，按模块汇总导入耗时，定位拖慢冷启动的模块
+
+用法:
+    python scripts/profile_startup.py                  # 分析 app.main，输出累计耗时前 30 的模块
+    python scripts/profile_startup.py --top 50 --self  # 按模块自身耗时排序
+    python scripts/profile_startup.py --prefix app.    # 只看应用自身的模块
+    python scripts/profile_startup.py --budget 2500    # 总耗时超过 2500ms 时以非零状态退出
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+from dataclasses import dataclass
+from typing import Dict, List
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 冷启动耗时目标（毫秒，-X importtime 统计的 app.main 累计导入耗时）
+DEFAULT_BUDGET_MS = 3000
+
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)$")
+
+
+@dataclass
+class ModuleImport:
+    """单个模块的导入耗时（微秒）"""
+    name: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(output: str) -> Dict[str, ModuleImport]:
+    """解析 -X importtime 输出（同一模块只会出现一次）"""
+    modules: Dict[str, ModuleImport] = {}
+    for line in output.splitlines():
+        match = _LINE.match(line)
+        if match is None:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        modules[name] = ModuleImport(name, int(self_us), int(cumulative_us), (len(indent) - 1) // 2)
+    return modules
+
+
+def profile_import(module: str = "app.main") -> Dict[str, ModuleImport]:
+    """在新的解释器中导入模块并返回各模块的导入耗时"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"导入 {module} 失败:\n{result.stderr[-2000:]}")
+    return parse_importtime(result.stderr)
+
+
+def format_report(modules: Dict[str, ModuleImport], root: str, top: int, by_self: bool, prefix: str) -> str:
+    """格式化报告"""
+    rows: List[ModuleImport] = [m for m in modules.values() if m.name.startswith(prefix)]
+    rows.sort(key=lambda m: m.self_us if by_self else m.cumulative_us, reverse=True)
+
+    lines = [f"{'自身(ms)':>10} {'累计(ms)':>10}  模块"]
+    for m in rows[:top]:
+        lines.append(f"{m.self_us / 1000:>10.1f} {m.cumulative_us / 1000:>10.1f}  {'  ' * m.depth}{m.name}")
+    total = modules[root].cumulative_us / 1000 if root in modules else 0
+    lines.append(f"\n{root} 累计导入耗时: {total:.1f}ms（共 {len(modules)} 个模块）")
+    return "\n".join(lines)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="分析应用启动导入耗时")
+    parser.add_argument("--module", default="app.main", help="要分析的模块（默认 app.main）")
+    parser.add_argument("--top", type=int, default=30, help="输出前 N 个模块")
+    parser.add_argument("--self", dest="by_self", action="store_true", help="按模块自身耗时排序")
+    parser.add_argument("--prefix", default="", help="只输出以该前缀开头的模块")
+    parser.add_argument("--budget", type=float, default=None, help="累计耗时上限（毫秒），超出时返回非零状态")
+    args = parser.parse_args()
+
+    modules = profile_import(args.module)
+    print(format_report(modules, args.module, args.top, args.by_self, args.prefix))
+
+    if args.budget is not None and args.module in modules:
+        total_ms = modules[args.module].cumulative_us / 1000
+        if total_ms > args.budget:
+            print(f"❌ 超出冷启动目标 {args.budget:.0f}ms")
+            return 1
+        print(f"✅ 在冷启动目标 {args.budget:.0f}ms 以内")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,32 @@
+"""
+重建金团统计汇总脚本
+首次部署汇总表或数据修复后运行，按金团记录全量重算周/月汇总
+
+用法:
+    python scripts/rebuild_gold_analytics.py            # 重建所有群组
+    python scripts/rebuild_gold_analytics.py --guild 3  # 只重建指定群组
+"""
+import argparse
+import asyncio
+import sys
+import os
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import AsyncSessionLocal, engine
+from app.services.gold_analytics_service import GoldAnalyticsService
+
+
+async def main(guild_id: int = None):
+    async with AsyncSessionLocal() as session:
+        guild_ids = await GoldAnalyticsService.rebuild(session, guild_id)
+    await engine.dispose()
+    print(f"✅ 金团统计汇总重建完成，共 {len(guild_ids)} 个群组")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="重建金团统计汇总")
+    parser.add_argument("--guild", type=int, default=None, help="群组ID（不指定则重建全部）")
+    args = parser.parse_args()
+    asyncio.run(main(args.guild))
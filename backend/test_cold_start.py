@@ -0,0 +1,32 @@
+from scripts.profile_startup import DEFAULT_BUDGET_MS, parse_importtime, profile_import
+
+# 启动时不应导入的模块（管理后台、游戏控制台延迟加载；迁移工具只在需要迁移时导入）
+LAZY_MODULES = (
+    "app.api.v2.admin",
+    "app.api.v2.endpoints.game_console",
+    "alembic",
+)
+
+
+def test_parse_importtime():
+    output = "\n".join([
+        "import time: self [us] | cumulative | imported package",
+        "import time:       120 |        120 |     app.core.config",
+        "import time:       300 |        420 |   app.main",
+    ])
+
+    modules = parse_importtime(output)
+
+    assert modules["app.main"].cumulative_us == 420
+    assert modules["app.core.config"].depth == 2
+
+
+def test_cold_start_within_budget():
+    modules = profile_import("app.main")
+
+    for name in LAZY_MODULES:
+        assert name not in modules, f"{name} 应延迟加载"
+
+    # 耗时受机器负载影响，取两次中较快的一次
+    best_ms = min(modules["app.main"].cumulative_us, profile_import("app.main")["app.main"].cumulative_us) / 1000
+    assert best_ms < DEFAULT_BUDGET_MS
@@ -0,0 +1,82 @@
+import pytest
+
+from app.database import REPLICA_SESSION_KEY
+from app.services.config_cache_service import (
+    ConfigCacheService,
+    _invalidate_pending_keys,
+    _discard_pending_keys,
+    system_key,
+)
+
+
+class FakeFetchResult:
+    def __init__(self, row):
+        self.row = row
+
+    def fetchone(self):
+        return self.row
+
+
+class CountingSession:
+    def __init__(self, value):
+        self.value = value
+        self.calls = 0
+        self.info = {}
+
+    async def execute(self, _statement):
+        self.calls += 1
+        return FakeFetchResult((self.value,))
+
+
+@pytest.fixture(autouse=True)
+def clear_config_cache():
+    ConfigCacheService.clear()
+    yield
+    ConfigCacheService.clear()
+
+
+@pytest.mark.asyncio
+async def test_system_config_cached_until_commit_invalidates():
+    db = CountingSession([{"name": "主本", "type": "primary", "order": 0}])
+
+    first = await ConfigCacheService.get_system_config(db, "dungeon_options")
+    first.append({"name": "调用方修改"})
+    second = await ConfigCacheService.get_system_config(db, "dungeon_options")
+    assert db.calls == 1
+    assert len(second) == 1
+
+    await ConfigCacheService.invalidate_on_commit(db, system_key("dungeon_options"))
+    _discard_pending_keys(db)
+    await ConfigCacheService.get_system_config(db, "dungeon_options")
+    assert db.calls == 1
+
+    await ConfigCacheService.invalidate_on_commit(db, system_key("dungeon_options"))
+    _invalidate_pending_keys(db)
+    await ConfigCacheService.get_system_config(db, "dungeon_options")
+    assert db.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_load_racing_with_invalidation_is_not_cached():
+    key = system_key("dungeon_options")
+
+    class RacingSession(CountingSession):
+        async def execute(self, statement):
+            ConfigCacheService.invalidate(key)
+            return await super().execute(statement)
+
+    db = RacingSession(["旧值"])
+    assert await ConfigCacheService.get_system_config(db, "dungeon_options") == ["旧值"]
+    assert key not in ConfigCacheService._cache
+
+
+@pytest.mark.asyncio
+async def test_replica_session_load_is_not_cached():
+    replica = CountingSession(["旧配置"])
+    replica.info[REPLICA_SESSION_KEY] = True
+    assert await ConfigCacheService.get_system_config(replica, "dungeon_options") == ["旧配置"]
+
+    primary = CountingSession(["新配置"])
+    assert await ConfigCacheService.get_system_config(primary, "dungeon_options") == ["新配置"]
+    assert await ConfigCacheService.get_system_config(replica, "dungeon_options") == ["新配置"]
+    assert (replica.calls, primary.calls) == (1, 1)
@@ -0,0 +1,38 @@
+import asyncio
+
+import pytest
+
+from app.services.data_loader import BatchLoader
+
+
+@pytest.mark.asyncio
+async def test_batch_loader_coalesces_keys_within_tick():
+    calls = []
+
+    async def batch_fn(keys):
+        calls.append(list(keys))
+        return {key: f"value-{key}" for key in keys if key != 3}
+
+    loader = BatchLoader(batch_fn, asyncio.Lock())
+
+    values = await asyncio.gather(loader.load(1), loader.load(2), loader.load(1), loader.load(3))
+
+    assert values == ["value-1", "value-2", "value-1", None]
+    assert calls == [[1, 2, 3]]
+
+    # 同一请求内再次加载命中缓存
+    assert await loader.load_many([2, 1]) == ["value-2", "value-1"]
+    assert calls == [[1, 2, 3]]
+
+
+@pytest.mark.asyncio
+async def test_batch_loader_prime_and_error():
+    async def batch_fn(keys):
+        raise RuntimeError("boom")
+
+    loader = BatchLoader(batch_fn, asyncio.Lock())
+    loader.prime(1, "primed")
+
+    assert await loader.load(1) == "primed"
+    with pytest.raises(RuntimeError):
+        await loader.load(2)
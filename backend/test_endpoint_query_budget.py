@@ -0,0 +1,155 @@
+"""
+关键读接口的查询预算（PostgreSQL）
+
+报名列表、红黑榜、开团列表的查询数不应随报名人数/黑本人数/团队数增长；
+批量加载一旦退化为逐条查询，这里会以 N+1 失败
+"""
+import os
+from contextlib import asynccontextmanager
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+
+import orjson
+import pytest
+from sqlalchemy import insert, text
+
+import app.models  # noqa: F401 - 注册全部模型
+from app.core import instrumentation
+from app.core.instrumentation import query_budget
+from app.models.archive import TeamArchive
+from app.models.base import Base
+from app.models.gold_record import GoldRecord
+from app.models.guild import Guild
+from app.models.guild_member import GuildMember
+from app.models.season_correction_factor import SeasonCorrectionFactor
+from app.models.signup import Signup
+from app.models.team import Team
+from app.models.user import User
+from app.services.guild_context_service import GuildContextService
+
+pytestmark = pytest.mark.skipif(
+    not os.getenv("TEST_DATABASE_URL"), reason="需要 TEST_DATABASE_URL 指向可用的 PostgreSQL"
+)
+
+GUILD_ID = 1
+USER_COUNT = 20
+NOW = datetime(2026, 1, 10, 20, 0)
+
+
+def _team_row(team_id, **overrides):
+    row = dict(
+        id=team_id, guild_id=GUILD_ID, creator_id=1, title=f"团队{team_id}", team_time=NOW - timedelta(days=team_id),
+        dungeon="主本", rule={}, status="open", created_at=NOW, updated_at=NOW,
+    )
+    row.update(overrides)
+    return row
+
+
+def _seed_rows():
+    """一个群组：20 名成员，每人报名同一团队、各有 3 条黑本记录；热表与归档表各有若干团队"""
+    user_ids = range(1, USER_COUNT + 1)
+    return {
+        User: [
+            dict(id=uid, qq_number=str(10000 + uid), password_hash="x", nickname=f"用户{uid}",
+                 created_at=NOW, updated_at=NOW)
+            for uid in user_ids
+        ],
+        Guild: [dict(id=GUILD_ID, guild_qq_number="20000", ukey="ukey", name="测试群", server="梦江南", owner_id=1)],
+        GuildMember: [
+            dict(guild_id=GUILD_ID, user_id=uid, role="owner" if uid == 1 else "member",
+                 group_nickname=f"群昵称{uid}" if uid % 2 else None, joined_at=NOW, created_at=NOW, updated_at=NOW)
+            for uid in user_ids
+        ],
+        Team: [_team_row(team_id) for team_id in range(1, 31)],
+        TeamArchive: [
+            _team_row(team_id, status="completed", archived_at=NOW) for team_id in range(31, 61)
+        ],
+        Signup: [
+            dict(team_id=1, submitter_id=uid, signup_user_id=uid,
+                 signup_info={"player_name": f"用户{uid}", "character_name": f"角色{uid}", "xinfa": "冰心诀"},
+                 created_at=NOW + timedelta(seconds=uid), updated_at=NOW)
+            for uid in user_ids
+        ],
+        GoldRecord: [
+            dict(guild_id=GUILD_ID, creator_id=1, dungeon="主本", run_date=date(2025, 12, 1) + timedelta(days=uid + n * 7),
+                 total_gold=1000 * uid, worker_count=25, heibenren_user_id=uid, created_at=NOW, updated_at=NOW)
+            for uid in user_ids
+            for n in range(3)
+        ],
+        SeasonCorrectionFactor: [
+            dict(guild_id=None, dungeon="主本", start_date=date(2025, 1, 1), end_date=None, correction_factor=1),
+            dict(guild_id=GUILD_ID, dungeon="主本", start_date=date(2025, 12, 10), end_date=None, correction_factor=2),
+        ],
+    }
+
+
+@asynccontextmanager
+async def _seeded_session():
+    """在独立 schema 中建表、写入种子数据，返回开启了 SQL 统计的会话"""
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+    schema = f"budget_test_{os.getpid()}"
+    admin = create_async_engine(os.environ["TEST_DATABASE_URL"])
+    async with admin.begin() as conn:
+        await conn.execute(text(f"CREATE SCHEMA {schema}"))
+
+    engine = create_async_engine(
+        os.environ["TEST_DATABASE_URL"],
+        connect_args={"server_settings": {"search_path": schema}},
+    )
+    instrumentation.install(engine.sync_engine)
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            for model, rows in _seed_rows().items():
+                await conn.execute(insert(model), rows)
+
+        GuildContextService.clear()
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            yield session
+    finally:
+        GuildContextService.clear()
+        await engine.dispose()
+        async with admin.begin() as conn:
+            await conn.execute(text(f"DROP SCHEMA {schema} CASCADE"))
+        await admin.dispose()
+
+
+@pytest.mark.asyncio
+async def test_list_signups_query_budget():
+    from app.api.v2.endpoints.signups import list_signups
+
+    async with _seeded_session() as db:
+        with query_budget(max_queries=6, max_repeats=1):
+            response = await list_signups(GUILD_ID, 1, SimpleNamespace(id=1), db)
+
+    signups = orjson.loads(response.body)["data"]
+    assert len(signups) == USER_COUNT
+    assert signups[2]["signup_info"]["submitter_name"] == "群昵称3"
+
+
+@pytest.mark.asyncio
+async def test_get_guild_ranking_query_budget():
+    from app.api.v2.endpoints.ranking import get_guild_ranking
+
+    async with _seeded_session() as db:
+        with query_budget(max_queries=11, max_repeats=1):
+            response = await get_guild_ranking(GUILD_ID, SimpleNamespace(id=1), db)
+
+    assert len(orjson.loads(response.body)["data"]["rankings"]) == USER_COUNT
+
+
+@pytest.mark.asyncio
+async def test_list_teams_page_query_budget():
+    from app.api.v2.endpoints.teams import list_teams_page
+
+    async with _seeded_session() as db:
+        with query_budget(max_queries=3, max_repeats=1):
+            response = await list_teams_page(
+                GUILD_ID, limit=50, cursor=None, status_filter=None,
+                from_date=None, to_date=None, detail=False, current_user=SimpleNamespace(id=1), db=db,
+            )
+
+    page = orjson.loads(response.body)["data"]
+    assert len(page["items"]) == 50
+    assert page["has_more"] is True
@@ -0,0 +1,38 @@
+import csv
+import io
+from datetime import date
+
+import pytest
+from fastapi import HTTPException
+
+from app.utils import export
+from app.utils.export import ensure_export_format, streaming_export
+
+
+async def _rows(count):
+    for index in range(count):
+        yield [index, date(2026, 2, 2), ["玄晶", "外观"], None, True]
+
+
+@pytest.mark.asyncio
+async def test_csv_export_streams_in_batches(monkeypatch):
+    monkeypatch.setattr(export, "_CSV_BATCH_ROWS", 2)
+    response = streaming_export("csv", "金团记录", ["ID", "日期", "掉落", "备注", "玄晶"], _rows(5))
+
+    chunks = [chunk async for chunk in response.body_iterator]
+    # 5 行按每批 2 行输出：2 + 2 + 剩余 1
+    assert len(chunks) == 3
+
+    text = b"".join(chunks).decode("utf-8")
+    assert text.startswith("﻿")
+    rows = list(csv.reader(io.StringIO(text.lstrip("﻿"))))
+    assert rows[0] == ["ID", "日期", "掉落", "备注", "玄晶"]
+    assert rows[1] == ["0", "2026-02-02", "玄晶、外观", "", "是"]
+    assert len(rows) == 6
+    assert "filename*=UTF-8''" in response.headers["content-disposition"]
+
+
+def test_unknown_export_format_rejected():
+    with pytest.raises(HTTPException) as exc_info:
+        ensure_export_format("pdf")
+    assert exc_info.value.status_code == 400
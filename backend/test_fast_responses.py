@@ -0,0 +1,63 @@
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import List
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.responses import FastJSONResponse, dump_rows, fast_success
+from app.schemas.common import ResponseModel, success
+from app.schemas.ranking import GuildRankingResponse
+from app.schemas.team import TeamOut
+from scripts.benchmark_serialization import build_ranking, build_teams
+
+
+def _client():
+    teams = build_teams(3)
+    ranking = build_ranking(3)
+    app = FastAPI(default_response_class=FastJSONResponse)
+
+    @app.get("/teams/default", response_model=ResponseModel[List[TeamOut]])
+    async def teams_default():
+        return success([TeamOut.model_validate(t) for t in teams], message="获取成功")
+
+    @app.get("/teams/fast", response_model=ResponseModel[List[TeamOut]])
+    async def teams_fast():
+        return fast_success(dump_rows(TeamOut, teams, from_attributes=True), message="获取成功")
+
+    @app.get("/ranking/default", response_model=ResponseModel[GuildRankingResponse])
+    async def ranking_default():
+        return success(ranking)
+
+    @app.get("/ranking/fast", response_model=ResponseModel[GuildRankingResponse])
+    async def ranking_fast():
+        return fast_success(ranking, message="操作成功", model=GuildRankingResponse)
+
+    return TestClient(app)
+
+
+def test_fast_path_matches_response_model_output():
+    client = _client()
+    for name in ("teams", "ranking"):
+        default = client.get(f"/{name}/default").json()
+        assert client.get(f"/{name}/fast").json() == default
+
+    # Decimal 与 response_model 序列化一致，输出为字符串
+    item = client.get("/ranking/fast").json()["data"]["rankings"][0]
+    assert item["average_gold"] == "12345.67"
+    assert item["last_heibenren_date"] == "2026-01-01"
+
+
+def test_orjson_response_handles_plain_values():
+    body = FastJSONResponse({
+        "amount": Decimal("12.50"),
+        "count": Decimal("3"),
+        "day": date(2026, 1, 5),
+        "at": datetime(2026, 1, 5, 8, 30),
+        "tags": {"a"},
+        1: "int key",
+    }).body
+    assert json.loads(body) == {
+        "amount": 12.5, "count": 3, "day": "2026-01-05", "at": "2026-01-05T08:30:00", "tags": ["a"], "1": "int key",
+    }
@@ -0,0 +1,50 @@
+from datetime import date
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.services.gold_analytics_service import GoldAnalyticsService
+
+
+class RecordingSession:
+    def __init__(self):
+        self.statements = []
+        self.commits = 0
+
+    async def execute(self, statement):
+        self.statements.append(str(statement.compile(dialect=postgresql.dialect())))
+
+    async def commit(self):
+        self.commits += 1
+
+
+def test_period_boundaries():
+    assert GoldAnalyticsService.period_start("week", date(2026, 1, 8)) == date(2026, 1, 5)
+    assert GoldAnalyticsService.period_end("week", date(2026, 1, 5)) == date(2026, 1, 12)
+    assert GoldAnalyticsService.period_start("month", date(2026, 2, 17)) == date(2026, 2, 1)
+    assert GoldAnalyticsService.period_end("month", date(2026, 2, 1)) == date(2026, 3, 1)
+
+
+def test_build_stat_ratios():
+    stat = GoldAnalyticsService.build_stat({
+        "record_count": 4, "total_gold": 40000, "subsidy_gold": 4000, "xuanjing_count": 1
+    })
+
+    assert stat["average_gold"] == 10000
+    assert stat["subsidy_ratio"] == 0.1
+    assert stat["xuanjing_rate"] == 0.25
+    assert GoldAnalyticsService.build_stat({})["average_gold"] == 0
+
+
+@pytest.mark.asyncio
+async def test_refresh_only_rebuilds_affected_periods():
+    db = RecordingSession()
+
+    # 同一周内的两个日期 + 跨月的旧日期
+    await GoldAnalyticsService.refresh(db, 1, [date(2026, 2, 3), date(2026, 2, 4), date(2026, 1, 30)])
+
+    inserts = [sql for sql in db.statements if sql.startswith("INSERT INTO gold_rollups")]
+    # 周：1/26、2/2 两个周期；月：1 月、2 月两个周期
+    assert len(inserts) == 4
+    assert "pg_advisory_xact_lock" in db.statements[0]
+    assert db.commits == 1
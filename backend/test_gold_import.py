@@ -0,0 +1,160 @@
+import io
+from datetime import date
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.services.gold_import_service import GoldImportService
+from app.services.job_queue import JobQueue
+
+
+def test_resolve_columns_accepts_export_header():
+    columns = GoldImportService.resolve_columns(
+        ["﻿记录ID", "日期", "副本", "总金团", "补贴", "打工人数", "出玄晶", "黑本人"]
+    )
+    assert columns["run_date"] == 1
+    assert columns["worker_count"] == 5
+    assert "heibenren_user_id" not in columns
+
+
+def test_resolve_columns_requires_core_fields():
+    with pytest.raises(ValueError, match="总金团"):
+        GoldImportService.resolve_columns(["run_date", "dungeon", "worker_count"])
+
+
+def test_parse_row_normalizes_values():
+    columns = GoldImportService.resolve_columns(
+        ["run_date", "dungeon", "total_gold", "worker_count", "has_xuanjing",
+         "heibenren_character_name", "special_drops"]
+    )
+    row = GoldImportService.parse_row(
+        ["2024/03/01", "25人英雄", "12000", "20", "是", "剑心", "玄晶、外观"], columns
+    )
+    assert row == (
+        date(2024, 3, 1), "25人英雄", 12000, 0, 20, True, None,
+        '{"character_name": "剑心"}', '["玄晶", "外观"]', None
+    )
+
+
+@pytest.mark.parametrize("values, message", [
+    (["2024-13-01", "副本", "1", "1"], "日期格式错误"),
+    (["2024-01-01", "副本", "-1", "1"], "总金团不能为负数"),
+    (["2024-01-01", "副本", "1", ""], "打工人数不能为空"),
+])
+def test_parse_row_rejects_invalid_values(values, message):
+    columns = GoldImportService.resolve_columns(["run_date", "dungeon", "total_gold", "worker_count"])
+    with pytest.raises(ValueError, match=message):
+        GoldImportService.parse_row(values, columns)
+
+
+class FakeResult:
+    def __init__(self, rows=(), scalar=None, rowcount=0):
+        self.rows = list(rows)
+        self.value = scalar
+        self.rowcount = rowcount
+
+    def all(self):
+        return self.rows
+
+    def scalar(self):
+        return self.value
+
+
+class FakeImportSession:
+    """记录执行的语句与 COPY 写入的行；去重计数、插入行数按暂存行模拟"""
+
+    def __init__(self, existing=0):
+        self.existing = existing
+        self.statements = []
+        self.copied = []
+        self.committed = False
+
+    async def execute(self, statement):
+        sql = str(statement.compile(dialect=postgresql.dialect()))
+        self.statements.append(sql)
+        unique = len({(row[1], row[2], row[3], row[5], row[7]) for row in self.copied})
+        if sql.startswith("SELECT count(*)"):
+            return FakeResult(scalar=unique)
+        if sql.startswith("INSERT INTO gold_records"):
+            return FakeResult(rowcount=unique - self.existing)
+        return FakeResult()
+
+    async def connection(self):
+        session = self
+
+        class Driver:
+            async def copy_records_to_table(self, table_name, records, columns):
+                session.copied.extend([row async for row in records])
+
+        class Raw:
+            driver_connection = Driver()
+
+        class Connection:
+            async def get_raw_connection(self):
+                return Raw()
+
+        return Connection()
+
+    async def commit(self):
+        self.committed = True
+
+    async def rollback(self):
+        pass
+
+
+@pytest.fixture
+def no_jobs(monkeypatch):
+    jobs = []
+
+    async def enqueue(db, job_type, payload, dedupe_key=None):
+        jobs.append(job_type)
+    monkeypatch.setattr(JobQueue, "enqueue", enqueue)
+    return jobs
+
+
+@pytest.mark.asyncio
+async def test_import_dedupes_rows_within_file(no_jobs):
+    db = FakeImportSession(existing=1)
+    lines = [
+        "日期,副本,总金团,打工人数\n",
+        "2024-03-01,25人英雄,12000,20\n",
+        "2024-03-01,25人英雄,12000,20\n",
+        "2024-03-02,25人英雄,9000,20\n",
+    ]
+
+    report = await GoldImportService.import_csv(db, 1, 1, lines)
+
+    insert_sql = next(sql for sql in db.statements if sql.startswith("INSERT INTO gold_records"))
+    assert "DISTINCT ON (gold_records_import.run_date, gold_records_import.dungeon" in insert_sql
+    assert report["total_rows"] == 3
+    assert report["duplicates"] == 1
+    assert report["imported"] == 1
+    assert report["skipped"] == 2
+    assert db.committed
+
+
+@pytest.mark.asyncio
+async def test_failed_import_returns_422_with_report(monkeypatch):
+    from types import SimpleNamespace
+
+    from fastapi import HTTPException
+
+    from app.api.v2.endpoints import gold_records as gold_api
+
+    async def require_member(db, guild_id, user_id, roles=None):
+        return None
+
+    async def import_csv(db, guild_id, creator_id, lines):
+        return {"total_rows": 1, "imported": 0, "skipped": 0, "duplicates": 0, "error_count": 1,
+                "errors": [{"line": 2, "message": "总金团不能为负数: -1"}]}
+
+    monkeypatch.setattr(gold_api.GuildContextService, "require_member", require_member)
+    monkeypatch.setattr(gold_api.GoldImportService, "import_csv", import_csv)
+
+    upload = SimpleNamespace(file=io.BytesIO("日期,副本,总金团,打工人数\n".encode()))
+    with pytest.raises(HTTPException) as exc:
+        await gold_api.import_gold_records(1, file=upload, current_user=SimpleNamespace(id=1), db=None)
+
+    assert exc.value.status_code == 422
+    assert exc.value.detail["error_count"] == 1
+    assert exc.value.detail["errors"][0]["line"] == 2
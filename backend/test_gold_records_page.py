@@ -0,0 +1,118 @@
+from datetime import date, datetime
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
+
+from app.api.v2.endpoints import gold_records as gold_api
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self.rows
+
+
+class FakeSession:
+    """记录执行的语句，返回预置的金团记录"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.statements = []
+
+    async def execute(self, statement):
+        self.statements.append(str(statement.compile(dialect=postgresql.dialect())))
+        return FakeResult(self.rows)
+
+
+class FakeLoader:
+    """记录每次批量加载的键"""
+
+    def __init__(self, values):
+        self.values = values
+        self.calls = []
+
+    async def load_many(self, keys):
+        self.calls.append(list(keys))
+        return [self.values.get(key) for key in keys]
+
+
+def _record(record_id, run_date, heibenren_user_id=None):
+    now = datetime(2026, 1, 10)
+    return SimpleNamespace(
+        id=record_id, guild_id=1, team_id=None, creator_id=1, dungeon="主本", run_date=run_date, total_gold=1000,
+        subsidy_gold=0, worker_count=25, special_drops=None, xuanjing_drops=None, has_xuanjing=False,
+        heibenren_user_id=heibenren_user_id, heibenren_character_id=None,
+        heibenren_info={"character_name": "角色"} if heibenren_user_id else None,
+        notes=None, created_at=now, updated_at=now,
+    )
+
+
+@pytest.fixture
+def loaders(monkeypatch):
+    users = FakeLoader({7: SimpleNamespace(id=7, nickname="用户七"), 8: SimpleNamespace(id=8, nickname="用户八")})
+    members = FakeLoader({(1, 7): SimpleNamespace(user_id=7, group_nickname="群昵称七")})
+    monkeypatch.setattr(gold_api, "get_loaders", lambda db: SimpleNamespace(users=users, guild_members=members))
+
+    async def require_member(db, guild_id, user_id):
+        return None
+    monkeypatch.setattr(gold_api.GuildContextService, "require_member", require_member)
+    return users, members
+
+
+async def _list_page(db, **params):
+    params = {"limit": 2, "cursor": None, "start_date": None, "end_date": None, "dungeon": None,
+              "team_id": None, "heibenren_user_id": None, **params}
+    response = await gold_api.list_gold_records_page(1, current_user=SimpleNamespace(id=1), db=db, **params)
+    return response["data"]
+
+
+@pytest.mark.asyncio
+async def test_page_returns_cursor_and_batches_heibenren_lookup(loaders):
+    users, members = loaders
+    rows = [_record(5, date(2026, 1, 9), 7), _record(4, date(2026, 1, 8), 8), _record(3, date(2026, 1, 8), 7)]
+    db = FakeSession(rows)
+
+    page = await _list_page(db)
+
+    sql = db.statements[0]
+    assert "ORDER BY gold_records.run_date DESC, gold_records.id DESC" in sql
+    assert "LIMIT" in sql
+    assert [item["id"] for item in page["items"]] == [5, 4]
+    assert page["has_more"] is True
+    assert page["next_cursor"] == "2026-01-08_4"
+
+    # 黑本人信息：群昵称优先，其次用户昵称；整页只批量加载一次
+    assert page["items"][0]["heibenren_info"]["user_name"] == "群昵称七"
+    assert page["items"][1]["heibenren_info"]["user_name"] == "用户八"
+    assert page["items"][0]["heibenren_info"]["character_name"] == "角色"
+    assert users.calls == [[7, 8]]
+    assert members.calls == [[(1, 7), (1, 8)]]
+
+    # 下一页以 (run_date, id) 作为 keyset 条件
+    await _list_page(db, cursor=page["next_cursor"])
+    assert "(gold_records.run_date, gold_records.id) < (" in db.statements[1]
+
+
+@pytest.mark.asyncio
+async def test_last_page_has_no_cursor(loaders):
+    page = await _list_page(FakeSession([_record(1, date(2026, 1, 1))]))
+
+    assert page["has_more"] is False
+    assert page["next_cursor"] is None
+    assert page["items"][0]["heibenren_info"]["user_name"] is None
+
+
+def test_cursor_round_trip_and_invalid_cursor():
+    cursor = gold_api._encode_cursor(_record(12, date(2026, 2, 3)))
+    assert gold_api._decode_cursor(cursor) == (date(2026, 2, 3), 12)
+
+    with pytest.raises(HTTPException) as exc:
+        gold_api._decode_cursor("bad-cursor")
+    assert exc.value.status_code == 400
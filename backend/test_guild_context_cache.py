@@ -0,0 +1,110 @@
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from app.database import REPLICA_SESSION_KEY
+from app.services.guild_context_service import GuildContextService
+
+
+class FakeRowResult:
+    def __init__(self, row):
+        self.row = row
+
+    def first(self):
+        return self.row
+
+
+class FakeAsyncSession:
+    def __init__(self, rows):
+        self.rows = list(rows)
+        self.info = {}
+        self.executed = 0
+
+    async def execute(self, _statement):
+        if not self.rows:
+            raise AssertionError("缺少预期的数据库查询结果")
+        self.executed += 1
+        return FakeRowResult(self.rows.pop(0))
+
+
+def make_row(role="member", nickname=None):
+    guild = SimpleNamespace(id=1, name="测试群", guild_qq_number="10001")
+    member = SimpleNamespace(id=7, role=role, group_nickname=nickname) if role else None
+    return (guild, member)
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    GuildContextService.clear()
+    yield
+    GuildContextService.clear()
+
+
+@pytest.mark.asyncio
+async def test_resolve_is_memoized_within_request_and_cached_across_requests():
+    first_request = FakeAsyncSession([make_row(role="helper", nickname="小秧")])
+
+    context = await GuildContextService.resolve(first_request, 1, 42)
+    again = await GuildContextService.resolve(first_request, 1, 42)
+
+    assert context is again
+    assert context.is_admin
+    assert context.group_nickname == "小秧"
+    assert first_request.executed == 1
+
+    second_request = FakeAsyncSession([])
+    cached = await GuildContextService.resolve(second_request, 1, 42)
+
+    assert cached == context
+    assert second_request.executed == 0
+
+
+@pytest.mark.asyncio
+async def test_invalidate_member_reloads_role():
+    await GuildContextService.resolve(FakeAsyncSession([make_row(role="helper")]), 1, 42)
+
+    GuildContextService.invalidate_member(1, 42)
+    db = FakeAsyncSession([make_row(role="member")])
+    context = await GuildContextService.resolve(db, 1, 42)
+
+    assert context.role == "member"
+    assert db.executed == 1
+
+
+@pytest.mark.asyncio
+async def test_require_member_rejects_non_member_and_missing_guild():
+    with pytest.raises(HTTPException) as exc_info:
+        await GuildContextService.require_member(FakeAsyncSession([make_row(role=None)]), 1, 42)
+    assert exc_info.value.status_code == 403
+
+    GuildContextService.clear()
+    with pytest.raises(HTTPException) as exc_info:
+        await GuildContextService.require_member(FakeAsyncSession([None]), 1, 42)
+    assert exc_info.value.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_require_member_checks_roles():
+    db = FakeAsyncSession([make_row(role="member")])
+
+    with pytest.raises(HTTPException) as exc_info:
+        await GuildContextService.require_member(db, 1, 42, roles=["owner", "helper"])
+    assert exc_info.value.status_code == 403
+    assert exc_info.value.detail == "权限不足"
+
+
+@pytest.mark.asyncio
+async def test_replica_session_result_is_not_cached_across_requests():
+    replica = FakeAsyncSession([make_row(role="member")])
+    replica.info[REPLICA_SESSION_KEY] = True
+
+    await GuildContextService.resolve(replica, 1, 42)
+    await GuildContextService.resolve(replica, 1, 42)
+    assert replica.executed == 1
+
+    # 副本可能滞后（例如刚升为管理员），后续请求仍从主库加载
+    primary = FakeAsyncSession([make_row(role="helper")])
+    context = await GuildContextService.resolve(primary, 1, 42)
+    assert context.role == "helper"
+    assert primary.executed == 1
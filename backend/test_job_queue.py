@@ -0,0 +1,282 @@
+import asyncio
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.job_queue import JobQueue, _wakeup_workers
+
+
+class FakeScalarResult:
+    def __init__(self, value):
+        self.value = value
+
+    def scalar_one_or_none(self):
+        return self.value
+
+
+class FakeAsyncSession:
+    def __init__(self, existing=None):
+        self.existing = existing
+        self.added = []
+        self.info = {}
+
+    async def execute(self, _statement):
+        return FakeScalarResult(self.existing)
+
+    def add(self, obj):
+        self.added.append(obj)
+
+
+@pytest.mark.asyncio
+async def test_enqueue_adds_job_to_current_transaction():
+    db = FakeAsyncSession()
+
+    job = await JobQueue.enqueue(db, "ranking.recompute", {"guild_id": 1}, dedupe_key="ranking.recompute:1")
+
+    assert db.added == [job]
+    assert job.status == "pending"
+    assert job.payload == {"guild_id": 1}
+    assert db.info["job_queue_wakeup"] is True
+
+
+@pytest.mark.asyncio
+async def test_enqueue_reuses_pending_job_with_same_dedupe_key():
+    existing = SimpleNamespace(id=3)
+    db = FakeAsyncSession(existing=existing)
+
+    job = await JobQueue.enqueue(db, "ranking.recompute", {"guild_id": 1}, dedupe_key="ranking.recompute:1")
+
+    assert job is existing
+    assert db.added == []
+
+
+def test_commit_wakes_workers_and_retry_backs_off():
+    JobQueue._wakeup = asyncio.Event()
+    try:
+        _wakeup_workers(SimpleNamespace(info={"job_queue_wakeup": True}))
+        assert JobQueue._wakeup.is_set()
+    finally:
+        JobQueue._wakeup = None
+
+    assert JobQueue.retry_delay(2) == 2 * JobQueue.retry_delay(1)
+    assert JobQueue.retry_delay(1) > timedelta(0)
+
+
+def test_handlers_are_registered():
+    import app.services.job_handlers  # noqa: F401
+
+    for job_type in ("ranking.recompute", "weekly_records.propagate", "bot.call_members", "bot.publish_card"):
+        assert job_type in JobQueue._handlers
+
+
+@pytest.mark.asyncio
+async def test_weekly_propagation_uses_week_from_enqueue_time(monkeypatch):
+    from app.api.v2.endpoints import gold_records as gold_api
+    from app.api.v2.endpoints import my_records as my_records_api
+    from app.services import job_handlers
+
+    # 入队时是上周，负载中带上所属周
+    enqueued = []
+
+    async def enqueue(db, job_type, payload, dedupe_key=None):
+        enqueued.append((job_type, payload, dedupe_key))
+    monkeypatch.setattr(gold_api.JobQueue, "enqueue", enqueue)
+    monkeypatch.setattr(my_records_api, "get_week_start_date", lambda: date(2026, 1, 5))
+
+    gold_record = SimpleNamespace(
+        id=9, guild_id=1, team_id=5, worker_count=2, heibenren_user_id=None, run_date=date(2026, 1, 11)
+    )
+    await gold_api._enqueue_gold_record_jobs(FakeAsyncSession(), gold_record)
+
+    job_type, payload, dedupe_key = enqueued[-1]
+    assert job_type == "weekly_records.propagate"
+    assert payload == {"gold_record_id": 9, "week_start": "2026-01-05"}
+    assert dedupe_key == "weekly_records.propagate:9:2026-01-05"
+
+    # 周一之后才执行，仍写入入队时的周
+    monkeypatch.setattr(my_records_api, "get_week_start_date", lambda: date(2026, 1, 12))
+    weeks = []
+
+    async def auto_update(db, record, week_start=None):
+        weeks.append(week_start)
+    monkeypatch.setattr(gold_api, "_auto_update_weekly_records", auto_update)
+
+    await job_handlers.propagate_weekly_records(FakeAsyncSession(existing=gold_record), payload)
+    await job_handlers.propagate_weekly_records(FakeAsyncSession(existing=gold_record), {"gold_record_id": 9})
+
+    assert weeks == [date(2026, 1, 5), None]
+
+
+class RecordingSession:
+    """记录执行的语句（替代 AsyncSessionLocal）"""
+    statements = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *_exc):
+        return False
+
+    async def execute(self, statement):
+        RecordingSession.statements.append(statement)
+        return SimpleNamespace(rowcount=1)
+
+    async def commit(self):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_stop_requeues_jobs_cancelled_mid_execution(monkeypatch):
+    from sqlalchemy.dialects import postgresql
+
+    import app.database
+
+    monkeypatch.setattr(app.database, "AsyncSessionLocal", RecordingSession)
+    RecordingSession.statements = []
+    started = asyncio.Event()
+
+    async def block(db, payload):
+        started.set()
+        await asyncio.Event().wait()
+
+    monkeypatch.setitem(JobQueue._handlers, "test.block", block)
+    job = SimpleNamespace(
+        id=42, job_type="test.block", payload={}, attempts=1, max_attempts=5, locked_at=datetime(2026, 1, 1, 8)
+    )
+    JobQueue._workers = [asyncio.create_task(JobQueue._execute(job))]
+    await started.wait()
+
+    await JobQueue.stop()
+
+    assert JobQueue._running == {}
+    [statement] = RecordingSession.statements
+    sql = str(statement.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+    assert sql.startswith("UPDATE background_jobs SET status='pending'")
+    assert "background_jobs.status = 'running'" in sql
+    assert "background_jobs.id = 42 AND background_jobs.locked_at = '2026-01-01 08:00:00'" in sql
+
+
+@pytest.mark.asyncio
+async def test_worker_loop_recovers_stale_jobs_periodically(monkeypatch):
+    from app.core.config import settings
+
+    recovered = []
+
+    async def recover():
+        recovered.append(True)
+
+    async def claim():
+        JobQueue._stopping = len(recovered) >= 2
+        return None
+
+    monkeypatch.setattr(settings, "JOB_RECOVER_INTERVAL", 0)
+    monkeypatch.setattr(settings, "JOB_POLL_INTERVAL", 0)
+    monkeypatch.setattr(JobQueue, "_recover", recover)
+    monkeypatch.setattr(JobQueue, "_claim", claim)
+    JobQueue._stopping = False
+    JobQueue._wakeup = asyncio.Event()
+    try:
+        await asyncio.wait_for(JobQueue._worker_loop(0), timeout=1)
+    finally:
+        JobQueue._wakeup = None
+
+    assert len(recovered) == 2
+
+
+def _compile(statement):
+    from sqlalchemy.dialects import postgresql
+
+    return str(statement.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+@pytest.mark.asyncio
+async def test_execute_heartbeats_and_writes_result_only_for_its_claim(monkeypatch):
+    import app.database
+    from app.core.config import settings
+
+    monkeypatch.setattr(app.database, "AsyncSessionLocal", RecordingSession)
+    monkeypatch.setattr(settings, "JOB_HEARTBEAT_INTERVAL", 0.01)
+    RecordingSession.statements = []
+
+    async def slow(db, payload):
+        await asyncio.sleep(0.05)
+
+    monkeypatch.setitem(JobQueue._handlers, "test.slow", slow)
+    claimed_at = datetime(2026, 1, 1, 8)
+    job = SimpleNamespace(id=7, job_type="test.slow", payload={}, attempts=1, max_attempts=5, locked_at=claimed_at)
+
+    await JobQueue._execute(job)
+
+    sqls = [_compile(statement) for statement in RecordingSession.statements]
+    heartbeats, [final] = sqls[:-1], sqls[-1:]
+    assert heartbeats
+    # 第一次心跳按领取时的 locked_at 校验，之后按刷新后的值
+    assert "background_jobs.locked_at = '2026-01-01 08:00:00'" in heartbeats[0]
+    assert all(sql.startswith("UPDATE background_jobs SET locked_at=") for sql in heartbeats)
+    assert "status='succeeded'" in final
+    assert "background_jobs.status = 'running'" in final
+    assert "background_jobs.locked_at = '2026-01-01 08:00:00'" not in final
+    assert JobQueue._running == {}
+
+
+@pytest.mark.asyncio
+async def test_recover_fails_stale_jobs_without_attempts_left(monkeypatch):
+    import app.database
+
+    monkeypatch.setattr(app.database, "AsyncSessionLocal", RecordingSession)
+    RecordingSession.statements = []
+
+    await JobQueue._recover()
+
+    exhausted, recovered, _purged = [_compile(statement) for statement in RecordingSession.statements]
+    assert exhausted.startswith("UPDATE background_jobs SET status='failed'")
+    assert "background_jobs.attempts >= background_jobs.max_attempts" in exhausted
+    assert recovered.startswith("UPDATE background_jobs SET status='pending'")
+
+
+@pytest.mark.asyncio
+async def test_bot_posts_retry_only_when_request_was_not_sent(monkeypatch):
+    import httpx
+
+    from app.services import job_handlers
+    from app.services.job_queue import PermanentJobError
+
+    real_client = httpx.AsyncClient
+
+    def client_raising(error):
+        def respond(request):
+            raise error("bot", request=request)
+        return lambda timeout: real_client(timeout=timeout, transport=httpx.MockTransport(respond))
+
+    # 连接失败：请求未发出，交给任务队列重试
+    monkeypatch.setattr(job_handlers.httpx, "AsyncClient", client_raising(httpx.ConnectError))
+    with pytest.raises(httpx.ConnectError):
+        await job_handlers.call_members(None, {"qq_numbers": ["1"]})
+
+    # 读超时：消息可能已发出，不再重试
+    monkeypatch.setattr(job_handlers.httpx, "AsyncClient", client_raising(httpx.ReadTimeout))
+    with pytest.raises(PermanentJobError):
+        await job_handlers.publish_card(None, {"group_id": "1"})
+
+
+@pytest.mark.asyncio
+async def test_permanent_job_error_fails_without_retry(monkeypatch):
+    import app.database
+    from app.services.job_queue import PermanentJobError
+
+    monkeypatch.setattr(app.database, "AsyncSessionLocal", RecordingSession)
+    RecordingSession.statements = []
+
+    async def give_up(db, payload):
+        raise PermanentJobError("结果未知")
+
+    monkeypatch.setitem(JobQueue._handlers, "test.give_up", give_up)
+    job = SimpleNamespace(
+        id=8, job_type="test.give_up", payload={}, attempts=1, max_attempts=3, locked_at=datetime(2026, 1, 1, 8)
+    )
+
+    await JobQueue._execute(job)
+
+    [final] = [_compile(statement) for statement in RecordingSession.statements]
+    assert final.startswith("UPDATE background_jobs SET status='failed'")
@@ -0,0 +1,49 @@
+import json
+import logging
+import queue
+
+import pytest
+
+from app.core.logging import BoundedQueueHandler, JsonFormatter
+
+
+def _record(message):
+    return logging.LogRecord("app.test", logging.INFO, __file__, 1, message, None, None)
+
+
+def _drain(log_queue):
+    messages = []
+    while not log_queue.empty():
+        messages.append(log_queue.get_nowait().getMessage())
+    return messages
+
+
+@pytest.mark.parametrize("policy, kept", [
+    ("drop_newest", ["a", "b"]),
+    ("drop_oldest", ["b", "c"]),
+])
+def test_overflow_policy_counts_dropped_records(policy, kept):
+    log_queue = queue.Queue(maxsize=2)
+    handler = BoundedQueueHandler(log_queue, policy)
+
+    for message in ("a", "b", "c"):
+        handler.handle(_record(message))
+
+    assert _drain(log_queue) == kept
+    assert handler.dropped == 1
+
+
+def test_unknown_policy_rejected():
+    with pytest.raises(ValueError):
+        BoundedQueueHandler(queue.Queue(), "discard")
+
+
+def test_json_formatter_includes_extra_fields():
+    record = _record("请求完成")
+    record.db_query_count = 3
+
+    data = json.loads(JsonFormatter().format(record))
+
+    assert data["message"] == "请求完成"
+    assert data["level"] == "INFO"
+    assert data["db_query_count"] == 3
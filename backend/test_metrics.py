@@ -0,0 +1,90 @@
+import json
+import os
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import metrics
+from app.core.config import settings
+from app.core.metrics import MetricsRegistry, render_snapshots
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("job_seconds", "耗时", ("kind",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, kind="a")
+    histogram.observe(0.5, kind="a")
+    registry.counter("hits_total", "次数", ("cache",)).inc(cache='a"b')
+
+    text = render_snapshots([registry.snapshot()])
+
+    assert '# TYPE job_seconds histogram' in text
+    assert 'job_seconds_bucket{kind="a",le="0.1"} 1' in text
+    assert 'job_seconds_bucket{kind="a",le="1.0"} 2' in text
+    assert 'job_seconds_bucket{kind="a",le="+Inf"} 2' in text
+    assert 'job_seconds_count{kind="a"} 2' in text
+    assert 'hits_total{cache="a\\"b"} 1' in text
+
+
+def test_multiprocess_snapshots_are_merged(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_MULTIPROCESS_DIR", str(tmp_path))
+    registry = MetricsRegistry()
+    registry.counter("requests_total", "次数").inc(2)
+    registry.gauge("in_flight", "进行中").set(1)
+
+    # 另一个存活的工作进程
+    other = MetricsRegistry()
+    other.counter("requests_total", "次数").inc(3)
+    other.gauge("in_flight", "进行中").set(4)
+    (tmp_path / "metrics-1.json").write_text(json.dumps(other.snapshot()))
+    # 已退出的工作进程：计数器保留，仪表丢弃
+    (tmp_path / "metrics-2.json").write_text(json.dumps(other.snapshot()))
+    os.utime(tmp_path / "metrics-2.json", (0, 0))
+
+    text = registry.render()
+
+    assert "requests_total 8" in text
+    assert "in_flight 5" in text
+
+
+def test_dropped_log_records_counter_survives_exited_process(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_MULTIPROCESS_DIR", str(tmp_path))
+    monkeypatch.setattr(metrics.LoggerManager, "_queue_handler", SimpleNamespace(dropped=2))
+
+    # 已退出的工作进程丢弃过 5 条日志
+    exited = MetricsRegistry()
+    exited.counter("log_records_dropped_total", "丢弃").set_function(lambda: 5)
+    (tmp_path / "metrics-1.json").write_text(json.dumps(exited.snapshot()))
+    os.utime(tmp_path / "metrics-1.json", (0, 0))
+
+    text = metrics.registry.render()
+
+    assert "# TYPE log_records_dropped_total counter" in text
+    assert "log_records_dropped_total 7.0" in text
+
+
+def test_metrics_endpoint_uses_route_template():
+    from app.main import app
+
+    metrics.registry.reset()
+    client = TestClient(app)
+    client.get("/health")
+    client.get("/health")
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert 'http_request_duration_seconds_count{method="GET",route="/health",status="200"} 2' in response.text
+    assert "db_pool_checked_out 0" in response.text
+
+
+@pytest.mark.asyncio
+async def test_slot_lock_wait_is_observed():
+    from app.services.slot_allocation_service import SlotAllocationService
+
+    metrics.registry.reset()
+    async with SlotAllocationService._team_lock(1):
+        pass
+
+    assert metrics.SLOT_LOCK_WAIT._values[()]["count"] == 1
@@ -0,0 +1,62 @@
+import pytest
+from alembic.script import ScriptDirectory
+
+from app import migrate
+from app.core.config import settings
+
+
+@pytest.fixture(autouse=True)
+def isolated_head_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(migrate, "_head_cache", None)
+    monkeypatch.setattr(migrate.tempfile, "gettempdir", lambda: str(tmp_path))
+
+
+def test_head_revision_cached_across_processes(monkeypatch):
+    head = migrate.get_head_revision()
+    assert head == ScriptDirectory.from_config(migrate._alembic_config()).get_current_head()
+
+    # 模拟新的工作进程：进程内缓存为空，应直接读取磁盘缓存而不解析迁移脚本
+    monkeypatch.setattr(migrate, "_head_cache", None)
+
+    def fail(*_args, **_kwargs):
+        raise AssertionError("不应重新解析迁移脚本")
+
+    monkeypatch.setattr(ScriptDirectory, "from_config", fail)
+    assert migrate.get_head_revision() == head
+
+
+def _patch_revisions(monkeypatch, current, calls):
+    async def get_current_revision():
+        calls.append("current")
+        return current
+
+    monkeypatch.setattr(migrate, "get_head_revision", lambda: "head")
+    monkeypatch.setattr(migrate, "get_current_revision", get_current_revision)
+    monkeypatch.setattr(migrate, "run_migrations", lambda: calls.append("upgrade"))
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("mode, current, expected", [
+    ("auto", "head", ["current"]),
+    ("auto", "old", ["current", "upgrade"]),
+    ("skip", "old", []),
+])
+async def test_ensure_schema_modes(monkeypatch, mode, current, expected):
+    calls = []
+    _patch_revisions(monkeypatch, current, calls)
+    monkeypatch.setattr(settings, "MIGRATION_MODE", mode)
+
+    await migrate.ensure_schema()
+
+    assert calls == expected
+
+
+@pytest.mark.asyncio
+async def test_check_mode_refuses_outdated_schema(monkeypatch):
+    calls = []
+    _patch_revisions(monkeypatch, "old", calls)
+    monkeypatch.setattr(settings, "MIGRATION_MODE", "check")
+
+    with pytest.raises(RuntimeError, match="app.migrate"):
+        await migrate.ensure_schema()
+    assert "upgrade" not in calls
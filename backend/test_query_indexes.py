@@ -0,0 +1,144 @@
+import json
+import os
+import re
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import pytest
+from sqlalchemy import insert, text
+
+import app.models  # noqa: F401 - 注册全部模型
+from app.models.base import Base
+from app.models.gold_record import GoldRecord
+from app.models.guild_member import GuildMember
+from app.models.ranking_snapshot import RankingSnapshot
+from app.models.signup import Signup
+from app.models.weekly_record import WeeklyRecord
+
+MIGRATION = Path(__file__).parent / "alembic" / "versions" / "2026_02_17_0001_add_hot_query_indexes.py"
+
+# 热点查询 -> 期望使用的索引
+HOT_QUERIES = {
+    "ix_gold_records_guild_run_date_active": (
+        "SELECT id FROM gold_records WHERE guild_id = 3 AND deleted_at IS NULL "
+        "ORDER BY run_date DESC, id DESC LIMIT 20"
+    ),
+    "ix_gold_records_guild_heibenren_run_date": (
+        "SELECT run_date FROM gold_records WHERE guild_id = 3 AND heibenren_user_id = 7 "
+        "AND deleted_at IS NULL ORDER BY run_date DESC"
+    ),
+    "ix_signups_team_active_created_at": (
+        "SELECT id FROM signups WHERE team_id = 5 AND cancelled_at IS NULL ORDER BY created_at"
+    ),
+    "ix_ranking_snapshots_guild_user_date": (
+        "SELECT id FROM ranking_snapshots WHERE guild_id = 3 AND user_id = 7 "
+        "ORDER BY snapshot_date DESC LIMIT 1"
+    ),
+    "ix_guild_members_guild_user_active": (
+        "SELECT id FROM guild_members WHERE guild_id = 3 AND user_id = 7 AND left_at IS NULL"
+    ),
+    "ix_weekly_records_user_week": (
+        "SELECT id FROM weekly_records WHERE user_id = 7 AND week_start_date = DATE '2026-01-05'"
+    ),
+}
+
+
+def test_migration_matches_model_indexes():
+    """迁移创建的索引与模型声明一致（否则 autogenerate 会产生多余的差异）"""
+    migrated = set(re.findall(r"create_index\(\s*'(\w+)'", MIGRATION.read_text(encoding="utf-8")))
+    declared = {
+        index.name
+        for table in Base.metadata.tables.values()
+        for index in table.indexes
+        if index.name in HOT_QUERIES
+    }
+    assert migrated == declared == set(HOT_QUERIES)
+
+
+def _index_names(plan):
+    """递归收集执行计划中使用的索引"""
+    names = set()
+    if isinstance(plan, dict):
+        if "Index Name" in plan:
+            names.add(plan["Index Name"])
+        for value in plan.values():
+            names |= _index_names(value)
+    elif isinstance(plan, list):
+        for item in plan:
+            names |= _index_names(item)
+    return names
+
+
+def _seed_rows():
+    """模拟多个群组/团队的数据分布：目标群组只占一小部分"""
+    now = datetime(2026, 1, 10)
+    gold_records, signups, snapshots, members, weekly = [], [], [], [], []
+    for i in range(6000):
+        guild_id = i % 30 + 1
+        gold_records.append(dict(
+            guild_id=guild_id, creator_id=1, dungeon="主本", run_date=date(2025, 1, 1) + timedelta(days=i % 400),
+            total_gold=1000, worker_count=25, heibenren_user_id=i % 50 + 1,
+            deleted_at=now if i % 20 == 0 else None, created_at=now, updated_at=now,
+        ))
+        signups.append(dict(
+            team_id=i % 300 + 1, submitter_id=1, signup_info={}, created_at=now + timedelta(seconds=i),
+            cancelled_at=now if i % 4 == 0 else None, updated_at=now,
+        ))
+        snapshots.append(dict(
+            guild_id=guild_id, user_id=i % 50 + 1, rank_position=1, rank_score=1, heibenren_count=1,
+            total_gold=1, average_gold=1, corrected_average_gold=1, snapshot_date=now - timedelta(hours=i),
+        ))
+        members.append(dict(
+            guild_id=guild_id, user_id=i + 1, role="member", joined_at=now, created_at=now, updated_at=now,
+            left_at=now if i % 10 == 0 else None,
+        ))
+        weekly.append(dict(
+            user_id=i % 200 + 1, character_id=i, week_start_date=date(2025, 1, 6) + timedelta(weeks=i % 60),
+            dungeon_name="主本", created_at=now, updated_at=now,
+        ))
+    return {
+        GoldRecord: gold_records, Signup: signups, RankingSnapshot: snapshots,
+        GuildMember: members, WeeklyRecord: weekly,
+    }
+
+
+@pytest.mark.skipif(not os.getenv("TEST_DATABASE_URL"), reason="需要 TEST_DATABASE_URL 指向可用的 PostgreSQL")
+@pytest.mark.asyncio
+async def test_hot_queries_use_composite_indexes():
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    schema = f"explain_test_{os.getpid()}"
+    admin = create_async_engine(os.environ["TEST_DATABASE_URL"])
+    async with admin.begin() as conn:
+        await conn.execute(text(f"CREATE SCHEMA {schema}"))
+
+    engine = create_async_engine(
+        os.environ["TEST_DATABASE_URL"],
+        connect_args={"server_settings": {"search_path": schema}},
+    )
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            # 只验证执行计划，去掉外键以便直接写入种子数据
+            fks = await conn.execute(text(
+                "SELECT conrelid::regclass::text, conname FROM pg_constraint "
+                "WHERE contype = 'f' AND connamespace = CAST(:schema AS regnamespace)"
+            ).bindparams(schema=schema))
+            for table, name in fks.all():
+                await conn.execute(text(f'ALTER TABLE {table} DROP CONSTRAINT "{name}"'))
+            for model, rows in _seed_rows().items():
+                await conn.execute(insert(model), rows)
+            for table in ("gold_records", "signups", "ranking_snapshots", "guild_members", "weekly_records"):
+                await conn.execute(text(f"ANALYZE {table}"))
+
+        async with engine.connect() as conn:
+            for index_name, query in HOT_QUERIES.items():
+                result = await conn.execute(text(f"EXPLAIN (FORMAT JSON) {query}"))
+                plan = result.scalar()
+                plan = json.loads(plan) if isinstance(plan, str) else plan
+                assert index_name in _index_names(plan), f"{index_name} 未被使用:\n{json.dumps(plan, indent=2)}"
+    finally:
+        await engine.dispose()
+        async with admin.begin() as conn:
+            await conn.execute(text(f"DROP SCHEMA {schema} CASCADE"))
+        await admin.dispose()
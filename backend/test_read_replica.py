@@ -0,0 +1,114 @@
+import os
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from jose import jwt
+
+from app import database
+from app.core.config import settings
+
+
+class FakeSession:
+    def __init__(self, name):
+        self.info = {}
+        self.name = name
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *_exc):
+        return False
+
+    async def close(self):
+        pass
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(database, "AsyncSessionLocal", lambda: FakeSession("primary"))
+    monkeypatch.setattr(database, "ReplicaSessionLocal", lambda: FakeSession("replica"))
+    monkeypatch.setattr(database, "_sticky_until", {})
+
+    app = FastAPI()
+    app.middleware("http")(database.primary_sticky_middleware)
+
+    @app.get("/read")
+    async def read(db=Depends(database.get_read_db)):
+        assert database.is_replica_session(db) == (db.name == "replica")
+        return db.name
+
+    @app.post("/write")
+    async def write(db=Depends(database.get_db)):
+        return db.name
+
+    return TestClient(app)
+
+
+def _auth(user_id):
+    token = jwt.encode({"sub": str(user_id), "type": "user"}, "secret")
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_reads_use_replica_until_own_write(client):
+    assert client.get("/read", headers=_auth(1)).json() == "replica"
+
+    assert client.post("/write", headers=_auth(1)).json() == "primary"
+
+    # 写入者在粘滞窗口内读主库，其他用户仍读副本
+    assert client.get("/read", headers=_auth(1)).json() == "primary"
+    assert client.get("/read", headers=_auth(2)).json() == "replica"
+
+
+def test_sticky_window_holds_across_workers(client):
+    """粘滞窗口随签名 Cookie 传递，另一个工作进程（没有本进程记录）同样读主库"""
+    client.post("/write", headers=_auth(1))
+    database._sticky_until.clear()
+
+    assert client.get("/read", headers=_auth(1)).json() == "primary"
+    # Cookie 与请求方绑定，其他用户带着它仍读副本
+    assert client.get("/read", headers=_auth(2)).json() == "replica"
+
+
+def test_tampered_sticky_cookie_is_ignored(client):
+    forged = jwt.encode({"sub": "user:1", "token_type": "db_sticky", "exp": 4102444800}, "not-the-secret-key")
+    client.cookies.set(database.STICKY_COOKIE, forged)
+
+    assert client.get("/read", headers=_auth(1)).json() == "replica"
+
+
+def test_sticky_window_expires(client, monkeypatch):
+    monkeypatch.setattr(settings, "DATABASE_REPLICA_STICKY_SECONDS", -1)
+
+    client.post("/write", headers=_auth(1))
+
+    assert client.get("/read", headers=_auth(1)).json() == "replica"
+
+
+def test_without_replica_everything_uses_primary(client, monkeypatch):
+    monkeypatch.setattr(database, "ReplicaSessionLocal", None)
+
+    assert client.get("/read", headers=_auth(1)).json() == "primary"
+    response = client.post("/write", headers=_auth(1))
+    assert database._sticky_until == {}
+    assert database.STICKY_COOKIE not in response.cookies
+
+
+@pytest.mark.skipif(not os.getenv("TEST_DATABASE_URL"), reason="需要 TEST_DATABASE_URL 指向可用的 PostgreSQL")
+@pytest.mark.asyncio
+async def test_replica_connections_are_read_only():
+    """主库与副本使用同一个 DSN，副本连接应处于只读事务"""
+    from sqlalchemy import text
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    dsn = os.environ["TEST_DATABASE_URL"]
+    primary = create_async_engine(dsn)
+    replica = create_async_engine(dsn, connect_args={"server_settings": {"default_transaction_read_only": "on"}})
+    try:
+        async with primary.connect() as conn:
+            assert (await conn.execute(text("SHOW transaction_read_only"))).scalar() == "off"
+        async with replica.connect() as conn:
+            assert (await conn.execute(text("SHOW transaction_read_only"))).scalar() == "on"
+    finally:
+        await primary.dispose()
+        await replica.dispose()
@@ -0,0 +1,65 @@
+import pytest
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.orm import Session
+
+from app.core import instrumentation
+from app.core.instrumentation import normalize_statement, query_budget
+from app.models.team_log import TeamLog
+from app.services.team_log_service import TeamLogService
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://")
+    TeamLog.__table__.create(engine)
+    instrumentation.install(engine)
+    yield engine
+    engine.dispose()
+
+
+def test_normalize_statement_collapses_literals_and_in_lists():
+    assert normalize_statement("SELECT *  FROM t\nWHERE id = $1 AND name = 'x'") == (
+        "SELECT * FROM t WHERE id = ? AND name = ?"
+    )
+    assert normalize_statement("SELECT * FROM t WHERE id IN (?, ?, ?)") == (
+        normalize_statement("SELECT * FROM t WHERE id IN (%(id_1)s)")
+    )
+
+
+def test_stats_record_count_time_and_repeats(engine):
+    token = instrumentation.begin()
+    try:
+        with engine.connect() as conn:
+            for team_id in range(4):
+                conn.execute(text("SELECT * FROM team_logs WHERE team_id = :id").bindparams(id=team_id))
+            conn.execute(text("SELECT 1"))
+    finally:
+        stats = instrumentation.end(token)
+
+    assert stats.count == 5
+    assert stats.total_ms >= stats.slowest_ms > 0
+    assert stats.repeated(3) == [("SELECT * FROM team_logs WHERE team_id = ?", 4)]
+    assert instrumentation.current_stats() is None
+
+
+def test_statements_outside_request_are_ignored(engine):
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+    assert instrumentation.current_stats() is None
+
+
+@pytest.mark.asyncio
+async def test_team_log_commit_query_budget(engine):
+    with Session(engine) as session:
+        with query_budget(max_queries=1):
+            for team_id in range(5):
+                await TeamLogService.create_log(session, 1, team_id, "team_locked", 3, {})
+            session.commit()
+
+
+def test_query_budget_reports_n_plus_one(engine):
+    with pytest.raises(AssertionError, match="N\\+1"):
+        with query_budget(max_queries=20, max_repeats=2):
+            with Session(engine) as session:
+                for team_id in range(3):
+                    session.execute(select(TeamLog).where(TeamLog.team_id == team_id))
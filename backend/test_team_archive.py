@@ -0,0 +1,147 @@
+import os
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.dialects import postgresql
+
+import app.models  # noqa: F401 - 注册全部模型
+from app.api.v2.endpoints import gold_records as gold_api
+from app.api.v2.endpoints import my_records as my_records_api
+from app.models.archive import SignupArchive, TeamArchive, TeamLogArchive
+from app.models.base import Base
+from app.models.signup import Signup
+from app.models.team import Team
+from app.models.team_log import TeamLog
+from app.services.archive_service import ArchiveService
+
+
+def test_archive_tables_mirror_hot_tables():
+    """归档表的列与热表一致（热表新增列时归档表同步）"""
+    for model, archive_model in ((Team, TeamArchive), (Signup, SignupArchive), (TeamLog, TeamLogArchive)):
+        hot = [c.name for c in model.__table__.columns]
+        archived = [c.name for c in archive_model.__table__.columns]
+        assert archived == hot + ["archived_at"]
+        assert not archive_model.__table__.foreign_keys
+
+
+class FakeResult:
+    def __init__(self, value):
+        self.value = value
+
+    def scalar_one_or_none(self):
+        return self.value
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self.value
+
+
+class FakeSession:
+    """按表返回预置结果：热表没有团队，归档表中有团队及其报名"""
+
+    def __init__(self, archived_team, archived_signups):
+        self.archived_team = archived_team
+        self.archived_signups = archived_signups
+        self.statements = []
+
+    async def execute(self, statement):
+        sql = str(statement.compile(dialect=postgresql.dialect()))
+        self.statements.append(sql)
+        if "FROM teams_archive" in sql:
+            return FakeResult(self.archived_team)
+        if "FROM signups_archive" in sql:
+            return FakeResult(self.archived_signups)
+        return FakeResult(None if "FROM teams" in sql else [])
+
+    async def commit(self):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_weekly_propagation_reads_archived_signups(monkeypatch):
+    upserts = []
+
+    async def auto_upsert_weekly_records(db, entries, dungeon_name, gold_amount, gold_record_id, week_start=None):
+        upserts.append((entries, dungeon_name, gold_amount))
+    monkeypatch.setattr(my_records_api, "auto_upsert_weekly_records", auto_upsert_weekly_records)
+
+    signups = [SimpleNamespace(signup_user_id=user_id, signup_character_id=user_id * 10) for user_id in (1, 2)]
+    db = FakeSession(TeamArchive(id=5, guild_id=1), signups)
+    gold_record = SimpleNamespace(
+        id=9, guild_id=1, team_id=5, dungeon="主本", total_gold=10000, subsidy_gold=0, worker_count=2
+    )
+
+    await gold_api._auto_update_weekly_records(db, gold_record)
+
+    assert any("FROM signups_archive" in sql for sql in db.statements)
+    assert upserts == [([(1, 10), (2, 20)], "主本", 5000)]
+
+
+def _team(team_id, status, closed_days_ago):
+    now = datetime.utcnow()
+    return dict(
+        id=team_id, guild_id=1, creator_id=1, title=f"团{team_id}", team_time=now - timedelta(days=closed_days_ago),
+        dungeon="主本", status=status, rule=[], created_at=now, updated_at=now,
+        closed_at=None if status == "open" else now - timedelta(days=closed_days_ago),
+    )
+
+
+@pytest.mark.skipif(not os.getenv("TEST_DATABASE_URL"), reason="需要 TEST_DATABASE_URL 指向可用的 PostgreSQL")
+@pytest.mark.asyncio
+async def test_archive_moves_old_closed_teams_and_reads_fall_back():
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    schema = f"archive_test_{os.getpid()}"
+    admin = create_async_engine(os.environ["TEST_DATABASE_URL"])
+    async with admin.begin() as conn:
+        await conn.execute(text(f"CREATE SCHEMA {schema}"))
+
+    engine = create_async_engine(
+        os.environ["TEST_DATABASE_URL"],
+        connect_args={"server_settings": {"search_path": schema}},
+    )
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            # 去掉指向用户/群组的外键以便直接写入测试数据（团队与报名、日志之间的外键保留）
+            fks = await conn.execute(text(
+                "SELECT conrelid::regclass::text, conname FROM pg_constraint "
+                "WHERE contype = 'f' AND connamespace = CAST(:schema AS regnamespace) "
+                "AND confrelid <> CAST('teams' AS regclass)"
+            ).bindparams(schema=schema))
+            for table, name in fks.all():
+                await conn.execute(text(f'ALTER TABLE {table} DROP CONSTRAINT "{name}"'))
+            await conn.execute(insert(Team), [
+                _team(1, "completed", 400), _team(2, "cancelled", 400), _team(3, "completed", 10), _team(4, "open", 400),
+            ])
+            now = datetime.utcnow()
+            await conn.execute(insert(Signup), [
+                dict(id=team_id * 10, team_id=team_id, submitter_id=1, signup_info={}, created_at=now, updated_at=now)
+                for team_id in (1, 2, 3, 4)
+            ])
+            await conn.execute(insert(TeamLog), [
+                dict(id=team_id * 10, team_id=team_id, guild_id=1, action_type="create", action_detail={}, created_at=now)
+                for team_id in (1, 2, 3, 4)
+            ])
+
+        session_factory = async_sessionmaker(engine, expire_on_commit=False)
+        async with session_factory() as db:
+            assert await ArchiveService.archive(db, older_than_days=180, batch_size=1) == 2
+
+            for model, archive_model in ((Team, TeamArchive), (Signup, SignupArchive), (TeamLog, TeamLogArchive)):
+                assert (await db.execute(select(func.count()).select_from(model))).scalar() == 2
+                assert (await db.execute(select(func.count()).select_from(archive_model))).scalar() == 2
+
+            archived = await ArchiveService.get_team(db, 1, 1)
+            assert isinstance(archived, TeamArchive)
+            assert ArchiveService.signup_model(archived) is SignupArchive
+            assert isinstance(await ArchiveService.get_team(db, 1, 3), Team)
+    finally:
+        await engine.dispose()
+        async with admin.begin() as conn:
+            await conn.execute(text(f"DROP SCHEMA {schema} CASCADE"))
+        await admin.dispose()
@@ -0,0 +1,65 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+from app.models.signup import Signup
+from app.schemas.bot import BotTeamDetail
+from app.services.team_board_service import (
+    TeamBoardService,
+    _collect_dirty_teams,
+    _invalidate_dirty_teams,
+)
+
+
+def make_document(**overrides):
+    data = dict(
+        id=1, guild_id=1, creator_id=1, creator_name="团长", title="测试团",
+        team_time=datetime(2026, 1, 1, 20), dungeon="测试副本", max_members=25,
+        is_xuanjing_booked=False, is_yuntie_booked=False, is_hidden=False,
+        is_locked=False, status="open", rules=[], signups=[],
+        created_at=datetime(2026, 1, 1), updated_at=datetime(2026, 1, 1),
+        latest_change_at=datetime(2026, 1, 1)
+    )
+    data.update(overrides)
+    return BotTeamDetail(**data)
+
+
+def test_version_is_content_hash():
+    document = make_document()
+    same = make_document()
+    changed = make_document(waitlist=[3])
+
+    assert TeamBoardService.compute_version(document) == TeamBoardService.compute_version(same)
+    assert TeamBoardService.compute_version(document) != TeamBoardService.compute_version(changed)
+
+
+def test_build_signup_counters_uses_latest_change():
+    team = SimpleNamespace(updated_at=datetime(2026, 1, 1))
+    stats = {
+        "total": 5,
+        "cancelled": 2,
+        "latest_created_at": datetime(2026, 1, 2),
+        "latest_cancelled_at": datetime(2026, 1, 3),
+        "latest_updated_at": datetime(2026, 1, 3)
+    }
+
+    counters = TeamBoardService.build_signup_counters(team, stats)
+
+    assert counters["signup_count"] == 3
+    assert counters["total_signup_count"] == 5
+    assert counters["latest_change_at"] == datetime(2026, 1, 3)
+    assert TeamBoardService.build_signup_counters(team, None)["signup_count"] == 0
+
+
+def test_commit_of_signup_write_invalidates_cached_board():
+    TeamBoardService.clear()
+    TeamBoardService._cache[7] = (float("inf"), (datetime(2026, 1, 1), 0, 0, None), make_document(id=7))
+    TeamBoardService._cache[8] = (float("inf"), (datetime(2026, 1, 1), 0, 0, None), make_document(id=8))
+    session = SimpleNamespace(new=[Signup(team_id=7)], dirty=[], deleted=[], info={})
+
+    _collect_dirty_teams(session, None)
+    assert 7 in TeamBoardService._cache  # 提交前不失效
+
+    _invalidate_dirty_teams(session)
+    assert 7 not in TeamBoardService._cache
+    assert 8 in TeamBoardService._cache
+    TeamBoardService.clear()
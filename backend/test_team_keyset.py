@@ -0,0 +1,93 @@
+import json
+from datetime import date, datetime
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
+
+from app.api.v2.endpoints import teams as teams_api
+from app.schemas.team import TeamSummaryOut
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def all(self):
+        return self.rows
+
+
+class FakeSession:
+    """记录执行的语句，按表返回预置的摘要行"""
+
+    def __init__(self, hot_rows, archived_rows=()):
+        self.hot_rows = list(hot_rows)
+        self.archived_rows = list(archived_rows)
+        self.statements = []
+
+    async def execute(self, statement):
+        sql = str(statement.compile(dialect=postgresql.dialect()))
+        self.statements.append(sql)
+        return FakeResult(self.archived_rows if "FROM teams_archive" in sql else self.hot_rows)
+
+
+def _summary_row(team_id, team_time):
+    row = {name: None for name in TeamSummaryOut.model_fields}
+    row.update(
+        id=team_id, guild_id=1, creator_id=1, title="金团", team_time=team_time, dungeon="主本",
+        max_members=25, is_xuanjing_booked=False, is_yuntie_booked=False, is_hidden=False, is_locked=False,
+        status="open", created_at=team_time, updated_at=team_time,
+    )
+    return SimpleNamespace(**row)
+
+
+async def _list_page(db, **params):
+    params = {"limit": 2, "cursor": None, "status_filter": None, "from_date": None, "to_date": None,
+              "detail": False, **params}
+    response = await teams_api.list_teams_page(1, current_user=SimpleNamespace(id=1), db=db, **params)
+    return json.loads(response.body)["data"]
+
+
+@pytest.fixture(autouse=True)
+def allow_member(monkeypatch):
+    async def require_member(db, guild_id, user_id):
+        return None
+    monkeypatch.setattr(teams_api.GuildContextService, "require_member", require_member)
+
+
+@pytest.mark.asyncio
+async def test_summary_page_merges_archive_and_returns_cursor():
+    # 热表与归档表的结果按 (team_time, id) 倒序合并
+    hot = [_summary_row(i, datetime(2026, 1, i, 20)) for i in (3, 1)]
+    archived = [_summary_row(2, datetime(2026, 1, 2, 20))]
+    db = FakeSession(hot, archived)
+
+    page = await _list_page(db, from_date=date(2026, 1, 1), to_date=date(2026, 1, 31))
+
+    assert len(db.statements) == 2
+    sql = db.statements[0]
+    assert "teams.rule" not in sql and "slot_assignments" not in sql and "teams.notice" not in sql
+    assert "ORDER BY teams.team_time DESC, teams.id DESC" in sql
+    assert [item["id"] for item in page["items"]] == [3, 2]
+    assert page["has_more"] is True
+    assert page["next_cursor"] == "2026-01-02T20:00:00_2"
+
+    # 下一页以 (team_time, id) 作为 keyset 条件
+    await _list_page(db, cursor=page["next_cursor"])
+    assert "(teams.team_time, teams.id) < (" in db.statements[2]
+    assert "(teams_archive.team_time, teams_archive.id) < (" in db.statements[3]
+
+
+@pytest.mark.asyncio
+async def test_open_teams_skip_archive():
+    db = FakeSession([])
+    await _list_page(db, status_filter="open")
+    assert len(db.statements) == 1
+
+
+@pytest.mark.asyncio
+async def test_invalid_cursor_is_rejected():
+    with pytest.raises(HTTPException) as exc:
+        await _list_page(FakeSession([]), cursor="not-a-cursor")
+    assert exc.value.status_code == 400
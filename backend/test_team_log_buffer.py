@@ -0,0 +1,49 @@
+import pytest
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.orm import Session
+
+from app.models.team_log import TeamLog
+from app.services.team_log_service import TeamLogService
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://")
+    TeamLog.__table__.create(engine)
+    statements = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def record(_conn, _cursor, statement, _params, _context, _executemany):
+        statements.append(statement)
+
+    engine.statements = statements
+    yield engine
+    engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_logs_written_in_one_insert_at_commit(engine):
+    with Session(engine) as session:
+        await TeamLogService.log_team_updated(session, 1, 2, 3, {"title": {"old": "a", "new": "b"}})
+        await TeamLogService.create_log(session, 1, 2, "team_locked", 3, {})
+        await TeamLogService.log_team_closed(session, 1, 2, 3, "completed")
+        assert engine.statements == []
+
+        session.commit()
+
+        inserts = [s for s in engine.statements if s.lstrip().upper().startswith("INSERT")]
+        assert len(inserts) == 1
+
+        logs = session.execute(select(TeamLog).order_by(TeamLog.id)).scalars().all()
+        assert [log.action_type for log in logs] == ["team_updated", "team_locked", "team_closed"]
+
+
+@pytest.mark.asyncio
+async def test_rollback_discards_buffered_logs(engine):
+    with Session(engine) as session:
+        session.execute(select(TeamLog))
+        await TeamLogService.log_team_deleted(session, 1, 2, 3)
+        session.rollback()
+        session.commit()
+
+        assert session.execute(select(TeamLog)).scalars().all() == []
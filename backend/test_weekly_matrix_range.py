@@ -0,0 +1,101 @@
+from datetime import timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from app.api.v2.endpoints.my_records import get_week_start_date, get_weekly_matrix_range
+from app.services.config_cache_service import ConfigCacheService
+
+
+class FakeResult:
+    def __init__(self, rows=None, row=None):
+        self.rows = rows or []
+        self.row = row
+
+    def fetchone(self):
+        return self.row
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self.rows
+
+
+class ReadOnlySession:
+    """按顺序返回查询结果，任何写入都会直接失败"""
+
+    def __init__(self, results):
+        self.info = {}
+        self.results = list(results)
+        self.executed = 0
+
+    async def execute(self, _statement):
+        self.executed += 1
+        return self.results.pop(0)
+
+    def add(self, _obj):
+        raise AssertionError("范围查询不应写入数据库")
+
+    async def commit(self):
+        raise AssertionError("范围查询不应提交事务")
+
+
+@pytest.fixture(autouse=True)
+def clear_config_cache():
+    ConfigCacheService.clear()
+    yield
+    ConfigCacheService.clear()
+
+
+@pytest.mark.asyncio
+async def test_matrix_range_reads_weeks_without_creating_configs():
+    end_week = get_week_start_date() - timedelta(weeks=1)
+    middle_week = end_week - timedelta(weeks=1)
+    old_week = end_week - timedelta(weeks=5)
+
+    system_options = [{"name": "主本", "type": "primary", "order": 0}]
+    # 范围前最近的配置（含自定义列），应被后续没有配置的周继承
+    old_config = SimpleNamespace(
+        week_start_date=old_week,
+        columns_json=[
+            {"name": "主本", "type": "primary", "order": 0},
+            {"name": "补贴本", "type": "custom", "order": 1},
+        ],
+    )
+    character = SimpleNamespace(id=7, name="剑心", server="梦江南", xinfa="冰心诀", remark=None)
+    records = [
+        SimpleNamespace(id=1, character_id=7, week_start_date=end_week, dungeon_name="主本",
+                        gold_amount=300, expense_amount=10, gold_record_id=None),
+        SimpleNamespace(id=2, character_id=7, week_start_date=middle_week, dungeon_name="补贴本",
+                        gold_amount=50, expense_amount=0, gold_record_id=None),
+    ]
+    cd_statuses = [
+        SimpleNamespace(character_id=7, week_start_date=middle_week, dungeon_name="主本", is_cleared=True),
+    ]
+
+    db = ReadOnlySession([
+        FakeResult(row=(system_options,)),
+        FakeResult([old_config]),
+        FakeResult([character]),
+        FakeResult(records),
+        FakeResult(cd_statuses),
+    ])
+
+    response = await get_weekly_matrix_range(
+        end_week=end_week + timedelta(days=3), weeks=3, x_guild_id=None,
+        current_user=SimpleNamespace(id=1), db=db,
+    )
+    data = response["data"]
+
+    assert db.executed == 5
+    assert data["end_week"] == end_week
+    assert [week["week_start_date"] for week in data["weeks"]] == [
+        end_week, middle_week, end_week - timedelta(weeks=2)
+    ]
+    assert all([col["name"] for col in week["columns"]] == ["主本", "补贴本"] for week in data["weeks"])
+    assert data["weeks"][1]["rows"][0]["cells"]["主本"]["is_cleared"] is True
+    assert [week["grand_total"] for week in data["weeks"]] == [300, 50, 0]
+    assert data["grand_total"] == 350
+    assert data["grand_expense_total"] == 10
+    assert data["column_totals"] == {"主本": 300, "补贴本": 50}
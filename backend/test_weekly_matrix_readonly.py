@@ -0,0 +1,156 @@
+from datetime import timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from app.api.v2.endpoints.my_records import get_week_start_date, get_weekly_columns, get_weekly_matrix
+from app.services.config_cache_service import ConfigCacheService
+
+
+class FakeResult:
+    def __init__(self, rows=None, row=None):
+        self.rows = rows or []
+        self.row = row
+
+    def fetchone(self):
+        return self.row
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self.rows
+
+
+class ReadOnlySession:
+    """按顺序返回查询结果，任何写入都会直接失败"""
+
+    def __init__(self, results):
+        self.info = {}
+        self.results = list(results)
+        self.statements = []
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        return self.results.pop(0)
+
+    def add(self, _obj):
+        raise AssertionError("GET 请求不应写入数据库")
+
+    async def flush(self):
+        raise AssertionError("GET 请求不应刷新写入")
+
+    async def commit(self):
+        raise AssertionError("GET 请求不应提交事务")
+
+
+SYSTEM_OPTIONS = [
+    {"name": "新主本", "type": "primary", "order": 0},
+]
+
+
+@pytest.fixture(autouse=True)
+def clear_config_cache():
+    ConfigCacheService.clear()
+    yield
+    ConfigCacheService.clear()
+
+
+def _assert_only_selects(db):
+    for statement in db.statements:
+        assert str(statement).lstrip().upper().startswith("SELECT")
+
+
+@pytest.mark.asyncio
+async def test_current_week_matrix_syncs_columns_without_writing():
+    week_start = get_week_start_date()
+    # 当前周配置仍是旧赛季主本，旧逻辑会在 GET 中改写并提交
+    config = SimpleNamespace(
+        week_start_date=week_start,
+        columns_json=[{"name": "旧主本", "type": "primary", "order": 0}],
+    )
+    character = SimpleNamespace(id=7, name="剑心", server="梦江南", xinfa="冰心诀", remark=None)
+    db = ReadOnlySession([
+        FakeResult([character]),
+        FakeResult([]),
+        FakeResult(row=(SYSTEM_OPTIONS,)),
+        FakeResult([config]),
+        FakeResult([]),
+    ])
+
+    response = await get_weekly_matrix(
+        week_start=None, x_guild_id=None, current_user=SimpleNamespace(id=1), db=db
+    )
+
+    columns = response["data"]["columns"]
+    assert [(col["name"], col["type"]) for col in columns] == [("新主本", "primary"), ("旧主本", "custom")]
+    assert config.columns_json == [{"name": "旧主本", "type": "primary", "order": 0}]
+    assert len(db.statements) == 5
+    _assert_only_selects(db)
+
+
+@pytest.mark.asyncio
+async def test_past_week_columns_inherit_without_creating_config():
+    week_start = get_week_start_date() - timedelta(weeks=3)
+    previous_config = SimpleNamespace(
+        week_start_date=week_start - timedelta(weeks=2),
+        columns_json=[
+            {"name": "旧主本", "type": "primary", "order": 0},
+            {"name": "补贴本", "type": "custom", "order": 1},
+        ],
+    )
+    db = ReadOnlySession([
+        FakeResult(row=(SYSTEM_OPTIONS,)),
+        FakeResult([previous_config]),
+        FakeResult([]),
+    ])
+
+    response = await get_weekly_columns(
+        week_start=week_start, x_guild_id=None, current_user=SimpleNamespace(id=1), db=db
+    )
+
+    assert [col["name"] for col in response["data"]] == ["新主本", "补贴本"]
+    assert len(db.statements) == 3
+    _assert_only_selects(db)
+
+
+@pytest.mark.asyncio
+async def test_past_week_keeps_recorded_columns_after_defaults_change():
+    # 该周没有配置，记录写在旧主本上；之后主要副本调整为新主本
+    week_start = get_week_start_date() - timedelta(weeks=3)
+    previous_config = SimpleNamespace(
+        week_start_date=week_start - timedelta(weeks=1),
+        columns_json=[{"name": "旧主本", "type": "primary", "order": 0}],
+    )
+    character = SimpleNamespace(id=7, name="剑心", server="梦江南", xinfa="冰心诀", remark=None)
+    record = SimpleNamespace(
+        id=11, character_id=7, dungeon_name="旧主本", week_start_date=week_start,
+        gold_amount=3000, expense_amount=0, gold_record_id=None,
+    )
+
+    db = ReadOnlySession([
+        FakeResult([character]),
+        FakeResult([record]),
+        FakeResult(row=(SYSTEM_OPTIONS,)),
+        FakeResult([previous_config]),
+        FakeResult([]),
+    ])
+    response = await get_weekly_matrix(
+        week_start=week_start, x_guild_id=None, current_user=SimpleNamespace(id=1), db=db
+    )
+
+    matrix = response["data"]
+    assert [(col["name"], col["type"]) for col in matrix["columns"]] == [("新主本", "primary"), ("旧主本", "custom")]
+    assert matrix["grand_total"] == 3000
+    _assert_only_selects(db)
+
+    # 列配置接口同样保留有记录的列（默认列已在缓存中）
+    db = ReadOnlySession([
+        FakeResult([previous_config]),
+        FakeResult(["旧主本"]),
+    ])
+    response = await get_weekly_columns(
+        week_start=week_start, x_guild_id=None, current_user=SimpleNamespace(id=1), db=db
+    )
+    assert [col["name"] for col in response["data"]] == ["新主本", "旧主本"]
+    _assert_only_selects(db)
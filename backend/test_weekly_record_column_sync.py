@@ -3,6 +3,7 @@ from types import SimpleNamespace
 import pytest
 
 from app.api.v2.endpoints.my_records import ColumnConfig, get_default_columns, sync_columns_with_primary_defaults
+from app.services.config_cache_service import ConfigCacheService
 
 
 class FakeScalarResult:
@@ -23,6 +24,7 @@ class FakeFetchResult:
 
 class FakeAsyncSession:
     def __init__(self, results):
+        self.info = {}
         self.results = list(results)
 
     async def execute(self, _statement):
@@ -31,6 +33,13 @@ class FakeAsyncSession:
         return self.results.pop(0)
 
 
+@pytest.fixture(autouse=True)
+def clear_config_cache():
+    ConfigCacheService.clear()
+    yield
+    ConfigCacheService.clear()
+
+
 def test_new_week_drops_obsolete_primary_columns():
     existing_columns = [
         ColumnConfig(name="旧赛季主本", type="primary", order=0),
@@ -88,7 +97,7 @@ async def test_get_default_columns_prefers_guild_config():
         {"name": "群组主本一", "type": "primary", "order": 1},
     ]
     db = FakeAsyncSession([
-        FakeScalarResult(SimpleNamespace(dungeon_options=guild_options)),
+        FakeScalarResult(SimpleNamespace(dungeon_options=guild_options, quick_team_options=[])),
     ])
 
     columns = await get_default_columns(db, guild_id=123)
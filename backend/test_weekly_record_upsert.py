@@ -0,0 +1,51 @@
+from datetime import date
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.api.v2.endpoints.my_records import auto_upsert_weekly_records
+
+
+class RecordingSession:
+    def __init__(self):
+        self.statements = []
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+
+
+@pytest.mark.asyncio
+async def test_upsert_uses_two_statements_for_whole_run():
+    db = RecordingSession()
+    entries = [(user_id, 100 + user_id) for user_id in range(1, 26)]
+
+    await auto_upsert_weekly_records(
+        db,
+        entries=entries + [entries[0]],
+        dungeon_name="测试副本",
+        gold_amount=1000,
+        gold_record_id=9,
+        week_start=date(2026, 1, 5)
+    )
+
+    assert len(db.statements) == 2
+    cd_sql, record_sql = (
+        str(statement.compile(dialect=postgresql.dialect())) for statement in db.statements
+    )
+    assert "INSERT INTO character_cd_status" in cd_sql
+    assert "ON CONFLICT (character_id, week_start_date, dungeon_name) DO UPDATE" in cd_sql
+    assert "INSERT INTO weekly_records" in record_sql
+    assert "ON CONFLICT (user_id, character_id, week_start_date, dungeon_name) DO UPDATE" in record_sql
+    # 重复的报名被去重，每个角色一行
+    params = db.statements[1].compile(dialect=postgresql.dialect()).params
+    assert "user_id_m24" in params
+    assert "user_id_m25" not in params
+
+
+@pytest.mark.asyncio
+async def test_upsert_skips_empty_entries():
+    db = RecordingSession()
+
+    await auto_upsert_weekly_records(db, [], "测试副本", 1000, 9)
+
+    assert db.statements == []
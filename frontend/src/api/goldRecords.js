@@ -20,6 +20,16 @@ export const getGoldRecords = (guildId, params = {}) => {
   return apiClient.get(`/guilds/${guildId}/gold-records`, { params });
 };
 
+/**
+ * 获取金团记录列表（游标分页）
+ * @param {number} guildId - 群组ID
+ * @param {object} params - 查询参数（limit, cursor, start_date, end_date, dungeon, heibenren_user_id）
+ * @returns {Promise} data: { items, next_cursor, has_more }
+ */
+export const getGoldRecordsPage = (guildId, params = {}) => {
+  return apiClient.get(`/guilds/${guildId}/gold-records/page`, { params });
+};
+
 /**
  * 获取金团记录详情
  * @param {number} guildId - 群组ID
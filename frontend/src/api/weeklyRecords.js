@@ -11,6 +11,17 @@ export const getWeeklyMatrix = async (weekStart = null) => {
   return response.data;
 };
 
+/**
+ * 获取多周记录矩阵数据（一次请求返回多周，按周倒序）
+ * @param {number} weeks - 周数
+ * @param {string} endWeek - 结束周起始日期 (YYYY-MM-DD)，不传则为当前周
+ */
+export const getWeeklyMatrixRange = async (weeks = 12, endWeek = null) => {
+  const params = endWeek ? { weeks, end_week: endWeek } : { weeks };
+  const response = await apiClient.get("/users/me/weekly-records/matrix/range", { params });
+  return response.data;
+};
+
 /**
  * 获取可选周列表
  * @param {number} limit - 返回周数